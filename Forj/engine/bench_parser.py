@@ -0,0 +1,132 @@
+"""
+Microbenchmark: row_parser.parse_rows against the character-by-character
+parser it replaced (kept below as legacy_parse_csv_row).
+
+Builds synthetic responses shaped like the model's output (plain values,
+quoted values with commas, doubled quotes), checks that both parsers agree on
+them and that parse_rows handles the REGRESSION_CASES below, then times
+parsing every response with each.
+
+Usage:
+    python bench_parser.py --responses 2000 --rows 10 --columns 6
+"""
+import argparse
+import random
+import timeit
+from typing import List
+
+from row_parser import parse_rows
+
+# (response, columns, rows parse_rows must return): a stray quote must only cost its own line
+REGRESSION_CASES = [
+    ('"a,b\nc,d\n"e,f', 2, [['c', 'd']]),
+    ('Bob,"Smith, Jr,5\nAmy,ok,3\nCat,good,1', 3, [['Amy', 'ok', '3'], ['Cat', 'good', '1']]),
+    ('x,"two\nlines",y\nz,w,v', 3, [['x', 'two\nlines', 'y'], ['z', 'w', 'v']]),
+]
+
+WORDS = ["alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel", "india", "juliet"]
+
+
+def legacy_parse_csv_row(response: str, num_columns: int) -> List[str]:
+    """The former Synthesizer._parse_csv_row, unchanged apart from taking the column count."""
+    row = []
+    in_quotes = False
+    current_value = []
+
+    i = 0
+    while i < len(response):
+        char = response[i]
+        if char == '"':
+            if i + 1 < len(response) and response[i+1] == '"':  # escaped quote
+                current_value.append('"')
+                i += 1
+            else:
+                in_quotes = not in_quotes
+        elif char == ',' and not in_quotes:
+            row.append(''.join(current_value).strip())
+            current_value = []
+            # If we've reached the expected number of columns, stop parsing
+            if len(row) >= num_columns:
+                break
+        else:
+            current_value.append(char)
+        i += 1
+
+    # Add the last value if we haven't reached the column limit
+    if current_value and len(row) < num_columns:
+        row.append(''.join(current_value).strip())
+
+    # Ensure we have exactly the right number of columns
+    if len(row) > num_columns:
+        row = row[:num_columns]
+    elif len(row) < num_columns:
+        # If we're short, pad with empty strings
+        row.extend([''] * (num_columns - len(row)))
+
+    return row
+
+
+def legacy_parse_response(text: str, num_columns: int, count: int) -> List[List[str]]:
+    """How generate_samples used the legacy parser: split on newlines, one call per line."""
+    lines = [line.strip() for line in text.split('\n') if line.strip()]
+    return [legacy_parse_csv_row(line, num_columns) for line in lines[:count]]
+
+
+def make_cell(rng: random.Random) -> str:
+    words = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 12)))
+    kind = rng.random()
+    if kind < 0.4:
+        return words
+    if kind < 0.8:
+        return f'"{words}, {rng.choice(WORDS)}"'
+    return f'"{words} ""{rng.choice(WORDS)}"""'
+
+
+def make_responses(count: int, rows: int, columns: int, seed: int = 1) -> List[str]:
+    rng = random.Random(seed)
+    return ["\n".join(",".join(make_cell(rng) for _ in range(columns)) for _ in range(rows))
+            for _ in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the csv-module row parser with the legacy one.")
+    parser.add_argument("--responses", type=int, default=2000, help="Responses to parse")
+    parser.add_argument("--rows", type=int, default=10, help="Rows per response")
+    parser.add_argument("--columns", type=int, default=6, help="Columns per row")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing runs; the best is reported")
+    args = parser.parse_args()
+
+    responses = make_responses(args.responses, args.rows, args.columns)
+    total_rows = args.responses * args.rows
+
+    for text, columns, expected in REGRESSION_CASES:
+        rows = parse_rows(text, columns).rows
+        if rows != expected:
+            raise SystemExit(f"parse_rows returned {rows!r} for {text!r}, expected {expected!r}")
+
+    for text in responses[:200]:
+        legacy = legacy_parse_response(text, args.columns, args.rows)
+        current = parse_rows(text, args.columns, limit=args.rows).rows
+        if legacy != current:
+            raise SystemExit(f"Parsers disagree on:\n{text}")
+
+    def run_legacy():
+        for text in responses:
+            legacy_parse_response(text, args.columns, args.rows)
+
+    def run_current():
+        for text in responses:
+            parse_rows(text, args.columns, limit=args.rows)
+
+    legacy_time = min(timeit.repeat(run_legacy, number=1, repeat=args.repeat))
+    current_time = min(timeit.repeat(run_current, number=1, repeat=args.repeat))
+
+    print(f"{total_rows} rows in {args.responses} responses, {args.columns} columns (best of {args.repeat})")
+    print(f"{'parser':<16}{'seconds':>10}{'rows/s':>14}")
+    print(f"{'legacy':<16}{legacy_time:>10.4f}{total_rows / legacy_time:>14,.0f}")
+    print(f"{'parse_rows':<16}{current_time:>10.4f}{total_rows / current_time:>14,.0f}")
+    print(f"speedup: {legacy_time / current_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
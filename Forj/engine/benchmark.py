@@ -0,0 +1,200 @@
+"""
+Offline throughput benchmark for the Synthesizer.
+
+Runs create_sample_set and create_dataset against the StubBackend, so no
+API key or network access is needed, and reports calls, rows and rows per
+second for each. With --http, the stub is served on localhost as an
+OpenAI-compatible /v1/chat/completions endpoint and the Synthesizer talks to
+it through the real OpenAIBackend, so the openai client and HTTP overhead are
+included too.
+
+Usage:
+    python benchmark.py --volume 2000 --latency 0.5 --jitter 0.3
+    python benchmark.py --volume 500 --failure-rate 0.05 --concurrency 16 --http
+    python benchmark.py --volume 2000 --max-rows 12 --fixed   # compare with and without --fixed
+    python benchmark.py --volume 2000 --duplicate-rate 0.1
+    python benchmark.py --volume 2000 --guidelines 150 --http   # prefix past the provider cache minimum
+"""
+import argparse
+import json
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+
+from generation_engine import EngineConfig
+from llm_backends import LLMBackendError, OpenAIBackend, StubBackend
+from synthesizer import Synthesizer
+
+DESCRIPTION = "customer support tickets for a mid-sized software company"
+COLUMNS = ["ticket_id", "product", "priority", "summary", "customer_sentiment"]
+
+
+def serve_stub(stub: StubBackend, port: int = 0) -> ThreadingHTTPServer:
+    """
+    Serve a stub backend as an OpenAI-compatible chat completions endpoint on localhost.
+
+    Args:
+        stub: The backend that answers each request.
+        port: Port to listen on (default: any free port).
+
+    Returns:
+        The running server; its address is server.server_address.
+    """
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def _reply(self, status: int, payload: Dict) -> None:
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            if not self.path.endswith("/chat/completions"):
+                self._reply(404, {"error": {"message": "Not found"}})
+                return
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            messages = request.get("messages", [])
+            system = next((m["content"] for m in messages if m.get("role") == "system"), "")
+            prompt = messages[-1]["content"] if messages else ""
+            try:
+                completion = stub.complete_with_usage(prompt, system=system)
+            except LLMBackendError as e:
+                self._reply(500, {"error": {"message": str(e), "type": "server_error"}})
+                return
+            self._reply(200, {
+                "id": f"stub-{stub.calls}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get("model", "stub"),
+                "choices": [{"index": 0, "finish_reason": completion.finish_reason,
+                             "message": {"role": "assistant", "content": completion.text}}],
+                "usage": {"prompt_tokens": completion.prompt_tokens,
+                          "prompt_tokens_details": {"cached_tokens": completion.cached_tokens},
+                          "completion_tokens": completion.completion_tokens,
+                          "total_tokens": completion.prompt_tokens + completion.completion_tokens},
+            })
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _timed(label: str, stub: StubBackend, fn) -> Dict:
+    calls_before = stub.calls
+    failures_before = stub.failures
+    started = time.perf_counter()
+    rows = fn()
+    elapsed = time.perf_counter() - started
+    return {
+        "benchmark": label,
+        "rows": len(rows),
+        "calls": stub.calls - calls_before,
+        "failures": stub.failures - failures_before,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(len(rows) / elapsed, 1) if elapsed > 0 else 0.0,
+    }
+
+
+def run_benchmark(args) -> list:
+    stub = StubBackend(latency=args.latency, jitter=args.jitter, failure_rate=args.failure_rate, seed=args.seed,
+                       max_rows=args.max_rows, duplicate_rate=args.duplicate_rate)
+    server = None
+    backend = stub
+    if args.http:
+        server = serve_stub(stub)
+        host, port = server.server_address
+        # The engine does the retrying; keep the client's own retries out of the numbers
+        backend = OpenAIBackend(model="stub", api_key="stub", base_url=f"http://{host}:{port}/v1")
+        backend.client.max_retries = 0
+
+    config = EngineConfig.from_env(
+        max_concurrency=args.concurrency,
+        requests_per_second=args.rps,
+        burst=args.concurrency,
+        batch_size=args.batch_size,
+        adaptive=not args.fixed,
+        dedup=not args.no_dedup,
+        backoff_base=0.05,
+    )
+    results = []
+    try:
+        with tempfile.TemporaryDirectory() as log_dir:
+            synthesizer = Synthesizer(log_dir=log_dir, engine_config=config, backend=backend)
+            description = DESCRIPTION + "".join(
+                f"\nGuideline {i + 1}: vary the {COLUMNS[i % len(COLUMNS)]} values, avoiding ones used before."
+                for i in range(args.guidelines))
+            synthesizer.create_initial_generation_prompt(description, COLUMNS)
+            results.append(_timed("create_sample_set", stub,
+                                  lambda: synthesizer.create_sample_set(num_samples=args.samples)))
+
+            def dataset():
+                rows, _ = synthesizer.create_dataset(description, COLUMNS, volume=args.volume, interactive=False)
+                return rows
+
+            result = _timed("create_dataset", stub, dataset)
+            result["engine"] = synthesizer.last_run_stats.to_dict()
+            result["prompts"] = synthesizer.prompt_metrics()
+            results.append(result)
+    finally:
+        if server is not None:
+            server.shutdown()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Synthesizer throughput against a local stub LLM.")
+    parser.add_argument("--volume", type=int, default=500, help="Rows for create_dataset")
+    parser.add_argument("--samples", type=int, default=5, help="Rows for create_sample_set")
+    parser.add_argument("--latency", type=float, default=0.2, help="Stub seconds per call")
+    parser.add_argument("--jitter", type=float, default=0.1, help="Stub random extra seconds per call")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Share of stub calls that fail")
+    parser.add_argument("--seed", type=int, default=1, help="Stub random seed")
+    parser.add_argument("--concurrency", type=int, default=8, help="Batch requests in flight")
+    parser.add_argument("--rps", type=float, default=0, help="Request rate limit (0 for none)")
+    parser.add_argument("--batch-size", type=int, default=5, help="Rows per request (starting size if adaptive)")
+    parser.add_argument("--fixed", action="store_true", help="Keep the batch size fixed instead of adapting it")
+    parser.add_argument("--max-rows", type=int, default=None, help="Stub truncates answers past this many rows")
+    parser.add_argument("--duplicate-rate", type=float, default=0.0, help="Share of stub rows that repeat earlier ones")
+    parser.add_argument("--no-dedup", action="store_true", help="Keep duplicate rows")
+    parser.add_argument("--guidelines", type=int, default=0,
+                        help="Extra guideline lines in the description, for a prompt long enough to be cached")
+    parser.add_argument("--http", action="store_true", help="Serve the stub over HTTP and use the OpenAI client")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = run_benchmark(args)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'benchmark':<20}{'rows':>8}{'calls':>8}{'failures':>10}{'seconds':>10}{'rows/s':>10}")
+    for result in results:
+        print(f"{result['benchmark']:<20}{result['rows']:>8}{result['calls']:>8}{result['failures']:>10}"
+              f"{result['seconds']:>10}{result['rows_per_second']:>10}")
+    engine = results[-1].get("engine")
+    if engine:
+        print(f"\ncreate_dataset engine: {engine['batches']} batches, {engine['refill_batches']} refills, "
+              f"{engine['retries']} retries, shortfall {engine['shortfall']}")
+        batching = engine.get("batching")
+        if batching:
+            print(f"adaptive batching: {batching['batch_size']} rows/call (ceiling {batching['ceiling']}), "
+                  f"yield {batching['yield']:.1%}, {batching['truncated_calls']} truncated calls, "
+                  f"{batching['tokens_per_row']} tokens/row ({batching['prompt_tokens_per_row']} prompt)")
+        prompts = results[-1]["prompts"]
+        print(f"prompts: {prompts['prompt_tokens_per_call']} prompt tokens/call, prefix ~{prompts['prefix_tokens']} "
+              f"tokens built {prompts['prefix_builds']}x, {prompts['cached_share']:.1%} served from cache")
+        dedup = engine.get("dedup")
+        if dedup:
+            print(f"dedup: {dedup['exact_duplicates']} exact and {dedup['near_duplicates']} near duplicates "
+                  f"of {dedup['checked']} rows ({dedup['duplicate_rate']:.1%})")
+
+
+if __name__ == "__main__":
+    main()
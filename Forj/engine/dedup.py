@@ -0,0 +1,203 @@
+"""
+Row-level deduplication for generated datasets.
+
+Asking the model for "COMPLETELY UNRELATED rows" doesn't stop it from
+repeating itself across batches, and on large runs every repeat is a wasted
+API call. RowDeduplicator sits between batch generation and the dataset:
+
+    exact       a blake2b hash of the normalized row text (lowercased,
+                whitespace collapsed), so rows differing only in case or
+                spacing count as the same
+    near        MinHash signatures over character shingles, indexed with
+                locality-sensitive hashing: the signature is cut into bands
+                and rows sharing any band are candidates, confirmed when their
+                estimated Jaccard similarity reaches the threshold
+
+Signatures for a whole batch are computed with numpy in one pass. The index
+is incremental and bounded: past max_rows it forgets the oldest rows first,
+so memory stays flat on arbitrarily long runs.
+"""
+import hashlib
+import re
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+Row = List[str]
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass
+class DedupStats:
+    """Rows checked and rejected so far."""
+    checked: int = 0
+    exact_duplicates: int = 0
+    near_duplicates: int = 0
+
+    @property
+    def rejected(self) -> int:
+        return self.exact_duplicates + self.near_duplicates
+
+    @property
+    def duplicate_rate(self) -> float:
+        return self.rejected / self.checked if self.checked else 0.0
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "checked": self.checked,
+            "exact_duplicates": self.exact_duplicates,
+            "near_duplicates": self.near_duplicates,
+            "duplicate_rate": round(self.duplicate_rate, 4),
+        }
+
+
+class RowDeduplicator:
+    def __init__(self, threshold: float = 0.8, num_perm: int = 64, bands: int = 16,
+                 shingle_size: int = 5, max_rows: int = 100_000, seed: int = 1):
+        """
+        Initialize the deduplicator.
+
+        Args:
+            threshold: Estimated Jaccard similarity at or above which a row is a near duplicate.
+                1.0 or more turns near-duplicate detection off.
+            num_perm: MinHash permutations per signature.
+            bands: LSH bands; num_perm must divide evenly. More bands catch less similar pairs.
+            shingle_size: Characters per shingle.
+            max_rows: Rows remembered before the oldest are forgotten.
+            seed: Seed for the hash permutations.
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.band_width = num_perm // bands
+        self.shingle_size = shingle_size
+        self.max_rows = max(1, max_rows)
+        self.stats = DedupStats()
+
+        rng = np.random.default_rng(seed)
+        # Multiply-shift hashing: (a*x + b) mod 2**64, top 32 bits, with a odd. The uint64
+        # arithmetic wraps, which is the mod
+        top = np.iinfo(np.uint64).max
+        self._a = rng.integers(0, top, size=num_perm, dtype=np.uint64, endpoint=True) | np.uint64(1)
+        self._b = rng.integers(0, top, size=num_perm, dtype=np.uint64, endpoint=True)
+
+        self._next_id = 0
+        self._rows: "OrderedDict[int, Tuple[bytes, Optional[np.ndarray]]]" = OrderedDict()
+        self._exact: Dict[bytes, int] = {}
+        self._buckets: Dict[Tuple[int, bytes], List[int]] = {}
+
+    @property
+    def near_enabled(self) -> bool:
+        return self.threshold < 1.0
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @staticmethod
+    def normalize(row: Row) -> str:
+        return " | ".join(_WHITESPACE.sub(" ", str(cell)).strip().lower() for cell in row)
+
+    def _shingle_hashes(self, text: str) -> np.ndarray:
+        k = self.shingle_size
+        if len(text) <= k:
+            shingles = {text}
+        else:
+            shingles = {text[i:i + k] for i in range(len(text) - k + 1)}
+        return np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+
+    def signatures(self, texts: List[str]) -> np.ndarray:
+        """
+        MinHash signatures for several texts at once.
+
+        Args:
+            texts: Normalized row texts.
+
+        Returns:
+            uint64 array of shape (len(texts), num_perm).
+        """
+        if not texts:
+            return np.empty((0, self.num_perm), dtype=np.uint64)
+        hashes = [self._shingle_hashes(text) for text in texts]
+        lengths = np.fromiter((len(h) for h in hashes), dtype=np.intp, count=len(hashes))
+        flat = np.concatenate(hashes)
+        # Every permutation of every shingle in the batch, then the minimum per row
+        permuted = (np.outer(flat, self._a) + self._b) >> np.uint64(32)
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        return np.minimum.reduceat(permuted, starts, axis=0)
+
+    def _band_keys(self, signature: np.ndarray) -> List[Tuple[int, bytes]]:
+        w = self.band_width
+        return [(band, signature[band * w:(band + 1) * w].tobytes()) for band in range(self.bands)]
+
+    def _is_near_duplicate(self, signature: np.ndarray) -> bool:
+        candidates = set()
+        for key in self._band_keys(signature):
+            candidates.update(self._buckets.get(key, ()))
+        for row_id in candidates:
+            other = self._rows[row_id][1]
+            if other is not None and np.mean(other == signature) >= self.threshold:
+                return True
+        return False
+
+    def _remember(self, digest: bytes, signature: Optional[np.ndarray]) -> None:
+        row_id = self._next_id
+        self._next_id += 1
+        self._rows[row_id] = (digest, signature)
+        self._exact[digest] = row_id
+        if signature is not None:
+            for key in self._band_keys(signature):
+                self._buckets.setdefault(key, []).append(row_id)
+        while len(self._rows) > self.max_rows:
+            self._forget_oldest()
+
+    def _forget_oldest(self) -> None:
+        row_id, (digest, signature) = self._rows.popitem(last=False)
+        if self._exact.get(digest) == row_id:
+            del self._exact[digest]
+        if signature is not None:
+            for key in self._band_keys(signature):
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    continue
+                if row_id in bucket:
+                    bucket.remove(row_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    def prime(self, rows: List[Row]) -> None:
+        """Remember rows kept earlier, such as by the run being resumed, without counting them in the stats."""
+        stats = replace(self.stats)
+        self.filter(rows)
+        self.stats = stats
+
+    def filter(self, rows: List[Row]) -> List[Row]:
+        """
+        Drop rows that repeat or nearly repeat an earlier row, including earlier rows in the same batch.
+
+        Args:
+            rows: A batch of rows.
+
+        Returns:
+            The rows that were kept, in their original order.
+        """
+        texts = [self.normalize(row) for row in rows]
+        signatures = self.signatures(texts) if self.near_enabled else [None] * len(rows)
+        kept = []
+        for row, text, signature in zip(rows, texts, signatures):
+            self.stats.checked += 1
+            digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+            if digest in self._exact:
+                self.stats.exact_duplicates += 1
+                continue
+            if signature is not None and self._is_near_duplicate(signature):
+                self.stats.near_duplicates += 1
+                continue
+            self._remember(digest, signature)
+            kept.append(row)
+        return kept
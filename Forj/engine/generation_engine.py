@@ -0,0 +1,435 @@
+"""
+Concurrent batch generation for Synthesizer.create_dataset.
+
+Generating a dataset one batch at a time means a 10k-row run makes 2,000
+sequential round-trips to the LLM. The GenerationEngine keeps several batch
+requests in flight on a thread pool instead, while:
+
+    - a token bucket caps the request rate (including retries), so a large
+      run stays under the provider's rate limit
+    - failed requests are retried with exponential backoff and jitter
+    - rows are emitted in batch order, not completion order, so the output
+      does not depend on which request happened to return first
+    - shortfall is accounted for as batches return: a batch that parses fewer
+      rows than it asked for frees that many rows for the next batch, rather
+      than the whole run being topped up at the end
+    - with an AdaptiveBatcher, rows per request grow while answers parse
+      cleanly and shrink when they come back truncated or malformed, so each
+      resent prompt is spread over as many rows as the model reliably returns
+    - with a RowDeduplicator (see dedup.py), repeated and near-repeated rows
+      are dropped as batches are emitted and count towards the refill, so
+      the run still ends with the requested number of distinct rows
+
+Settings come from EngineConfig, whose defaults can be overridden with FORJ_*
+environment variables (see EngineConfig.from_env). The OpenAI client honours
+OPENAI_BASE_URL, so the engine can be pointed at a local stub server.
+"""
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from dedup import RowDeduplicator
+
+Row = List[str]
+
+
+class GenerationError(RuntimeError):
+    """Raised when a batch still fails after all its retries, or the run stops making progress."""
+
+
+@dataclass
+class EngineConfig:
+    """Tuning for the generation engine."""
+    max_concurrency: int = 8          # Batch requests in flight at once
+    requests_per_second: float = 5.0  # Token bucket refill rate
+    burst: int = 8                    # Token bucket capacity
+    batch_size: int = 5               # Rows asked for per request (the starting size if adaptive)
+    adaptive: bool = True             # Let an AdaptiveBatcher resize batches
+    min_batch_size: int = 1
+    max_batch_size: int = 25
+    max_retries: int = 4              # Retries per batch after the first attempt
+    backoff_base: float = 0.5         # Seconds before the first retry
+    backoff_max: float = 30.0         # Upper bound on a single backoff
+    max_empty_batches: int = 10       # Consecutive batches with no usable rows before giving up
+    dedup: bool = True                # Drop duplicate and near-duplicate rows
+    dedup_threshold: float = 0.8      # Estimated Jaccard similarity that counts as a near duplicate
+    dedup_max_rows: int = 100_000     # Rows the dedup index remembers
+
+    @classmethod
+    def from_env(cls, **overrides) -> "EngineConfig":
+        """
+        Build a config from FORJ_* environment variables, then explicit overrides.
+
+        Args:
+            **overrides: Field values that take precedence over the environment.
+
+        Returns:
+            EngineConfig
+        """
+        values = {}
+        for name, default in asdict(cls()).items():
+            raw = os.environ.get(f"FORJ_{name.upper()}")
+            if raw is None:
+                continue
+            if isinstance(default, bool):
+                values[name] = raw.strip().lower() in ("1", "true", "yes", "on")
+                continue
+            try:
+                values[name] = type(default)(raw)
+            except ValueError:
+                pass
+        values.update({k: v for k, v in overrides.items() if v is not None})
+        return cls(**values)
+
+
+@dataclass
+class EngineStats:
+    """What happened during a run."""
+    requested_rows: int = 0
+    generated_rows: int = 0
+    batches: int = 0
+    refill_batches: int = 0
+    retries: int = 0
+    empty_batches: int = 0
+    duplicate_rows: int = 0
+    elapsed: float = 0.0
+    batching: Dict[str, float] = field(default_factory=dict)  # AdaptiveBatcher.metrics() at the end
+    dedup: Dict[str, float] = field(default_factory=dict)     # DedupStats.to_dict() at the end
+
+    @property
+    def shortfall(self) -> int:
+        return max(0, self.requested_rows - self.generated_rows)
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.generated_rows / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def duplicate_rate(self) -> float:
+        checked = self.generated_rows + self.duplicate_rows
+        return self.duplicate_rows / checked if checked else 0.0
+
+    def to_dict(self) -> Dict[str, float]:
+        data = asdict(self)
+        data["shortfall"] = self.shortfall
+        data["duplicate_rate"] = round(self.duplicate_rate, 4)
+        data["rows_per_second"] = round(self.rows_per_second, 2)
+        return data
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, holding at most `capacity`."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a token is available, then take it."""
+        if self.rate <= 0:
+            return  # Unlimited
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_for = (1 - self._tokens) / self.rate
+            time.sleep(wait_for)
+
+
+class AdaptiveBatcher:
+    """
+    Chooses how many rows to ask for per request.
+
+    Every request resends the whole generation prompt, so asking for more rows
+    per call spreads that prompt over more rows. The size grows while answers
+    parse cleanly (valid rows / rows asked for stays above grow_above) and
+    shrinks when an answer is cut off at the model's output limit or the yield
+    drops below shrink_below. A truncated answer also caps growth at the rows
+    that fitted; the cap is probed upwards again after a run of clean batches.
+    """
+
+    def __init__(self, initial: int = 5, minimum: int = 1, maximum: int = 25,
+                 grow_above: float = 0.9, shrink_below: float = 0.6, smoothing: float = 0.3,
+                 probe_after: int = 10):
+        """
+        Initialize the batcher.
+
+        Args:
+            initial: Rows per request to start with.
+            minimum: Smallest batch size.
+            maximum: Largest batch size.
+            grow_above: Yield a full-size batch needs (with the recent average) to grow.
+            shrink_below: Recent average yield under which the size shrinks.
+            smoothing: Weight of the newest batch in the recent-yield average.
+            probe_after: Clean batches at the cap before trying one row more.
+        """
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.size = min(self.maximum, max(self.minimum, initial))
+        self.grow_above = grow_above
+        self.shrink_below = shrink_below
+        self.smoothing = smoothing
+        self.probe_after = probe_after
+        self.ceiling = self.maximum
+        self.recent_yield = None
+        self.calls = 0
+        self.requested_rows = 0
+        self.valid_rows = 0
+        self.malformed_rows = 0
+        self.truncated_calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.grows = 0
+        self.shrinks = 0
+        self._clean_at_ceiling = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: EngineConfig) -> "AdaptiveBatcher":
+        return cls(initial=config.batch_size, minimum=config.min_batch_size, maximum=config.max_batch_size)
+
+    def next_size(self) -> int:
+        """Rows to ask for in the next request."""
+        with self._lock:
+            return self.size
+
+    def record(self, requested: int, valid: int, malformed: int = 0, truncated: bool = False,
+               prompt_tokens: int = 0, completion_tokens: int = 0) -> None:
+        """
+        Record how a request went and resize.
+
+        Args:
+            requested: Rows asked for.
+            valid: Rows that parsed with the right number of columns.
+            malformed: Lines that didn't parse into a row.
+            truncated: Whether the answer was cut off at the output limit.
+            prompt_tokens: Input tokens the request used.
+            completion_tokens: Output tokens the request used.
+        """
+        if requested <= 0:
+            return
+        batch_yield = min(1.0, valid / requested)
+        with self._lock:
+            self.calls += 1
+            self.requested_rows += requested
+            self.valid_rows += valid
+            self.malformed_rows += malformed
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+            if self.recent_yield is None:
+                self.recent_yield = batch_yield
+            else:
+                self.recent_yield += self.smoothing * (batch_yield - self.recent_yield)
+
+            if truncated:
+                self.truncated_calls += 1
+                # The rows that fitted are roughly what this model returns per answer
+                fitted = valid if valid else requested // 2
+                self.ceiling = max(self.minimum, min(self.ceiling, fitted))
+                self._shrink_to(min(self.size, self.ceiling))
+            elif self.recent_yield < self.shrink_below or (malformed and batch_yield < self.grow_above):
+                self._shrink_to(self.size // 2)
+            elif batch_yield >= self.grow_above and self.recent_yield >= self.grow_above and requested >= self.size:
+                if self.size >= self.ceiling:
+                    self._clean_at_ceiling += 1
+                    if self._clean_at_ceiling >= self.probe_after and self.ceiling < self.maximum:
+                        self.ceiling += 1
+                        self._clean_at_ceiling = 0
+                grown = min(self.ceiling, self.size + max(1, self.size // 4))
+                if grown > self.size:
+                    self.size = grown
+                    self.grows += 1
+
+    def _shrink_to(self, size: int) -> None:
+        size = max(self.minimum, size)
+        if size < self.size:
+            self.size = size
+            self.shrinks += 1
+        self._clean_at_ceiling = 0
+
+    def metrics(self) -> Dict[str, float]:
+        """The current batch size and what batches have yielded so far."""
+        with self._lock:
+            valid = max(1, self.valid_rows)
+            return {
+                "batch_size": self.size,
+                "ceiling": self.ceiling,
+                "calls": self.calls,
+                "yield": round(self.valid_rows / self.requested_rows, 4) if self.requested_rows else 0.0,
+                "recent_yield": round(self.recent_yield, 4) if self.recent_yield is not None else 0.0,
+                "malformed_rows": self.malformed_rows,
+                "truncated_calls": self.truncated_calls,
+                "grows": self.grows,
+                "shrinks": self.shrinks,
+                "tokens_per_row": round((self.prompt_tokens + self.completion_tokens) / valid, 1),
+                "prompt_tokens_per_row": round(self.prompt_tokens / valid, 1),
+            }
+
+
+class GenerationEngine:
+    def __init__(self, generate_batch: Callable[[int], List[Row]], config: Optional[EngineConfig] = None,
+                 on_progress: Optional[Callable[[int, int], None]] = None,
+                 batcher: Optional[AdaptiveBatcher] = None,
+                 deduplicator: Optional[RowDeduplicator] = None):
+        """
+        Initialize the engine.
+
+        Args:
+            generate_batch: Called with a row count; returns up to that many parsed rows.
+                Called concurrently from worker threads, so it must be thread-safe (the
+                batcher it records into is locked for this).
+            config: Engine settings (default: EngineConfig.from_env()).
+            on_progress: Called with (rows emitted so far, rows requested) after each emitted batch.
+            batcher: Picks each batch's size; generate_batch is expected to record into it.
+                Without one, every batch asks for config.batch_size rows.
+            deduplicator: Filters each batch, in order, before it is yielded; rejected rows
+                are generated again.
+        """
+        self.generate_batch = generate_batch
+        self.config = config or EngineConfig.from_env()
+        self.on_progress = on_progress
+        self.batcher = batcher
+        self.deduplicator = deduplicator
+        self.bucket = TokenBucket(self.config.requests_per_second, self.config.burst)
+        self.stats = EngineStats()
+        self._stats_lock = threading.Lock()
+
+    def _backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given retry attempt (1-based)."""
+        ceiling = min(self.config.backoff_max, self.config.backoff_base * (2 ** (attempt - 1)))
+        return random.uniform(0, ceiling)
+
+    def _run_batch(self, count: int) -> List[Row]:
+        """Generate one batch, retrying failures. Runs on a worker thread."""
+        attempt = 0
+        while True:
+            self.bucket.acquire()
+            try:
+                return self.generate_batch(count)[:count]
+            except Exception as e:
+                attempt += 1
+                if attempt > self.config.max_retries:
+                    raise GenerationError(f"Batch of {count} rows failed after {attempt} attempts: {e}") from e
+                with self._stats_lock:
+                    self.stats.retries += 1
+                time.sleep(self._backoff(attempt))
+
+    def iter_batches(self, volume: int) -> Iterator[Tuple[int, List[Row]]]:
+        """
+        Generate `volume` rows, yielding batches in order as they complete.
+
+        Batch i is yielded only after batches 0..i-1, whatever order the requests
+        finish in; batches left with no rows (after deduplication) are skipped.
+        Stops early, with stats.shortfall > 0, if max_empty_batches batches in a
+        row come back without usable rows.
+
+        Args:
+            volume: Number of rows to generate.
+
+        Yields:
+            (batch index, rows) tuples.
+        """
+        config = self.config
+        self.stats = EngineStats(requested_rows=volume)
+        started = time.monotonic()
+
+        pending = {}       # future -> (batch index, rows requested)
+        completed = {}     # batch index -> rows, waiting for earlier batches
+        next_index = 0     # Index of the next batch to submit
+        next_emit = 0      # Index of the next batch to yield
+        accepted = 0       # Rows returned by finished batches
+        in_flight = 0      # Rows requested by pending batches
+        requested = 0      # Rows asked for by all submitted batches
+        empty_streak = 0
+        # A slow early batch holds back everything after it; cap what can pile up behind it
+        max_buffered = max(1, config.max_concurrency) * 4
+
+        executor = ThreadPoolExecutor(max_workers=max(1, config.max_concurrency),
+                                      thread_name_prefix="forj-generate")
+        try:
+            while True:
+                # Fill free slots with batches for the rows nobody has asked for yet
+                while (len(pending) < config.max_concurrency and len(completed) < max_buffered
+                       and empty_streak < config.max_empty_batches):
+                    outstanding = volume - accepted - in_flight
+                    if outstanding <= 0:
+                        break
+                    size = self.batcher.next_size() if self.batcher else config.batch_size
+                    count = min(max(1, size), outstanding)
+                    future = executor.submit(self._run_batch, count)
+                    pending[future] = (next_index, count)
+                    if requested >= volume:
+                        self.stats.refill_batches += 1
+                    next_index += 1
+                    in_flight += count
+                    requested += count
+
+                if not pending:
+                    break
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, count = pending.pop(future)
+                    in_flight -= count
+                    rows = future.result()  # Re-raises GenerationError and stops the run
+                    accepted += len(rows)
+                    self.stats.batches += 1
+                    completed[index] = rows
+
+                while next_emit in completed:
+                    rows = completed.pop(next_emit)
+                    if self.deduplicator is not None and rows:
+                        # Filtered in batch order, so which copy survives doesn't depend on timing
+                        kept = self.deduplicator.filter(rows)
+                        rejected = len(rows) - len(kept)
+                        accepted -= rejected  # Frees those rows for the next batch
+                        self.stats.duplicate_rows += rejected
+                        rows = kept
+                    if rows:
+                        empty_streak = 0
+                    else:
+                        empty_streak += 1
+                        self.stats.empty_batches += 1
+                        next_emit += 1
+                        continue
+                    self.stats.generated_rows += len(rows)
+                    self.stats.elapsed = time.monotonic() - started
+                    yield next_emit, rows
+                    if self.on_progress:
+                        self.on_progress(self.stats.generated_rows, volume)
+                    next_emit += 1
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+            self.stats.elapsed = time.monotonic() - started
+            if self.batcher:
+                self.stats.batching = self.batcher.metrics()
+            if self.deduplicator is not None:
+                self.stats.dedup = self.deduplicator.stats.to_dict()
+
+    def run(self, volume: int) -> List[Row]:
+        """
+        Generate `volume` rows and return them in batch order.
+
+        Args:
+            volume: Number of rows to generate.
+
+        Returns:
+            List of rows; shorter than `volume` only if the run gave up (see stats.shortfall).
+        """
+        rows = []
+        for _, batch in self.iter_batches(volume):
+            rows.extend(batch)
+        return rows
@@ -0,0 +1,302 @@
+"""
+LLM backends for the Synthesizer.
+
+Every call the Synthesizer makes goes through an LLMBackend, so generation can
+run against OpenAI or against a local stub that needs no network or API key:
+
+    OpenAIBackend   chat completions through the openai package; honours
+                    OPENAI_API_KEY and OPENAI_BASE_URL
+    StubBackend     returns templated CSV rows for generation prompts, after a
+                    configurable latency, failing a configurable share of calls
+                    and (with max_rows) truncating long answers like a model
+                    hitting its output limit
+
+complete_with_usage() also returns token counts (including prompt tokens
+served from the provider's prompt cache) and the finish reason, which the
+adaptive batcher uses to size batches.
+
+get_backend() picks one from FORJ_LLM_BACKEND ("openai", the default, or
+"stub"); the stub reads FORJ_STUB_LATENCY, FORJ_STUB_JITTER,
+FORJ_STUB_FAILURE_RATE, FORJ_STUB_SEED, FORJ_STUB_MAX_ROWS and
+FORJ_STUB_DUPLICATE_RATE. This lets the web app's background tasks and
+benchmark.py run entirely offline.
+"""
+import os
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+
+SYSTEM_PROMPT = "You are a helpful assistant that generates synthetic data."
+
+# Like OpenAI's prompt cache: prefixes of at least 1,024 tokens, cached in 128-token steps
+_STUB_CACHE_MIN_TOKENS = 1024
+_STUB_CACHE_STEP = 128
+
+# What the Synthesizer's prompts say, used by the stub to shape its answer
+_ROW_COUNT_PATTERN = re.compile(r"Generate (\d+) COMPLETELY UNRELATED rows")
+_COLUMNS_PATTERN = re.compile(r"with these exact names: (.+)")
+_CURRENT_PROMPT_PATTERN = re.compile(r"Current prompt:\s*```\n(.*?)\n```", re.DOTALL)
+
+# Filler for the stub's cells, so its rows differ the way real ones do
+_STUB_WORDS = (
+    "amber", "basin", "cobalt", "delta", "ember", "fjord", "granite", "harbor", "iris", "juniper",
+    "kelp", "lantern", "meadow", "nickel", "orchid", "pebble", "quartz", "river", "saffron", "timber",
+    "umber", "velvet", "willow", "xenon", "yarrow", "zephyr", "anchor", "bramble", "cinder", "dune",
+    "estuary", "falcon", "glacier", "heron", "inlet", "jasper", "kestrel", "lichen", "marsh", "nectar",
+)
+
+
+class LLMBackendError(RuntimeError):
+    """Raised when a backend call fails."""
+
+
+@dataclass
+class Completion:
+    """A completion and what it cost."""
+    text: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    finish_reason: str = "stop"  # "length" when the answer was cut off
+    cached_tokens: int = 0       # Prompt tokens the provider served from its prompt cache
+
+    @property
+    def truncated(self) -> bool:
+        return self.finish_reason == "length"
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about 4 characters per token) for backends that don't report usage."""
+    return max(1, len(text) // 4) if text else 0
+
+
+class LLMBackend:
+    """Interface: send one system and user prompt, get the completion text back."""
+
+    name = "base"
+
+    def complete_with_usage(self, prompt: str, system: str = SYSTEM_PROMPT) -> Completion:
+        """
+        Get a completion for a prompt, with token usage.
+
+        Args:
+            prompt: The user prompt.
+            system: The system prompt.
+
+        Returns:
+            Completion with the generated text, stripped.
+        """
+        raise NotImplementedError
+
+    def complete(self, prompt: str, system: str = SYSTEM_PROMPT) -> str:
+        """Get just the completion text for a prompt."""
+        return self.complete_with_usage(prompt, system=system).text
+
+
+class OpenAIBackend(LLMBackend):
+    name = "openai"
+
+    def __init__(self, model: str = "gpt-4-1106-preview", api_key: Optional[str] = None,
+                 base_url: Optional[str] = None, temperature: float = 0.9, top_p: float = 0.95):
+        """
+        Initialize the OpenAI backend.
+
+        Args:
+            model: The model to use.
+            api_key: API key (default: OPENAI_API_KEY).
+            base_url: API base URL (default: OPENAI_BASE_URL, then api.openai.com).
+            temperature: Sampling temperature.
+            top_p: Nucleus sampling cutoff.
+        """
+        self.model = model
+        self.api_key = api_key if api_key is not None else os.environ.get("OPENAI_API_KEY", "")
+        self.base_url = base_url or os.environ.get("OPENAI_BASE_URL") or None
+        self.temperature = temperature
+        self.top_p = top_p
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        # Created on first use, so importing the engine doesn't require the openai package
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    from openai import OpenAI
+                    self._client = OpenAI(api_key=self.api_key, base_url=self.base_url)
+        return self._client
+
+    def complete_with_usage(self, prompt: str, system: str = SYSTEM_PROMPT) -> Completion:
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=self.temperature,
+            top_p=self.top_p
+        )
+        choice = response.choices[0]
+        text = (choice.message.content or "").strip()
+        usage = response.usage
+        details = getattr(usage, "prompt_tokens_details", None)  # Not reported by older API versions
+        return Completion(
+            text=text,
+            prompt_tokens=usage.prompt_tokens if usage else estimate_tokens(system + prompt),
+            completion_tokens=usage.completion_tokens if usage else estimate_tokens(text),
+            finish_reason=choice.finish_reason or "stop",
+            cached_tokens=(getattr(details, "cached_tokens", 0) or 0) if details else 0,
+        )
+
+
+class StubBackend(LLMBackend):
+    name = "stub"
+
+    def __init__(self, columns: Optional[List[str]] = None, latency: float = 0.0, jitter: float = 0.0,
+                 failure_rate: float = 0.0, seed: Optional[int] = None,
+                 row_template: str = '"{column} {words}"', response: Optional[str] = None,
+                 max_rows: Optional[int] = None, duplicate_rate: float = 0.0):
+        """
+        Initialize the stub backend.
+
+        Args:
+            columns: Column names to fill (default: read from the prompt, else three columns).
+            latency: Seconds to wait before each answer.
+            jitter: Extra random delay, up to this many seconds.
+            failure_rate: Share of calls (0..1) that raise LLMBackendError.
+            seed: Seed for the delays, failures and rows, for repeatable runs (default: a
+                different random sequence in every process).
+            row_template: Format for each cell; gets {column}, {n} (call number), {i} (row in
+                call) and {words} (a few random words).
+            response: Fixed answer for prompts that don't ask for rows (default: echo the current
+                prompt back, which keeps update_generation_prompt's prompt unchanged).
+            max_rows: Most rows per answer; asking for more gets a cut-off answer with
+                finish_reason "length", as from a model hitting its output token limit.
+            duplicate_rate: Share of rows (0..1) that repeat an earlier row.
+        """
+        self.columns = columns
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.row_template = row_template
+        self.response = response
+        self.max_rows = max_rows
+        self.duplicate_rate = duplicate_rate
+        self.seed = seed
+        self.calls = 0
+        self.failures = 0
+        self._random = random.Random(seed)
+        self._recent_rows: List[str] = []  # Rows a duplicate can be copied from
+        self._seen_systems = set()  # System messages sent before, for simulated prompt caching
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, **overrides) -> "StubBackend":
+        """Build a stub from FORJ_STUB_* environment variables, then explicit overrides."""
+        values = {
+            "latency": float(os.environ.get("FORJ_STUB_LATENCY", 0.0)),
+            "jitter": float(os.environ.get("FORJ_STUB_JITTER", 0.0)),
+            "failure_rate": float(os.environ.get("FORJ_STUB_FAILURE_RATE", 0.0)),
+        }
+        if os.environ.get("FORJ_STUB_SEED"):
+            values["seed"] = int(os.environ["FORJ_STUB_SEED"])
+        if os.environ.get("FORJ_STUB_DUPLICATE_RATE"):
+            values["duplicate_rate"] = float(os.environ["FORJ_STUB_DUPLICATE_RATE"])
+        if os.environ.get("FORJ_STUB_MAX_ROWS"):
+            values["max_rows"] = int(os.environ["FORJ_STUB_MAX_ROWS"])
+        values.update(overrides)
+        return cls(**values)
+
+    def _columns_for(self, text: str) -> List[str]:
+        if self.columns:
+            return self.columns
+        match = _COLUMNS_PATTERN.search(text)
+        if match:
+            return [c.strip() for c in match.group(1).split(",") if c.strip()]
+        return ["column_1", "column_2", "column_3"]
+
+    def complete_with_usage(self, prompt: str, system: str = SYSTEM_PROMPT) -> Completion:
+        with self._lock:
+            self.calls += 1
+            call = self.calls
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+            fail = self._random.random() < self.failure_rate
+            if fail:
+                self.failures += 1
+            seen = system in self._seen_systems
+            self._seen_systems.add(system)
+            # An explicit seed gives each call its own repeatable rows, whichever thread
+            # gets there first; without one every process must differ, or a resumed run
+            # would regenerate the rows it already has
+            call_seed = f"{self.seed}-{call}" if self.seed is not None else self._random.getrandbits(64)
+        if delay > 0:
+            time.sleep(delay)
+        if fail:
+            raise LLMBackendError(f"Stub failure on call {call}")
+
+        prompt_tokens = estimate_tokens(system + prompt)
+        system_tokens = estimate_tokens(system)
+        cached = 0
+        if seen and system_tokens >= _STUB_CACHE_MIN_TOKENS:
+            cached = system_tokens // _STUB_CACHE_STEP * _STUB_CACHE_STEP
+        match = _ROW_COUNT_PATTERN.search(prompt)
+        if match is None:
+            if self.response is not None:
+                text = self.response
+            else:
+                current = _CURRENT_PROMPT_PATTERN.search(prompt)
+                text = (current.group(1) if current else prompt).strip()
+            return Completion(text, prompt_tokens, estimate_tokens(text), cached_tokens=cached)
+
+        columns = self._columns_for(system + "\n" + prompt)
+        requested = int(match.group(1))
+        rows = requested if self.max_rows is None else min(requested, self.max_rows)
+        rng = random.Random(call_seed)
+
+        def make_row(i: int) -> str:
+            cells = [self.row_template.format(column=column, n=call, i=i,
+                                              words=" ".join(rng.sample(_STUB_WORDS, 4)))
+                     for column in columns]
+            return ",".join(cells)
+
+        lines = []
+        for i in range(rows):
+            with self._lock:
+                if self._recent_rows and rng.random() < self.duplicate_rate:
+                    lines.append(rng.choice(self._recent_rows))
+                    continue
+            line = make_row(i)
+            lines.append(line)
+            if self.duplicate_rate:
+                with self._lock:
+                    self._recent_rows.append(line)
+                    del self._recent_rows[:-200]
+        finish_reason = "stop"
+        if rows < requested:
+            # Cut off partway through the next row
+            lines.append(make_row(rows)[:max(1, len(columns[0]) // 2)])
+            finish_reason = "length"
+        text = "\n".join(lines)
+        return Completion(text, prompt_tokens, estimate_tokens(text), finish_reason, cached)
+
+
+def get_backend(name: Optional[str] = None, model: str = "gpt-4-1106-preview", **kwargs) -> LLMBackend:
+    """
+    Create a backend by name.
+
+    Args:
+        name: "openai" or "stub" (default: FORJ_LLM_BACKEND, then "openai").
+        model: Model for the OpenAI backend.
+        **kwargs: Passed to the backend's constructor.
+
+    Returns:
+        LLMBackend
+    """
+    name = (name or os.environ.get("FORJ_LLM_BACKEND") or "openai").strip().lower()
+    if name == "stub":
+        return StubBackend.from_env(**kwargs)
+    if name == "openai":
+        return OpenAIBackend(model=model, **kwargs)
+    raise ValueError(f"Unknown LLM backend: {name}")
@@ -1,8 +1,35 @@
+"""
+Pipeline run logs.
+
+A run used to be saved by rewriting one JSON file, and a text rendering of it,
+at the end of every feedback step: the cost grew with the run, and nothing was
+saved while the dataset itself was generated, so a crash there lost every row.
+
+The log is now an append-only JSON Lines file, pipeline_run_<run_id>.jsonl,
+with one event per line, written when it happens and never rewritten:
+
+    run_started         description, columns and volume
+    step_started        a feedback step: its prompt and meta statistics
+    samples, feedback, prompt_updated, step_ended
+    generation_started  the prompt the dataset is generated with
+    batch               rows accepted into the dataset, in order
+    run_completed       engine stats, or run_failed with the error
+
+The batch events are the run's checkpoint. PipelineTracker.load() replays a log,
+dropping a last line cut off by a crash, and Synthesizer.resume_dataset()
+continues from the last recorded batch. The human-readable view is built from
+the events only when asked for: render(), write_report(), or
+
+    python pipeline_tracker.py pipeline_logs/pipeline_run_<run_id>.jsonl
+"""
+import argparse
 import json
 import os
+import threading
+import uuid
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterator, List, Any, Optional
 from dataclasses import dataclass, asdict, field
 
 @dataclass
@@ -15,7 +42,7 @@ class PipelineStep:
     samples: List[Dict[str, str]] = field(default_factory=list)
     feedback: List[Dict[str, Any]] = field(default_factory=list)
     updated_prompt: Optional[str] = None
-    
+
     def to_dict(self):
         """Convert the step to a dictionary for serialization."""
         return {
@@ -30,100 +57,278 @@ class PipelineStep:
 
 class PipelineTracker:
     """Tracks the entire data generation pipeline with all its steps."""
-    
-    def __init__(self, output_dir: str = "pipeline_logs"):
+
+    def __init__(self, output_dir: str = "pipeline_logs", run_id: Optional[str] = None,
+                 record_batches: bool = True):
         """Initialize the pipeline tracker.
-        
+
         Args:
             output_dir: Directory to save pipeline logs
+            run_id: Run to log to (default: a new one)
+            record_batches: Whether to log generated rows, which is what makes a run resumable.
+                Callers that checkpoint rows themselves can turn it off.
         """
         self.steps: List[PipelineStep] = []
         self.current_step: Optional[PipelineStep] = None
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
-        
-        # Create a unique run ID
-        self.run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
-        self.log_file = self.output_dir / f"pipeline_run_{self.run_id}.json"
-        
+        self.record_batches = record_batches
+
+        # Create a unique run ID; the suffix keeps runs started in the same second apart
+        self.run_id = run_id or f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+        self.log_file = self.output_dir / f"pipeline_run_{self.run_id}.jsonl"
+
+        # Run state, kept up to date from the events as they are logged or replayed
+        self.status = "new"  # new, running, completed, failed
+        self.started_at: Optional[str] = None
+        self.description: Optional[str] = None
+        self.columns: List[str] = []
+        self.volume = 0
+        self.generation_prompt: Optional[str] = None
+        self.generation_statistics: Dict[str, float] = {}
+        self.batches_recorded = 0
+        self.rows_recorded = 0
+        self.engine_stats: Dict[str, Any] = {}
+        self.error: Optional[str] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, log_file: str, record_batches: bool = True) -> 'PipelineTracker':
+        """Replay a run's log. Events logged through the returned tracker are appended to it.
+
+        Args:
+            log_file: Path to a pipeline_run_<run_id>.jsonl file
+            record_batches: Whether to log rows generated from here on
+
+        Returns:
+            PipelineTracker with the run's state
+        """
+        path = Path(log_file)
+        run_id = path.stem[len("pipeline_run_"):] if path.stem.startswith("pipeline_run_") else path.stem
+        tracker = cls(output_dir=str(path.parent), run_id=run_id, record_batches=record_batches)
+        tracker.log_file = path
+        tracker._drop_partial_line()
+        for record in tracker.events():
+            tracker._apply(record)
+        return tracker
+
+    def _drop_partial_line(self) -> None:
+        # A crash mid-append leaves a line without its newline; cut it off so new events start clean
+        if not self.log_file.exists():
+            return
+        with open(self.log_file, 'rb+') as f:
+            end = f.seek(0, os.SEEK_END)
+            if not end:
+                return
+            f.seek(end - 1)
+            if f.read(1) == b'\n':
+                return
+            # Walk back a block at a time to the last complete line
+            pos = end
+            while pos > 0:
+                start = max(0, pos - 65536)
+                f.seek(start)
+                newline = f.read(pos - start).rfind(b'\n')
+                if newline >= 0:
+                    f.truncate(start + newline + 1)
+                    return
+                pos = start
+            f.truncate(0)
+
+    def events(self) -> Iterator[Dict[str, Any]]:
+        """Read the logged events in order, skipping any line that isn't valid JSON."""
+        if not self.log_file.exists():
+            return
+        with open(self.log_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+    def iter_batches(self) -> Iterator[List[List[str]]]:
+        """Read back the recorded batches of rows, in order."""
+        for record in self.events():
+            if record['event'] == 'batch':
+                yield record['rows']
+
+    @property
+    def resumable(self) -> bool:
+        """Whether the run started but didn't complete."""
+        return self.status in ("running", "failed")
+
+    def _log(self, event: str, **fields: Any) -> None:
+        record = {'event': event, 'timestamp': datetime.now().isoformat(), **fields}
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            with open(self.log_file, 'a', encoding='utf-8') as f:
+                f.write(line)
+            self._apply(record)
+
+    def _apply(self, record: Dict[str, Any]) -> None:
+        event = record['event']
+        if event == 'run_started':
+            self.status = "running"
+            self.started_at = record['timestamp']
+            self.description = record['description']
+            self.columns = record['columns']
+            self.volume = record['volume']
+        elif event == 'step_started':
+            self.current_step = PipelineStep(
+                step_number=record['step_number'],
+                timestamp=record['timestamp'],
+                generation_prompt=record['generation_prompt'],
+                meta_statistics=record['meta_statistics']
+            )
+        elif event == 'samples' and self.current_step:
+            self.current_step.samples = record['samples']
+        elif event == 'feedback' and self.current_step:
+            self.current_step.feedback = record['feedback']
+        elif event == 'prompt_updated' and self.current_step:
+            self.current_step.updated_prompt = record['updated_prompt']
+        elif event == 'step_ended' and self.current_step:
+            self.steps.append(self.current_step)
+            self.current_step = None
+        elif event == 'generation_started':
+            self.status = "running"
+            self.generation_prompt = record['generation_prompt']
+            self.generation_statistics = record['meta_statistics']
+        elif event == 'batch':
+            self.batches_recorded += 1
+            self.rows_recorded += len(record['rows'])
+        elif event == 'run_completed':
+            self.status = "completed"
+            self.engine_stats = record.get('stats', {})
+            self.error = None
+        elif event == 'run_failed':
+            self.status = "failed"
+            self.error = record.get('error')
+
+    def start_run(self, description: str, columns: List[str], volume: int) -> None:
+        """Record what the run is asked to generate.
+
+        Args:
+            description: Description of the dataset
+            columns: Column names
+            volume: Number of rows wanted
+        """
+        self._log('run_started', run_id=self.run_id, description=description, columns=list(columns), volume=volume)
+
     def start_step(self, generation_prompt: str, meta_statistics: Dict[str, float]) -> None:
         """Start a new pipeline step.
-        
+
         Args:
             generation_prompt: The prompt used for this generation step
             meta_statistics: The meta statistics used for this step
         """
-        self.current_step = PipelineStep(
-            step_number=len(self.steps) + 1,
-            timestamp=datetime.now().isoformat(),
-            generation_prompt=generation_prompt,
-            meta_statistics=meta_statistics.copy()
-        )
-    
+        self._log('step_started', step_number=len(self.steps) + 1, generation_prompt=generation_prompt,
+                  meta_statistics=meta_statistics.copy())
+
     def add_samples(self, samples: List[Dict[str, str]]) -> None:
         """Add generated samples to the current step.
-        
+
         Args:
             samples: List of generated samples with their metadata
         """
         if self.current_step:
-            self.current_step.samples = samples
-    
+            self._log('samples', step_number=self.current_step.step_number, samples=samples)
+
     def add_feedback(self, feedback: List[Dict[str, Any]]) -> None:
         """Add user feedback to the current step.
-        
+
         Args:
             feedback: List of feedback items with approval status and comments
         """
         if self.current_step:
-            self.current_step.feedback = feedback
-    
+            self._log('feedback', step_number=self.current_step.step_number, feedback=feedback)
+
     def update_prompt(self, updated_prompt: str) -> None:
         """Update the prompt after feedback.
-        
+
         Args:
             updated_prompt: The new prompt after incorporating feedback
         """
         if self.current_step:
-            self.current_step.updated_prompt = updated_prompt
-    
+            self._log('prompt_updated', step_number=self.current_step.step_number, updated_prompt=updated_prompt)
+
     def end_step(self) -> None:
-        """Finalize the current step and save to log."""
+        """Finalize the current step."""
         if self.current_step:
-            self.steps.append(self.current_step)
-            self._save_log()
-            self.current_step = None
-    
-    def _save_log(self) -> None:
-        """Save the current pipeline state to a JSON log file."""
+            self._log('step_ended', step_number=self.current_step.step_number)
+
+    def start_generation(self, generation_prompt: str, meta_statistics: Dict[str, float]) -> None:
+        """Record the prompt the dataset itself is generated with, once feedback is done.
+
+        Args:
+            generation_prompt: The final generation prompt
+            meta_statistics: The meta statistics in effect
+        """
+        self._log('generation_started', generation_prompt=generation_prompt,
+                  meta_statistics=dict(meta_statistics))
+
+    def record_batch(self, rows: List[List[str]]) -> None:
+        """Checkpoint a batch of rows accepted into the dataset.
+
+        Args:
+            rows: The batch's rows
+        """
+        if self.record_batches:
+            self._log('batch', index=self.batches_recorded, rows=rows)
+
+    def end_run(self, stats: Optional[Dict[str, Any]] = None) -> None:
+        """Mark the run completed.
+
+        Args:
+            stats: Engine stats for the run
+        """
+        self._log('run_completed', stats=stats or {})
+
+    def fail_run(self, error: str) -> None:
+        """Mark the run failed; it can still be resumed.
+
+        Args:
+            error: What went wrong
+        """
+        self._log('run_failed', error=error)
+
+    def render(self) -> str:
+        """Build the human-readable view of the run."""
         log_data = {
             'run_id': self.run_id,
-            'start_time': self.steps[0].timestamp if self.steps else datetime.now().isoformat(),
+            'start_time': self.started_at or (self.steps[0].timestamp if self.steps else datetime.now().isoformat()),
             'current_time': datetime.now().isoformat(),
             'total_steps': len(self.steps),
             'steps': [step.to_dict() for step in self.steps]
         }
-        
-        # Save the complete log
-        with open(self.log_file, 'w', encoding='utf-8') as f:
-            json.dump(log_data, f, indent=2, ensure_ascii=False)
-        
-        # Also save a human-readable version
-        human_readable = self._format_human_readable(log_data)
-        with open(str(self.log_file).replace('.json', '.txt'), 'w', encoding='utf-8') as f:
-            f.write(human_readable)
-    
+        return self._format_human_readable(log_data)
+
+    def write_report(self, path: Optional[str] = None) -> Path:
+        """Write the human-readable view to a file.
+
+        Args:
+            path: Where to write it (default: the log file with a .txt extension)
+
+        Returns:
+            Path of the written file
+        """
+        report = Path(path) if path else self.log_file.with_suffix('.txt')
+        with open(report, 'w', encoding='utf-8') as f:
+            f.write(self.render())
+        return report
+
     def _format_human_readable(self, log_data: Dict) -> str:
         """Format the log data in a human-readable way."""
         output = [
             f"DataForge Pipeline Run: {log_data['run_id']}",
             f"Started: {log_data['start_time']}",
             f"Current: {log_data['current_time']}",
+            f"Status: {self.status}" + (f" ({self.error})" if self.error else ""),
             f"Total Steps: {log_data['total_steps']}",
+            f"Rows Generated: {self.rows_recorded}/{self.volume} in {self.batches_recorded} batches",
             "=" * 80,
             ""
         ]
-        
+
         for step in log_data['steps']:
             output.extend([
                 f"Step {step['step_number']} - {step['timestamp']}",
@@ -134,38 +339,70 @@ class PipelineTracker:
                 step['generation_prompt'],
                 "\nSamples:"
             ])
-            
+
             for i, sample in enumerate(step['samples'], 1):
                 output.append(f"\nSample {i}:")
                 for k, v in sample.items():
                     output.append(f"  {k}: {v[:200]}{'...' if len(str(v)) > 200 else ''}")
-            
+
             if step['feedback']:
                 output.append("\nFeedback:")
                 for i, fb in enumerate(step['feedback'], 1):
                     approved = "✓" if fb.get('approved', False) else "✗"
                     comment = fb.get('qualitative', 'No comment')
                     output.append(f"  {approved} {comment}")
-            
+
             if step['updated_prompt']:
                 output.extend([
                     "\nUpdated Prompt:",
                     step['updated_prompt']
                 ])
-            
+
             output.append("\n" + "=" * 80 + "\n")
-        
+
+        if self.generation_prompt is not None:
+            output.extend([
+                "Dataset Generation Prompt:",
+                self.generation_prompt,
+                ""
+            ])
+
         return "\n".join(output)
-    
+
     def get_summary(self) -> str:
         """Get a summary of the pipeline run."""
         if not self.steps:
-            return "No steps completed yet."
-            
+            if self.status == "new":
+                return "No steps completed yet."
+            return (
+                f"Pipeline Run: {self.run_id}\n"
+                f"Status: {self.status}\n"
+                f"Rows Generated: {self.rows_recorded}/{self.volume}"
+            )
+
         last_step = self.steps[-1]
         return (
             f"Pipeline Run: {self.run_id}\n"
+            f"Status: {self.status}\n"
             f"Steps: {len(self.steps)}\n"
             f"Samples Generated: {sum(len(step.samples) for step in self.steps)}\n"
+            f"Rows Generated: {self.rows_recorded}/{self.volume}\n"
             f"Latest Statistics: {', '.join(f'{k}={v:.2f}' for k, v in last_step.meta_statistics.items())}"
         )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show a pipeline run log in human-readable form.")
+    parser.add_argument("log_file", help="pipeline_run_<run_id>.jsonl file")
+    parser.add_argument("--write", action="store_true", help="Write the view next to the log instead of printing it")
+    args = parser.parse_args()
+
+    tracker = PipelineTracker.load(args.log_file)
+    if args.write:
+        print(f"Wrote {tracker.write_report()}")
+    else:
+        print(tracker.render())
+
+
+if __name__ == "__main__":
+    main()
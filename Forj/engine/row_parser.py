@@ -0,0 +1,117 @@
+"""
+Parsing LLM responses into dataset rows.
+
+A generation response is a block of CSV: one row per record, quoted where a
+value contains a comma. parse_rows reads the whole response with the C csv
+reader in one call, instead of walking it a character at a time, and then:
+
+    - strips Markdown code fences (```csv ... ```) that models like to add
+    - skips blank records and an echoed header row
+    - normalizes the column count: trailing empty cells from a dangling
+      comma are dropped, and a record that still has the wrong number of
+      cells is counted as malformed instead of being padded or cut
+    - drops the final record when the response was truncated, since it
+      was cut off partway
+
+Quoted values may span lines, which splitting the response on newlines first
+used to break. A stray quote, though, would make the csv reader swallow every
+later line into one cell, so a record spanning several lines is only kept if
+its quotes close cleanly (it re-reads in strict mode) and it has the right
+number of cells. Otherwise its lines are parsed one at a time, which limits
+the damage to the line with the stray quote.
+"""
+import csv
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence
+
+Row = List[str]
+
+_FENCE = re.compile(r"^\s*```[\w-]*\s*$")
+
+
+@dataclass
+class ParseResult:
+    """Rows parsed from one response, and what was rejected."""
+    rows: List[Row] = field(default_factory=list)
+    records: int = 0    # Non-blank records read
+    malformed: int = 0  # Records with the wrong number of cells
+    skipped: int = 0    # Echoed headers and records past the limit
+
+
+def strip_code_fences(text: str) -> str:
+    """Remove Markdown code fence lines, keeping what is between them."""
+    if "```" not in text:
+        return text
+    return "\n".join(line for line in text.splitlines() if not _FENCE.match(line))
+
+
+def _normalize(cells: List[str], num_columns: int) -> Optional[Row]:
+    cells = [cell.strip() for cell in cells]
+    while len(cells) > num_columns and not cells[-1]:
+        cells.pop()
+    return cells if len(cells) == num_columns else None
+
+
+def _read_records(text: str, num_columns: int) -> List[List[str]]:
+    """Read the CSV records, re-reading any suspect multi-line record one line at a time."""
+    lines = text.splitlines(keepends=True)
+    reader = csv.reader(lines, skipinitialspace=True)
+    records = []
+    start = 0
+    for record in reader:
+        end = reader.line_num
+        suspect = end - start > 1 and (_normalize(record, num_columns) is None
+                                       or not _closes_cleanly(lines[start:end]))
+        if suspect:
+            records.extend(next(csv.reader([line], skipinitialspace=True), []) for line in lines[start:end])
+        else:
+            records.append(record)
+        start = end
+    return records
+
+
+def _closes_cleanly(lines: List[str]) -> bool:
+    """Whether lines hold exactly one record, with every quote closed right before a comma or line end."""
+    try:
+        return len(list(csv.reader(lines, skipinitialspace=True, strict=True))) == 1
+    except csv.Error:
+        return False
+
+
+def parse_rows(text: str, num_columns: int, limit: Optional[int] = None,
+               header: Optional[Sequence[str]] = None, truncated: bool = False) -> ParseResult:
+    """
+    Parse a multi-row CSV response.
+
+    Args:
+        text: The response text.
+        num_columns: Cells each row must have.
+        limit: Most rows to return; later records are skipped.
+        header: Column names; a record matching them is skipped as an echoed header.
+        truncated: Whether the response was cut off, so its last record is incomplete.
+
+    Returns:
+        ParseResult
+    """
+    result = ParseResult()
+    records = [record for record in _read_records(strip_code_fences(text), num_columns)
+               if any(cell.strip() for cell in record)]
+    if truncated and records:
+        records.pop()
+    header_key = [name.strip().lower() for name in header] if header else None
+
+    for record in records:
+        result.records += 1
+        row = _normalize(record, num_columns)
+        if row is None:
+            result.malformed += 1
+            continue
+        if header_key and [cell.lower() for cell in row] == header_key:
+            result.skipped += 1
+            continue
+        if limit is not None and len(result.rows) >= limit:
+            result.skipped += 1
+            continue
+        result.rows.append(row)
+    return result
@@ -1,35 +1,51 @@
-from openai import OpenAI
 import random
-from typing import List, Dict, Any, Tuple, Optional, Union
+from typing import List, Dict, Any, Iterator, Tuple, Optional, Union
 import json
 from meta_statistics import MetaStatistics, StatisticRange
 from pipeline_tracker import PipelineTracker
+from generation_engine import AdaptiveBatcher, EngineConfig, EngineStats, GenerationEngine
+from dedup import RowDeduplicator
+from row_parser import parse_rows
+from llm_backends import SYSTEM_PROMPT, Completion, LLMBackend, get_backend
+from prompt_builder import PromptBuilder
 import os
 from datetime import datetime
 
-# Initialize the OpenAI client with the hardcoded API key
-DEFAULT_API_KEY = "OBFUSCATED"h
-client = OpenAI(api_key=DEFAULT_API_KEY)
-
 class Synthesizer:
-    def __init__(self, model: str = "gpt-4-1106-preview", log_dir: str = "pipeline_logs"):
+    def __init__(self, model: str = "gpt-4-1106-preview", log_dir: str = "pipeline_logs",
+                 engine_config: Optional[EngineConfig] = None, backend: Optional[LLMBackend] = None,
+                 record_batches: bool = True):
         """
         Initialize the DataForge Synthesizer.
         
         Args:
             model: The OpenAI model to use for generation (default: gpt-4-1106-preview).
             log_dir: Directory to save pipeline logs
+            engine_config: Concurrency, rate limit and retry settings for dataset generation
+                (default: EngineConfig.from_env()).
+            backend: LLM backend to send prompts to (default: get_backend(), which reads
+                FORJ_LLM_BACKEND and falls back to OpenAI).
+            record_batches: Whether the pipeline log records generated rows, so an interrupted
+                run can be picked up with resume_dataset.
         """
         self.model = model
+        self.backend = backend or get_backend(model=model)
+        self.prompts = PromptBuilder()  # Caches the static part of generation requests
+        self.engine_config = engine_config or EngineConfig.from_env()
+        # Learns rows per call across sample rounds and the final dataset
+        self.batcher = AdaptiveBatcher.from_config(self.engine_config) if self.engine_config.adaptive else None
+        self.last_run_stats = None  # EngineStats from the last create_dataset call
         self.generation_prompt = ""
         self.columns = []  # Will store the current columns being used
         self.meta_stats = MetaStatistics()  # Initialize meta statistics
         self.current_stats = {}  # Store stats for the current generation
-        self.pipeline = PipelineTracker(output_dir=log_dir)  # Initialize pipeline tracker
+        self.log_dir = log_dir
+        self.record_batches = record_batches
+        self.pipeline = PipelineTracker(output_dir=log_dir, record_batches=record_batches)  # Initialize pipeline tracker
         
     def prompt_llm(self, prompt: str) -> str:
         """
-        Interface with OpenAI's API to get a completion using the chat API.
+        Get a completion from the configured LLM backend.
 
         Args:
             prompt: The prompt to send to the LLM.
@@ -37,24 +53,35 @@ class Synthesizer:
         Returns:
             The generated text response.
         """
-        try:
-            response = client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant that generates synthetic data."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.9,
-                top_p=0.95
-            )
+        return self.prompt_llm_with_usage(prompt).text
 
-            return response.choices[0].message.content.strip()
+    def prompt_llm_with_usage(self, prompt: str, system: str = SYSTEM_PROMPT) -> Completion:
+        """
+        Get a completion from the configured LLM backend, with token usage and finish reason.
+
+        Args:
+            prompt: The prompt to send to the LLM.
+            system: The system message.
+
+        Returns:
+            Completion
+        """
+        try:
+            return self.backend.complete_with_usage(prompt, system=system)
 
         except Exception as e:
-            print(f"Error calling OpenAI API: {e}")
+            print(f"Error calling {self.backend.name} backend: {e}")
             raise
 
     
+    def batch_metrics(self) -> Dict[str, float]:
+        """Current rows-per-call, yield and tokens-per-row from the adaptive batcher."""
+        return self.batcher.metrics() if self.batcher else {}
+    
+    def prompt_metrics(self) -> Dict[str, float]:
+        """Prompt tokens per generation call and the share served from the provider's cache."""
+        return self.prompts.metrics()
+    
     def _get_statistics_prompt(self) -> str:
         """Get the prompt section for current statistics."""
         if not hasattr(self, 'current_stats') or not self.current_stats:
@@ -133,44 +160,6 @@ Generated row:"""
         self.generation_prompt = prompt
         return prompt
     
-    def _parse_csv_row(self, response: str) -> List[str]:
-        """Parse a single CSV row from the LLM response."""
-        row = []
-        in_quotes = False
-        current_value = []
-        
-        i = 0
-        while i < len(response):
-            char = response[i]
-            if char == '"':
-                if i + 1 < len(response) and response[i+1] == '"':  # escaped quote
-                    current_value.append('"')
-                    i += 1
-                else:
-                    in_quotes = not in_quotes
-            elif char == ',' and not in_quotes:
-                row.append(''.join(current_value).strip())
-                current_value = []
-                # If we've reached the expected number of columns, stop parsing
-                if len(row) >= len(self.columns):
-                    break
-            else:
-                current_value.append(char)
-            i += 1
-        
-        # Add the last value if we haven't reached the column limit
-        if current_value and len(row) < len(self.columns):
-            row.append(''.join(current_value).strip())
-        
-        # Ensure we have exactly the right number of columns
-        if len(row) > len(self.columns):
-            row = row[:len(self.columns)]
-        elif len(row) < len(self.columns):
-            # If we're short, pad with empty strings
-            row.extend([''] * (len(self.columns) - len(row)))
-            
-        return row
-    
     def generate_samples(self, count: int = 5, prompt: str = None) -> List[List[str]]:
         """
         Generate multiple unrelated rows of data at once.
@@ -184,33 +173,23 @@ Generated row:"""
         """
         current_prompt = prompt or self.generation_prompt
         
-        # Update prompt to request multiple unrelated rows
-        batch_prompt = f"""{current_prompt}
-
-IMPORTANT: Generate {count} COMPLETELY UNRELATED rows of data. Each row should be distinct and independent.
-Make sure the data is diverse and covers different scenarios.
-
-Format your response as:
-""Value 1","Value 2",...
-"Value 1","Value 2",...
-...""
-
-Generated rows:"""
+        # The generation prompt and format rules go in a system message that is identical on
+        # every call (so provider prompt caching applies); only the row count varies
+        system, request = self.prompts.build(current_prompt, self.columns, count)
+        completion = self.prompt_llm_with_usage(request, system=system)
+        self.prompts.record(completion)
+        response = completion.text
         
-        response = self.prompt_llm(batch_prompt)
+        # Parse the whole response at once; a cut-off final row is dropped, not padded
+        parsed = parse_rows(response, len(self.columns), limit=count, header=self.columns,
+                            truncated=completion.truncated)
+        rows = parsed.rows
+        malformed = parsed.malformed
         
-        # Split response into lines and parse each line as a separate row
-        lines = [line.strip() for line in response.split('\n') if line.strip()]
-        rows = []
-        
-        for line in lines[:count]:  # Take up to 'count' rows
-            if line:  # Skip empty lines
-                try:
-                    row = self._parse_csv_row(line)
-                    if len(row) == len(self.columns):  # Only add if it has the right number of columns
-                        rows.append(row)
-                except Exception as e:
-                    print(f"Warning: Error parsing row: {e}")
+        if self.batcher:
+            self.batcher.record(count, len(rows), malformed=malformed, truncated=completion.truncated,
+                                prompt_tokens=completion.prompt_tokens,
+                                completion_tokens=completion.completion_tokens)
         
         return rows
     
@@ -224,22 +203,13 @@ Generated rows:"""
         Returns:
             List of generated samples, each as a list of column values.
         """
-        # Generate samples in batches of 5 for efficiency
-        samples = []
-        remaining = num_samples
-        
-        while remaining > 0:
-            batch_size = min(5, remaining)
-            batch = self.generate_samples(count=batch_size)
-            samples.extend(batch)
-            remaining -= len(batch)
-            
-            # If we didn't get enough samples, try again with a smaller batch
-            if remaining > 0 and len(batch) < batch_size:
-                print(f"Warning: Only got {len(batch)}/{batch_size} samples. Retrying...")
-                continue
-                
-        return samples[:num_samples]  # Ensure we don't return more than requested
+        # Same engine as the full dataset, so sample rounds get retries and shortfall refills too
+        engine = GenerationEngine(
+            lambda count: self.generate_samples(count=count),
+            config=self.engine_config,
+            batcher=self.batcher,
+        )
+        return engine.run(num_samples)
     
     def collect_feedback(self, samples: List[List[str]]) -> Dict[str, Dict[str, Any]]:
         """
@@ -373,21 +343,30 @@ Improved prompt:"""
             
         return feedback
 
-    def create_dataset(self, description: str, columns: List[str], volume: int = 100, interactive: bool = True) -> tuple:
+    def stream_dataset(self, description: str, columns: List[str], volume: int = 100,
+                       interactive: bool = False,
+                       seen_rows: Optional[List[List[str]]] = None) -> Iterator[List[List[str]]]:
         """
-        Create a dataset with the given description and columns.
+        Create a dataset like create_dataset, but yield the rows batch by batch.
+        
+        Each batch is yielded, in order, as soon as it and every batch before it are done, so
+        the caller can write it out and only a few batches are ever held in memory. Engine
+        stats for the run are in last_run_stats once the generator finishes.
         
         Args:
             description: Description of the dataset.
             columns: List of column names.
             volume: Number of rows to generate.
-            interactive: Whether to run in interactive mode (show prompts in terminal).
+            interactive: Whether to run the feedback rounds in the terminal first.
+            seen_rows: Rows already kept, e.g. by an interrupted run being resumed; new rows
+                that duplicate them are rejected.
             
-        Returns:
-            Tuple of (dataset, log_path) where dataset is a list of rows and log_path is the path to the pipeline log.
+        Yields:
+            Lists of rows, each row a list of column values.
         """
         # Initialize pipeline tracking
-        self.pipeline = PipelineTracker()
+        self.pipeline = PipelineTracker(output_dir=self.log_dir, record_batches=self.record_batches)
+        self.pipeline.start_run(description, columns, volume)
         
         # Create initial generation prompt
         self.create_initial_generation_prompt(description, columns)
@@ -431,28 +410,130 @@ Improved prompt:"""
                     
                 feedback_round += 1
         
-        # Generate final dataset in batches for efficiency
-        final_dataset = []
-        remaining = volume
+        yield from self._generate_batches(volume, interactive, seen_rows)
+
+    def _generate_batches(self, volume: int, interactive: bool,
+                          seen_rows: Optional[List[List[str]]] = None) -> Iterator[List[List[str]]]:
+        """Generate rows with the current prompt, checkpointing each batch in the pipeline log."""
+        self.pipeline.start_generation(self.generation_prompt, self.current_stats)
+        
+        # Generate the final dataset with several batches in flight at once; duplicates are
+        # checked against this run's rows and any seen_rows only
+        deduplicator = None
+        if self.engine_config.dedup:
+            deduplicator = RowDeduplicator(threshold=self.engine_config.dedup_threshold,
+                                           max_rows=self.engine_config.dedup_max_rows)
+            if seen_rows:
+                deduplicator.prime(seen_rows)
+        engine = GenerationEngine(
+            lambda count: self.generate_samples(count=count),
+            config=self.engine_config,
+            on_progress=(lambda done, total: print(f"Generated {done}/{total} rows...")) if interactive else None,
+            batcher=self.batcher,
+            deduplicator=deduplicator,
+        )
+        try:
+            for _, batch in engine.iter_batches(volume):
+                self.pipeline.record_batch(batch)
+                yield batch
+        except Exception as e:
+            self.pipeline.fail_run(str(e))
+            raise
+        else:
+            self.pipeline.end_run(engine.stats.to_dict())
+        finally:
+            self.last_run_stats = engine.stats
+
+    def stream_resumed(self, log_file: str, replay: bool = True,
+                       interactive: bool = False) -> Iterator[List[List[str]]]:
+        """
+        Continue a run that failed or was interrupted, from its pipeline log.
         
-        # Generate in batches of 5
-        while remaining > 0:
-            batch_size = min(5, remaining)
-            batch = self.generate_samples(count=batch_size)
-            final_dataset.extend(batch)
-            remaining -= len(batch)
+        Batches the log already recorded aren't generated again: with replay they are yielded
+        first, straight from the log, and new rows are checked against them for duplicates.
+        Feedback rounds aren't repeated; generation picks up with the run's last prompt.
+        
+        Args:
+            log_file: The run's pipeline_run_<run_id>.jsonl file.
+            replay: Whether to yield the recorded batches before the new ones.
+            interactive: Whether to print progress in the terminal.
             
-            if interactive:
-                print(f"Generated {len(final_dataset)}/{volume} rows...")
+        Yields:
+            Lists of rows, each row a list of column values.
+        """
+        self.pipeline = PipelineTracker.load(log_file, record_batches=self.record_batches)
+        pipeline = self.pipeline
+        if pipeline.description is None:
+            raise ValueError(f"{log_file} doesn't record a run to resume")
+        
+        if pipeline.generation_prompt is not None:
+            self.columns = pipeline.columns
+            self.generation_prompt = pipeline.generation_prompt
+            self.current_stats = pipeline.generation_statistics
+        else:
+            # Stopped during the feedback rounds: generate with the latest prompt they produced
+            self.create_initial_generation_prompt(pipeline.description, pipeline.columns)
+            updated = [step.updated_prompt for step in pipeline.steps if step.updated_prompt]
+            if updated:
+                self.generation_prompt = updated[-1]
+        
+        done = []
+        for batch in pipeline.iter_batches():
+            done.extend(batch)
+            if replay:
+                yield batch
+        
+        remaining = pipeline.volume - len(done)
+        if pipeline.status == "completed" or remaining <= 0:
+            self.last_run_stats = EngineStats(requested_rows=0)
+            return
+        if interactive:
+            print(f"Resuming run {pipeline.run_id}: {len(done)}/{pipeline.volume} rows already generated.")
+        yield from self._generate_batches(remaining, interactive, seen_rows=done)
+
+    def create_dataset(self, description: str, columns: List[str], volume: int = 100, interactive: bool = True) -> tuple:
+        """
+        Create a dataset with the given description and columns.
+        
+        Args:
+            description: Description of the dataset.
+            columns: List of column names.
+            volume: Number of rows to generate.
+            interactive: Whether to run in interactive mode (show prompts in terminal).
+            
+        Returns:
+            Tuple of (dataset, log_path) where dataset is a list of rows and log_path is the path to the pipeline log.
+        """
+        batches = self.stream_dataset(description, columns, volume, interactive=interactive)
+        return self._collect_dataset(batches, volume, interactive)
+
+    def resume_dataset(self, log_file: str, interactive: bool = True) -> tuple:
+        """
+        Finish a run that failed or was interrupted, without regenerating its recorded batches.
+        
+        Args:
+            log_file: The run's pipeline_run_<run_id>.jsonl file.
+            interactive: Whether to print progress in the terminal.
             
-            # If we didn't get enough samples, try again with a smaller batch
-            if remaining > 0 and len(batch) < batch_size:
-                if interactive:
-                    print(f"Warning: Only got {len(batch)}/{batch_size} samples. Retrying...")
-                continue
-        
-        # Ensure we have exactly the requested number of rows
-        final_dataset = final_dataset[:volume]
+        Returns:
+            Tuple of (dataset, log_path), as from create_dataset.
+        """
+        batches = self.stream_resumed(log_file, interactive=interactive)
+        return self._collect_dataset(batches, None, interactive)
+
+    def _collect_dataset(self, batches: Iterator[List[List[str]]], volume: Optional[int],
+                         interactive: bool) -> tuple:
+        final_dataset = []
+        for batch in batches:
+            final_dataset.extend(batch)
+        volume = volume if volume is not None else self.pipeline.volume
+        
+        stats = self.last_run_stats
+        if interactive and stats.duplicate_rows:
+            print(f"Rejected {stats.duplicate_rows} duplicate rows ({stats.duplicate_rate:.1%}).")
+        if interactive and stats.shortfall:
+            print(f"Warning: Only got {len(final_dataset)}/{volume} rows after "
+                  f"{stats.empty_batches} batches with no usable rows.")
         
         # Save final pipeline state
         if hasattr(self, 'pipeline'):
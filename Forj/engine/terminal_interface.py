@@ -217,6 +217,9 @@ def create_dataset_flow(synthesizer: Synthesizer):
         print(f"\n❌ An error occurred: {str(e)}")
         if hasattr(synthesizer, 'pipeline') and hasattr(synthesizer.pipeline, 'log_file'):
             print(f"Check the log file for details: {synthesizer.pipeline.log_file.absolute()}")
+            if synthesizer.pipeline.resumable:
+                print("Rows generated so far are kept in the log; Synthesizer.resume_dataset() "
+                      "can finish the run from there.")
     
     input("\nPress Enter to return to the main menu...")
 
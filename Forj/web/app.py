@@ -1,9 +1,13 @@
 import os
+import csv
+import itertools
+import threading
 from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, send_from_directory, json, session
 from flask_socketio import SocketIO, emit
 from datetime import datetime
 import time
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.orm import Session
 from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
 from flask_wtf import FlaskForm
 from flask_wtf.csrf import CSRFProtect, generate_csrf, CSRFError
@@ -18,6 +22,7 @@ import uuid
 # Add the engine directory to the path
 sys.path.append(str(Path(__file__).parent.parent / 'engine'))
 from synthesizer import Synthesizer
+from job_queue import JobQueue, SessionStore
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY') or 'dev-key-please-change-in-production'
@@ -86,51 +91,353 @@ class Dataset(db.Model):
     row_count = db.Column(db.Integer, nullable=False, default=100)
     status = db.Column(db.String(20), nullable=False, default='pending')  # pending, processing, completed, failed
     progress = db.Column(db.Float, default=0.0)
-    logs = db.Column(db.Text, default='[]')  # JSON array of log entries
+    logs = db.Column(db.Text, default='[]')  # JSON array of log entries (datasets from before dataset_log)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     file_path = db.Column(db.String(500), nullable=True)
     
     def add_log(self, message, log_type='info'):
-        """Add a log entry to the dataset."""
-        logs = json.loads(self.logs or '[]')
-        log_entry = {
-            'id': str(time.time() * 1000),  # Unique ID based on timestamp
-            'timestamp': datetime.utcnow().isoformat(),
+        """Add a log entry to the dataset. It is written and emitted with the next batch of entries."""
+        log_buffer.add({
+            'dataset_id': self.id,
+            'timestamp': datetime.utcnow(),
             'type': log_type,
             'message': message
-        }
-        logs.append(log_entry)
-        self.logs = json.dumps(logs)
-        db.session.commit()
-        
-        # Emit socket.io event for real-time updates
-        socketio.emit('log_update', {
-            'dataset_id': self.id,
-            'log': log_entry
         })
         
     def update_progress(self, progress):
-        """Update the progress of dataset generation."""
+        """Update the progress of dataset generation; commits and events are rate limited."""
         self.progress = min(100.0, max(0.0, float(progress)))
-        db.session.commit()
-        
-        # Emit socket.io event for progress updates
-        socketio.emit('progress_update', {
-            'dataset_id': self.id,
-            'progress': self.progress
-        })
+        progress_limiter.update(self)
+
+    def read_logs(self, after=None, limit=200):
+        """
+        Read the dataset's log entries in order, a page at a time.
+
+        Args:
+            after: Only return entries after this log id (the last id of the previous page).
+            limit: Most entries to return.
+
+        Returns:
+            tuple: (entries as dicts, whether there are more, the id to pass as `after` next)
+        """
+        query = DatasetLog.query.filter_by(dataset_id=self.id)
+        if after is not None:
+            query = query.filter(DatasetLog.id > after)
+        rows = query.order_by(DatasetLog.id).limit(limit + 1).all()
+        if not rows and after is None:
+            # Datasets from before dataset_log keep their entries in the logs column, with
+            # timestamp ids that can't be a cursor: return them all once, then continue
+            # from the start of dataset_log
+            legacy = json.loads(self.logs or '[]')
+            if legacy:
+                return legacy, False, 0
+        entries = [row.to_dict() for row in rows[:limit]]
+        return entries, len(rows) > limit, entries[-1]['id'] if entries else after
+
+class DatasetLog(db.Model):
+    __tablename__ = 'dataset_log'
+    id = db.Column(db.Integer, primary_key=True)
+    dataset_id = db.Column(db.Integer, db.ForeignKey('dataset.id'), nullable=False, index=True)
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    type = db.Column(db.String(20), nullable=False, default='info')
+    message = db.Column(db.Text, nullable=False)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'timestamp': self.timestamp.isoformat(),
+            'type': self.type,
+            'message': self.message
+        }
+
+class LogBuffer:
+    """
+    Collect dataset log entries and write them to dataset_log in batches.
+
+    add_log used to load a dataset's whole JSON log, append one entry, write it
+    back and commit, so every entry cost a transaction and more as the log
+    grew. Entries are now held in memory and inserted together, with one
+    commit, once `batch_size` are waiting or, from a timer, `interval`
+    seconds after the first of them arrived, so the last entry of a burst
+    isn't held back until the next one. Each entry's log_update event is
+    emitted when it is written. Entries are written in a session of their
+    own, so adding one never commits the caller's pending changes. Call
+    flush() when a run ends, and before reading logs.
+    """
+
+    def __init__(self, batch_size=50, interval=1.0):
+        self.batch_size = batch_size
+        self.interval = interval
+        self._pending = []
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def add(self, entry):
+        with self._lock:
+            self._pending.append(entry)
+            due = len(self._pending) >= self.batch_size
+            if not due:
+                self._schedule()
+        if due:
+            self.flush()
+
+    def _schedule(self):
+        # Called with the lock held
+        if self._timer is None:
+            self._timer = threading.Timer(self.interval, self._flush_from_timer)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _flush_from_timer(self):
+        with self._lock:
+            self._timer = None
+        try:
+            self.flush()
+        except Exception as e:
+            # The entries were put back; try again after another interval
+            app.logger.error(f'Could not write dataset log entries: {e}')
+            with self._lock:
+                self._schedule()
+
+    def flush(self):
+        """
+        Write every waiting entry, in its own session and transaction. Safe from any thread,
+        but on SQLite call it from a thread whose own session isn't holding uncommitted writes.
+        """
+        with self._lock:
+            entries, self._pending = self._pending, []
+        if not entries:
+            return
+        try:
+            with app.app_context(), Session(db.engine) as session:
+                rows = [DatasetLog(**entry) for entry in entries]
+                session.add_all(rows)
+                session.flush()
+                events = [{'dataset_id': row.dataset_id, 'log': row.to_dict()} for row in rows]
+                session.commit()
+        except Exception:
+            with self._lock:
+                self._pending[:0] = entries
+            raise
+
+        # Emit socket.io events for real-time updates
+        for event in events:
+            socketio.emit('log_update', event)
+
+class ProgressLimiter:
+    """
+    Rate limit progress writes and progress_update events.
+
+    A dataset's progress is committed at most every `commit_interval` seconds
+    and emitted at most `max_rate` times a second; intermediate values are
+    dropped, since only the latest matters. Reaching 100% is always committed
+    and emitted.
+    """
+
+    def __init__(self, max_rate=2.0, commit_interval=5.0):
+        self.min_gap = 1.0 / max_rate
+        self.commit_interval = commit_interval
+        self._last = {}  # dataset id -> (last emit, last commit)
+        self._lock = threading.Lock()
+
+    def update(self, dataset):
+        now = time.monotonic()
+        final = dataset.progress >= 100.0
+        with self._lock:
+            last_emit, last_commit = self._last.get(dataset.id, (float('-inf'), float('-inf')))
+            emit_now = final or now - last_emit >= self.min_gap
+            commit_now = final or now - last_commit >= self.commit_interval
+            self._last[dataset.id] = (now if emit_now else last_emit, now if commit_now else last_commit)
+            if final:
+                del self._last[dataset.id]
+        if commit_now:
+            db.session.commit()
+        if emit_now:
+            # Emit socket.io event for progress updates
+            socketio.emit('progress_update', {
+                'dataset_id': dataset.id,
+                'progress': dataset.progress
+            })
+
+log_buffer = LogBuffer()
+progress_limiter = ProgressLimiter()
+
+class ProgressThrottle:
+    """
+    Report a generation's progress as batches arrive.
+
+    Progress is passed on for every batch (update_progress rate limits the
+    writes and events), with a log line each time another tenth of the rows
+    is done.
+    """
+
+    def __init__(self, dataset, total, start=10.0, end=95.0):
+        self.dataset = dataset
+        self.total = max(1, total)
+        self.start = start
+        self.end = end
+        self._last_tenth = 0
+
+    def update(self, done):
+        tenth = min(10, done * 10 // self.total)
+        self.dataset.update_progress(self.start + (self.end - self.start) * min(done, self.total) / self.total)
+        if tenth > self._last_tenth:
+            self._last_tenth = tenth
+            self.dataset.add_log(f'Generated {done}/{self.total} rows')
+
+
+def write_dataset_csv(dataset, synthesizer, description, columns, row_count, job=None):
+    """
+    Generate a dataset's rows and append them to its CSV file as each batch arrives.
+
+    Rows go from the synthesizer straight to the file, so memory use doesn't grow
+    with row_count and nothing is copied into Dataset.data. The file is written
+    under a .part name and only renamed once it is complete.
+
+    With a job, the file path, rows written and byte offset are checkpointed after
+    every batch. A job resumed from a checkpoint truncates the .part file to the
+    last checkpointed row and only generates the rows still missing.
+
+    Returns:
+        tuple: (file path, rows written)
+    """
+    checkpoint = job.checkpoint if job is not None else {}
+    filepath = checkpoint.get('file_path')
+    if not filepath:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        safe_name = "".join(c if c.isalnum() else "_" for c in dataset.name)[:50]
+        filename = f"dataset_{dataset.id}_{safe_name}_{timestamp}.csv"
+        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+
+    partial = filepath + '.part'
+    written = checkpoint.get('rows', 0)
+    seen_rows = None
+    if written and os.path.exists(partial):
+        # Drop anything written after the last checkpoint, and keep the rows before it
+        # out of the rest of the run as duplicates
+        with open(partial, 'r+b') as f:
+            f.truncate(checkpoint['offset'])
+        with open(partial, 'r', encoding='utf-8', newline='') as f:
+            seen_rows = list(itertools.islice(csv.reader(f), 1, None))
+        mode = 'a'
+    else:
+        written = 0
+        mode = 'w'
+
+    throttle = ProgressThrottle(dataset, row_count)
+    try:
+        with open(partial, mode, encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            if mode == 'w':
+                writer.writerow(columns)
+            if job is not None:
+                f.flush()
+                job.save_checkpoint({'file_path': filepath, 'rows': written, 'offset': f.tell()})
+            if written < row_count:
+                for batch in synthesizer.stream_dataset(description, columns, row_count - written,
+                                                          seen_rows=seen_rows):
+                    writer.writerows(batch)
+                    written += len(batch)
+                    if job is not None:
+                        f.flush()
+                        job.save_checkpoint({'file_path': filepath, 'rows': written, 'offset': f.tell()})
+                    throttle.update(written)
+                    # Show this batch's log entries now rather than with the next batch's
+                    log_buffer.flush()
+        os.replace(partial, filepath)
+    except Exception:
+        # A job keeps its partial file so it can resume; otherwise there is nothing to resume
+        if job is None and os.path.exists(partial):
+            os.remove(partial)
+        raise
+
+    stats = synthesizer.last_run_stats
+    if stats is not None and stats.duplicate_rows:
+        dataset.add_log(f'Rejected {stats.duplicate_rows} duplicate rows ({stats.duplicate_rate:.1%}) '
+                        f'and generated replacements')
+    return filepath, written
+
+
+def complete_dataset(dataset, filepath, written):
+    """Mark a dataset as completed once its CSV file is written."""
+    if written < dataset.row_count:
+        dataset.add_log(f'Only {written} of {dataset.row_count} rows could be generated', 'warning')
+        dataset.row_count = written
+    dataset.file_path = filepath
+    dataset.status = 'completed'
+    dataset.update_progress(100)
+    dataset.add_log(f'Dataset saved to {filepath}')
+    db.session.commit()
+    log_buffer.flush()
+
 
 @login_manager.user_loader
 def load_user(user_id):
     return User.query.get(int(user_id))
 
+def run_generation_job(job):
+    """Job handler: generate a dataset's rows, continuing from the job's checkpoint if it has one."""
+    payload = job.payload
+    with app.app_context():
+        dataset = Dataset.query.get(payload['dataset_id'])
+        if not dataset:
+            app.logger.error('Dataset {} not found'.format(payload['dataset_id']))
+            return
+        try:
+            dataset.status = 'processing'
+            if job.resumed:
+                dataset.add_log(f"Resuming dataset generation after {job.checkpoint.get('rows', 0)} rows...")
+            else:
+                dataset.add_log('Starting dataset generation...')
+                dataset.update_progress(10)
+            db.session.commit()
+
+            # The job checkpoints rows itself, so the pipeline log needn't hold them too
+            synthesizer = Synthesizer(record_batches=False)
+            filepath, written = write_dataset_csv(dataset, synthesizer, payload['description'],
+                                                  payload['columns'], payload['row_count'], job=job)
+            complete_dataset(dataset, filepath, written)
+            app.logger.info('Successfully generated dataset {}'.format(dataset.id))
+        except Exception as e:
+            db.session.rollback()
+            dataset.status = 'failed'
+            dataset.add_log(f'Error during dataset generation: {str(e)}', 'error')
+            db.session.commit()
+            partial = job.checkpoint.get('file_path', '') + '.part'
+            if os.path.exists(partial):
+                os.remove(partial)
+            raise
+        finally:
+            log_buffer.flush()
+
+
 # Initialize Synthesizer
 synthesizer = Synthesizer()
 
-# In-memory storage for feedback sessions (in production, use Redis or database)
-feedback_sessions = {}
+# Dataset generation runs on a bounded pool of workers, from a queue that survives restarts
+os.makedirs(app.instance_path, exist_ok=True)
+job_queue = JobQueue(
+    os.environ.get('FORJ_JOB_DB') or os.path.join(app.instance_path, 'jobs.db'),
+    workers=int(os.environ.get('FORJ_JOB_WORKERS', 2)),
+    per_user_limit=int(os.environ.get('FORJ_JOBS_PER_USER', 1)),
+    logger=app.logger
+)
+job_queue.register('generate_dataset', run_generation_job)
+
+# Feedback sessions are kept in the job database so they survive restarts and are shared between workers
+feedback_sessions = SessionStore(job_queue)
+
+
+@app.before_request
+def start_job_queue():
+    """
+    Start the job workers, resuming jobs the last shutdown interrupted, in whichever process serves
+    requests (the dev server's reloader child or each gunicorn worker). Later calls do nothing.
+    """
+    job_queue.start()
 
 # Routes
 @app.route('/')
@@ -181,111 +488,13 @@ def create_dataset():
             db.session.add(dataset)
             db.session.commit()
             
-            # Start the background task
-            from threading import Thread
-            
-            def generate_dataset_task(dataset_id, description, columns, row_count):
-                with app.app_context():
-                    try:
-                        from synthesizer import Synthesizer
-                        import os
-                        from datetime import datetime
-                        
-                        dataset = Dataset.query.get(dataset_id)
-                        if not dataset:
-                            app.logger.error('Dataset {} not found'.format(dataset_id))
-                            return
-                        
-                        # Update status to processing
-                        dataset.status = 'processing'
-                        dataset.add_log('Starting dataset generation...')
-                        db.session.commit()
-                        
-                        # Initialize the synthesizer with progress callback
-                        def progress_callback(progress, message):
-                            dataset = Dataset.query.get(dataset_id)
-                            if dataset:
-                                dataset.update_progress(progress)
-                                if message:
-                                    dataset.add_log(message)
-                        
-                        synthesizer = Synthesizer()
-                        
-                        # Generate the dataset
-                        dataset.add_log('Initializing data generation...')
-                        dataset.update_progress(10)
-                        
-                        try:
-                            dataset_data, log_path = synthesizer.create_dataset(
-                                description=description,
-                                columns=columns,
-                                num_rows=row_count
-                            )
-                        except Exception as e:
-                            dataset.status = 'failed'
-                            dataset.add_log(f'Error during dataset generation: {str(e)}', 'error')
-                            db.session.commit()
-                            return
-                        
-                        dataset.add_log('Dataset generated successfully')
-                        dataset.update_progress(70)
-                        
-                        # Save the dataset to a file
-                        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                        safe_name = "".join(c if c.isalnum() else "_" for c in dataset.name)[:50]
-                        filename = "dataset_{}_{}.csv".format(safe_name, timestamp)
-                        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-                        
-                        # Ensure upload directory exists
-                        os.makedirs(os.path.dirname(filepath), exist_ok=True)
-                        
-                        try:
-                            # Write the dataset to a CSV file
-                            with open(filepath, 'w', encoding='utf-8') as f:
-                                # Write header
-                                f.write(','.join(columns) + '\n')
-                                # Write data
-                                for i, row in enumerate(dataset_data):
-                                    row_data = []
-                                    for cell in row:
-                                        cell_str = str(cell)
-                                        if ',' in cell_str or '"' in cell_str or '\n' in cell_str:
-                                            # Escape quotes by doubling them and wrap in quotes
-                                            cell_str = '"' + cell_str.replace('"', '""') + '"'
-                                        row_data.append(cell_str)
-                                    f.write(','.join(row_data) + '\n')
-                                    
-                                    # Update progress every 10%
-                                    if (i + 1) % max(1, len(dataset_data) // 10) == 0:
-                                        progress = 70 + int(25 * (i + 1) / len(dataset_data))
-                                        dataset.update_progress(progress)
-                                        dataset.add_log(f'Processed {i + 1}/{len(dataset_data)} rows')
-                            
-                            # Update dataset with file path and status
-                            dataset.file_path = filepath
-                            dataset.status = 'completed'
-                            dataset.update_progress(100)
-                            dataset.add_log(f'Dataset saved to {filepath}')
-                            db.session.commit()
-                            
-                            app.logger.info('Successfully generated dataset {}'.format(dataset_id))
-                            
-                        except Exception as e:
-                            dataset.status = 'failed'
-                            dataset.add_log(f'Error saving dataset: {str(e)}', 'error')
-                            db.session.commit()
-                            
-                    except Exception as e:
-                        app.logger.error('Error in background task: {}'.format(str(e)))
-                        if 'dataset' in locals():
-                            dataset.status = 'failed'
-                            dataset.add_log(f'Unexpected error: {str(e)}', 'error')
-                            db.session.commit()
-            
-            # Start the background task
-            thread = Thread(target=generate_dataset_task, args=(dataset.id, description, columns, row_count))
-            thread.daemon = True
-            thread.start()
+            # Queue the generation; a worker picks it up when one is free
+            job_queue.enqueue('generate_dataset', {
+                'dataset_id': dataset.id,
+                'description': description,
+                'columns': columns,
+                'row_count': row_count
+            }, user_id=current_user.id)
             
             # Redirect to the dataset status page
             return redirect(url_for('dataset_status', dataset_id=dataset.id))
@@ -297,20 +506,34 @@ def create_dataset():
     return render_template('create_dataset.html', form=form)
 
 @app.route('/datasets/<int:dataset_id>/status')
+@app.route('/api/datasets/<int:dataset_id>/status')
 @login_required
 def dataset_status(dataset_id):
-    """Endpoint to check the status of a dataset generation."""
+    """
+    Endpoint to check the status of a dataset generation.
+    
+    Logs are paginated: pass the previous response's last_log_id as `after` to get only newer
+    entries, and `limit` (max 1000) to cap how many come back.
+    """
     dataset = Dataset.query.get_or_404(dataset_id)
     
     # Ensure the user owns this dataset
     if dataset.user_id != current_user.id:
         return jsonify({'error': 'Unauthorized'}), 403
     
+    # Entries still buffered in this process would otherwise show up a poll late
+    log_buffer.flush()
+    after = request.args.get('after', type=int)
+    limit = min(max(request.args.get('limit', 200, type=int), 1), 1000)
+    logs, has_more, last_log_id = dataset.read_logs(after=after, limit=limit)
+    
     return jsonify({
         'id': dataset.id,
         'status': dataset.status,
         'progress': dataset.progress,
-        'logs': json.loads(dataset.logs or '[]'),
+        'logs': logs,
+        'last_log_id': last_log_id,
+        'has_more_logs': has_more,
         'file_path': dataset.file_path,
         'created_at': dataset.created_at.isoformat(),
         'updated_at': dataset.updated_at.isoformat()
@@ -367,7 +590,7 @@ def start_generation():
         
         # Create a new session for this generation
         session_id = str(uuid.uuid4())
-        feedback_sessions[session_id] = {
+        feedback_sessions.save(session_id, {
             'description': description,
             'columns': columns,
             'row_count': row_count,
@@ -376,7 +599,7 @@ def start_generation():
             'all_samples': [],
             'status': 'generating_samples',
             'created_at': datetime.utcnow().isoformat()
-        }
+        }, user_id=current_user.id)
         
         # Generate initial samples
         return _generate_samples(session_id)
@@ -388,7 +611,7 @@ def start_generation():
 def _generate_samples(session_id):
     """Generate samples for a given session."""
     try:
-        session_data = feedback_sessions[session_id]
+        session_data = feedback_sessions.get(session_id)
         synthesizer = Synthesizer()
         
         # Update generation prompt with feedback if any
@@ -424,6 +647,7 @@ def _generate_samples(session_id):
         session_data['current_samples'] = formatted_samples
         session_data['status'] = 'awaiting_feedback'
         session_data['feedback_round'] += 1
+        feedback_sessions.save(session_id, session_data)
         
         return jsonify({
             'success': True,
@@ -435,9 +659,15 @@ def _generate_samples(session_id):
         
     except Exception as e:
         app.logger.error(f'Error generating samples: {str(e)}', exc_info=True)
-        feedback_sessions[session_id]['status'] = 'error'
+        _mark_session_error(session_id)
         return jsonify({'error': str(e), 'session_id': session_id}), 500
 
+def _mark_session_error(session_id):
+    session_data = feedback_sessions.get(session_id)
+    if session_data is not None:
+        session_data['status'] = 'error'
+        feedback_sessions.save(session_id, session_data)
+
 @app.route('/api/submit-feedback', methods=['POST'])
 @login_required
 def submit_feedback():
@@ -450,7 +680,7 @@ def submit_feedback():
         if not session_id or session_id not in feedback_sessions:
             return jsonify({'error': 'Invalid session ID'}), 400
             
-        session_data = feedback_sessions[session_id]
+        session_data = feedback_sessions.get(session_id)
         
         # Update feedback for each sample
         for fb in feedback_items:
@@ -470,6 +700,7 @@ def submit_feedback():
         
         # Check if all samples were approved
         all_approved = all(sample.get('approved', False) for sample in session_data['current_samples'])
+        feedback_sessions.save(session_id, session_data)
         
         if all_approved or session_data['feedback_round'] >= 3:  # Max 3 feedback rounds
             # Generate full dataset
@@ -485,7 +716,7 @@ def submit_feedback():
 def _generate_final_dataset(session_id):
     """Generate the final dataset after feedback is complete."""
     try:
-        session_data = feedback_sessions[session_id]
+        session_data = feedback_sessions.get(session_id)
         synthesizer = Synthesizer()
         
         # Generate final dataset
@@ -499,8 +730,11 @@ def _generate_final_dataset(session_id):
         # Save the dataset (implement your saving logic here)
         # For now, just return the data
         
+        # Keep only a preview in the session; the full dataset would bloat every session read
         session_data['status'] = 'completed'
-        session_data['final_dataset'] = final_data
+        session_data['final_preview'] = final_data[:10]
+        session_data['total_rows'] = len(final_data)
+        feedback_sessions.save(session_id, session_data)
         
         return jsonify({
             'success': True,
@@ -512,7 +746,7 @@ def _generate_final_dataset(session_id):
         
     except Exception as e:
         app.logger.error(f'Error generating final dataset: {str(e)}', exc_info=True)
-        feedback_sessions[session_id]['status'] = 'error'
+        _mark_session_error(session_id)
         return jsonify({'error': str(e), 'session_id': session_id}), 500
 
 @app.route('/api/finalize-dataset', methods=['POST'])
@@ -543,95 +777,25 @@ def finalize_dataset():
             row_count=row_count,
             columns=json.dumps(columns),
             schema=json.dumps([{'name': col, 'type': 'text'} for col in columns]),
-            status='processing',
+            status='pending',
             progress=0
         )
         
         db.session.add(dataset)
         db.session.commit()
         
-        # Start background task to generate the full dataset
-        from threading import Thread
-        
-        def generate_dataset_task(dataset_id, description, columns, row_count, feedback):
-            with app.app_context():
-                try:
-                    dataset = Dataset.query.get(dataset_id)
-                    if not dataset:
-                        app.logger.error(f'Dataset {dataset_id} not found')
-                        return
-                    
-                    # Update status
-                    dataset.status = 'processing'
-                    dataset.add_log('Starting dataset generation...')
-                    db.session.commit()
-                    
-                    # Initialize the synthesizer
-                    synthesizer = Synthesizer()
-                    
-                    # Include any feedback in the generation
-                    generation_prompt = description
-                    if feedback:
-                        generation_prompt += f"\n\nPrevious feedback to incorporate: {feedback}"
-                    
-                    # Generate the dataset
-                    dataset.add_log('Generating data...')
-                    dataset.update_progress(10)
-                    
-                    dataset_data, log_path = synthesizer.create_dataset(
-                        description=generation_prompt,
-                        columns=columns,
-                        num_rows=row_count
-                    )
-                    
-                    dataset.add_log('Data generation complete. Saving to file...')
-                    dataset.update_progress(70)
-                    
-                    # Save the dataset to a file
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    safe_name = "".join(c if c.isalnum() else "_" for c in dataset.name)[:50]
-                    filename = f"dataset_{safe_name}_{timestamp}.csv"
-                    filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-                    
-                    # Ensure upload directory exists
-                    os.makedirs(os.path.dirname(filepath), exist_ok=True)
-                    
-                    # Write the dataset to a CSV file
-                    with open(filepath, 'w', encoding='utf-8', newline='') as f:
-                        writer = csv.writer(f)
-                        writer.writerow(columns)
-                        
-                        for i, row in enumerate(dataset_data):
-                            writer.writerow(row)
-                            
-                            # Update progress every 5%
-                            if (i + 1) % max(1, row_count // 20) == 0:
-                                progress = 70 + int(25 * (i + 1) / row_count)
-                                dataset.update_progress(min(progress, 95))
-                    
-                    # Update dataset with file path and status
-                    dataset.file_path = filepath
-                    dataset.status = 'completed'
-                    dataset.update_progress(100)
-                    dataset.add_log(f'Dataset saved to {filepath}')
-                    db.session.commit()
-                    
-                    app.logger.info(f'Successfully generated dataset {dataset_id}')
-                    
-                except Exception as e:
-                    app.logger.error(f'Error in background task: {str(e)}')
-                    if 'dataset' in locals():
-                        dataset.status = 'failed'
-                        dataset.add_log(f'Error: {str(e)}', 'error')
-                        db.session.commit()
-        
-        # Start the background task
-        thread = Thread(
-            target=generate_dataset_task,
-            args=(dataset.id, description, columns, row_count, feedback)
-        )
-        thread.daemon = True
-        thread.start()
+        # Include any feedback in the generation
+        generation_prompt = description
+        if feedback:
+            generation_prompt += f"\n\nPrevious feedback to incorporate: {feedback}"
+        
+        # Queue the generation; a worker picks it up when one is free
+        job_queue.enqueue('generate_dataset', {
+            'dataset_id': dataset.id,
+            'description': generation_prompt,
+            'columns': columns,
+            'row_count': row_count
+        }, user_id=current_user.id)
         
         return jsonify({
             'success': True,
@@ -753,12 +917,26 @@ def get_dataset(dataset_id):
                 'message': 'Dataset not found or access denied'
             }), 404
             
+        # Rows are read from the CSV file a page at a time, not from Dataset.data
+        offset = max(0, request.args.get('offset', 0, type=int))
+        limit = min(max(1, request.args.get('limit', 100, type=int)), 1000)
+        if dataset.file_path and os.path.exists(dataset.file_path):
+            with open(dataset.file_path, 'r', encoding='utf-8', newline='') as f:
+                reader = csv.reader(f)
+                next(reader, None)  # Header
+                rows = list(itertools.islice(reader, offset, offset + limit))
+        else:
+            # Datasets saved before rows moved to files
+            rows = (json.loads(dataset.data) if dataset.data else [])[offset:offset + limit]
+            
         return jsonify({
             'id': dataset.id,
             'name': dataset.name,
             'description': dataset.description,
             'columns': json.loads(dataset.columns) if dataset.columns else [],
-            'data': json.loads(dataset.data) if dataset.data else [],
+            'data': rows,
+            'offset': offset,
+            'limit': limit,
             'row_count': dataset.row_count,
             'status': dataset.status,
             'created_at': dataset.created_at.isoformat(),
@@ -777,20 +955,31 @@ def get_dataset(dataset_id):
 def save_dataset():
     try:
         data = request.get_json()
+        columns = data.get('columns', [])
+        rows = data.get('dataset', [])
         
         # Create a new dataset record
         dataset = Dataset(
             name=f"Generated Dataset {datetime.utcnow().strftime('%Y-%m-%d %H:%M')}",
             description="AI-generated dataset",
-            columns=json.dumps(data.get('columns', [])),
-            data=json.dumps(data.get('dataset', [])),
-            row_count=data.get('row_count', 0),
+            columns=json.dumps(columns),
+            data=None,  # Rows live in the CSV file
+            row_count=len(rows),
             status='completed',
             user_id=current_user.id,
             file_path=None
         )
         
         db.session.add(dataset)
+        db.session.flush()  # Assigns dataset.id for the file name
+        
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filepath = os.path.join(app.config['UPLOAD_FOLDER'], f"dataset_{dataset.id}_saved_{timestamp}.csv")
+        with open(filepath, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            writer.writerows(rows)
+        dataset.file_path = filepath
         db.session.commit()
         
         return jsonify({
@@ -885,4 +1074,8 @@ def download_dataset(dataset_id):
 if __name__ == '__main__':
     with app.app_context():
         db.create_all()
+    # Resume jobs interrupted by the last shutdown without waiting for a request; with the
+    # reloader, only in the process that serves
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        job_queue.start()
     socketio.run(app, debug=True, host='0.0.0.0', port=5000)
@@ -0,0 +1,346 @@
+"""
+Persistent job queue for dataset generation.
+
+Generation used to run in a bare daemon thread per dataset: nothing limited
+how many ran at once, and a restart killed them silently. Jobs now go into a
+local SQLite database (instance/jobs.db by default) and are run by a bounded
+pool of worker threads:
+
+    - at most `workers` jobs run at once per process, and at most
+      `per_user_limit` per user across every process sharing the database
+    - a job saves a checkpoint (for generation: the rows written so far and
+      the byte offset in its partial file) as it goes
+    - while a process lives, a heartbeat thread renews the lease of every job
+      it is running, however long a single batch takes
+    - on start, jobs left running by a process on this host that is gone, or
+      by another host whose lease ran out, are queued again and resume from
+      their last checkpoint; a live process on this host keeps its jobs
+    - a job reclaimed max_attempts times is marked failed instead of looping
+
+Jobs are claimed inside an IMMEDIATE transaction, so several worker
+processes can share one database. The same database holds the web app's
+feedback sessions (SessionStore), which used to be an in-memory dict lost on
+restart and invisible to other workers.
+"""
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    user_id INTEGER,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    checkpoint TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    owner TEXT,
+    lease_expires REAL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_jobs_status ON jobs (status, id);
+CREATE INDEX IF NOT EXISTS ix_jobs_user_status ON jobs (user_id, status);
+CREATE TABLE IF NOT EXISTS feedback_sessions (
+    session_id TEXT PRIMARY KEY,
+    user_id INTEGER,
+    data TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+# Job statuses
+QUEUED = 'queued'
+RUNNING = 'running'
+COMPLETED = 'completed'
+FAILED = 'failed'
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    return conn
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class Job:
+    """A claimed job, as handed to its handler."""
+
+    def __init__(self, queue: 'JobQueue', row: sqlite3.Row):
+        self.queue = queue
+        self.id = row['id']
+        self.kind = row['kind']
+        self.user_id = row['user_id']
+        self.payload = json.loads(row['payload'])
+        self.checkpoint = json.loads(row['checkpoint']) if row['checkpoint'] else {}
+        self.attempts = row['attempts']
+
+    @property
+    def resumed(self) -> bool:
+        return bool(self.checkpoint)
+
+    def save_checkpoint(self, checkpoint: Dict[str, Any]) -> None:
+        """Persist progress so a restarted job can continue from here."""
+        self.checkpoint = dict(checkpoint)
+        self.queue._save_checkpoint(self.id, self.checkpoint)
+
+
+class JobQueue:
+    def __init__(self, path: str, workers: int = 2, per_user_limit: int = 1, lease_seconds: float = 120.0,
+                 max_attempts: int = 3, poll_interval: float = 1.0, logger=None):
+        """
+        Initialize the queue.
+
+        Args:
+            path: SQLite database file.
+            workers: Worker threads in this process.
+            per_user_limit: Jobs one user may have running at once, across all processes.
+            lease_seconds: How long a running job may go without a heartbeat before a process
+                on another host may take it over. The lease is renewed every third of this.
+            max_attempts: Times a job may be claimed (first run plus resumes) before it is failed.
+            poll_interval: Seconds between checks for new jobs when idle.
+            logger: Logger for job errors (default: print).
+        """
+        self.path = path
+        self.workers = max(1, workers)
+        self.per_user_limit = max(1, per_user_limit)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.logger = logger
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._handlers: Dict[str, Callable[[Job], None]] = {}
+        self._local = threading.local()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+        self._start_lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn().executescript(SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = _connect(self.path)
+        return conn
+
+    def _log(self, message: str) -> None:
+        if self.logger is not None:
+            self.logger.error(message)
+        else:
+            print(message)
+
+    def register(self, kind: str, handler: Callable[[Job], None]) -> None:
+        """Run `handler(job)` for jobs of this kind. An exception from it fails the job."""
+        self._handlers[kind] = handler
+
+    def enqueue(self, kind: str, payload: Dict[str, Any], user_id: Optional[int] = None) -> int:
+        """
+        Add a job to the queue.
+
+        Args:
+            kind: Handler to run it with.
+            payload: JSON-serializable job arguments.
+            user_id: Owner, for the per-user limit.
+
+        Returns:
+            int: The job id
+        """
+        now = time.time()
+        cursor = self._conn().execute(
+            'INSERT INTO jobs (kind, user_id, payload, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)',
+            (kind, user_id, json.dumps(payload), QUEUED, now, now)
+        )
+        self.start()
+        self._wake.set()
+        return cursor.lastrowid
+
+    def get(self, job_id: int) -> Optional[Dict[str, Any]]:
+        row = self._conn().execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job['payload'] = json.loads(job['payload'])
+        job['checkpoint'] = json.loads(job['checkpoint']) if job['checkpoint'] else {}
+        return job
+
+    def counts(self) -> Dict[str, int]:
+        rows = self._conn().execute('SELECT status, COUNT(*) AS n FROM jobs GROUP BY status').fetchall()
+        return {row['status']: row['n'] for row in rows}
+
+    def start(self) -> None:
+        """Recover abandoned jobs and start the workers; later calls do nothing."""
+        with self._start_lock:
+            if self._threads:
+                return
+            self.recover()
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f'forj-job-{i}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+            thread = threading.Thread(target=self._heartbeat, name='forj-job-heartbeat', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the workers after their current jobs."""
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def recover(self) -> int:
+        """
+        Queue again the running jobs whose process is gone.
+
+        A job owned by this host is only taken back once its process has exited,
+        however old its lease; one owned by another host, once its lease has run out.
+
+        Returns:
+            int: Jobs queued again
+        """
+        conn = self._conn()
+        now = time.time()
+        host = socket.gethostname()
+        requeued = 0
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            rows = conn.execute('SELECT id, owner, lease_expires, attempts FROM jobs WHERE status = ?',
+                                (RUNNING,)).fetchall()
+            for row in rows:
+                owner_host, _, owner_pid = (row['owner'] or '').rpartition(':')
+                if owner_host == host and owner_pid.isdigit():
+                    # This process hasn't claimed anything yet, so its own pid means a reused one
+                    if int(owner_pid) != os.getpid() and _process_alive(int(owner_pid)):
+                        continue
+                elif (row['lease_expires'] or 0) > now:
+                    continue
+                if row['attempts'] >= self.max_attempts:
+                    conn.execute('UPDATE jobs SET status = ?, error = ?, owner = NULL, updated_at = ? WHERE id = ?',
+                                 (FAILED, 'Abandoned too many times', now, row['id']))
+                else:
+                    conn.execute('UPDATE jobs SET status = ?, owner = NULL, updated_at = ? WHERE id = ?',
+                                 (QUEUED, now, row['id']))
+                    requeued += 1
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return requeued
+
+    def _claim(self) -> Optional[Job]:
+        conn = self._conn()
+        now = time.time()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute(
+                '''SELECT * FROM jobs AS j
+                   WHERE j.status = ? AND (j.user_id IS NULL OR
+                         (SELECT COUNT(*) FROM jobs AS r WHERE r.status = ? AND r.user_id = j.user_id) < ?)
+                   ORDER BY j.id LIMIT 1''',
+                (QUEUED, RUNNING, self.per_user_limit)
+            ).fetchone()
+            if row is None:
+                conn.execute('COMMIT')
+                return None
+            conn.execute(
+                'UPDATE jobs SET status = ?, owner = ?, lease_expires = ?, attempts = attempts + 1, updated_at = ? '
+                'WHERE id = ?',
+                (RUNNING, self.owner, now + self.lease_seconds, now, row['id'])
+            )
+            row = conn.execute('SELECT * FROM jobs WHERE id = ?', (row['id'],)).fetchone()
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return Job(self, row)
+
+    def _save_checkpoint(self, job_id: int, checkpoint: Dict[str, Any]) -> None:
+        self._conn().execute(
+            'UPDATE jobs SET checkpoint = ?, updated_at = ? WHERE id = ? AND owner = ?',
+            (json.dumps(checkpoint), time.time(), job_id, self.owner)
+        )
+
+    def _heartbeat(self) -> None:
+        # Renew the leases of this process's running jobs, so a slow batch doesn't look abandoned
+        while not self._stop.wait(self.lease_seconds / 3):
+            try:
+                self._conn().execute('UPDATE jobs SET lease_expires = ? WHERE owner = ? AND status = ?',
+                                     (time.time() + self.lease_seconds, self.owner, RUNNING))
+            except sqlite3.Error as e:
+                self._log(f'Could not renew job leases: {e}')
+
+    def _finish(self, job_id: int, status: str, error: Optional[str] = None) -> None:
+        self._conn().execute(
+            'UPDATE jobs SET status = ?, error = ?, owner = NULL, lease_expires = NULL, updated_at = ? '
+            'WHERE id = ? AND owner = ?',
+            (status, error, time.time(), job_id, self.owner)
+        )
+        # A finished job may free a per-user slot for another worker
+        self._wake.set()
+
+    def _work(self) -> None:
+        while not self._stop.is_set():
+            try:
+                job = self._claim()
+            except sqlite3.Error as e:
+                self._log(f'Could not claim a job: {e}')
+                job = None
+            if job is None:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+                continue
+
+            handler = self._handlers.get(job.kind)
+            if handler is None:
+                self._finish(job.id, FAILED, f'No handler for job kind {job.kind}')
+                continue
+            try:
+                handler(job)
+            except Exception as e:
+                self._log(f'Job {job.id} ({job.kind}) failed: {e}')
+                self._finish(job.id, FAILED, str(e))
+            else:
+                self._finish(job.id, COMPLETED)
+
+
+class SessionStore:
+    """Feedback sessions, as JSON documents in the job database."""
+
+    def __init__(self, queue: JobQueue):
+        self.queue = queue
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        row = self.queue._conn().execute('SELECT data FROM feedback_sessions WHERE session_id = ?',
+                                         (session_id,)).fetchone()
+        return json.loads(row['data']) if row else None
+
+    def save(self, session_id: str, data: Dict[str, Any], user_id: Optional[int] = None) -> None:
+        self.queue._conn().execute(
+            '''INSERT INTO feedback_sessions (session_id, user_id, data, updated_at) VALUES (?, ?, ?, ?)
+               ON CONFLICT(session_id) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at''',
+            (session_id, user_id, json.dumps(data), time.time())
+        )
+
+    def __contains__(self, session_id: str) -> bool:
+        return self.queue._conn().execute('SELECT 1 FROM feedback_sessions WHERE session_id = ?',
+                                          (session_id,)).fetchone() is not None
@@ -21,7 +21,6 @@ def create_app():
         REMEMBER_COOKIE_HTTPONLY=True,
         SESSION_COOKIE_SECURE=True,
         SESSION_COOKIE_HTTPONLY=True,
-        SQLALCHEMY_DATABASE_URI='sqlite:///quizbowl.db',
         SQLALCHEMY_TRACK_MODIFICATIONS=False,
         WTF_CSRF_TIME_LIMIT=3600  # CSRF token valid for 1 hour
     )
@@ -74,15 +73,6 @@ def create_app():
     csrf = CSRFProtect()
     csrf.init_app(app)
     
-    # Add request logging
-    @app.before_request
-    def log_request_info():
-        app.logger.info('Request: %s %s', request.method, request.url)
-        app.logger.debug('Headers: %s', dict(request.headers))
-        if request.method == 'POST':
-            app.logger.info('Form data: %s', request.form)
-            app.logger.debug('JSON data: %s', request.get_json(silent=True))
-    
     def escapejs(value):
         """Escape a string for use in JavaScript strings."""
         if value is None:
@@ -108,34 +98,37 @@ def create_app():
     # Add the escapejs filter to Jinja2
     app.jinja_env.filters['escapejs'] = escapejs
     
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///quizbowl.db'
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     app.config['UPLOAD_FOLDER'] = os.path.join(app.root_path, 'uploads')
     
-    # Disable template caching in development
-    app.config['TEMPLATES_AUTO_RELOAD'] = True
-    app.jinja_env.auto_reload = True
-    
     # Ensure the upload folder exists
     os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
     
+    # Database URI (DATABASE_URL) and connection tuning
+    from utils.db_config import configure_database
+    configure_database(app)
+    
     # Initialize extensions
     init_extensions(app)
-    
+
+    # Track committed changes so cached schedules know when they are stale
+    from utils.change_tracking import init_change_tracking
+    init_change_tracking()
+
+    # Push alerts, protests and game results to connected dashboards
+    from utils.event_broker import init_event_broker
+    init_event_broker()
+
+    # Queue-backed, level-gated logging with sampled per-request summaries
+    from utils.request_logging import init_request_logging
+    init_request_logging(app)
+
     # Initialize Flask-Migrate
     migrate.init_app(app, db)
     
-    # Configure login manager
-    from models.reader import Reader
-    
-    @login_manager.user_loader
-    def load_user(user_id):
-        # Try to load as Admin first, then as Reader
-        from models.admin import Admin
-        user = Admin.query.get(int(user_id))
-        if user is None:
-            user = Reader.query.get(int(user_id))
-        return user
+    # Cache logged-in users' identity; the user loader itself lives in extensions.py
+    from utils.user_cache import init_user_cache
+    init_user_cache(app)
     
     # Register blueprints
     from controllers.admin_controller import admin_bp
@@ -143,12 +136,19 @@ def create_app():
     from controllers.reader_controller import reader_bp
     from routes.alerts import bp as alerts_bp
     from routes.protests import bp as protests_bp
+    from routes.events import bp as events_bp
     
     app.register_blueprint(public_bp)
     app.register_blueprint(admin_bp, url_prefix='/admin')
     app.register_blueprint(reader_bp, url_prefix='/reader')
     app.register_blueprint(alerts_bp, url_prefix='/api')
     app.register_blueprint(protests_bp, url_prefix='/api')
+    app.register_blueprint(events_bp, url_prefix='/api')
+    
+    # Template reloading in development; bytecode cache, fingerprinted and
+    # precompressed static files when PRODUCTION is set
+    from utils.static_assets import init_static_assets
+    init_static_assets(app)
     
     # Set the login view for the login manager
     login_manager.login_view = 'reader.login'
@@ -0,0 +1,90 @@
+"""
+Check that the main controller queries are served by indexes.
+
+Runs EXPLAIN QUERY PLAN over the hot Game/TeamAlias/Question/Alert/RoomAlias
+lookups and exits with status 1 if any of them scans a whole table.
+
+Usage:
+    python check_query_plans.py                      # fresh in-memory schema from the models
+    python check_query_plans.py sqlite:///quizbowl.db  # an existing (migrated) database
+"""
+import os
+import re
+import sys
+
+# Add the current directory to the path so we can import models
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import sqlite
+
+from extensions import db
+from models import Alert, Game, Question, RoomAlias, TeamAlias
+
+# A plan step like "SCAN game" reads every row; "SEARCH game USING INDEX ..." does not
+FULL_SCAN = re.compile(r'^SCAN (\w+)(?! USING (COVERING )?INDEX)')
+
+# (description, statement) for the queries the controllers run most often
+QUERIES = [
+    ('Games for a tournament (schedules, leaderboards)',
+     sa.select(Game).where(Game.tournament_id == 1).order_by(Game.stage_id, Game.round_number)),
+    ('Games for a stage',
+     sa.select(Game).where(Game.tournament_id == 1, Game.stage_id == 2)),
+    ('Games for a round',
+     sa.select(Game).where(Game.tournament_id == 1, Game.stage_id == 1, Game.round_number == 3)),
+    ('Team aliases for a tournament',
+     sa.select(TeamAlias).where(TeamAlias.tournament_id == 1)),
+    ('Team alias by team ID',
+     sa.select(TeamAlias).where(TeamAlias.tournament_id == 1, TeamAlias.team_id == 'T1')),
+    ('Team alias by name and stage',
+     sa.select(TeamAlias).where(TeamAlias.tournament_id == 1, TeamAlias.team_name == 'Team', TeamAlias.stage_id == 1)),
+    ('Team aliases for a stage',
+     sa.select(TeamAlias).where(TeamAlias.tournament_id == 1, TeamAlias.stage_id == 2)),
+    ('Questions for a game',
+     sa.select(Question).where(Question.game_id == 1).order_by(Question.order)),
+    ('Questions for a round',
+     sa.select(Question).where(Question.tournament_id == 1, Question.stage == '1', Question.round == 1)),
+    ('Unresolved alerts',
+     sa.select(Alert).where(Alert.resolved == False).order_by(Alert.created_at.desc())),  # noqa: E712
+    ('Room aliases for a tournament',
+     sa.select(RoomAlias).where(RoomAlias.tournament_id == 1)),
+    ('Room alias by number',
+     sa.select(RoomAlias).where(RoomAlias.tournament_id == 1, RoomAlias.room_number == 1)),
+]
+
+
+def explain(connection, statement):
+    """Return the EXPLAIN QUERY PLAN detail lines for a statement."""
+    sql = str(statement.compile(dialect=sqlite.dialect(), compile_kwargs={'literal_binds': True}))
+    rows = connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {sql}').fetchall()
+    return [row[-1] for row in rows]
+
+
+def check_query_plans(database_uri='sqlite://'):
+    engine = sa.create_engine(database_uri)
+    if database_uri == 'sqlite://':
+        db.metadata.create_all(engine)
+
+    failures = 0
+    with engine.connect() as connection:
+        for description, statement in QUERIES:
+            plan = explain(connection, statement)
+            scans = [step for step in plan if FULL_SCAN.match(step)]
+            status = 'FULL SCAN' if scans else 'ok'
+            print(f"[{status:>9}] {description}")
+            for step in plan:
+                print(f"            {step}")
+            if scans:
+                failures += 1
+
+    print("-" * 80)
+    if failures:
+        print(f"{failures} of {len(QUERIES)} queries do a full table scan")
+    else:
+        print(f"All {len(QUERIES)} queries use an index")
+    return failures == 0
+
+
+if __name__ == '__main__':
+    uri = sys.argv[1] if len(sys.argv) > 1 else 'sqlite://'
+    sys.exit(0 if check_query_plans(uri) else 1)
@@ -30,7 +30,7 @@ def create_dummy_admin():
             db.session.add(admin)
             db.session.commit()
     except Exception as e:
-        print(f"Error creating admin user: {str(e)}")
+        current_app.logger.error("Error creating admin user: %s", str(e))
         db.session.rollback()
 
 # Decorator to ensure admin is logged in
@@ -83,7 +83,7 @@ def login():
             else:
                 flash('Invalid username or password', 'danger')
         except Exception as e:
-            print(f"Login error: {str(e)}")
+            current_app.logger.error("Login error: %s", str(e))
             db.session.rollback()
             flash('An error occurred during login. Please try again.', 'danger')
     
@@ -135,7 +135,7 @@ def dashboard():
                 
             except Exception as e:
                 db.session.rollback()
-                print(f"Error creating tournament: {str(e)}")
+                current_app.logger.error("Error creating tournament: %s", str(e))
                 flash('An error occurred while creating the tournament', 'danger')
         return render_template('admin/dashboard.html', 
                             tournaments=tournaments, 
@@ -145,7 +145,7 @@ def dashboard():
                             
     except Exception as e:
         db.session.rollback()
-        print(f"Error in dashboard: {str(e)}")
+        current_app.logger.error("Error in dashboard: %s", str(e))
         flash(f'An error occurred while loading the dashboard: {str(e)}', 'danger')
         return render_template('admin/dashboard.html', 
                             tournaments=[], 
@@ -162,8 +162,8 @@ def create_tournament():
     """
     try:
         # Log the incoming request
-        print("\n=== Tournament Creation Request ===")
-        print(f"Request form data: {request.form}")
+        current_app.logger.debug("Tournament creation request")
+        current_app.logger.debug("Request form data: %s", request.form)
         
         # Extract form data
         name = request.form['name']
@@ -172,22 +172,22 @@ def create_tournament():
         format_name = request.form['format']
         
         # Log the extracted data
-        print(f"Creating tournament with:")
-        print(f"Name: {name}")
-        print(f"Date: {date}")
-        print(f"Location: {location}")
-        print(f"Format: {format_name}")
+        current_app.logger.debug("Creating tournament with:")
+        current_app.logger.debug("Name: %s", name)
+        current_app.logger.debug("Date: %s", date)
+        current_app.logger.debug("Location: %s", location)
+        current_app.logger.debug("Format: %s", format_name)
         
         # Load format file
         format_path = os.path.join('formats', f'{format_name}.json')
-        print(f"Loading format from: {format_path}")
+        current_app.logger.debug("Loading format from: %s", format_path)
         
         with open(format_path, 'r') as f:
             format_json = json.load(f)
-            print(f"Loaded format JSON: {json.dumps(format_json, indent=2)}")
+            current_app.logger.debug("Loaded format JSON: %s", format_json)
         
         # Create tournament
-        print("\nCreating Tournament object...")
+        current_app.logger.debug("\nCreating Tournament object...")
         new_tournament = Tournament(
             name=name,
             date=date,
@@ -196,36 +196,31 @@ def create_tournament():
         )
         
         # Log the created tournament
-        print(f"Created Tournament: {new_tournament}")
+        current_app.logger.debug("Created Tournament: %s", new_tournament)
         
         # Add to database
-        print("Adding tournament to session...")
+        current_app.logger.debug("Adding tournament to session...")
         db.session.add(new_tournament)
         
         # Commit transaction
-        print("Committing transaction...")
+        current_app.logger.debug("Committing transaction...")
         db.session.commit()
         
-        print("Tournament creation successful!")
+        current_app.logger.debug("Tournament creation successful!")
         return redirect(url_for('admin.dashboard'))
         
     except KeyError as e:
-        print(f"Missing form field: {str(e)}")
+        current_app.logger.debug("Missing form field: %s", str(e))
         flash(f'Missing required field: {str(e)}', 'error')
         return redirect(url_for('admin.dashboard'))
         
     except ValueError as e:
-        print(f"Invalid date format: {str(e)}")
+        current_app.logger.debug("Invalid date format: %s", str(e))
         flash('Invalid date format. Please use YYYY-MM-DD.', 'error')
         return redirect(url_for('admin.dashboard'))
         
     except Exception as e:
-        print(f"=== Unexpected Error ===")
-        print(f"Error type: {type(e)}")
-        print(f"Error message: {str(e)}")
-        import traceback
-        print("Full traceback:")
-        print(traceback.format_exc())
+        current_app.logger.exception("Error creating tournament: %s", str(e))
         
         flash(f'Error creating tournament: {str(e)}', 'error')
         return redirect(url_for('admin.dashboard'))
@@ -307,7 +302,7 @@ def tournament_details(tournament_id):
             return redirect(url_for('admin.tournament_details', tournament_id=tournament_id))
         
         # Load tournament format data
-        format_data = json.loads(tournament.format_json)
+        format_data = tournament.format
         if not isinstance(format_data, dict):
             flash('Invalid tournament format data', 'error')
             return redirect(url_for('admin.dashboard'))
@@ -447,13 +442,10 @@ def tournament_details(tournament_id):
         # Get list of assigned room numbers, ensuring it's always a list
         assigned_rooms = [ra.room_number for ra in tournament.reader_assignments] if tournament.reader_assignments else []
         
-        # Get room aliases for the tournament
-        room_aliases = {}
-        for alias in tournament.room_aliases:
-            room_aliases[alias.room_number] = alias.room_name
-        
-        # Import the room utility function
-        from utils.room_utils import get_room_display_name
+        # Get room aliases and every assigned room's display name from the cached alias map
+        from utils.room_utils import get_room_aliases, get_room_display_names
+        room_aliases = get_room_aliases(tournament.id)
+        room_display_names = get_room_display_names(tournament.id, set(assigned_rooms))
         
         # Render the template with the processed games
         return render_template('admin/tournament_details.html',
@@ -472,373 +464,172 @@ def tournament_details(tournament_id):
                            bonus_counts=bonus_counts,
                            assigned_rooms=assigned_rooms,
                            room_aliases=room_aliases,
+                           room_display_names=room_display_names,
                            get_room_display_name=get_room_display_name)
                            
     except Exception as e:
         db.session.rollback()
-        print(f"Error in tournament_details: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        current_app.logger.exception("Error in tournament_details: %s", str(e))
         flash('An error occurred while loading tournament details', 'danger')
         return redirect(url_for('admin.dashboard'))
 
 def test_route():
-    print("=== test_route was called ===")
+    current_app.logger.debug("test_route was called")
     return "Test route is working!"
 
 @admin_bp.route('/create_games/<int:tournament_id>/<int:stage_id>', methods=['GET', 'POST'])
 @admin_login_required
 def create_games(tournament_id, stage_id):
-    print("\n" + "="*80)
-    print(f"=== START: create_games for tournament_id: {tournament_id}, stage_id: {stage_id} ===")
-    print(f"Request method: {request.method}")
-    print(f"Request form data: {request.form}")
+    from utils.game_generation import GenerationError, generate_games, stage_completion
+    current_app.logger.debug("create_games for tournament_id: %s, stage_id: %s", tournament_id, stage_id)
     
     try:
-        print(f"\n1. Looking up tournament with ID: {tournament_id}")
         tournament = Tournament.query.get_or_404(tournament_id)
-        print(f"   Found tournament: {tournament.name} (ID: {tournament.id})")
         
         # Check if previous stage is completed (if not stage 1)
         if stage_id > 1:
             prev_stage_id = stage_id - 1
-            prev_stage_games = Game.query.filter_by(
-                tournament_id=tournament.id,
-                stage_id=prev_stage_id
-            ).all()
+            prev_total, prev_unfinished = stage_completion(tournament.id, prev_stage_id)
             
-            if not prev_stage_games:
+            if not prev_total:
                 flash(f'No games found for previous stage {prev_stage_id}. Please create them first.', 'error')
                 return redirect(url_for('admin.tournament_details', tournament_id=tournament_id))
                 
             # Check if all games in previous stage are completed
-            if not all(game.result is not None and game.result != -2 for game in prev_stage_games):
+            if prev_unfinished:
                 flash(f'Please complete all games in stage {prev_stage_id} before creating games for stage {stage_id}.', 'error')
                 return redirect(url_for('admin.tournament_details', tournament_id=tournament_id))
+            
+            # If no team aliases exist for this stage, create them from previous stage winners
+            has_aliases = db.session.query(
+                TeamAlias.query.filter_by(tournament_id=tournament.id, stage_id=stage_id).exists()
+            ).scalar()
+            if not has_aliases:
+                prev_stage_winners = set()
+                for team1, team2, result in db.session.query(Game.team1, Game.team2, Game.result).filter_by(
+                    tournament_id=tournament.id, stage_id=prev_stage_id
+                ):
+                    if result == 1 and team1:
+                        prev_stage_winners.add(team1)
+                    elif result == 2 and team2:
+                        prev_stage_winners.add(team2)
+                
+                if prev_stage_winners:
+                    # Get team names from previous stage aliases, using team_id as fallback
+                    prev_names = dict(db.session.query(TeamAlias.team_id, TeamAlias.team_name).filter_by(
+                        tournament_id=tournament.id, stage_id=prev_stage_id
+                    ))
+                    db.session.add_all([
+                        TeamAlias(
+                            team_name=prev_names.get(team_id, f"Team {team_id}"),
+                            team_id=team_id,
+                            stage_id=stage_id,
+                            tournament_id=tournament.id
+                        )
+                        for team_id in prev_stage_winners
+                    ])
+                    current_app.logger.debug("Creating %s team aliases for stage %s from previous stage winners", len(prev_stage_winners), stage_id)
         
-        print("\n2. Getting tournament format data...")
-        format_data = json.loads(tournament.format_json)
-        print(f"   Format data type: {type(format_data)}")
-        print(f"   Format data keys: {format_data.keys() if hasattr(format_data, 'keys') else 'N/A'}")
-        
-        # Find the requested stage
-        print(f"\n3. Looking for stage with ID: {stage_id}...")
-        stages = format_data.get('tournament_format', {}).get('stages', [])
-        print(f"   Found {len(stages)} total stages")
-        print(f"   Stage IDs: {[s.get('stage_id') for s in stages]}")
-        
-        current_stage = next(
-            (s for s in stages if s.get('stage_id') == stage_id),
-            None
-        )
-        print(f"   Stage {stage_id} found: {current_stage is not None}")
-        
-        if not current_stage:
-            error_msg = f"Stage {stage_id} not found in the tournament format."
-            print(f"   ERROR: {error_msg}")
-            flash(error_msg, "danger")
+        # Build, validate and insert every missing game for the stage at once
+        try:
+            summary = generate_games(tournament, [stage_id])
+        except GenerationError as e:
+            db.session.rollback()
+            current_app.logger.error("Cannot create games for stage %s: %s", stage_id, e)
+            flash(str(e), "danger")
             return redirect(url_for('admin.tournament_details', tournament_id=tournament_id))
         
-        # Get team aliases for this tournament and stage
-        print(f"\n4. Fetching team aliases for stage {stage_id}...")
-        team_aliases = TeamAlias.query.filter_by(
-            tournament_id=tournament.id, 
-            stage_id=stage_id
-        ).all()
+        current_app.logger.debug("Game generation for stage %s: %s", stage_id, summary)
         
-        # For stages after 1, check if we have seeding from previous stage
-        if stage_id > 1:
-            # Get winners from previous stage
-            prev_stage_winners = set()
-            for game in prev_stage_games:
-                if game.result == 1 and game.team1:
-                    prev_stage_winners.add(game.team1)
-                elif game.result == 2 and game.team2:
-                    prev_stage_winners.add(game.team2)
+        if summary.created_count > 0:
+            # If this is a playoff stage, mark it as created in the tournament format
+            if stage_id > 1:
+                # Parse a private copy, since the cached format is shared
+                format_data = json.loads(tournament.format_json)
+                for stage in format_data.get('tournament_format', {}).get('stages', []):
+                    if stage.get('stage_id') == stage_id:
+                        stage['games_created'] = True
+                        break
+                tournament.format_json = json.dumps(format_data, indent=2)
             
-            # If no team aliases exist for this stage, create them from previous stage winners
-            if not team_aliases and prev_stage_winners:
-                print(f"   Creating new team aliases for stage {stage_id} from previous stage winners")
-                for team_id in prev_stage_winners:
-                    # Get team name from previous stage alias or use team_id as fallback
-                    prev_alias = TeamAlias.query.filter_by(
-                        tournament_name=tournament.name,
-                        team_id=team_id,
-                        stage_id=stage_id-1
-                    ).first()
-                    
-                    team_name = prev_alias.team_name if prev_alias else f"Team {team_id}"
-                    
-                    new_alias = TeamAlias(
-                        team_name=team_name,
-                        team_id=team_id,
-                        stage_id=stage_id,
-                        tournament_name=tournament.name
-                    )
-                    db.session.add(new_alias)
-                
-                try:
-                    db.session.commit()
-                    # Refresh the team_aliases list
-                    team_aliases = TeamAlias.query.filter_by(
-                        tournament_name=tournament.name, 
-                        stage_id=stage_id
-                    ).all()
-                    print(f"   Created {len(team_aliases)} new team aliases for stage {stage_id}")
-                except Exception as e:
-                    db.session.rollback()
-                    print(f"   Error creating team aliases: {str(e)}")
-                    flash(f"Error creating team aliases: {str(e)}", "error")
-                    return redirect(url_for('admin.tournament_details', tournament_id=tournament_id))
-        
-        aliases = {alias.team_id: alias.team_name for alias in team_aliases}
-        print(f"   Found {len(aliases)} team aliases for stage {stage_id}")
-        if aliases:
-            print(f"   Team aliases: {aliases}")
-        
-        games_created = 0
-        
-        # Process each round and pairing in the stage
-        rounds = current_stage.get('rounds', [])
-        print(f"\n5. Processing {len(rounds)} rounds in stage {stage_id}")
-        
-        for rnd in rounds:
-            round_num = rnd.get('round_in_stage')
-            if round_num is None:
-                print("   WARNING: round_in_stage not found, defaulting to 1")
-                round_num = 1
-            pairings = rnd.get('pairings', [])
-            print(f"   Processing round {round_num} with {len(pairings)} pairings")
-            
-            for i, pairing in enumerate(pairings, 1):
-                teams = pairing.get('teams', [])
-                if len(teams) != 2:
-                    print(f"      [{i}] Skipping invalid pairing with {len(teams)} teams: {teams}")
-                    continue  # Skip invalid pairings
-                
-                team1_id, team2_id = teams
-                team1_name = aliases.get(team1_id, f"Team {team1_id}")
-                team2_name = aliases.get(team2_id, f"Team {team2_id}")
-                
-                print(f"      [{i}] Processing match: {team1_name} ({team1_id}) vs {team2_name} ({team2_id})")
-                
-                # Check if game already exists (in either order)
-                # Check if game already exists for this stage and round
-                existing = Game.query.filter(
-                    (Game.tournament_id == tournament.id) &
-                    (Game.stage_id == stage_id) &
-                    (Game.round_number == round_num) &
-                    (
-                        ((Game.team1 == team1_id) & (Game.team2 == team2_id)) |
-                        ((Game.team1 == team2_id) & (Game.team2 == team1_id))
-                    )
-                ).first()
-                
-                if existing:
-                    print(f"         Game already exists (ID: {existing.id}), skipping")
-                    continue
-                    
-                print(f"         Creating new game for stage {stage_id}, round {round_num}...")
-                try:
-                    new_game = Game(
-                        team1=team1_id,
-                        team2=team2_id,
-                        tournament_id=tournament.id,
-                        round_number=round_num,
-                        stage_id=stage_id,
-                        result=-2  # -2 indicates game not started
-                    )
-                    
-                    db.session.add(new_game)
-                    db.session.flush()  # Flush to get the game ID
-                    
-                    # Create game directory if it doesn't exist
-                    game_dir = os.path.join(
-                        current_app.config['UPLOAD_FOLDER'],
-                        str(tournament.id),
-                        str(stage_id),
-                        str(round_num),
-                        str(new_game.id)
-                    )
-                    os.makedirs(game_dir, exist_ok=True)
-                    
-                    games_created += 1
-                    print(f"         Created game ID: {new_game.id} in stage {stage_id}, round {round_num}")
-                    
-                except Exception as e:
-                    db.session.rollback()
-                    print(f"         Error creating game: {str(e)}")
-                    import traceback
-                    traceback.print_exc()
-                    continue  # Continue with next game even if one fails
-        
-        print(f"\n6. Finalizing stage {stage_id}...")
-        success = False
-        
-        if games_created > 0:
-            try:
-                print(f"   Committing {games_created} new games to the database...")
-                db.session.commit()
-                # msg = f'Successfully created {games_created} games for stage {stage_id}!'
-                print(f"   {msg}")
-                # flash(msg, 'success')
-                success = True
-                
-                # If this is a playoff stage, update the tournament status
-                if stage_id > 1:
-                    try:
-                        # Get the tournament format data
-                        format_data = json.loads(tournament.format_json)
-                        if 'stages' in format_data.get('tournament_format', {}):
-                            stages = format_data['tournament_format']['stages']
-                            # Find the current stage and mark it as created
-                            for stage in stages:
-                                if stage.get('stage_id') == stage_id:
-                                    stage['games_created'] = True
-                                    break
-                            
-                            # Save the updated format data
-                            tournament.format_json = json.dumps(format_data, indent=2)
-                            db.session.commit()
-                            print(f"   Updated tournament format to mark stage {stage_id} as created")
-                            
-                    except Exception as update_error:
-                        print(f"   Warning: Could not update tournament status: {str(update_error)}")
-                        # Don't fail the whole operation if we can't update the status
-                        
-            except Exception as commit_error:
-                db.session.rollback()
-                error_msg = f'Database commit error: {str(commit_error)}'
-                print(f"   ERROR: {error_msg}")
-                import traceback
-                traceback.print_exc()
-                flash(error_msg, 'danger')
+            # Games and the stage's aliases are written in a single transaction
+            db.session.commit()
+            
+            # Create game directories
+            for game_id, game_stage_id, round_num in summary.created:
+                os.makedirs(os.path.join(
+                    current_app.config['UPLOAD_FOLDER'],
+                    str(tournament.id),
+                    str(game_stage_id),
+                    str(round_num),
+                    str(game_id)
+                ), exist_ok=True)
         else:
+            db.session.commit()
             msg = f'No new games were created for stage {stage_id} (they may already exist).'
-            print(f"   {msg}")
+            current_app.logger.debug("%s", msg)
             flash(msg, 'info')
-            success = True  # Not an error if no new games were needed
             
     except Exception as e:
-        print("\n!!! UNEXPECTED ERROR !!!")
         error_msg = f'Error creating games for stage {stage_id}: {str(e)}'
-        print(error_msg)
-        import traceback
-        traceback.print_exc()
+        current_app.logger.error("%s", error_msg, exc_info=True)
         db.session.rollback()
         flash(error_msg, 'danger')
     
-    print("\n" + "="*80)
-    print(f"=== END: create_games for tournament_id: {tournament_id}, stage_id: {stage_id} ===\n\n")
-    
     return redirect(url_for('admin.tournament_details', tournament_id=tournament_id))
 
-def auto_assign_playoff_seeding(tournament):
+def auto_assign_playoff_seeding(tournament, tiebreakers=None):
     """
     Automatically assign playoff seeding based on preliminary round results.
-    Teams are ranked by number of wins in the preliminary stage.
+    Teams are ranked by the tiebreak chain in utils/seeding.py (by default
+    wins, head-to-head, PPG, then PPB) and written as the playoff stage's aliases.
+    
+    Args:
+        tournament (Tournament): The tournament to seed
+        tiebreakers (list or str): Overrides the configured tiebreak chain
+    
+    Returns:
+        tuple: (success, message)
     """
+    from utils.seeding import SeedingError, assign_playoff_seeding
     try:
-        # Get all preliminary aliases and games for this tournament
-        prelim_aliases = TeamAlias.query.filter_by(
-            tournament_id=tournament.id, 
-            stage_id=1  # Preliminary stage
-        ).all()
-        
-        if not prelim_aliases:
-            return False, "No preliminary teams found. Please assign teams to the preliminary stage first."
-        
-        prelim_games = Game.query.filter_by(
-            tournament_id=tournament.id, 
-            stage_id=1  # Preliminary stage
-        ).all()
-        
-        # Initialize win counts (using team_name as key)
-        standings = {alias.team_name: 0 for alias in prelim_aliases}
-        
-        # Calculate wins for each team
-        for game in prelim_games:
-            if game.scorecard is not None and game.result != -2:  # -2 means not played
-                if game.result == 1:  # team1 won
-                    standings[game.team1] = standings.get(game.team1, 0) + 1
-                elif game.result == -1:  # team2 won
-                    standings[game.team2] = standings.get(game.team2, 0) + 1
-        
-        # Sort teams by wins (descending)
-        sorted_teams = sorted(standings.items(), key=lambda x: (-x[1], x[0]))
-        
-        try:
-            # Start a transaction
-            db.session.begin()
-            
-            # Remove any existing playoff aliases (stage_id=2)
-            TeamAlias.query.filter_by(
-                tournament_id=tournament.id, 
-                stage_id=2  # Playoff stage
-            ).delete()
-            
-            # Create new playoff aliases with seeds "T1", "T2", ...
-            aliases_created = []
-            for idx, (team_name, wins) in enumerate(sorted_teams, start=1):
-                seed = f"T{idx}"
-                new_alias = TeamAlias(
-                    team_name=team_name,
-                    team_id=team_name,  # Store the original team name as team_id
-                    stage_id=2,  # Playoff stage
-                    tournament_id=tournament.id,
-                    placeholder=seed  # Store the seed as the placeholder
-                )
-                db.session.add(new_alias)
-                aliases_created.append((team_name, seed))
-            
-            db.session.commit()
-            return True, f"Successfully created {len(aliases_created)} playoff seeds."
-            
-        except Exception as e:
-            db.session.rollback()
-            current_app.logger.error(f"Error in auto_assign_playoff_seeding: {str(e)}")
-            return False, f"Failed to assign playoff seeding: {str(e)}"
-            
+        seeds = assign_playoff_seeding(tournament, tiebreakers)
+        db.session.commit()
+        current_app.logger.debug("Playoff seeding for tournament %s: %s", tournament.id, seeds)
+        return True, f"Successfully created {len(seeds)} playoff seeds."
+    except SeedingError as e:
+        db.session.rollback()
+        return False, str(e)
     except Exception as e:
-        current_app.logger.error(f"Error in auto_assign_playoff_seeding (outer): {str(e)}")
-        return False, f"An error occurred: {str(e)}"
+        db.session.rollback()
+        current_app.logger.error("Error in auto_assign_playoff_seeding: %s", e, exc_info=True)
+        return False, f"Failed to assign playoff seeding: {str(e)}"
 
 @admin_bp.route('/create_playoff_games/<int:tournament_id>')
 @admin_login_required
 def create_playoff_games(tournament_id):
     """
     Create playoff games based on the tournament format and preliminary results.
-    This function ensures all preliminary games are complete and creates the first round of playoff games.
+    This function ensures all preliminary games are complete and creates the games for every playoff stage.
     """
+    from utils.game_generation import GenerationError, generate_games, stage_completion
     current_app.logger.info(f"Starting create_playoff_games for tournament {tournament_id}")
     
     try:
         tournament = Tournament.query.get_or_404(tournament_id)
-        current_app.logger.info(f"Found tournament: {tournament.name}")
-        
-        format_data = tournament.format  # Using the @property
-        current_app.logger.info(f"Format data: {json.dumps(format_data, indent=2)}")
+        parsed_format = tournament.parsed_format
         
         # Find playoff stages (all stages except the preliminary stage)
-        playoff_stages = [
-            stage for stage in format_data['tournament_format']['stages'] 
-            if stage.get('stage_id') != 1  # Exclude preliminary stage
-        ]
+        playoff_stage_ids = [stage_id for stage_id in parsed_format.stage_ids if stage_id != 1]
         
-        current_app.logger.info(f"Found {len(playoff_stages)} playoff stages")
-        
-        if not playoff_stages:
+        if not playoff_stage_ids:
             error_msg = "No playoff stages are defined in the tournament format."
             current_app.logger.error(error_msg)
             flash(error_msg, "danger")
             return redirect(url_for('admin.tournament_details', tournament_id=tournament_id))
         
         # Check if preliminary games are complete
-        prelim_stage = next(
-            (stage for stage in format_data['tournament_format']['stages'] 
-             if stage.get('stage_id') == 1),  # Preliminary stage
-            None
-        )
+        prelim_stage = parsed_format.get_stage(1)
         
         if not prelim_stage:
             flash("Preliminary stage not found in the tournament format.", "danger")
@@ -849,45 +640,28 @@ def create_playoff_games(tournament_id):
             len(round_data.get('pairings', [])) 
             for round_data in prelim_stage.get('rounds', [])
         )
-        
-        current_app.logger.info(f"Expected {expected_prelim_games} preliminary games")
-        
-        # Get all preliminary games
-        prelim_games = Game.query.filter_by(
-            tournament_id=tournament.id,
-            stage_id=1  # Preliminary stage
-        ).all()
-        
-        current_app.logger.info(f"Found {len(prelim_games)} preliminary games in the database")
+        prelim_total, prelim_unfinished = stage_completion(tournament.id, 1, require_scorecard=True)
         
         # Check if all preliminary games have been created
-        if len(prelim_games) != expected_prelim_games:
-            error_msg = f"Preliminary games have not been created yet. Expected {expected_prelim_games}, found {len(prelim_games)}."
+        if prelim_total != expected_prelim_games:
+            error_msg = f"Preliminary games have not been created yet. Expected {expected_prelim_games}, found {prelim_total}."
             current_app.logger.error(error_msg)
             flash(error_msg, "danger")
             return redirect(url_for('admin.tournament_details', tournament_id=tournament_id))
         
         # Check if all preliminary games are complete
-        incomplete_prelims = [
-            game for game in prelim_games 
-            if game.scorecard is None or game.result == -2
-        ]
-        
-        if incomplete_prelims:
-            error_msg = f"Not all preliminary games are complete. Found {len(incomplete_prelims)} incomplete games."
+        if prelim_unfinished:
+            error_msg = f"Not all preliminary games are complete. Found {prelim_unfinished} incomplete games."
             current_app.logger.error(error_msg)
             flash(error_msg, "danger")
             return redirect(url_for('admin.tournament_details', tournament_id=tournament_id))
         
         # Ensure playoff seeding aliases exist, auto-assign if missing
-        current_app.logger.info("Checking for playoff aliases...")
         playoff_aliases = TeamAlias.query.filter_by(
             tournament_id=tournament.id,
             stage_id=2  # Playoff stage
         ).all()
         
-        current_app.logger.info(f"Found {len(playoff_aliases)} playoff aliases")
-        
         if not playoff_aliases:
             current_app.logger.info("No playoff aliases found, attempting to auto-assign")
             success, message = auto_assign_playoff_seeding(tournament)
@@ -905,8 +679,6 @@ def create_playoff_games(tournament_id):
                 stage_id=2  # Playoff stage
             ).all()
             
-            current_app.logger.info(f"After auto-assign, found {len(playoff_aliases)} playoff aliases")
-            
             if not playoff_aliases:
                 error_msg = "Failed to create playoff seedings. Please try again."
                 current_app.logger.error(error_msg)
@@ -915,108 +687,31 @@ def create_playoff_games(tournament_id):
         
         # Create a mapping of team IDs to their display names for the playoff stage
         aliases = {alias.placeholder or alias.team_id: alias.team_name for alias in playoff_aliases}
-        current_app.logger.info(f"Alias mapping: {aliases}")
-        
-        # Also create a reverse mapping from team name to placeholder for lookup
-        team_to_placeholder = {alias.team_id: alias.placeholder for alias in playoff_aliases if alias.placeholder}
+        current_app.logger.debug("Alias mapping: %s", aliases)
         
-        playoff_created = False
-        games_created = 0
-        
-        current_app.logger.info(f"Processing {len(playoff_stages)} playoff stages")
-        
-        for stage_idx, stage in enumerate(playoff_stages, 1):
-            stage_id = stage.get('stage_id')
-            current_app.logger.info(f"Processing stage {stage_id} ({stage_idx}/{len(playoff_stages)})")
-            
-            for rnd in stage.get('rounds', []):
-                round_num = rnd.get('round_in_stage')
-                current_app.logger.info(f"  Processing round {round_num}")
-                
-                for pair_idx, pairing in enumerate(rnd.get('pairings', []), 1):
-                    teams = pairing.get('teams', [])
-                    if len(teams) != 2:
-                        current_app.logger.warning(f"    Invalid pairing {pair_idx}: expected 2 teams, got {len(teams)}")
-                        continue
-                        
-                    team1_orig, team2_orig = teams
-                    
-                    # Check if game already exists in this stage and round
-                    existing = Game.query.filter(
-                        Game.tournament_id == tournament.id,
-                        Game.stage_id == stage_id,
-                        Game.round_number == round_num,
-                        ((Game.team1 == team1_orig) & (Game.team2 == team2_orig)) |
-                        ((Game.team1 == team2_orig) & (Game.team2 == team1_orig))
-                    ).first()
-                    
-                    if existing:
-                        current_app.logger.info(f"    Game {team1_orig} vs {team2_orig} already exists (ID: {existing.id})")
-                        continue
-                    
-                    # Resolve team names using aliases
-                    team1_name = aliases.get(team1_orig, team1_orig)
-                    team2_name = aliases.get(team2_orig, team2_orig)
-                    
-                    # If this is a winner/loser bracket reference, keep it as is
-                    if team1_orig.startswith(('W(', 'L(')):
-                        team1_name = team1_orig
-                    if team2_orig.startswith(('W(', 'L(')):
-                        team2_name = team2_orig
-                    
-                    current_app.logger.info(f"    Creating game: {team1_name} vs {team2_name} (Stage {stage_id}, Round {round_num})")
-                    
-                    game = Game(
-                        team1=team1_name,
-                        team2=team2_name,
-                        result=-2,
-                        tournament_id=tournament.id,
-                        round_number=round_num,
-                        stage_id=stage_id,
-                        scorecard=None
-                    )
-                    
-                    db.session.add(game)
-                    games_created += 1
-                    playoff_created = True
+        def resolve_team(team_ref):
+            # Winner/loser bracket references are kept as is and resolved once played
+            if team_ref.startswith(('W(', 'L(')):
+                return team_ref
+            return aliases.get(team_ref, team_ref)
         
-        print(f"\n6. Finalizing...")
-        success = False
+        # Build, validate and insert every missing playoff game at once
         try:
-            if games_created > 0:
-                db.session.commit()
-                print(f"Successfully created {games_created} new games for stage {stage_id}")
-                # flash(f'Successfully created {games_created} new games for stage {stage_id}', 'success')
-                success = True
-            else:
-                print("No new games were created")
-                # flash('No new games were created - all games already exist', 'info')
-                success = True
-                
-        except Exception as e:
+            summary = generate_games(tournament, playoff_stage_ids, resolve_team=resolve_team)
+        except GenerationError as e:
             db.session.rollback()
-            print(f"Error committing games: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            flash('An error occurred while creating games', 'error')
+            current_app.logger.error("Cannot create playoff games: %s", e)
+            flash(str(e), "danger")
+            return redirect(url_for('admin.tournament_details', tournament_id=tournament_id))
         
-        # If we're creating playoff games (stage 2+), we might need to update the tournament status
-        if success and games_created > 0 and stage_id > 1:
-            try:
-                # Update tournament status to indicate this stage's games have been created
-                # You might want to add a field to track which stages have been created
-                # current_app.logger.info(f"Successfully created {games_created} games for stage {stage_id}")
-                pass  # Added to fix empty try block
-            except Exception as e:
-                current_app.logger.warning(f"Could not update tournament status: {str(e)}")
+        db.session.commit()
+        current_app.logger.info(f"Playoff game generation: {summary}")
         
         return redirect(url_for('admin.tournament_details', tournament_id=tournament_id))
         
     except Exception as e:
         db.session.rollback()
-        print(f"Error in create_games: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        current_app.logger.error("Error in create_playoff_games: %s", str(e), exc_info=True)
         flash(f'An error occurred while creating games: {str(e)}', 'error')
         return redirect(url_for('admin.tournament_details', tournament_id=tournament_id))
 
@@ -1123,7 +818,6 @@ def upload_round_file(tournament_id, stage_id, round_number):
         import subprocess
         import json
         import shutil
-        import traceback
         from pathlib import Path
 
         try:
@@ -1132,25 +826,25 @@ def upload_round_file(tournament_id, stage_id, round_number):
             parser_dir = base_dir / 'packet-parser-main'
             
             # For debugging - show the full path we're using
-            print(f"Project root: {base_dir}")
-            print(f"Looking for parser in: {parser_dir}")
-            print(f"Directory exists: {parser_dir.exists()}")
+            current_app.logger.debug("Project root: %s", base_dir)
+            current_app.logger.debug("Looking for parser in: %s", parser_dir)
+            current_app.logger.debug("Directory exists: %s", parser_dir.exists())
             
-            print(f"\n=== Starting file upload process ===")
-            print(f"Base directory: {base_dir}")
-            print(f"Parser directory: {parser_dir}")
+            current_app.logger.debug("Starting file upload process")
+            current_app.logger.debug("Base directory: %s", base_dir)
+            current_app.logger.debug("Parser directory: %s", parser_dir)
             
             # Check if packet-parser-main directory exists
             if not parser_dir.exists():
                 error_msg = f"Packet parser directory not found at: {parser_dir}"
-                print(f"ERROR: {error_msg}")
-                print(f"Current working directory: {Path.cwd()}")
-                print(f"Directory contents of {base_dir}:")
+                current_app.logger.error("ERROR: %s", error_msg)
+                current_app.logger.debug("Current working directory: %s", Path.cwd())
+                current_app.logger.debug("Directory contents of %s:", base_dir)
                 try:
                     for f in base_dir.iterdir():
-                        print(f"  - {f.name} (dir: {f.is_dir()})")
+                        current_app.logger.debug("  - %s (dir: %s)", f.name, f.is_dir())
                 except Exception as e:
-                    print(f"Could not list directory contents: {e}")
+                    current_app.logger.warning("Could not list directory contents: %s", e)
                 raise FileNotFoundError(error_msg)
             
             # Check for required files and directories
@@ -1173,58 +867,58 @@ def upload_round_file(tournament_id, stage_id, round_number):
                 
                 if path_type == 'file' and not full_path.is_file():
                     missing_paths.append(f"File not found: {path}")
-                    print(f"MISSING: {full_path} (expected file)")
+                    current_app.logger.debug("MISSING: %s (expected file)", full_path)
                 elif path_type == 'dir' and not full_path.is_dir():
                     missing_paths.append(f"Directory not found: {path}")
-                    print(f"MISSING: {full_path} (expected directory)")
+                    current_app.logger.debug("MISSING: %s (expected directory)", full_path)
                 elif path_type == 'any' and not full_path.exists():
                     missing_paths.append(f"Path not found: {path}")
-                    print(f"MISSING: {full_path}")
+                    current_app.logger.debug("MISSING: %s", full_path)
             
             if missing_paths:
                 error_msg = f"Required paths not found in {parser_dir}:\n  " + "\n  ".join(missing_paths)
-                print(f"\n{error_msg}")
-                print(f"\nFiles in {parser_dir}:")
+                current_app.logger.error("\n%s", error_msg)
+                current_app.logger.debug("\nFiles in %s:", parser_dir)
                 try:
                     for f in sorted(parser_dir.iterdir()):
                         type_str = "dir" if f.is_dir() else "file"
-                        print(f"  - {f.name} ({type_str})")
+                        current_app.logger.debug("  - %s (%s)", f.name, type_str)
                         
                     # Also show modules directory if it exists
                     modules_dir = parser_dir / 'modules'
                     if modules_dir.exists():
-                        print(f"\nFiles in {modules_dir}:")
+                        current_app.logger.debug("\nFiles in %s:", modules_dir)
                         for f in sorted(modules_dir.iterdir()):
                             type_str = "dir" if f.is_dir() else "file"
-                            print(f"  - {f.name} ({type_str})")
+                            current_app.logger.debug("  - %s (%s)", f.name, type_str)
                             
                 except Exception as e:
-                    print(f"Could not list directory contents: {e}")
+                    current_app.logger.warning("Could not list directory contents: %s", e)
                 raise FileNotFoundError(error_msg)
                     
             p_docx_dir = parser_dir / 'p-docx'
             output_dir = parser_dir / 'output'
             
-            print(f"\n=== Directory structure validated ===")
-            print(f"p_docx_dir: {p_docx_dir}")
-            print(f"output_dir: {output_dir}")
+            current_app.logger.debug("Directory structure validated")
+            current_app.logger.debug("p_docx_dir: %s", p_docx_dir)
+            current_app.logger.debug("output_dir: %s", output_dir)
             
             # Create directories if they don't exist
-            print(f"\n=== Creating/cleaning directories ===")
+            current_app.logger.debug("Creating/cleaning directories")
             p_docx_dir.mkdir(parents=True, exist_ok=True)
             output_dir.mkdir(parents=True, exist_ok=True)
-            print(f"Created/validated directories")
+            current_app.logger.debug("Created/validated directories")
             
             # Clear any existing files in the directories
-            print(f"\n=== Cleaning up old files ===")
-            print(f"Cleaning {p_docx_dir}:")
+            current_app.logger.debug("Cleaning up old files")
+            current_app.logger.debug("Cleaning %s:", p_docx_dir)
             for f in p_docx_dir.glob('*'):
-                print(f"  - Deleting {f}")
+                current_app.logger.debug("  - Deleting %s", f)
                 f.unlink()
                 
-            print(f"\nCleaning {output_dir}:")
+            current_app.logger.debug("\nCleaning %s:", output_dir)
             for f in output_dir.glob('*'):
-                print(f"  - Deleting {f}")
+                current_app.logger.debug("  - Deleting %s", f)
                 f.unlink()
             
             # Save the uploaded file to p-docx immediately
@@ -1238,8 +932,8 @@ def upload_round_file(tournament_id, stage_id, round_number):
                 
             # Save the uploaded file to p-docx directory
             file_path = p_docx_dir / filename
-            print(f"\n=== Saving uploaded file ===")
-            print(f"Saving to: {file_path}")
+            current_app.logger.debug("Saving uploaded file")
+            current_app.logger.debug("Saving to: %s", file_path)
             
             try:
                 # Ensure the directory exists with proper permissions
@@ -1254,23 +948,23 @@ def upload_round_file(tournament_id, stage_id, round_number):
                 # Set file permissions (rw-r--r--)
                 os.chmod(file_path, 0o644)
                 
-                print(f"File saved successfully: {file_path}")
-                print(f"File size: {file_path.stat().st_size} bytes")
-                print(f"File permissions: {oct(file_path.stat().st_mode)[-3:]}")
+                current_app.logger.debug("File saved successfully: %s", file_path)
+                current_app.logger.debug("File size: %s bytes", file_path.stat().st_size)
+                current_app.logger.debug("File permissions: %s", oct(file_path.stat().st_mode)[-3:])
                 
                 # Verify the file was saved
                 if not file_path.exists() or file_path.stat().st_size == 0:
                     error_msg = f"Failed to save file or file is empty: {file_path}"
-                    print(error_msg)
+                    current_app.logger.error("%s", error_msg)
                     raise IOError(error_msg)
                     
             except Exception as e:
                 error_msg = f"Error saving file: {str(e)}"
-                print(error_msg)
-                print(f"File path: {file_path}")
-                print(f"Parent directory exists: {file_path.parent.exists()}")
+                current_app.logger.error("%s", error_msg)
+                current_app.logger.debug("File path: %s", file_path)
+                current_app.logger.debug("Parent directory exists: %s", file_path.parent.exists())
                 if file_path.parent.exists():
-                    print(f"Parent directory permissions: {oct(file_path.parent.stat().st_mode)[-3:]}")
+                    current_app.logger.debug("Parent directory permissions: %s", oct(file_path.parent.stat().st_mode)[-3:])
                 raise Exception(error_msg) from e
             
             # Create packets directory if it doesn't exist
@@ -1278,13 +972,13 @@ def upload_round_file(tournament_id, stage_id, round_number):
             packets_dir.mkdir(exist_ok=True)
             
             # Clean up any existing files in the packets directory
-            print(f"\nCleaning {packets_dir}:")
+            current_app.logger.debug("\nCleaning %s:", packets_dir)
             for f in packets_dir.glob('*'):
-                print(f"  - Deleting {f}")
+                current_app.logger.debug("  - Deleting %s", f)
                 try:
                     f.unlink()
                 except Exception as e:
-                    print(f"    Failed to delete {f}: {e}")
+                    current_app.logger.error("    Failed to delete %s: %s", f, e)
             
             # Import the docx_to_txt module directly
             import sys
@@ -1293,17 +987,17 @@ def upload_round_file(tournament_id, stage_id, round_number):
             try:
                 from modules.docx_to_txt import main as convert_docx_to_txt
             except ImportError as e:
-                print(f"Error importing docx_to_txt: {e}")
-                print(f"Current sys.path: {sys.path}")
-                print(f"Looking for module in: {parser_dir / 'modules'}")
+                current_app.logger.error("Error importing docx_to_txt: %s", e)
+                current_app.logger.debug("Current sys.path: %s", sys.path)
+                current_app.logger.debug("Looking for module in: %s", parser_dir / 'modules')
                 raise
             
             # Set the output file path
             output_file = packets_dir / f"{file_path.stem}.txt"
             
-            print(f"\n=== Converting {file_path} to text ===")
-            print(f"Input file: {file_path}")
-            print(f"Output file: {output_file}")
+            current_app.logger.debug("Converting %s to text", file_path)
+            current_app.logger.debug("Input file: %s", file_path)
+            current_app.logger.debug("Output file: %s", output_file)
             
             # Create the output directory if it doesn't exist
             os.makedirs(packets_dir, exist_ok=True)
@@ -1311,17 +1005,17 @@ def upload_round_file(tournament_id, stage_id, round_number):
             # Run the conversion
             try:
                 convert_docx_to_txt(str(file_path), str(output_file))
-                print("Conversion completed successfully")
+                current_app.logger.debug("Conversion completed successfully")
             except Exception as e:
                 error_msg = f"Error converting file: {str(e)}"
-                print(error_msg)
+                current_app.logger.error("%s", error_msg)
                 raise Exception(error_msg) from e
             
             # Verify the output file was created
             if not output_file.exists() or output_file.stat().st_size == 0:
                 raise Exception(f"Output file was not created or is empty: {output_file}")
                 
-            print(f"Successfully processed document. Output: {output_file}")
+            current_app.logger.debug("Successfully processed document. Output: %s", output_file)
             
             # Import the packet_parser module
             import os
@@ -1347,18 +1041,18 @@ def upload_round_file(tournament_id, stage_id, round_number):
                 has_question_numbers = request.form.get('has_question_numbers') == 'y'
                 has_category_tags = request.form.get('has_category_tags') == 'y'
                 
-                print(f"\n=== Running packet_parser ===")
-                print(f"Input directory: {input_dir}")
-                print(f"Output directory: {output_dir}")
-                print(f"Has question numbers: {has_question_numbers}")
-                print(f"Has category tags: {has_category_tags}")
+                current_app.logger.debug("Running packet_parser")
+                current_app.logger.debug("Input directory: %s", input_dir)
+                current_app.logger.debug("Output directory: %s", output_dir)
+                current_app.logger.debug("Has question numbers: %s", has_question_numbers)
+                current_app.logger.debug("Has category tags: %s", has_category_tags)
                 
                 # Verify the input directory exists and has files
                 if not os.path.exists(input_dir):
                     raise FileNotFoundError(f"Input directory not found: {input_dir}")
                 
                 input_files = os.listdir(input_dir)
-                print(f"Found {len(input_files)} files in input directory")
+                current_app.logger.debug("Found %s files in input directory", len(input_files))
                 if not input_files:
                     raise FileNotFoundError(f"No files found in input directory: {input_dir}")
                 
@@ -1398,7 +1092,7 @@ def upload_round_file(tournament_id, stage_id, round_number):
                     output_filename = os.path.splitext(filename)[0] + ".json"
                     output_path = os.path.join(output_dir, output_filename)
                     
-                    print(f"Processing {filename} -> {output_filename}")
+                    current_app.logger.debug("Processing %s -> %s", filename, output_filename)
                     
                     # Read the input file
                     with open(input_path, 'r', encoding='utf-8') as f:
@@ -1412,70 +1106,70 @@ def upload_round_file(tournament_id, stage_id, round_number):
                         with open(output_path, 'w', encoding='utf-8') as f:
                             json.dump(packet, f, indent=2, ensure_ascii=False)
                         
-                        print(f"Successfully processed {filename}")
+                        current_app.logger.debug("Successfully processed %s", filename)
                     except Exception as e:
-                        print(f"Error processing {filename}: {str(e)}")
+                        current_app.logger.error("Error processing %s: %s", filename, str(e))
                         raise
                 
-                print("Packet parsing completed successfully")
+                current_app.logger.debug("Packet parsing completed successfully")
                 
             except Exception as e:
                 # Restore the original working directory before re-raising
                 os.chdir(original_cwd)
-                print(f"Error in packet parsing: {str(e)}", file=sys.stderr)
-                print(f"Current working directory: {os.getcwd()}", file=sys.stderr)
-                print(f"Parser directory: {parser_dir}", file=sys.stderr)
-                print(f"Input directory: {packets_dir}", file=sys.stderr)
-                print(f"Output directory: {output_dir}", file=sys.stderr)
+                current_app.logger.error("Error in packet parsing: %s", str(e))
+                current_app.logger.error("Current working directory: %s", os.getcwd())
+                current_app.logger.error("Parser directory: %s", parser_dir)
+                current_app.logger.error("Input directory: %s", packets_dir)
+                current_app.logger.error("Output directory: %s", output_dir)
                 raise Exception(f"Packet parsing failed: {str(e)}")
             finally:
                 # Always restore the original working directory
                 os.chdir(original_cwd)
             
             # Find the output JSON file
-            print(f"\n=== Looking for output JSON ===")
+            current_app.logger.debug("Looking for output JSON")
             import glob
             
             # Convert output_dir to string for glob
             output_dir_str = str(output_dir)
             output_files = glob.glob(os.path.join(output_dir_str, '*.json'))
-            print(f"Found {len(output_files)} JSON files in {output_dir}:")
+            current_app.logger.debug("Found %s JSON files in %s:", len(output_files), output_dir)
             for f in output_files:
-                print(f"  - {f}")
+                current_app.logger.debug("  - %s", f)
                 
             if not output_files:
                 error_msg = f"No JSON output file found in {output_dir}"
-                print(f"ERROR: {error_msg}")
-                print(f"Contents of {output_dir}:")
+                current_app.logger.error("ERROR: %s", error_msg)
+                current_app.logger.debug("Contents of %s:", output_dir)
                 try:
                     for f in os.listdir(output_dir_str):
                         f_path = os.path.join(output_dir_str, f)
                         if os.path.isfile(f_path):
-                            print(f"  - {f} (size: {os.path.getsize(f_path)} bytes)")
+                            current_app.logger.debug("  - %s (size: %s bytes)", f, os.path.getsize(f_path))
                 except Exception as e:
-                    print(f"Could not list output directory: {e}")
+                    current_app.logger.warning("Could not list output directory: %s", e)
                 raise Exception(error_msg)
             
             # Process the first JSON file found
             json_file = output_files[0]
-            print(f"Processing JSON file: {json_file}")
+            current_app.logger.debug("Processing JSON file: %s", json_file)
             
             # Read and parse the JSON file
             try:
                 with open(json_file, 'r', encoding='utf-8') as f:
                     data = json.load(f)
-                print(f"Successfully loaded JSON with {len(data.get('tossups', []))} tossups and {len(data.get('bonuses', []))} bonuses")
+                current_app.logger.debug("Successfully loaded JSON with %s tossups and %s bonuses", len(data.get('tossups', [])), len(data.get('bonuses', [])))
                 
                 # Process the JSON data
                 tossups = data.get('tossups', [])
                 bonuses = data.get('bonuses', [])
                 
-                print(f"Found {len(tossups)} tossups and {len(bonuses)} bonuses in the JSON file")
+                current_app.logger.debug("Found %s tossups and %s bonuses in the JSON file", len(tossups), len(bonuses))
             except json.JSONDecodeError as e:
-                print(f"ERROR: Failed to parse JSON: {e}")
-                print("File content (first 500 chars):")
+                current_app.logger.error("ERROR: Failed to parse JSON: %s", e)
+                current_app.logger.debug("File content (first 500 chars):")
                 with open(json_file, 'r', encoding='utf-8', errors='replace') as f:
-                    print(f.read(500) + ("..." if len(f.read(501)) > 500 else ""))
+                    current_app.logger.debug("%s", f.read(500) + ("..." if len(f.read(501)) > 500 else ""))
                 raise
             
             # First, collect all questions to determine correct ordering
@@ -1642,16 +1336,16 @@ def upload_round_file(tournament_id, stage_id, round_number):
     tournament = db.session.get(Tournament, tournament_id)
     if not tournament:
         error_msg = f"Tournament with ID {tournament_id} not found"
-        print(f"\n!!! ERROR: {error_msg}")
+        current_app.logger.error("\n!!! ERROR: %s", error_msg)
         flash(error_msg, 'danger')
         return redirect(url_for('admin.dashboard'))
     
     tournament_name = tournament.name
-    print(f"\nProcessing packet for tournament: {tournament_name}")
+    current_app.logger.debug("\nProcessing packet for tournament: %s", tournament_name)
 
     if request.method == 'GET':
-        print("\nRendering upload form")
-        print("Serving upload form template")
+        current_app.logger.debug("\nRendering upload form")
+        current_app.logger.debug("Serving upload form template")
         
         # Get current question counts for this round
         current_questions = Question.query.filter_by(
@@ -1672,33 +1366,33 @@ def upload_round_file(tournament_id, stage_id, round_number):
                             bonus_count=bonus_count)
 
     # Handle POST request
-    print("\n=== PROCESSING FILE UPLOAD ===")
-    print(f"Request files: {request.files}")
+    current_app.logger.debug("Processing file upload")
+    current_app.logger.debug("Request files: %s", request.files)
     
     # Check if 'packet_file' is in request.files
     if 'packet_file' not in request.files:
         error_msg = "No 'packet_file' part in the request"
-        print(f"\n!!! ERROR: {error_msg}")
-        print("Available files in request:", list(request.files.keys()))
+        current_app.logger.error("\n!!! ERROR: %s", error_msg)
+        current_app.logger.debug("Available files in request: %s", list(request.files.keys()))
         flash(error_msg, 'danger')
         return redirect(request.url)
     
     file = request.files['packet_file']
-    print(f"File object: {file}")
-    print(f"File name: {file.filename}")
-    print(f"File content type: {file.content_type}")
-    print(f"File headers: {file.headers}")
+    current_app.logger.debug("File object: %s", file)
+    current_app.logger.debug("File name: %s", file.filename)
+    current_app.logger.debug("File content type: %s", file.content_type)
+    current_app.logger.debug("File headers: %s", file.headers)
     
     if file.filename == '':
         error_msg = "No file selected"
-        print(f"\n!!! ERROR: {error_msg}")
+        current_app.logger.error("\n!!! ERROR: %s", error_msg)
         flash(error_msg, 'danger')
         return redirect(request.url)
     
     # Validate file extension
     if not file.filename.lower().endswith(('.docx', '.doc')):
         error_msg = "Only .docx or .doc files are allowed"
-        print(f"Error: {error_msg}")
+        current_app.logger.error("Error: %s", error_msg)
         flash(error_msg, 'danger')
         return redirect(request.url)
     
@@ -1706,11 +1400,11 @@ def upload_round_file(tournament_id, stage_id, round_number):
     has_question_numbers = request.form.get('has_question_numbers', 'n').lower() == 'y'
     has_category_tags = request.form.get('has_category_tags', 'n').lower() == 'y'
     
-    print(f"Parser options - Has question numbers: {has_question_numbers}, Has category tags: {has_category_tags}")
+    current_app.logger.debug("Parser options - Has question numbers: %s, Has category tags: %s", has_question_numbers, has_category_tags)
 
     # Create a temporary directory for processing
     temp_dir = tempfile.mkdtemp()
-    print(f"Created temporary directory: {temp_dir}")
+    current_app.logger.debug("Created temporary directory: %s", temp_dir)
     
     # Save the uploaded file with a .docx extension
     file_extension = os.path.splitext(file.filename)[1].lower()
@@ -1720,7 +1414,7 @@ def upload_round_file(tournament_id, stage_id, round_number):
     file_name = f"packet_{tournament_id}_{stage_id}_{round_number}{file_extension}"
     file_path = os.path.join(temp_dir, file_name)
     file.save(file_path)
-    print(f"Saved uploaded file to: {file_path}")
+    current_app.logger.debug("Saved uploaded file to: %s", file_path)
     
     try:
         # Prepare command for the parser
@@ -1733,7 +1427,7 @@ def upload_round_file(tournament_id, stage_id, round_number):
             
         output_dir = os.path.join(temp_dir, 'output')
         os.makedirs(output_dir, exist_ok=True)
-        print(f"Created output directory: {output_dir}")
+        current_app.logger.debug("Created output directory: %s", output_dir)
         
         # Build command with appropriate flags based on user input
         cmd = [sys.executable, parser_script, file_path, '--output-dir', output_dir]
@@ -1743,8 +1437,8 @@ def upload_round_file(tournament_id, stage_id, round_number):
             cmd.append('--has-category-tags')
         
         # Run the parser
-        print(f"\n=== Running parser command ===")
-        print(f"Command: {' '.join(cmd)}")
+        current_app.logger.debug("Running parser command")
+        current_app.logger.debug("Command: %s", ' '.join(cmd))
         
         result = subprocess.run(
             cmd,
@@ -1754,25 +1448,25 @@ def upload_round_file(tournament_id, stage_id, round_number):
         )
         
         # Log the output for debugging
-        print("\n=== Parser Output ===")
-        print(f"Return code: {result.returncode}")
-        print(f"Stdout: {result.stdout}")
+        current_app.logger.debug("Parser output")
+        current_app.logger.debug("Return code: %s", result.returncode)
+        current_app.logger.debug("Stdout: %s", result.stdout)
         if result.stderr:
-            print(f"Stderr: {result.stderr}")
+            current_app.logger.debug("Stderr: %s", result.stderr)
         
         if result.returncode != 0:
             raise Exception(f"Parser failed with return code {result.returncode}")
         
         # Process the output
         output_files = [f for f in os.listdir(output_dir) if f.endswith('.json')]
-        print(f"\nFound {len(output_files)} JSON output files")
+        current_app.logger.debug("\nFound %s JSON output files", len(output_files))
         
         if not output_files:
             raise Exception("No JSON output files found. Parser output: " + (result.stderr or "No error output"))
         
         # Get the first JSON file (should be only one)
         json_file = os.path.join(output_dir, output_files[0])
-        print(f"Processing JSON file: {json_file}")
+        current_app.logger.debug("Processing JSON file: %s", json_file)
         
         # Read and parse the JSON
         with open(json_file, 'r', encoding='utf-8') as f:
@@ -1783,7 +1477,7 @@ def upload_round_file(tournament_id, stage_id, round_number):
         
         tossup_count = len(data.get('tossups', []))
         bonus_count = len(data.get('bonuses', []))
-        print(f"Found {tossup_count} tossups and {bonus_count} bonuses in the packet")
+        current_app.logger.debug("Found %s tossups and %s bonuses in the packet", tossup_count, bonus_count)
         
         # Insert tossups into database
         for i, tossup in enumerate(data.get('tossups', []), 1):
@@ -1798,13 +1492,13 @@ def upload_round_file(tournament_id, stage_id, round_number):
             )
             db.session.add(question)
             if i % 10 == 0 or i == tossup_count:
-                print(f"Added {i}/{tossup_count} tossups to database")
+                current_app.logger.debug("Added %s/%s tossups to database", i, tossup_count)
         
         # Insert bonuses into database if they exist
         if 'bonuses' in data:
             for i, bonus in enumerate(data['bonuses'], 1):
                 if not all(k in bonus for k in ['leadin', 'parts', 'answers']):
-                    print(f"Skipping malformed bonus at index {i-1}: {json.dumps(bonus, indent=2)}")
+                    current_app.logger.debug("Skipping malformed bonus at index %s: %s", i-1, bonus)
                     continue
                 
                 # Create a single question entry for the bonus
@@ -1848,51 +1542,49 @@ def upload_round_file(tournament_id, stage_id, round_number):
                         db.session.add(bonus_part)
                 
                 if i % 10 == 0 or i == bonus_count:
-                    print(f"Added {i}/{bonus_count} bonuses to database")
+                    current_app.logger.debug("Added %s/%s bonuses to database", i, bonus_count)
         
         db.session.commit()
         success_msg = f"Successfully processed packet with {tossup_count} tossups and {bonus_count} bonuses"
-        print(success_msg)
+        current_app.logger.debug("%s", success_msg)
         flash(success_msg, 'success')
         
     except subprocess.TimeoutExpired as e:
         error_msg = f"Packet processing timed out after 5 minutes: {str(e)}"
-        print(f"Error: {error_msg}")
+        current_app.logger.error("Error: %s", error_msg)
         flash(error_msg, 'danger')
     except FileNotFoundError as e:
         error_msg = f"Required file not found: {str(e)}"
-        print(f"Error: {error_msg}")
+        current_app.logger.error("Error: %s", error_msg)
         flash(error_msg, 'danger')
     except Exception as e:
         error_msg = f"Error processing packet: {str(e)}"
-        print(f"Error: {error_msg}")
-        import traceback
-        traceback.print_exc()  # Print full traceback
+        current_app.logger.exception("Error: %s", error_msg)
         flash(f'Error: {str(e)}', 'danger')
     finally:
         # Clean up files
-        print("\n=== Cleaning up files ===")
+        current_app.logger.debug("Cleaning up files")
         try:
             # Remove the original file
             if os.path.exists(file_path):
                 os.remove(file_path)
-                print(f"Removed file: {file_path}")
+                current_app.logger.debug("Removed file: %s", file_path)
             
             # Remove the output directory
             if os.path.exists(output_dir):
                 shutil.rmtree(output_dir)
-                print(f"Removed directory: {output_dir}")
+                current_app.logger.debug("Removed directory: %s", output_dir)
                 
             # Remove the temp directory if empty
             if os.path.exists(temp_dir) and not os.listdir(temp_dir):
                 os.rmdir(temp_dir)
-                print(f"Removed empty directory: {temp_dir}")
+                current_app.logger.debug("Removed empty directory: %s", temp_dir)
         except Exception as e:
-            print(f"Error during cleanup: {str(e)}")
+            current_app.logger.error("Error during cleanup: %s", str(e))
     
-    print("=== Packet upload process completed ===\n")
+    current_app.logger.debug("Packet upload process completed")
     redirect_url = url_for('admin.tournament_details', tournament_id=tournament_id)
-    print(f"Redirecting to: {redirect_url}")
+    current_app.logger.debug("Redirecting to: %s", redirect_url)
     return redirect(redirect_url)
 
 @admin_bp.route('/manual_seed_teams/<int:tournament_id>/<int:stage_id>', methods=['POST'])
@@ -1902,9 +1594,7 @@ def manual_seed_teams(tournament_id, stage_id):
         tournament = Tournament.query.get_or_404(tournament_id)
         
         # Get the format data to validate placeholders
-        format_data = json.loads(tournament.format_json)
-        stage = next((s for s in format_data.get('tournament_format', {}).get('stages', []) 
-                     if s.get('stage_id') == stage_id), None)
+        stage = tournament.parsed_format.get_stage(stage_id)
         
         if not stage:
             flash(f'Stage {stage_id} not found in tournament format', 'error')
@@ -1963,9 +1653,7 @@ def manual_seed_teams(tournament_id, stage_id):
         
     except Exception as e:
         db.session.rollback()
-        current_app.logger.error(f"Error in manual_seed_teams: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        current_app.logger.exception(f"Error in manual_seed_teams: {str(e)}")
         flash('An error occurred while updating team assignments', 'error')
         return redirect(url_for('admin.tournament_details', tournament_id=tournament_id))
     
@@ -1975,8 +1663,8 @@ def manual_seed_teams(tournament_id, stage_id):
 @admin_login_required
 def auto_assign_playoff(tournament_id):
     tournament = Tournament.query.get_or_404(tournament_id)
-    auto_assign_playoff_seeding(tournament)
-    flash("Playoff seeding automatically assigned based on ranking.", "success")
+    success, message = auto_assign_playoff_seeding(tournament, request.args.get('tiebreakers'))
+    flash(message, "success" if success else "danger")
     return redirect(url_for('admin.tournament_details', tournament_id=tournament_id))
 
 @admin_bp.route('/tournament/<int:tournament_id>/assign_reader', methods=['POST'])
@@ -2110,7 +1798,7 @@ def create_admin():
             
         except Exception as e:
             db.session.rollback()
-            print(f"Error creating admin: {str(e)}")
+            current_app.logger.error("Error creating admin: %s", str(e))
             flash('An error occurred while creating the admin account', 'danger')
     
     return render_template('admin/create_admin.html')
@@ -2196,7 +1884,7 @@ def change_password():
             
         except Exception as e:
             db.session.rollback()
-            print(f"Error changing password: {str(e)}")
+            current_app.logger.error("Error changing password: %s", str(e))
             flash('An error occurred while changing your password. Please try again.', 'danger')
     
     return render_template('admin/change_password.html', 
@@ -2210,7 +1898,9 @@ def check_password_change():
     if 'admin_id' not in session or request.endpoint in ['admin.logout', 'admin.change_password', 'static']:
         return
         
-    admin = Admin.query.get(session['admin_id'])
+    # Served from the identity cache, which is dropped when the password changes
+    from utils.user_cache import ROLE_ADMIN, get_user_identity
+    admin = get_user_identity(ROLE_ADMIN, session['admin_id'])
     if admin and admin.needs_password_change:
         # Only redirect if not already on the change password page
         if request.endpoint != 'admin.change_password':
@@ -2246,7 +1936,7 @@ def delete_admin(admin_id):
     except Exception as e:
         db.session.rollback()
         error_msg = f'An error occurred while deleting the admin account: {str(e)}'
-        print(error_msg)
+        current_app.logger.error("%s", error_msg)
         
         if request.is_json:
             return jsonify({'success': False, 'message': error_msg}), 500
@@ -2291,7 +1981,7 @@ def reset_admin_password(admin_id):
     except Exception as e:
         db.session.rollback()
         error_msg = f'Error resetting password: {str(e)}'
-        print(error_msg)
+        current_app.logger.error("%s", error_msg)
         return jsonify({'success': False, 'message': error_msg}), 500
 
 @admin_bp.route('/api/teams/<int:tournament_id>/add_player', methods=['POST'])
@@ -2511,6 +2201,26 @@ def get_team_players(tournament_id):
             'message': f'Failed to fetch players: {str(e)}'
         }), 500
 
+@admin_bp.route('/api/tournament/<int:tournament_id>/buzz_analytics')
+@admin_login_required
+def buzz_analytics(tournament_id):
+    """
+    API endpoint for per-question and per-category buzz-point analytics.
+    Takes an optional 'bins' query parameter (default 20).
+    """
+    from utils.buzz_analytics import DEFAULT_BINS, get_buzz_analytics
+    Tournament.query.get_or_404(tournament_id)
+    bins = request.args.get('bins', DEFAULT_BINS, type=int)
+    try:
+        analytics = get_buzz_analytics(tournament_id, bins)
+        return jsonify({'success': True, **analytics})
+    except Exception as e:
+        current_app.logger.error("Error computing buzz analytics for tournament %s: %s", tournament_id, e, exc_info=True)
+        return jsonify({
+            'success': False,
+            'message': f'Failed to compute buzz analytics: {str(e)}'
+        }), 500
+
 @admin_bp.route('/tournament/<int:tournament_id>/game/<int:game_id>/scorecard', methods=['GET', 'POST'])
 @admin_login_required
 def edit_game_scorecard(tournament_id, game_id):
@@ -2790,7 +2500,7 @@ def list_tournament_games(tournament_id):
         game._match_number = len(games_by_stage[stage_id][round_num])
     
     # Get format data for stage names
-    format_data = json.loads(tournament.format_json) if tournament.format_json else {}
+    format_data = tournament.format if tournament.format_json else {}
     
     return render_template(
         'admin/tournament_games.html',
@@ -3039,6 +2749,7 @@ def manage_rooms(tournament_id):
 @admin_login_required
 def add_room_alias(tournament_id):
     """Add a new room alias."""
+    from utils.room_utils import invalidate_room_aliases
     tournament = Tournament.query.get_or_404(tournament_id)
     form = RoomAliasForm()
     
@@ -3062,6 +2773,7 @@ def add_room_alias(tournament_id):
             else:
                 db.session.add(room_alias)
                 db.session.commit()
+                invalidate_room_aliases(tournament_id)
                 flash(f'Added alias for Room {room_number}', 'success')
                 
         except ValueError:
@@ -3081,6 +2793,7 @@ def add_room_alias(tournament_id):
 @admin_login_required
 def delete_room_alias(tournament_id, room_number):
     """Delete a room alias."""
+    from utils.room_utils import invalidate_room_aliases
     room_alias = RoomAlias.query.filter_by(
         tournament_id=tournament_id,
         room_number=room_number
@@ -3089,6 +2802,7 @@ def delete_room_alias(tournament_id, room_number):
     try:
         db.session.delete(room_alias)
         db.session.commit()
+        invalidate_room_aliases(tournament_id)
         flash(f'Removed alias for Room {room_number}', 'success')
     except Exception as e:
         db.session.rollback()
@@ -1,4 +1,4 @@
-from flask import Blueprint, render_template, abort, current_app
+from flask import Blueprint, render_template, abort, current_app, make_response
 from datetime import datetime
 from models import db
 from models.tournament import Tournament
@@ -32,282 +32,51 @@ def list_tournaments():
 # Removed old team route (/schedule/<teamname>)
 @public_bp.route('/schedule/<int:tournament_id>/<teamname>')
 def team_schedule(tournament_id, teamname):
+    from utils.schedule_cache import get_cached_snapshot, get_snapshot, not_modified, add_cache_headers
+
+    # Answer polling clients from the cached snapshot without touching the database
+    snapshot = get_cached_snapshot(tournament_id)
+    if snapshot:
+        response = not_modified(snapshot, snapshot.team_etag(teamname))
+        if response:
+            return response
+
     tournament = Tournament.query.get(tournament_id)
     if not tournament:
         abort(404, description="Tournament not found")
-    format_data = tournament.format
-    aliases = TeamAlias.query.filter_by(tournament_id=tournament.id, stage_id=1).all()
-    alias_dict = {alias.team_id: alias.team_name for alias in aliases}
-    
-    # Get room aliases for the tournament
-    room_aliases = {alias.room_number: alias.room_name for alias in tournament.room_aliases}
-    
-    # Import the room utility function
-    from utils.room_utils import get_room_display_name
-    
-    schedule_resolved = {}
-    stages = format_data['tournament_format']['stages']
-    for stage in stages:
-        stage_name = stage.get('stage_name')
-        rounds = stage.get('rounds', [])
-        if stage.get('stage_id') == 1:
-            resolved_rounds = []
-            for rnd in rounds:
-                round_label = rnd.get('round_in_stage')
-                pdf = rnd.get('pdf', None)
-                matches = []
-                for pairing in rnd.get('pairings', []):
-                    teams = pairing.get('teams', [])
-                    resolved = [alias_dict.get(t, t) for t in teams]
-                    if teamname in resolved:
-                        opponent = resolved[1] if resolved[0] == teamname else resolved[0]
-                        matches.append({'match_number': pairing.get('match_number'), 'opponent': opponent})
-                if matches:
-                    resolved_rounds.append({'round': round_label, 'matches': matches, 'pdf': pdf})
-            schedule_resolved[stage_name] = {'resolved': True, 'rounds': resolved_rounds}
-        else:
-            schedule_resolved[stage_name] = {'resolved': False, 'round_count': len(rounds)}
-    return render_template('schedule.html', 
+    snapshot = get_snapshot(tournament)
+
+    response = make_response(render_template('schedule.html', 
                          teamname=teamname, 
                          tournament=tournament, 
-                         schedule=schedule_resolved,
-                         room_aliases=room_aliases,
-                         get_room_display_name=get_room_display_name)
+                         schedule=snapshot.get_team_schedule(teamname),
+                         room_aliases=snapshot.room_aliases,
+                         get_room_display_name=snapshot.get_room_display_name))
+    return add_cache_headers(response, snapshot, snapshot.team_etag(teamname))
 
 @public_bp.route('/schedule/<int:tournament_id>')
 def schedule_all(tournament_id):
+    from utils.schedule_cache import get_cached_snapshot, get_snapshot, not_modified, add_cache_headers
+
+    # Answer polling clients from the cached snapshot without touching the database
+    snapshot = get_cached_snapshot(tournament_id)
+    if snapshot:
+        response = not_modified(snapshot)
+        if response:
+            return response
+
     tournament = Tournament.query.get(tournament_id)
     if not tournament:
         abort(404, description="No tournament found")
-    format_data = tournament.format
-    
-    # Get all team aliases for this tournament
-    aliases = TeamAlias.query.filter_by(tournament_id=tournament.id).all()
-    alias_dict = {alias.team_id: alias.team_name for alias in aliases}
-    
-    # Get room aliases for this tournament
-    from models.room_alias import RoomAlias
-    room_aliases = {alias.room_number: alias.room_name for alias in RoomAlias.query.filter_by(tournament_id=tournament.id).all()}
-    
-    # Import the room utility function
-    from utils.room_utils import get_room_display_name
-    
-    # Get all games for this tournament
-    games = Game.query.filter_by(tournament_id=tournament.id).order_by(Game.stage_id, Game.round_number).all()
-    
-    # First pass: organize games by stage and round, and create a lookup dict for game references
-    games_by_stage_round = {}
-    game_lookup = {}  # Format: {'S{stage}R{round}M{match}': game}
-    
-    for game in games:
-        stage_id = game.stage_id or 1
-        round_num = game.round_number or 1
-        
-        # Add to games_by_stage_round
-        if stage_id not in games_by_stage_round:
-            games_by_stage_round[stage_id] = {}
-        if round_num not in games_by_stage_round[stage_id]:
-            games_by_stage_round[stage_id][round_num] = []
-        games_by_stage_round[stage_id][round_num].append(game)
-        
-        # Add to game_lookup
-        game_key = f'S{stage_id}R{round_num}M{game.id}'
-        game_lookup[game_key] = game
-    
-    # Function to resolve team name from a game reference
-    def resolve_team_name(team_ref, current_stage_id, current_round_num, current_match_num):
-        if not team_ref:
-            return "TBD"
-            
-        # If team_ref is not a string, convert to string for consistent handling
-        if not isinstance(team_ref, str):
-            team_ref = str(team_ref)
-            
-        # If it's a direct team ID, return the team name
-        # First try exact match (in case team_id is a string like '1')
-        if team_ref in alias_dict:
-            return alias_dict[team_ref]
-            
-        # Then try converting to int and looking up (for backward compatibility)
-        if team_ref.isdigit():
-            return alias_dict.get(int(team_ref), f"Team {team_ref}")
-            
-        # Check if it's a game reference like 'W(S2R1M1)'
-        import re
-        match = re.match(r'^(W|L|T)\((S\d+R\d+M\d+)\)$', team_ref)
-        if match:
-            result_type, game_ref = match.groups()
-            
-            # Find the referenced game
-            ref_game = game_lookup.get(game_ref)
-            if not ref_game:
-                return f"Winner/Loser of {game_ref}"  # More descriptive than just the reference
-                
-            # Get the winner/loser based on result_type
-            if result_type == 'W':
-                winning_team = str(ref_game.team1 if ref_game.score1 > ref_game.score2 else ref_game.team2)
-                return alias_dict.get(winning_team, f"Team {winning_team}")
-            elif result_type == 'L':
-                losing_team = str(ref_game.team2 if ref_game.score1 > ref_game.score2 else ref_game.team1)
-                return alias_dict.get(losing_team, f"Team {losing_team}")
-            else:  # 'T' for tie
-                return f"Tie in {game_ref}"
-        
-        # If it's a string that looks like 't1', 't2', etc., try to convert to int and look up
-        if team_ref.startswith('t') and team_ref[1:].isdigit():
-            team_id = team_ref[1:]  # Keep as string to match how it's stored
-            return alias_dict.get(team_id, f"Team {team_id}")
-            
-        # If we get here, return the reference as is with a prefix to indicate it's a team
-        return f"Team {team_ref}"
-    
-    schedule_resolved = {}
-    stages = format_data['tournament_format']['stages']
-    
-    for stage in stages:
-        stage_id = stage.get('stage_id')
-        stage_name = stage.get('stage_name')
-        rounds = stage.get('rounds', [])
-        
-        # For all stages, try to show actual games if they exist
-        if stage_id in games_by_stage_round:
-            resolved_rounds = []
-            for round_num, games_in_round in sorted(games_by_stage_round[stage_id].items()):
-                matches = []
-                # Sort games by ID to ensure consistent ordering
-                sorted_games = sorted(games_in_round, key=lambda g: g.id)
-                for match_number, game in enumerate(sorted_games, 1):
-                    # Resolve team names, handling game references
-                    team1_name = resolve_team_name(game.team1, game.stage_id, game.round_number, match_number)
-                    team2_name = "TBD"
-                    
-                    if game.team2:
-                        team2_name = resolve_team_name(game.team2, game.stage_id, game.round_number, match_number)
-                    
-                    # Initialize default values
-                    score1 = 0
-                    score2 = 0
-                    is_completed = game.result != -2  # -2 means not played
-                    
-                    # Extract scores from scorecard if available
-                    if game.scorecard:
-                        try:
-                            scorecard_data = json.loads(game.scorecard)
-                            if isinstance(scorecard_data, list):
-                                for q in scorecard_data:
-                                    # Handle both old and new scorecard formats
-                                    if 'team1' in q and 'team2' in q:
-                                        # New format with team1/team2 structure
-                                        score1 += sum(int(p) for p in q['team1'].values() if str(p).lstrip('-').isdigit())
-                                        score2 += sum(int(p) for p in q['team2'].values() if str(p).lstrip('-').isdigit())
-                                        
-                                        # Add bonus points if they exist
-                                        if 'team1Bonus' in q and isinstance(q['team1Bonus'], (int, float)):
-                                            score1 += int(q['team1Bonus'])
-                                        if 'team2Bonus' in q and isinstance(q['team2Bonus'], (int, float)):
-                                            score2 += int(q['team2Bonus'])
-                                    elif 'scores' in q and len(q['scores']) >= 4:
-                                        # Old format with scores array
-                                        team1_scores = q['scores'][0]
-                                        team2_scores = q['scores'][2]
-                                        if isinstance(team1_scores, list):
-                                            score1 += sum(s for s in team1_scores if isinstance(s, (int, float)))
-                                        if isinstance(team2_scores, list):
-                                            score2 += sum(s for s in team2_scores if isinstance(s, (int, float)))
-                            
-                            # Update the game result based on scores
-                            if score1 > score2:
-                                game.result = 1  # Team 1 wins
-                            elif score2 > score1:
-                                game.result = -1  # Team 2 wins
-                            else:
-                                game.result = 0  # Tie
-                            db.session.commit()
-                                
-                            # Consider game completed if we have non-zero scores
-                            is_completed = score1 > 0 or score2 > 0
-                            
-                        except Exception as e:
-                            current_app.logger.error(f"Error parsing scorecard for game {game.id}: {str(e)}")
-                            # Fall back to game.result if available
-                            if game.result is not None:
-                                is_completed = True
-                                if game.result == 1:
-                                    score1 = 1  # Indicate team 1 won
-                                    score2 = 0
-                                elif game.result == 2:
-                                    score1 = 0
-                                    score2 = 1  # Indicate team 2 won
-                                else:
-                                    score1 = score2 = 0  # Tie
-                                
-                                # Player names are not being displayed
-                        except Exception as e:
-                            print(f"Error parsing scorecard: {e}")
-                    
-                    # Use match number as room number if no room is assigned
-                    room_number = getattr(game, 'room_number', match_number)
-                    
-                    matches.append({
-                        'match_number': match_number,
-                        'teams': [team1_name, team2_name],
-                        'scores': [score1, score2],
-                        'completed': is_completed,
-                        'room_number': room_number
-                    })
-                
-                resolved_rounds.append({
-                    'round': round_num,
-                    'round_name': f"Round {round_num}",
-                    'matches': matches
-                })
-            
-            schedule_resolved[stage_name] = {
-                'resolved': True,
-                'rounds': resolved_rounds,
-                'is_playoff': stage_id > 1
-            }
-        else:
-            # Fallback to format data if no games exist yet
-            if stage_id == 1:  # Prelims
-                resolved_rounds = []
-                for rnd in rounds:
-                    round_label = rnd.get('round_in_stage')
-                    matches = []
-                    for pairing in rnd.get('pairings', []):
-                        teams = pairing.get('teams', [])
-                        resolved = [alias_dict.get(t, t) for t in teams]
-                        match_num = pairing.get('match_number')
-                        matches.append({
-                            'match_number': match_num,
-                            'teams': resolved,
-                            'scores': ["-", "-"],
-                            'completed': False,
-                            'room_number': pairing.get('room_number', match_num)  # Default to match number if no room specified
-                        })
-                    resolved_rounds.append({
-                        'round': round_label,
-                        'round_name': f"Round {round_label}",
-                        'matches': matches
-                    })
-                schedule_resolved[stage_name] = {
-                    'resolved': True,
-                    'rounds': resolved_rounds,
-                    'is_playoff': False
-                }
-            else:
-                schedule_resolved[stage_name] = {
-                    'resolved': False,
-                    'round_count': len(rounds),
-                    'is_playoff': True
-                }
-    
-    return render_template('schedule.html', 
+    snapshot = get_snapshot(tournament)
+
+    response = make_response(render_template('schedule.html', 
                          teamname=None, 
                          tournament=tournament, 
-                         schedule=schedule_resolved,
-                         room_aliases=room_aliases,
-                         get_room_display_name=get_room_display_name)
+                         schedule=snapshot.schedule,
+                         room_aliases=snapshot.room_aliases,
+                         get_room_display_name=snapshot.get_room_display_name))
+    return add_cache_headers(response, snapshot)
 
 class TeamStats:
     def __init__(self):
@@ -333,6 +102,25 @@ class PlayerStats:
         self.negs = 0      # -5 point answers
         self.zeroes = 0    # 0 point answers (active but didn't buzz or got it wrong)
 
+@public_bp.route('/tournament/<int:tournament_id>/export.<export_format>')
+def export_stats(tournament_id, export_format):
+    """Download a tournament's stats as JSON, CSV or QBJ (MODAQ/SQBS-compatible)."""
+    from utils.schedule_cache import not_modified, add_cache_headers
+    from utils.stats_export import EXPORT_FORMATS, get_artifact, stream_export
+    if export_format not in EXPORT_FORMATS:
+        abort(404, description=f"Unknown export format. Use one of: {', '.join(EXPORT_FORMATS)}")
+
+    # Conditional requests for an unchanged tournament never re-read its games
+    artifact = get_artifact(tournament_id, export_format)
+    response = not_modified(artifact)
+    if response:
+        return response
+
+    tournament = Tournament.query.get_or_404(tournament_id)
+    response = current_app.response_class(stream_export(tournament, artifact), mimetype=artifact.mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="{artifact.filename}"'
+    return add_cache_headers(response, artifact)
+
 @public_bp.route('/tournament/<int:tournament_id>/leaderboard')
 def team_leaderboard(tournament_id):
     current_app.logger.info(f"Generating leaderboard for tournament {tournament_id}")
@@ -436,7 +224,6 @@ def team_leaderboard(tournament_id):
             
             try:
                 scorecard = json.loads(game.scorecard) if isinstance(game.scorecard, str) else game.scorecard
-                current_app.logger.debug(f"Parsed scorecard: {json.dumps(scorecard, indent=2)}")
             except json.JSONDecodeError as e:
                 current_app.logger.error(f"Failed to parse scorecard for game {game.id}: {e}")
                 continue
@@ -576,7 +363,7 @@ def team_leaderboard(tournament_id):
                 team_stats[team2_id].ties += 1
                 
         except Exception as e:
-            print(f"Error processing game {game.id}: {e}")
+            current_app.logger.error("Error processing game %s: %s", game.id, e)
     
     # Calculate derived statistics
     for team_id, stats in team_stats.items():
@@ -663,25 +450,52 @@ def team_leaderboard(tournament_id):
     for t in team_data:
         current_app.logger.info(f"Team data: {t}")
         
+    # Games still being read that have synced cycles; shown live, not in the standings
+    from utils.scorecard_sync import score_cycles
+    live_games = []
+    in_progress = Game.query.filter(
+        Game.tournament_id == tournament.id,
+        Game.scorecard.isnot(None),
+        Game.result == -2
+    ).order_by(Game.stage_id, Game.round_number, Game.id).all()
+    for game in in_progress:
+        try:
+            cycles = json.loads(game.scorecard)
+        except (TypeError, ValueError):
+            continue
+        if not isinstance(cycles, list) or not cycles:
+            continue
+        team1_score, team2_score = score_cycles(cycles)
+        live_games.append({
+            'id': game.id,
+            'round_number': game.round_number,
+            'team1': team_id_to_name.get(game.team1, game.team1),
+            'team2': team_id_to_name.get(game.team2, game.team2),
+            'team1_score': team1_score,
+            'team2_score': team2_score,
+            'cycles': len(cycles)
+        })
+    
     return render_template(
         'team_leaderboard.html',
         tournament=tournament,
         teams=team_data,
-        players=player_data
+        players=player_data,
+        live_games=live_games
     )
     
     # Debug: Print number of games and games with scorecards
-    print(f"Found {len(games)} games with scorecards for tournament '{tournament.name}'")
+    current_app.logger.debug("Found %s games with scorecards for tournament '%s'", len(games), tournament.name)
     
     if not games:
-        print("No games with scorecards found. This is why no individual stats are showing up.")
-    else:
-        # Print first scorecard structure for debugging
+        current_app.logger.debug("No games with scorecards found. This is why no individual stats are showing up.")
+    elif current_app.logger.isEnabledFor(logging.DEBUG):
+        # Print first scorecard structure for debugging (only parsed when it will be logged)
         try:
             first_scorecard = json.loads(games[0].scorecard)
-            print(f"First scorecard structure: {json.dumps(first_scorecard, indent=2)[:500]}...")  # Print first 500 chars
+            current_app.logger.debug("First scorecard structure: %s...", json.dumps(first_scorecard, indent=2)[:500])  # Print first 500 chars
         except Exception as e:
-            print(f"Error parsing first scorecard: {e}")
+            current_app.logger.error("Error parsing first scorecard: %s", e)
 
     # Prepare three dictionaries for overall, prelim, and playoffs.
     def init_stats():
@@ -710,7 +524,7 @@ def team_leaderboard(tournament_id):
             if not isinstance(scorecard, list):
                 scorecard = [scorecard]  # Ensure we have a list of cycles
         except Exception as e:
-            print(f"Error parsing scorecard for game {game.id}: {e}")
+            current_app.logger.error("Error parsing scorecard for game %s: %s", game.id, e)
             return
             
         # Initialize team names (stored directly in the Game model)
@@ -885,7 +699,7 @@ def team_leaderboard(tournament_id):
         # Sum up points from player scores and bonus points
         for cycle in scorecard:
             if not isinstance(cycle, dict):
-                print(f"Warning: Non-dictionary cycle in scorecard: {cycle}")
+                current_app.logger.warning("Warning: Non-dictionary cycle in scorecard: %s", cycle)
                 continue
                 
             # Initialize cycle totals
@@ -906,7 +720,7 @@ def team_leaderboard(tournament_id):
                 team1_total += team1_cycle_pts + int(team1_bonus) if str(team1_bonus).lstrip('-').isdigit() else 0
                 team2_total += team2_cycle_pts + int(team2_bonus) if str(team2_bonus).lstrip('-').isdigit() else 0
                 
-                print(f"  Method 1: team1={team1_cycle_pts} + {team1_bonus} bonus, team2={team2_cycle_pts} + {team2_bonus} bonus")
+                current_app.logger.debug("  Method 1: team1=%s + %s bonus, team2=%s + %s bonus", team1_cycle_pts, team1_bonus, team2_cycle_pts, team2_bonus)
             
             # Method 2: Check for team1Scores/team2Scores
             elif 'team1Scores' in cycle and 'team2Scores' in cycle:
@@ -919,7 +733,7 @@ def team_leaderboard(tournament_id):
                 team1_total += team1_cycle_pts
                 team2_total += team2_cycle_pts
                 
-                print(f"  Method 2: team1={team1_cycle_pts}, team2={team2_cycle_pts}")
+                current_app.logger.debug("  Method 2: team1=%s, team2=%s", team1_cycle_pts, team2_cycle_pts)
             
             # Method 3: Check for tossup object (single tossup result)
             elif 'tossup' in cycle and isinstance(cycle['tossup'], dict):
@@ -932,7 +746,7 @@ def team_leaderboard(tournament_id):
                     elif tossup['team'] == 2:
                         team2_cycle_pts = points
                         team2_total += points
-                    print(f"  Method 3: team{tossup['team']} scored {points} points")
+                    current_app.logger.debug("  Method 3: team%s scored %s points", tossup['team'], points)
             
             # Method 4: Check for team1/team2 with player points (old format)
             if 'team1' in cycle and isinstance(cycle['team1'], dict):
@@ -942,7 +756,7 @@ def team_leaderboard(tournament_id):
                 )
                 team1_cycle_pts = max(team1_cycle_pts, team1_player_pts)
                 team1_total += team1_player_pts
-                print(f"  Method 4: team1 players scored {team1_player_pts}")
+                current_app.logger.debug("  Method 4: team1 players scored %s", team1_player_pts)
                 
             if 'team2' in cycle and isinstance(cycle['team2'], dict):
                 team2_player_pts = sum(
@@ -951,7 +765,7 @@ def team_leaderboard(tournament_id):
                 )
                 team2_cycle_pts = max(team2_cycle_pts, team2_player_pts)
                 team2_total += team2_player_pts
-                print(f"  Method 4: team2 players scored {team2_player_pts}")
+                current_app.logger.debug("  Method 4: team2 players scored %s", team2_player_pts)
             
             # Process bonus points (check in multiple possible locations)
             bonus = {}
@@ -965,19 +779,19 @@ def team_leaderboard(tournament_id):
                     try:
                         team1_bonus = int(bonus['team1'])
                         team1_total += team1_bonus
-                        print(f"  Team1 bonus: {team1_bonus}")
+                        current_app.logger.debug("  Team1 bonus: %s", team1_bonus)
                     except (ValueError, TypeError) as e:
-                        print(f"  Warning: Invalid bonus value for team1: {bonus['team1']}")
+                        current_app.logger.warning("  Warning: Invalid bonus value for team1: %s", bonus['team1'])
                 if 'team2' in bonus and isinstance(bonus['team2'], (int, float, str)):
                     try:
                         team2_bonus = int(bonus['team2'])
                         team2_total += team2_bonus
-                        print(f"  Team2 bonus: {team2_bonus}")
+                        current_app.logger.debug("  Team2 bonus: %s", team2_bonus)
                     except (ValueError, TypeError) as e:
-                        print(f"  Warning: Invalid bonus value for team2: {bonus['team2']}")
+                        current_app.logger.warning("  Warning: Invalid bonus value for team2: %s", bonus['team2'])
             
-            print(f"  Cycle totals - team1: {team1_cycle_pts}, team2: {team2_cycle_pts}")
-            print(f"  Running totals - team1: {team1_total}, team2: {team2_total}")
+            current_app.logger.debug("  Cycle totals - team1: %s, team2: %s", team1_cycle_pts, team2_cycle_pts)
+            current_app.logger.debug("  Running totals - team1: %s, team2: %s", team1_total, team2_total)
         
         # Determine the winner based on total points
         if team1_total > team2_total:
@@ -991,13 +805,13 @@ def team_leaderboard(tournament_id):
             stats[game.team2]["ties"] += 1
             
         # Debug output
-        print(f"Game {game.id}: {game.team1} ({team1_total} pts) vs {game.team2} ({team2_total} pts)")
+        current_app.logger.debug("Game %s: %s (%s pts) vs %s (%s pts)", game.id, game.team1, team1_total, game.team2, team2_total)
         if team1_total > team2_total:
-            print(f"  Winner: {game.team1}")
+            current_app.logger.debug("  Winner: %s", game.team1)
         elif team2_total > team1_total:
-            print(f"  Winner: {game.team2}")
+            current_app.logger.debug("  Winner: %s", game.team2)
         else:
-            print("  Result: Tie")
+            current_app.logger.debug("  Result: Tie")
 
     # Get all team aliases for this tournament to map team names to IDs
     team_aliases = TeamAlias.query.filter_by(tournament_id=tournament.id).all()
@@ -1014,7 +828,7 @@ def team_leaderboard(tournament_id):
         team2_id = team_name_to_id.get(team2_name)
         
         if not team1_id or not team2_id:
-            print(f"Warning: Could not find team IDs for game {game.id} ({team1_name} vs {team2_name})")
+            current_app.logger.warning("Warning: Could not find team IDs for game %s (%s vs %s)", game.id, team1_name, team2_name)
             continue
         
         # Initialize stats for these teams if they don't exist
@@ -1117,7 +931,7 @@ def team_leaderboard(tournament_id):
     
     # First, get all players from all teams
     all_teams = set(game.team1 for game in games) | set(game.team2 for game in games)
-    print(f"Found {len(all_teams)} teams in games")
+    current_app.logger.debug("Found %s teams in games", len(all_teams))
     
     # Initialize all players first
     for team_name in all_teams:
@@ -1150,7 +964,7 @@ def team_leaderboard(tournament_id):
             alias2 = TeamAlias.query.filter_by(team_name=game.team2).first()
             
             # Debug: Print team info
-            print(f"\nProcessing game: {game.team1} vs {game.team2}")
+            current_app.logger.debug("\nProcessing game: %s vs %s", game.team1, game.team2)
             
             # Track which players participated in this game
             game_players = set()
@@ -1172,15 +986,15 @@ def team_leaderboard(tournament_id):
                 team2_bonus = scores[3] if len(scores) > 3 and isinstance(scores[3], (int, float)) else 0
                 
                 # Debug: Print cycle info
-                print(f"\nCycle: {cycle.get('tossup', {}).get('question', '?')}")
-                print(f"Team 1 scores: {team1_scores}")
-                print(f"Team 2 scores: {team2_scores}")
-                print(f"Team 1 bonus: {team1_bonus}")
-                print(f"Team 2 bonus: {team2_bonus}")
+                current_app.logger.debug("\nCycle: %s", cycle.get('tossup', {}).get('question', '?'))
+                current_app.logger.debug("Team 1 scores: %s", team1_scores)
+                current_app.logger.debug("Team 2 scores: %s", team2_scores)
+                current_app.logger.debug("Team 1 bonus: %s", team1_bonus)
+                current_app.logger.debug("Team 2 bonus: %s", team2_bonus)
                 
                 # Process team 1 players
                 if 'team1' in cycle and isinstance(cycle['team1'], dict):
-                    print(f"\nProcessing team 1 ({game.team1}) players:")
+                    current_app.logger.debug("\nProcessing team 1 (%s) players:", game.team1)
                     
                     # Get the player stats for this team
                     team_players = {}
@@ -1198,7 +1012,7 @@ def team_leaderboard(tournament_id):
                         # Find the player in our team
                         player = team_players.get(player_id)
                         if not player:
-                            print(f"  Warning: Player ID {player_id} not found in team {game.team1}")
+                            current_app.logger.warning("  Warning: Player ID %s not found in team %s", player_id, game.team1)
                             continue
                             
                         # Create player key and ensure player exists in stats
@@ -1271,22 +1085,22 @@ def team_leaderboard(tournament_id):
                                 team1_bonus_count += 1
                 # Process team 2
                 if alias2 and team2_scores:
-                    print(f"\nProcessing team 2 ({game.team2}) players:")
+                    current_app.logger.debug("\nProcessing team 2 (%s) players:", game.team2)
                     for i, pts in enumerate(team2_scores):
                         if i >= len(alias2.players):
-                            print(f"  Warning: More scores than players for team 2")
+                            current_app.logger.warning("  Warning: More scores than players for team 2")
                             break
                             
                         player = alias2.players[i]
                         pid = player.id
-                        print(f"  Player {i}: {player.name} (ID: {pid}) - Points: {pts}")
+                        current_app.logger.debug("  Player %s: %s (ID: %s) - Points: %s", i, player.name, pid, pts)
                         
                         # Check if player was active in this cycle (by ID or legacy index)
                         is_active = (pid in team2_active_ids or 
                                    (i < len(team2_active) and team2_active[i] == 1))
                         
                         if pid not in player_stats:
-                            print(f"  Creating new player entry for {player.name}")
+                            current_app.logger.debug("  Creating new player entry for %s", player.name)
                             player_stats[pid] = {
                                 'player': player.name,
                                 'team': game.team2,
@@ -1343,7 +1157,7 @@ def team_leaderboard(tournament_id):
                     player_stats[pid]['games'] += 1
                     
         except Exception as e:
-            print(f"Error processing game {game.id}: {str(e)}")
+            current_app.logger.error("Error processing game %s: %s", game.id, str(e))
             continue
     
     # Prepare final leaderboard - include ALL players
@@ -1435,7 +1249,7 @@ def team_leaderboard(tournament_id):
                 player_stats[player_key]['games_played'] += 1
                 
         except Exception as e:
-            print(f"Error processing game {game.id}: {e}")
+            current_app.logger.error("Error processing game %s: %s", game.id, e)
     
     # Compile the individual leaderboard
     leaderboard_individual = []
@@ -1459,14 +1273,12 @@ def team_leaderboard(tournament_id):
     # Sort by points per game (descending)
     leaderboard_individual.sort(key=lambda x: x['points_ppg'], reverse=True)
     
-    print(f"Generated leaderboard with {len(leaderboard_individual)} players")
+    current_app.logger.debug("Generated leaderboard with %s players", len(leaderboard_individual))
     
     # Debug output
-    print("\n=== Leaderboard Debug Info ===")
-    print(f"Teams in leaderboard_overall: {len(leaderboard_overall) if leaderboard_overall else 0}")
+    current_app.logger.debug("Teams in leaderboard_overall: %s", len(leaderboard_overall) if leaderboard_overall else 0)
     if leaderboard_overall:
-        print("Sample team data:", leaderboard_overall[0])
-    print("==========================\n")
+        current_app.logger.debug("Sample team data: %s", leaderboard_overall[0])
 
     return render_template('team_leaderboard.html',
                            tournament=tournament,
@@ -1,4 +1,5 @@
 import json
+from functools import wraps
 from flask import Blueprint, render_template, request, jsonify, redirect, url_for, flash, current_app
 from flask_login import login_user, login_required, logout_user, current_user
 from flask_wtf import FlaskForm
@@ -11,13 +12,22 @@ from models.team_alias import TeamAlias
 from models.player import Player
 from models.question import Question
 from models.reader import Reader
-from extensions import db, login_manager
+from extensions import db
 
 reader_bp = Blueprint('reader', __name__, template_folder='../templates/reader')
 
-@login_manager.user_loader
-def load_reader(reader_id):
-    return Reader.query.get(int(reader_id))
+# Decorator to ensure a reader (not an admin's login session) is logged in
+def reader_login_required(f):
+    @wraps(f)
+    @login_required
+    def decorated_function(*args, **kwargs):
+        if not current_user.is_reader:
+            if request.is_json or '/api/' in request.path:
+                return jsonify({'error': 'Reader login required'}), 403
+            flash('Please log in as a reader to continue', 'warning')
+            return redirect(url_for('reader.login'))
+        return f(*args, **kwargs)
+    return decorated_function
 
 def format_reference(ref):
     """Convert reference like 'S2R1M4' to 'Stage 2 Round 1 Match 4'"""
@@ -62,7 +72,7 @@ class LoginForm(FlaskForm):
 
 @reader_bp.route('/register', methods=['GET', 'POST'])
 def register():
-    if current_user.is_authenticated:
+    if current_user.is_authenticated and current_user.is_reader:
         return redirect(url_for('reader.dashboard'))
     
     form = RegistrationForm()
@@ -89,7 +99,7 @@ def register():
 
 @reader_bp.route('/login', methods=['GET', 'POST'])
 def login():
-    if current_user.is_authenticated:
+    if current_user.is_authenticated and current_user.is_reader:
         return redirect(url_for('reader.dashboard'))
     
     form = LoginForm()
@@ -117,7 +127,7 @@ def logout():
     return redirect(url_for('reader.login'))
 
 @reader_bp.route('/dashboard')
-@login_required
+@reader_login_required
 def dashboard():
     # Get tournaments assigned to the current reader
     # No need to call .all() on an association proxy, it's already a list-like object
@@ -125,13 +135,13 @@ def dashboard():
     return render_template('reader/dashboard.html', tournaments=tournaments)
 
 @reader_bp.route('/tournament/<int:tournament_id>')
-@login_required
+@reader_login_required
 def view_tournament(tournament_id):
     # Redirect to the tournament_games endpoint which handles room assignments
     return redirect(url_for('reader.tournament_games', tournament_id=tournament_id))
 
 @reader_bp.route('/tournament/<int:tournament_id>/games')
-@login_required
+@reader_login_required
 def tournament_games(tournament_id):
     tournament = Tournament.query.get_or_404(tournament_id)
     
@@ -257,9 +267,9 @@ def resolve_team_reference(tournament_id, team_ref, depth=0, max_depth=5):
             - If pending: (None, None, {'ref': team_ref, 'game': game_details, 'team1': team1_name, 'team2': team2_name})
             - If error: (None, None, None)
     """
-    print(f"Resolving reference: {team_ref} (depth: {depth})")  # Debug log
+    current_app.logger.debug("Resolving reference: %s (depth: %s)", team_ref, depth)  # Debug log
     if depth > max_depth:
-        print(f"Maximum recursion depth ({max_depth}) exceeded resolving reference: {team_ref}")
+        current_app.logger.debug("Maximum recursion depth (%s) exceeded resolving reference: %s", max_depth, team_ref)
         return None, None, None
         
     if not team_ref or not isinstance(team_ref, str):
@@ -289,7 +299,7 @@ def resolve_team_reference(tournament_id, team_ref, depth=0, max_depth=5):
         # Format: S{stage}R{round}M{match}
         match = re.match(r'^S(\d+)R(\d+)M(\d+)$', ref)
         if not match:
-            print(f"Invalid team reference format: {team_ref}")
+            current_app.logger.debug("Invalid team reference format: %s", team_ref)
             return None, None, None
             
         stage_num, round_num, match_num = map(int, match.groups())
@@ -322,18 +332,18 @@ def resolve_team_reference(tournament_id, team_ref, depth=0, max_depth=5):
                 elif games_in_round:  # If only one game in round, use it
                     ref_game = games_in_round[0]
                     
-                print(f"Found game {ref_game.id if ref_game else 'None'} for {team_ref} (position {match_num} of {len(games_in_round)} games in round)")
+                current_app.logger.debug("Found game %s for %s (position %s of %s games in round)", ref_game.id if ref_game else 'None', team_ref, match_num, len(games_in_round))
             else:
-                print(f"Found game {ref_game.id} for {team_ref} by match_num")
+                current_app.logger.debug("Found game %s for %s by match_num", ref_game.id, team_ref)
         except Exception as e:
-            print(f"Error finding game for {team_ref}: {str(e)}")
+            current_app.logger.warning("Error finding game for %s: %s", team_ref, str(e))
         
         if not ref_game:
-            print(f"Referenced game not found: {team_ref} (S{stage_num}R{round_num}M{match_num})")
+            current_app.logger.debug("Referenced game not found: %s (S%sR%sM%s)", team_ref, stage_num, round_num, match_num)
             return None, None, None
             
-        print(f"Resolving {team_ref} (S{stage_num}R{round_num}M{match_num}) - Game ID: {ref_game.id}")
-        print(f"  Teams: {ref_game.team1} vs {ref_game.team2}, Result: {ref_game.result}")
+        current_app.logger.debug("Resolving %s (S%sR%sM%s) - Game ID: %s", team_ref, stage_num, round_num, match_num, ref_game.id)
+        current_app.logger.debug("  Teams: %s vs %s, Result: %s", ref_game.team1, ref_game.team2, ref_game.result)
             
         # Get team names for the pending game
         team1_name = None
@@ -372,7 +382,7 @@ def resolve_team_reference(tournament_id, team_ref, depth=0, max_depth=5):
         }
         
         if ref_game.result is None:
-            print(f"Referenced game {team_ref} has no result yet")
+            current_app.logger.debug("Referenced game %s has no result yet", team_ref)
             return None, None, game_info
             
         # Get the winning/losing team based on reference type
@@ -381,7 +391,7 @@ def resolve_team_reference(tournament_id, team_ref, depth=0, max_depth=5):
         elif ref_game.result == -1:  # Team 2 won
             team_id = ref_game.team2 if ref_type == 'W' else ref_game.team1
         else:
-            print(f"Referenced game {team_ref} ended in a tie")
+            current_app.logger.debug("Referenced game %s ended in a tie", team_ref)
             game_info['is_tie'] = True
             return None, None, game_info
             
@@ -391,17 +401,17 @@ def resolve_team_reference(tournament_id, team_ref, depth=0, max_depth=5):
         elif ref_game.result == -1:  # Team 2 won
             winner_id = ref_game.team2 if ref_type in ['W', 'T'] else ref_game.team1
         else:  # Tie or no result
-            print(f"Referenced game {team_ref} ended in a tie or has no result")
+            current_app.logger.debug("Referenced game %s ended in a tie or has no result", team_ref)
             game_info['is_tie'] = True
             return None, None, game_info
             
         # Check if the winner is itself a dynamic reference
         if isinstance(winner_id, str) and (winner_id.startswith('W(') or winner_id.startswith('L(') or winner_id.startswith('T(')):
-            print(f"Winner is another dynamic reference: {winner_id}, resolving recursively...")
+            current_app.logger.debug("Winner is another dynamic reference: %s, resolving recursively...", winner_id)
             if depth < max_depth:
                 return resolve_team_reference(tournament_id, winner_id, depth + 1, max_depth)
             else:
-                print(f"Max recursion depth reached for reference: {winner_id}")
+                current_app.logger.debug("Max recursion depth reached for reference: %s", winner_id)
                 return None, None, game_info
         
         # Get the team name from aliases
@@ -412,24 +422,22 @@ def resolve_team_reference(tournament_id, team_ref, depth=0, max_depth=5):
         ).order_by(TeamAlias.id.desc()).first()  # Get the most recent alias if multiple exist
         
         if not team_alias:
-            print(f"No alias found for team ID: {winner_id} in stage {ref_game.stage_id}")
+            current_app.logger.debug("No alias found for team ID: %s in stage %s", winner_id, ref_game.stage_id)
             # If no alias, try to find by team name as a fallback
             if isinstance(winner_id, str) and (winner_id.startswith('T') or winner_id.isdigit()):
                 return winner_id, f"Team {winner_id}", None
             return None, None, game_info
             
-        print(f"Resolved {team_ref} -> {winner_id} ({team_alias.team_name})")
+        current_app.logger.debug("Resolved %s -> %s (%s)", team_ref, winner_id, team_alias.team_name)
         return winner_id, team_alias.team_name, None
         
     except Exception as e:
-        print(f"Error resolving team reference {team_ref}: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        current_app.logger.exception("Error resolving team reference %s: %s", team_ref, str(e))
         return None, None, None
 
 @reader_bp.route('/game/<int:game_id>', methods=['GET', 'POST'])
 def submit_game(game_id):
-    print(f"\n=== DEBUG: Starting submit_game for game_id: {game_id} ===")
+    current_app.logger.debug("submit_game started for game %s", game_id)
     game = Game.query.get_or_404(game_id)
     
     # Get the tournament for this game
@@ -439,7 +447,7 @@ def submit_game(game_id):
         flash("Tournament not found", "danger")
         return redirect(url_for('reader.select_tournament'))
         
-    print(f"Found tournament: {tournament.name} (ID: {tournament.id})")
+    current_app.logger.debug("Found tournament: %s (ID: %s)", tournament.name, tournament.id)
     
     # Check if game is already completed (result is not None and not -2)
     if game.result is not None and game.result != -2:
@@ -470,7 +478,7 @@ def submit_game(game_id):
         if resolved_id and resolved_name:
             team1_id = resolved_id
             team1_display_name = resolved_name
-            print(f"Resolved team1 reference: {game.team1} -> {team1_id} ({team1_display_name})")
+            current_app.logger.debug("Resolved team1 reference: %s -> %s (%s)", game.team1, team1_id, team1_display_name)
         elif pending_info:
             pending_team1_info = pending_info
             # Include the reference in the display name
@@ -488,7 +496,7 @@ def submit_game(game_id):
         if resolved_id and resolved_name:
             team2_id = resolved_id
             team2_display_name = resolved_name
-            print(f"Resolved team2 reference: {game.team2} -> {team2_id} ({team2_display_name})")
+            current_app.logger.debug("Resolved team2 reference: %s -> %s (%s)", game.team2, team2_id, team2_display_name)
         elif pending_info:
             pending_team2_info = pending_info
             # Include the reference in the display name
@@ -518,10 +526,10 @@ def submit_game(game_id):
             team2_display_name = alias.team_name
     
     # Debug info
-    print(f"\n=== DEBUG: Looking up team aliases ===")
-    print(f"Tournament ID: {tournament.id}")
-    print(f"Team 1 ID: {team1_id}, Name: {team1_display_name}")
-    print(f"Team 2 ID: {team2_id}, Name: {team2_display_name}")
+    current_app.logger.debug("Looking up team aliases")
+    current_app.logger.debug("Tournament ID: %s", tournament.id)
+    current_app.logger.debug("Team 1 ID: %s, Name: %s", team1_id, team1_display_name)
+    current_app.logger.debug("Team 2 ID: %s, Name: %s", team2_id, team2_display_name)
     
     # Get team aliases using the resolved team IDs
     team1_alias = TeamAlias.query.filter_by(
@@ -548,8 +556,8 @@ def submit_game(game_id):
         ).first()
     
     # Debug the found aliases
-    print(f"Team 1 Alias: {team1_alias.team_name if team1_alias else 'Not found'}")
-    print(f"Team 2 Alias: {team2_alias.team_name if team2_alias else 'Not found'}")
+    current_app.logger.debug("Team 1 Alias: %s", team1_alias.team_name if team1_alias else 'Not found')
+    current_app.logger.debug("Team 2 Alias: %s", team2_alias.team_name if team2_alias else 'Not found')
     
     # Team display names should already be set from earlier resolution
     
@@ -558,11 +566,11 @@ def submit_game(game_id):
     
     def get_players_for_team(team_id, team_name, team_number):
         if not team_id:
-            print(f"No team_id provided for team {team_number}")
+            current_app.logger.debug("No team_id provided for team %s", team_number)
             return []
             
-        print(f"\n=== DEBUG: Looking up players for team {team_number} ===")
-        print(f"Team ID: {team_id}, Name: {team_name}")
+        current_app.logger.debug("Looking up players for team %s", team_number)
+        current_app.logger.debug("Team ID: %s, Name: %s", team_id, team_name)
         
         players = []
         
@@ -572,9 +580,9 @@ def submit_game(game_id):
             team_id=team_id
         ).all()
         
-        print(f"Found {len(aliases)} aliases for team {team_id}:")
+        current_app.logger.debug("Found %s aliases for team %s:", len(aliases), team_id)
         for alias in aliases:
-            print(f"  - Alias ID: {alias.id}, Name: {alias.team_name}, Stage: {alias.stage_id}")
+            current_app.logger.debug("  - Alias ID: %s, Name: %s, Stage: %s", alias.id, alias.team_name, alias.stage_id)
             
             # Get players associated with this alias
             alias_players = Player.query.filter_by(
@@ -582,24 +590,24 @@ def submit_game(game_id):
             ).all()
             
             for p in alias_players:
-                print(f"    - Player: {p.name} (ID: {p.id}, Alias ID: {p.alias_id})")
+                current_app.logger.debug("    - Player: %s (ID: %s, Alias ID: %s)", p.name, p.id, p.alias_id)
                 players.append({'id': p.id, 'name': p.name})
         
         # If no players found through aliases, try direct team_id match
         if not players:
-            print("No players found through aliases, trying direct team_id match...")
+            current_app.logger.debug("No players found through aliases, trying direct team_id match...")
             direct_players = Player.query.filter_by(
                 team_id=team_id
             ).all()
             
-            print(f"Found {len(direct_players)} players by direct team_id match")
+            current_app.logger.debug("Found %s players by direct team_id match", len(direct_players))
             for p in direct_players:
-                print(f"  - {p.name} (ID: {p.id}, Team ID: {p.team_id})")
+                current_app.logger.debug("  - %s (ID: %s, Team ID: %s)", p.name, p.id, p.team_id)
                 players.append({'id': p.id, 'name': p.name})
         
         # If still no players, try matching by team name as a last resort
         if not players and team_name and team_name != f"Team {team_number}":
-            print(f"No players found by ID, trying to find by team name: {team_name}")
+            current_app.logger.debug("No players found by ID, trying to find by team name: %s", team_name)
             
             # Find aliases with this team name in this tournament
             name_aliases = TeamAlias.query.filter(
@@ -613,7 +621,7 @@ def submit_game(game_id):
                 ).all()
                 
                 for p in alias_players:
-                    print(f"  - {p.name} (ID: {p.id}, Team: {alias.team_name})")
+                    current_app.logger.debug("  - %s (ID: %s, Team: %s)", p.name, p.id, alias.team_name)
                     players.append({'id': p.id, 'name': p.name})
         
         # Convert list of names to list of player objects with unique IDs
@@ -638,14 +646,14 @@ def submit_game(game_id):
     players_team1 = get_players_for_team(team1_id, team1_display_name, 1) if team1_id else []
     players_team2 = get_players_for_team(team2_id, team2_display_name, 2) if team2_id else []
     
-    print(f"\n=== Final Player Counts ===")
-    print(f"Team 1 ({team1_display_name}): {len(players_team1)} players")
-    print(f"Team 2 ({team2_display_name}): {len(players_team2)} players")
+    current_app.logger.debug("Final player counts")
+    current_app.logger.debug("Team 1 (%s): %s players", team1_display_name, len(players_team1))
+    current_app.logger.debug("Team 2 (%s): %s players", team2_display_name, len(players_team2))
     
     # Team 2 players are now handled by the get_players_for_team function
     
     # Get questions and bonuses for this game
-    print("\n=== DEBUG: Fetching questions ===")
+    current_app.logger.debug("Fetching questions")
     questions = Question.query.filter(
         Question.tournament_id == tournament.id,
         Question.stage == str(game.stage_id) if hasattr(game, 'stage_id') else True,
@@ -653,11 +661,11 @@ def submit_game(game_id):
         Question.is_bonus == False
     ).order_by(Question.question_number).all()
     
-    print(f"Found {len(questions)} questions for tournament {tournament.id}, round {game.round_number}")
+    current_app.logger.debug("Found %s questions for tournament %s, round %s", len(questions), tournament.id, game.round_number)
     for i, q in enumerate(questions[:3]):  # Print first 3 questions as sample
-        print(f"  Q{i+1}: ID={q.id}, Number={q.question_number}, Text: {q.question_text[:50]}...")
+        current_app.logger.debug("  Q%s: ID=%s, Number=%s, Text: %s...", i+1, q.id, q.question_number, q.question_text[:50])
     
-    print("\n=== DEBUG: Fetching bonuses ===")
+    current_app.logger.debug("Fetching bonuses")
     bonuses = Question.query.filter(
         Question.tournament_id == tournament.id,
         Question.stage == str(game.stage_id) if hasattr(game, 'stage_id') else True,
@@ -665,7 +673,7 @@ def submit_game(game_id):
         Question.is_bonus == True
     ).order_by(Question.question_number).all()
     
-    print(f"Found {len(bonuses)} bonus questions from DB")
+    current_app.logger.debug("Found %s bonus questions from DB", len(bonuses))
     
     # Format bonuses for the frontend
     formatted_bonuses = []
@@ -678,16 +686,16 @@ def submit_game(game_id):
         }
         formatted_bonuses.append(formatted_bonus)
     
-    print(f"Formatted {len(formatted_bonuses)} bonuses for template. Sample: {formatted_bonuses[0] if formatted_bonuses else 'None'}")
+    current_app.logger.debug("Formatted %s bonuses for template. Sample: %s", len(formatted_bonuses), formatted_bonuses[0] if formatted_bonuses else 'None')
     
     # For GET request, render the game view
     if request.method == 'GET':
-        print("\n=== DEBUG: Processing GET request ===")
-        print(f"Game ID: {game.id}, Round: {game.round_number}, Stage: {getattr(game, 'stage_id', 'N/A')}")
+        current_app.logger.debug("Processing GET request")
+        current_app.logger.debug("Game ID: %s, Round: %s, Stage: %s", game.id, game.round_number, getattr(game, 'stage_id', 'N/A'))
         
         # Initialize scorecard if it doesn't exist
         if not game.scorecard:
-            print("Initializing new scorecard")
+            current_app.logger.debug("Initializing new scorecard")
             # Create a new scorecard with 20 empty cycles
             empty_cycle = {
                 'tossup': {'points': 0, 'team': None, 'player': None},
@@ -792,7 +800,7 @@ def submit_game(game_id):
         }
         
         # Convert questions to dictionaries for JSON serialization
-        print("\n=== DEBUG: Formatting questions for JSON ===")
+        current_app.logger.debug("Formatting questions for JSON")
         formatted_questions = [
             {
                 'id': q.id,
@@ -808,8 +816,8 @@ def submit_game(game_id):
             for q in questions[:20]  # Only take the first 20 questions
         ]
         
-        print(f"Formatted {len(formatted_questions)} questions for JSON")
-        print("Sample question:", formatted_questions[0] if formatted_questions else "No questions")
+        current_app.logger.debug("Formatted %s questions for JSON", len(formatted_questions))
+        current_app.logger.debug("Sample question: %s", formatted_questions[0] if formatted_questions else "No questions")
         
         return render_template(
             'reader/match_view.html',
@@ -837,11 +845,11 @@ def submit_game(game_id):
             if not data:
                 return jsonify({'error': 'Invalid JSON data'}), 400
             
-            print(f"Received data: {data}")  # Debug log
+            current_app.logger.debug("Received data: %s", data)  # Debug log
             
             # Validate the scorecard data
             if 'scorecard' not in data or not isinstance(data['scorecard'], list):
-                print(f"Invalid scorecard data: {data.get('scorecard')}")  # Debug log
+                current_app.logger.debug("Invalid scorecard data: %s", data.get('scorecard'))  # Debug log
                 return jsonify({'error': 'Invalid scorecard data'}), 400
             
             # Update the game's scorecard with the raw data
@@ -892,11 +900,10 @@ def submit_game(game_id):
                             team2_score += points
             
             # Log the raw scorecard data for debugging
-            print("\n=== RAW SCORECARD DATA ===")
-            print(json.dumps(data['scorecard'], indent=2))
+            current_app.logger.debug("Raw scorecard data: %s", data['scorecard'])
             
             # Log detailed score calculation
-            print("\n=== DETAILED SCORE CALCULATION ===")
+            current_app.logger.debug("Calculating scores")
             
             # Reset scores to ensure we're calculating from scratch
             team1_score = 0
@@ -904,8 +911,8 @@ def submit_game(game_id):
             
             # Process each cycle in the scorecard
             for i, cycle in enumerate(data['scorecard'], 1):
-                print(f"\n--- Cycle {i} ---")
-                print(f"Cycle data: {json.dumps(cycle, indent=2)}")
+                current_app.logger.debug("\n--- Cycle %s ---", i)
+                current_app.logger.debug("Cycle data: %s", cycle)
                 
                 # Initialize cycle scores
                 cycle_team1 = 0
@@ -917,7 +924,7 @@ def submit_game(game_id):
                         if isinstance(points, (int, float)) or (isinstance(points, str) and points.lstrip('-').isdigit()):
                             points_int = int(points)
                             cycle_team1 += points_int
-                            print(f"  Team 1 Player {player_id}: {points_int} points")
+                            current_app.logger.debug("  Team 1 Player %s: %s points", player_id, points_int)
                 
                 # Process team2 player points (from sample_scorecard.json format)
                 if 'team2' in cycle and isinstance(cycle['team2'], dict):
@@ -925,18 +932,18 @@ def submit_game(game_id):
                         if isinstance(points, (int, float)) or (isinstance(points, str) and points.lstrip('-').isdigit()):
                             points_int = int(points)
                             cycle_team2 += points_int
-                            print(f"  Team 2 Player {player_id}: {points_int} points")
+                            current_app.logger.debug("  Team 2 Player %s: %s points", player_id, points_int)
                 
                 # Process bonus points (from sample_scorecard.json format)
                 if 'team1Bonus' in cycle and isinstance(cycle['team1Bonus'], (int, float, str)):
                     bonus = int(cycle['team1Bonus']) if str(cycle['team1Bonus']).lstrip('-').isdigit() else 0
                     cycle_team1 += bonus
-                    print(f"  Team 1 Bonus: {bonus} points")
+                    current_app.logger.debug("  Team 1 Bonus: %s points", bonus)
                 
                 if 'team2Bonus' in cycle and isinstance(cycle['team2Bonus'], (int, float, str)):
                     bonus = int(cycle['team2Bonus']) if str(cycle['team2Bonus']).lstrip('-').isdigit() else 0
                     cycle_team2 += bonus
-                    print(f"  Team 2 Bonus: {bonus} points")
+                    current_app.logger.debug("  Team 2 Bonus: %s points", bonus)
                 
                 # Process buzzes to determine tossup results (from sample_scorecard.json format)
                 if 'buzzes' in cycle and isinstance(cycle['buzzes'], dict):
@@ -954,57 +961,57 @@ def submit_game(game_id):
                         
                         # Check which team has the correct answer
                         if cycle_team1 > 0:
-                            print(f"  Team 1 got the tossup: {cycle_team1} points")
+                            current_app.logger.debug("  Team 1 got the tossup: %s points", cycle_team1)
                         elif cycle_team2 > 0:
-                            print(f"  Team 2 got the tossup: {cycle_team2} points")
+                            current_app.logger.debug("  Team 2 got the tossup: %s points", cycle_team2)
                     
                     # Process all buzzes for negs
                     for percent, result in cycle['buzzes'].items():
                         if result == 'Incorrect' and percent.replace('.', '').isdigit():
                             # Find which team made the incorrect buzz
                             if cycle_team1 < 0:
-                                print(f"  Team 1 incorrect buzz: {cycle_team1} points")
+                                current_app.logger.debug("  Team 1 incorrect buzz: %s points", cycle_team1)
                             elif cycle_team2 < 0:
-                                print(f"  Team 2 incorrect buzz: {cycle_team2} points")
+                                current_app.logger.debug("  Team 2 incorrect buzz: %s points", cycle_team2)
                 
                 # Add cycle scores to totals
                 team1_score += cycle_team1
                 team2_score += cycle_team2
-                print(f"Cycle {i} totals - Team 1: {cycle_team1}, Team 2: {cycle_team2}")
+                current_app.logger.debug("Cycle %s totals - Team 1: %s, Team 2: %s", i, cycle_team1, cycle_team2)
             
             # Update game scores with calculated values
             game.team1_score = team1_score
             game.team2_score = team2_score
             
             # Log final scores and result determination
-            print("\n=== FINAL SCORE CALCULATION ===")
-            print(f"Team 1 Total Score: {team1_score}")
-            print(f"Team 2 Total Score: {team2_score}")
+            current_app.logger.debug("Final score calculation")
+            current_app.logger.debug("Team 1 Total Score: %s", team1_score)
+            current_app.logger.debug("Team 2 Total Score: %s", team2_score)
             
             # Determine the game result with detailed logging
             if team1_score > team2_score:
                 game.result = 1  # Team 1 (first team in DB) wins
-                print("RESULT: Team 1 wins (result = 1)")
+                current_app.logger.debug("RESULT: Team 1 wins (result = 1)")
             elif team2_score > team1_score:
                 game.result = -1  # Team 2 (second team in DB) wins
-                print("RESULT: Team 2 wins (result = -1)")
+                current_app.logger.debug("RESULT: Team 2 wins (result = -1)")
             else:
                 # Check if all questions have been used (tie with no tiebreakers left)
                 total_questions = len(questions) if questions else 0
                 questions_used = len([cycle for cycle in data['scorecard'] 
                                    if cycle.get('tossupResult', {}).get('team') is not None])
                 
-                print(f"Tie detected. Questions used: {questions_used}/{total_questions}")
+                current_app.logger.debug("Tie detected. Questions used: %s/%s", questions_used, total_questions)
                 
                 if questions_used >= total_questions:
                     # All questions used and still a tie
                     game.result = 0  # Declare a tie
-                    print("RESULT: All questions used - declaring a tie (result = 0)")
+                    current_app.logger.debug("RESULT: All questions used - declaring a tie (result = 0)")
                 else:
                     # Not all questions used, but we have a tie - this shouldn't normally happen
                     game.result = 0  # Declare a tie as a fallback
-                    print("RESULT: Tie detected before all questions used - declaring a tie (result = 0)")
-                    print(f"WARNING: Unexpected tie after {questions_used} questions with {total_questions} total questions")
+                    current_app.logger.debug("RESULT: Tie detected before all questions used - declaring a tie (result = 0)")
+                    current_app.logger.warning("Unexpected tie after %s questions with %s total questions", questions_used, total_questions)
             
             db.session.commit()
             
@@ -1021,6 +1028,59 @@ def submit_game(game_id):
     
     return jsonify({'error': 'Invalid request method'}), 405
 
+@reader_bp.route('/game/<int:game_id>/sync', methods=['POST'])
+@reader_login_required
+def sync_game_cycles(game_id):
+    """
+    Accept a batch of scorecard cycle deltas while a game is being read.
+
+    Expected JSON payload:
+    {
+        "client_id": "match view session id",
+        "cycles": [{"seq": 1, "index": 0, "cycle": {...}}, ...]
+    }
+
+    Replayed deltas are ignored, so the client can safely resend after a
+    dropped connection. The response's acked_seq is the highest sequence
+    number applied; the client only needs to resend deltas after it.
+    """
+    from sqlalchemy.exc import IntegrityError
+    from utils.scorecard_sync import SyncError, get_acked_seq, parse_sync_request, sync_cycles
+
+    if not request.is_json:
+        return jsonify({'success': False, 'error': 'Request must be JSON'}), 400
+    try:
+        client_id, deltas = parse_sync_request(request.get_json(silent=True))
+    except SyncError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+    game = Game.query.get_or_404(game_id)
+    if game.result != -2:
+        # The final scorecard was already submitted and supersedes any buffered deltas
+        return jsonify({
+            'success': False,
+            'error': 'Game has already been submitted',
+            'acked_seq': get_acked_seq(game.id, client_id)
+        }), 409
+
+    # A concurrent retry of the same batch can win the insert; the second pass
+    # then sees its rows as duplicates
+    for attempt in range(2):
+        try:
+            result = sync_cycles(game, client_id, deltas)
+            db.session.commit()
+            break
+        except IntegrityError:
+            db.session.rollback()
+            if attempt:
+                return jsonify({'success': False, 'error': 'Conflicting sync in progress, retry'}), 409
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error("Error syncing cycles for game %s: %s", game_id, e)
+            return jsonify({'success': False, 'error': f'Error syncing game: {str(e)}'}), 500
+
+    return jsonify({'success': True, **result.to_dict()})
+
 @reader_bp.route('/game/<int:game_id>/questions')
 def get_game_questions(game_id):
     game = Game.query.get_or_404(game_id)
@@ -1052,7 +1112,7 @@ def get_game_questions(game_id):
     )
 
 @reader_bp.route('/api/teams/add_player', methods=['POST'])
-@login_required
+@reader_login_required
 def add_player_to_team():
     """
     API endpoint to add a player to a team during a game.
@@ -1177,7 +1237,7 @@ def add_player_to_team():
         current_app.logger.info('=== END add_player_to_team ===')
 
 @reader_bp.route('/api/game/<int:game_id>/players')
-@login_required
+@reader_login_required
 def get_game_players(game_id):
     """
     API endpoint to get the list of players for both teams in a game.
@@ -113,7 +113,9 @@ fi
 
 # Patch systemd service to use venv gunicorn
 echo "📝 Ensuring systemd uses virtualenv Gunicorn..."
-if ! grep -q "$VENV_PATH/bin/gunicorn" "$SYSTEMD_FILE"; then
+# Threaded workers: each server-sent events stream (/api/events/stream) holds a
+# thread for up to STREAM_MAX_AGE seconds, which would block a whole sync worker
+if ! grep -q "$VENV_PATH/bin/gunicorn.*--worker-class gthread" "$SYSTEMD_FILE"; then
     echo "🔄 Patching $SYSTEMD_FILE"
 
     cat <<UNITFILE > "$SYSTEMD_FILE"
@@ -126,7 +128,7 @@ User=root
 Group=www-data
 WorkingDirectory=$REMOTE_PATH
 Environment="PATH=$VENV_PATH/bin"
-ExecStart=$VENV_PATH/bin/gunicorn --workers 3 --bind unix:$REMOTE_PATH/cannoli.sock wsgi:app --timeout 120
+ExecStart=$VENV_PATH/bin/gunicorn --workers 3 --worker-class gthread --threads 16 --bind unix:$REMOTE_PATH/cannoli.sock wsgi:app --timeout 120
 
 [Install]
 WantedBy=multi-user.target
@@ -16,9 +16,10 @@ migrate = Migrate()
 
 @login_manager.user_loader
 def load_user(user_id):
+    # The one loader for admins and readers, backed by a short-lived identity cache
     # Import inside function to avoid circular imports
-    from models.admin import Admin
-    return Admin.query.get(int(user_id))
+    from utils.user_cache import load_user as load_cached_user
+    return load_cached_user(user_id)
 
 def init_extensions(app):
     """Initialize Flask extensions with the given app."""
@@ -28,16 +29,21 @@ def init_extensions(app):
     migrate.init_app(app, db)
     
     with app.app_context():
+        # Apply connection pragmas before the first connection is opened
+        from utils.db_config import DATABASE_DEFAULTS, get_database_settings, register_engine_events
+        settings = get_database_settings({key: app.config[key] for key in DATABASE_DEFAULTS if key in app.config})
+        register_engine_events(db.engine, settings)
+        
         # Import models inside app context to avoid circular imports
         from models import tournament, game, admin, question, team_alias, player
         from sqlalchemy import inspect, text
         
         # Check if the admin table has needs_password_change column
         inspector = inspect(db.engine)
-        columns = [col['name'] for col in inspector.get_columns('admin')]
+        columns = [col['name'] for col in inspector.get_columns('admin')] if inspector.has_table('admin') else None
         
-        # Add missing column if needed
-        if 'needs_password_change' not in columns:
+        # Add missing column if needed (a new database gets it from create_all below)
+        if columns is not None and 'needs_password_change' not in columns:
             try:
                 with db.engine.connect() as conn:
                     conn.execute(text('ALTER TABLE admin ADD COLUMN needs_password_change BOOLEAN DEFAULT TRUE NOT NULL'))
@@ -0,0 +1,419 @@
+"""
+Load test for a simulated live tournament.
+
+Seeds a throwaway SQLite database with a tournament built from
+formats/8-rr-de.json, replicated until there is one room per reader, and plays
+its preliminary rounds: every reader logs in, opens each of their games,
+syncs the sample_scorecard.json cycles one at a time and submits the final
+scorecard, while spectators keep reloading the leaderboard and schedules
+(sending If-None-Match like a browser). Prints p50/p95/p99 latency,
+throughput and errors per endpoint.
+
+Everything runs in this process against a temporary database: by default
+through the Flask test client, or with --http through a local threaded
+werkzeug server on a free port. CSRF checks and secure-only cookies are
+turned off for the virtual users.
+
+Usage:
+    python load_test.py                              # 30 readers, 200 spectators
+    python load_test.py --readers 10 --spectators 50 --rounds 1
+    python load_test.py --http --cycle-ms 200
+"""
+import argparse
+import copy
+import http.cookiejar
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from datetime import date
+
+# Add the current directory to the path so we can import models
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+FORMAT_FILE = os.path.join(BASE_DIR, 'formats', '8-rr-de.json')
+SAMPLE_SCORECARD = os.path.join(BASE_DIR, 'sample_scorecard.json')
+
+READER_PASSWORD = 'loadtest'
+PLAIN_TEAM_PATTERN = re.compile(r'^T(\d+)$')
+
+
+# ---------------------------------------------------------------------------
+# Fixtures
+# ---------------------------------------------------------------------------
+
+def scale_format(format_data, copies):
+    """
+    Replicate every round's pairings so the format has `copies` times the teams.
+
+    Copy k plays teams T(n + k * teams_per_copy) and its bracket references
+    point at its own copy of the referenced match, so later stages still
+    resolve within the copy.
+    """
+    from utils.format_cache import parse_game_reference
+
+    scaled = copy.deepcopy(format_data)
+    stages = scaled['tournament_format']['stages']
+    pairing_counts = {
+        (stage['stage_id'], rnd.get('round_in_stage')): len(rnd.get('pairings', []))
+        for stage in stages for rnd in stage.get('rounds', [])
+    }
+    teams_per_copy = max(
+        int(PLAIN_TEAM_PATTERN.match(team).group(1))
+        for stage in stages for rnd in stage.get('rounds', []) for pairing in rnd.get('pairings', [])
+        for team in pairing.get('teams', []) if PLAIN_TEAM_PATTERN.match(team)
+    )
+
+    def shift(team_ref, k):
+        plain = PLAIN_TEAM_PATTERN.match(team_ref)
+        if plain:
+            return f'T{int(plain.group(1)) + k * teams_per_copy}'
+        reference = parse_game_reference(team_ref)
+        if reference is None:
+            return team_ref
+        kind, stage_id, round_number, match_number = reference
+        match_number += k * pairing_counts[(stage_id, round_number)]
+        return f'{kind}(S{stage_id}R{round_number}M{match_number})'
+
+    for stage in stages:
+        for rnd in stage.get('rounds', []):
+            originals = rnd.get('pairings', [])
+            rnd['pairings'] = [
+                dict(pairing,
+                     match_number=pairing['match_number'] + k * len(originals),
+                     teams=[shift(team, k) for team in pairing.get('teams', [])])
+                for k in range(copies) for pairing in originals
+            ]
+    return scaled, teams_per_copy * copies
+
+
+def create_load_tournament(readers):
+    """Create the tournament, its teams, players, questions, stage-1 games and readers."""
+    from extensions import db
+    from models import Player, Question, Reader, ReaderTournament, TeamAlias, Tournament
+    from utils.game_generation import generate_games
+
+    with open(FORMAT_FILE) as f:
+        base_format = json.load(f)
+    first_round = base_format['tournament_format']['stages'][0]['rounds'][0]
+    copies = -(-readers // len(first_round['pairings']))  # ceil
+    format_data, team_count = scale_format(base_format, copies)
+
+    tournament = Tournament(
+        name='Load Test Invitational',
+        date=date.today(),
+        location='Load test',
+        password='loadtest',
+        format_json=json.dumps(format_data),
+        status='active'
+    )
+    db.session.add(tournament)
+    db.session.flush()
+
+    first_names = ["Alex", "Jamie", "Taylor", "Jordan", "Casey", "Riley", "Quinn"]
+    team_names = {}
+    for i in range(1, team_count + 1):
+        team = TeamAlias(tournament_id=tournament.id, team_id=f'T{i}', team_name=f'Team {i}', stage_id=1)
+        db.session.add(team)
+        db.session.flush()
+        team_names[team.team_id] = team.team_name
+        for j in range(1, 5):
+            db.session.add(Player(name=f'{random.choice(first_names)} {i}-{j}', team_id=team.team_id, alias_id=team.id))
+
+    stage = format_data['tournament_format']['stages'][0]
+    for rnd in stage['rounds']:
+        for number in range(1, 21):
+            for is_bonus in (False, True):
+                db.session.add(Question(
+                    question_type='bonus' if is_bonus else 'tossup',
+                    question_text=' '.join(['Sample question text'] * 12),
+                    answer=f'Answer {number}',
+                    question_number=number,
+                    round=rnd['round_in_stage'],
+                    stage=str(stage['stage_id']),
+                    tournament_id=tournament.id,
+                    order=number,
+                    is_bonus=is_bonus,
+                    bonus_part=1 if is_bonus else None
+                ))
+
+    generate_games(tournament, [stage['stage_id']])
+
+    emails = []
+    for room in range(1, readers + 1):
+        reader = Reader(email=f'reader{room}@loadtest.example.org')
+        reader.set_password(READER_PASSWORD)
+        db.session.add(reader)
+        db.session.flush()
+        db.session.add(ReaderTournament(reader_id=reader.id, tournament_id=tournament.id, room_number=room))
+        emails.append(reader.email)
+
+    db.session.commit()
+    return tournament.id, emails, list(team_names.values())
+
+
+def room_schedule(tournament_id, readers):
+    """Map each room to its game IDs, the same way the reader's game list assigns them."""
+    from models import Game
+
+    schedule = {room: [] for room in range(1, readers + 1)}
+    games = Game.query.filter_by(tournament_id=tournament_id).order_by(Game.stage_id, Game.round_number, Game.id).all()
+    by_round = {}
+    for game in games:
+        by_round.setdefault((game.stage_id, game.round_number), []).append(game.id)
+    for key in sorted(by_round):
+        for room, game_id in enumerate(by_round[key], 1):
+            if room in schedule:
+                schedule[room].append(game_id)
+    return schedule
+
+
+# ---------------------------------------------------------------------------
+# Clients
+# ---------------------------------------------------------------------------
+
+class TestClientSession:
+    """One virtual user's cookies, driving the app in process."""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, headers=None, json_body=None, form=None):
+        response = self.client.open(path, method=method, headers=headers or {}, json=json_body, data=form)
+        return response.status_code, response.headers.get('ETag')
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    # Report redirects as they are, like the test client does
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+class HttpSession:
+    """One virtual user's cookies, driving a server over HTTP."""
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()), _NoRedirect)
+
+    def request(self, method, path, headers=None, json_body=None, form=None):
+        headers = dict(headers or {})
+        data = None
+        if json_body is not None:
+            data = json.dumps(json_body).encode()
+            headers['Content-Type'] = 'application/json'
+        elif form is not None:
+            data = urllib.parse.urlencode(form).encode()
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        req = urllib.request.Request(self.base_url + path, data=data, headers=headers, method=method)
+        try:
+            with self.opener.open(req, timeout=60) as response:
+                response.read()
+                return response.status, response.headers.get('ETag')
+        except urllib.error.HTTPError as e:
+            e.read()
+            return e.code, e.headers.get('ETag')
+
+
+# ---------------------------------------------------------------------------
+# Virtual users
+# ---------------------------------------------------------------------------
+
+class Recorder:
+    """Thread-safe per-endpoint latencies, statuses and errors."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = {}
+        self.not_modified = {}
+        self.errors = {}
+        self.error_statuses = {}  # label -> {status: count}, for the breakdown under the table
+
+    def call(self, session, label, method, path, **kwargs):
+        start = time.perf_counter()
+        try:
+            status, etag = session.request(method, path, **kwargs)
+        except Exception:
+            status, etag = None, None
+        elapsed = time.perf_counter() - start
+        with self.lock:
+            self.latencies.setdefault(label, []).append(elapsed)
+            if status == 304:
+                self.not_modified[label] = self.not_modified.get(label, 0) + 1
+            if status is None or status >= 400:
+                self.errors[label] = self.errors.get(label, 0) + 1
+                statuses = self.error_statuses.setdefault(label, {})
+                statuses[status] = statuses.get(status, 0) + 1
+        return status, etag
+
+
+def reader_user(session, recorder, email, tournament_id, game_ids, cycles, cycle_delay, stop):
+    """Log in, then read each assigned game: open it, sync cycle by cycle, submit."""
+    status, _ = recorder.call(session, 'POST /reader/login', 'POST', '/reader/login',
+                              form={'email': email, 'password': READER_PASSWORD})
+    if status != 302:
+        # The login form re-rendered or failed; everything after would just redirect to it
+        print(f"{email}: login failed with status {status}, skipping this reader")
+        return
+    client_id = email.split('@')[0]
+    for game_id in game_ids:
+        if stop.is_set():
+            return
+        recorder.call(session, 'GET /reader/tournament/<id>/games', 'GET', f'/reader/tournament/{tournament_id}/games')
+        recorder.call(session, 'GET /reader/game/<id>', 'GET', f'/reader/game/{game_id}')
+        for index, cycle in enumerate(cycles):
+            if stop.wait(cycle_delay):
+                return
+            recorder.call(session, 'POST /reader/game/<id>/sync', 'POST', f'/reader/game/{game_id}/sync',
+                          json_body={'client_id': f'{client_id}-{game_id}',
+                                     'cycles': [{'seq': index + 1, 'index': index, 'cycle': cycle}]})
+        recorder.call(session, 'POST /reader/game/<id>', 'POST', f'/reader/game/{game_id}',
+                      json_body={'scorecard': cycles})
+
+
+def spectator_user(session, recorder, tournament_id, team_names, think, stop):
+    """Reload the leaderboard and schedules, revalidating with the last ETag seen."""
+    etags = {}
+    pages = [
+        ('GET /tournament/<id>/leaderboard', f'/tournament/{tournament_id}/leaderboard', 4),
+        ('GET /schedule/<id>', f'/schedule/{tournament_id}', 4),
+        ('GET /schedule/<id>/<team>', None, 2),
+    ]
+    weights = [weight for _, _, weight in pages]
+    while not stop.is_set():
+        label, path, _ = random.choices(pages, weights)[0]
+        if path is None:
+            path = f'/schedule/{tournament_id}/{urllib.parse.quote(random.choice(team_names))}'
+        headers = {'If-None-Match': etags[path]} if path in etags else {}
+        status, etag = recorder.call(session, label, 'GET', path, headers=headers)
+        if etag:
+            etags[path] = etag
+        # Spread spectators out so they don't all reload in lockstep
+        stop.wait(random.uniform(0.5, 1.5) * think)
+
+
+# ---------------------------------------------------------------------------
+# Reporting
+# ---------------------------------------------------------------------------
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def report(recorder, seconds):
+    print(f"\n{'endpoint':<38} {'count':>7} {'per sec':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'304':>6} {'errors':>6}")
+    print("-" * 96)
+    total = 0
+    for label in sorted(recorder.latencies):
+        values = recorder.latencies[label]
+        total += len(values)
+        print(f"{label:<38} {len(values):>7} {len(values) / seconds:>8.1f} "
+              f"{percentile(values, 50) * 1000:>8.1f} {percentile(values, 95) * 1000:>8.1f} "
+              f"{percentile(values, 99) * 1000:>8.1f} {recorder.not_modified.get(label, 0):>6} "
+              f"{recorder.errors.get(label, 0):>6}")
+    print("-" * 96)
+    print(f"{'total':<38} {total:>7} {total / seconds:>8.1f}   over {seconds:.1f}s")
+    if recorder.error_statuses:
+        print("\nerrors by status (None = no response):")
+        for label in sorted(recorder.error_statuses):
+            breakdown = ', '.join(f"{status}: {count}" for status, count in
+                                  sorted(recorder.error_statuses[label].items(), key=lambda item: -item[1]))
+            print(f"  {label:<36} {breakdown}")
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--readers', type=int, default=30, help='Rooms with a reader submitting scorecards')
+    parser.add_argument('--spectators', type=int, default=200, help='Concurrent leaderboard/schedule viewers')
+    parser.add_argument('--rounds', type=int, default=None, help='Preliminary rounds each reader plays (default: all)')
+    parser.add_argument('--cycle-ms', type=float, default=500, help='Reader pause between synced cycles')
+    parser.add_argument('--think-ms', type=float, default=2000, help='Average spectator pause between page loads')
+    parser.add_argument('--http', action='store_true', help='Serve the app on a local port and use real HTTP')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # The app reads its configuration at import time
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmp, 'loadtest.db')}"
+        os.environ.setdefault('LOG_LEVEL', 'ERROR')
+        os.environ.setdefault('LOG_REQUEST_SAMPLE_RATE', '0')
+        os.environ.setdefault('LOG_SLOW_REQUEST_MS', '1e9')
+        from app import app
+        app.config.update(WTF_CSRF_ENABLED=False, SESSION_COOKIE_SECURE=False, REMEMBER_COOKIE_SECURE=False)
+
+        with app.app_context():
+            tournament_id, emails, team_names = create_load_tournament(args.readers)
+            schedule = room_schedule(tournament_id, args.readers)
+        with open(SAMPLE_SCORECARD) as f:
+            cycles = json.load(f)
+
+        server = None
+        if args.http:
+            from werkzeug.serving import make_server
+            server = make_server('127.0.0.1', 0, app, threaded=True)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            base_url = f'http://127.0.0.1:{server.server_port}'
+            new_session = lambda: HttpSession(base_url)
+            print(f"Serving on {base_url}")
+        else:
+            new_session = lambda: TestClientSession(app)
+
+        rounds = len(next(iter(schedule.values()), []))
+        rounds = min(rounds, args.rounds) if args.rounds else rounds
+        print(f"{args.readers} readers x {rounds} rounds x {len(cycles)} cycles, "
+              f"{args.spectators} spectators, {len(team_names)} teams")
+
+        recorder = Recorder()
+        stop = threading.Event()
+        readers = [
+            threading.Thread(target=reader_user, args=(
+                new_session(), recorder, email, tournament_id, schedule[room][:rounds], cycles, args.cycle_ms / 1000, stop))
+            for room, email in enumerate(emails, 1)
+        ]
+        spectators = [
+            threading.Thread(target=spectator_user, args=(
+                new_session(), recorder, tournament_id, team_names, args.think_ms / 1000, stop))
+            for _ in range(args.spectators)
+        ]
+
+        started = time.perf_counter()
+        for thread in readers + spectators:
+            thread.start()
+        try:
+            # The test lasts as long as the readers take to finish their games
+            for thread in readers:
+                thread.join()
+        except KeyboardInterrupt:
+            print("Interrupted; reporting what was collected")
+        stop.set()
+        for thread in spectators:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        if server is not None:
+            server.shutdown()
+        report(recorder, elapsed)
+
+        with app.app_context():
+            from extensions import db
+            db.engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
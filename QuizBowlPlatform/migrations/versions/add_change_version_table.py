@@ -0,0 +1,33 @@
+"""Add change_version table for cache invalidation shared between workers
+
+Revision ID: add_change_version_table
+Revises: add_game_cycle_table
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_change_version_table'
+down_revision = 'add_game_cycle_table'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases created with db.create_all() after the model was added already have it
+    if sa.inspect(op.get_bind()).has_table('change_version'):
+        return
+    op.create_table('change_version',
+        sa.Column('tournament_id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('table_name', sa.String(length=50), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('modified_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('tournament_id', 'table_name')
+    )
+
+
+def downgrade():
+    op.drop_table('change_version')
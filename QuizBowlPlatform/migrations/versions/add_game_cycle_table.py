@@ -0,0 +1,40 @@
+"""Add game_cycle table for incremental scorecard sync
+
+Revision ID: add_game_cycle_table
+Revises: add_query_path_indexes
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_game_cycle_table'
+down_revision = 'add_query_path_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases created with db.create_all() after the model was added already have it
+    if sa.inspect(op.get_bind()).has_table('game_cycle'):
+        return
+    op.create_table('game_cycle',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('game_id', sa.Integer(), nullable=False),
+        sa.Column('client_id', sa.String(length=64), nullable=False),
+        sa.Column('seq', sa.Integer(), nullable=False),
+        sa.Column('cycle_index', sa.Integer(), nullable=False),
+        sa.Column('data', sa.Text(), nullable=True),
+        sa.Column('received_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['game_id'], ['game.id'], name='fk_game_cycle_game'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('game_id', 'client_id', 'seq', name='uq_game_cycle_client_seq')
+    )
+    op.create_index('ix_game_cycle_game_id', 'game_cycle', ['game_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_game_cycle_game_id', table_name='game_cycle')
+    op.drop_table('game_cycle')
@@ -0,0 +1,48 @@
+"""Add indexes for hot Game/TeamAlias/Question/Alert/RoomAlias filters
+
+Revision ID: add_query_path_indexes
+Revises: add_room_alias_table
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_query_path_indexes'
+down_revision = 'add_room_alias_table'
+branch_labels = None
+depends_on = None
+
+
+# (index name, table, columns)
+INDEXES = [
+    ('ix_game_tournament_stage_round', 'game', ['tournament_id', 'stage_id', 'round_number']),
+    ('ix_team_alias_tournament_team', 'team_alias', ['tournament_id', 'team_id']),
+    ('ix_team_alias_tournament_name_stage', 'team_alias', ['tournament_id', 'team_name', 'stage_id']),
+    ('ix_team_alias_tournament_stage', 'team_alias', ['tournament_id', 'stage_id']),
+    ('ix_question_game_id', 'question', ['game_id']),
+    ('ix_question_tournament_stage_round', 'question', ['tournament_id', 'stage', 'round']),
+    ('ix_alerts_resolved', 'alerts', ['resolved']),
+    ('ix_room_alias_tournament_room', 'room_alias', ['tournament_id', 'room_number']),
+]
+
+
+def _existing_indexes(table):
+    inspector = sa.inspect(op.get_bind())
+    return {index['name'] for index in inspector.get_indexes(table)}
+
+
+def upgrade():
+    # Databases created with db.create_all() after the models gained these
+    # indexes already have them, so only create the missing ones
+    for name, table, columns in INDEXES:
+        if name not in _existing_indexes(table):
+            op.create_index(name, table, columns, unique=False)
+
+
+def downgrade():
+    for name, table, columns in reversed(INDEXES):
+        if name in _existing_indexes(table):
+            op.drop_index(name, table_name=table)
@@ -4,6 +4,7 @@ from extensions import db
 # These imports are used to ensure SQLAlchemy knows about all models when creating tables
 from .tournament import Tournament
 from .game import Game
+from .game_cycle import GameCycle
 from .player import Player
 from .question import Question
 from .team_alias import TeamAlias
@@ -12,11 +13,13 @@ from .admin import Admin
 from .reader import Reader, ReaderTournament
 from .alert import Alert
 from .protest import Protest
+from .change_version import ChangeVersion
 
 # Make models available at the package level
 __all__ = [
     'Tournament',
     'Game',
+    'GameCycle',
     'Player',
     'Question',
     'TeamAlias',
@@ -25,5 +28,6 @@ __all__ = [
     'Alert',
     'Reader',
     'ReaderTournament',
-    'Protest'
+    'Protest',
+    'ChangeVersion'
 ]
@@ -25,5 +25,9 @@ class Admin(db.Model, UserMixin):
     def check_password(self, password):
         return check_password_hash(self.password_hash, password)
     
+    def get_id(self):
+        # Admin and reader IDs overlap, so the session ID carries the role
+        return f'admin:{self.id}'
+    
     def __repr__(self):
         return f'<Admin {self.username}>'
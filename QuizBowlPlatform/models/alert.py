@@ -17,7 +17,7 @@ class Alert(db.Model):
     level = Column(SQLAlchemyEnum(AlertLevel), nullable=False)  # TD call or emergency
     message = Column(String(500), nullable=True)  # Optional message
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    resolved = Column(db.Boolean, default=False, nullable=False)
+    resolved = Column(db.Boolean, default=False, nullable=False, index=True)
     resolved_at = Column(DateTime, nullable=True)
     
     # Relationship
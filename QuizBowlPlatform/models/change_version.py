@@ -0,0 +1,16 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime
+from extensions import db
+
+class ChangeVersion(db.Model):
+    """Version counter for one tournament's rows in one table (see utils/change_tracking.py)."""
+    __tablename__ = 'change_version'
+
+    # 0 stands for every tournament: bulk statements that don't say which tournaments they touched
+    tournament_id = Column(Integer, primary_key=True, autoincrement=False)
+    table_name = Column(String(50), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    modified_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<ChangeVersion {self.table_name} tournament={self.tournament_id} v{self.version}>'
@@ -1,10 +1,14 @@
 from extensions import db
-from sqlalchemy import ForeignKey, Column, Integer, String, Text
+from sqlalchemy import ForeignKey, Column, Integer, String, Text, Index
 from datetime import datetime
 
 class Game(db.Model):
     __tablename__ = 'game'
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # Games are almost always looked up by tournament, stage and round
+        Index('ix_game_tournament_stage_round', 'tournament_id', 'stage_id', 'round_number'),
+        {'extend_existing': True}
+    )
     
     id = Column(db.Integer, primary_key=True)
     team1 = Column(String(100), nullable=False)
@@ -19,6 +23,7 @@ class Game(db.Model):
     tournament = db.relationship('Tournament', back_populates='games')
     questions = db.relationship('Question', back_populates='game_rel', lazy=True, foreign_keys='Question.game_id')
     alerts = db.relationship('Alert', back_populates='game', lazy='dynamic', cascade='all, delete-orphan')
+    cycles = db.relationship('GameCycle', back_populates='game', lazy='dynamic', cascade='all, delete-orphan')
     
     def __repr__(self):
         return f'<Game {self.team1} vs {self.team2} (Round {self.round_number})>'
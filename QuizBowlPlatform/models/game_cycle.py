@@ -0,0 +1,25 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, UniqueConstraint
+from extensions import db
+
+class GameCycle(db.Model):
+    """A scorecard cycle delta synced from a reader's match view (see utils/scorecard_sync.py)."""
+    __tablename__ = 'game_cycle'
+    __table_args__ = (
+        # A replayed delta has the same (game, client, seq) and is rejected
+        UniqueConstraint('game_id', 'client_id', 'seq', name='uq_game_cycle_client_seq'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    game_id = Column(Integer, ForeignKey('game.id', name='fk_game_cycle_game'), nullable=False, index=True)
+    client_id = Column(String(64), nullable=False)  # One match view session (browser tab)
+    seq = Column(Integer, nullable=False)  # Per-client sequence number, starting at 1
+    cycle_index = Column(Integer, nullable=False)  # Position of the cycle in the game
+    data = Column(Text, nullable=True)  # Cycle JSON; NULL when the cycle was thrown out
+    received_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    # Relationships
+    game = db.relationship('Game', back_populates='cycles')
+
+    def __repr__(self):
+        return f'<GameCycle game={self.game_id} client={self.client_id} seq={self.seq} cycle={self.cycle_index}>'
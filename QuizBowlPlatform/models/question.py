@@ -1,9 +1,12 @@
-from sqlalchemy import Column, Integer, String, Text, JSON, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, JSON, ForeignKey, Index
 from extensions import db
 
 class Question(db.Model):
     __tablename__ = 'question'
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index('ix_question_tournament_stage_round', 'tournament_id', 'stage', 'round'),
+        {'extend_existing': True}
+    )
     
     id = Column(Integer, primary_key=True)
     question_type = Column(String(10), nullable=False)  # 'tossup' or 'bonus'
@@ -13,7 +16,7 @@ class Question(db.Model):
     round = Column(Integer, nullable=False)
     stage = Column(String(50), nullable=False)
     tournament_id = Column(Integer, ForeignKey('tournament.id', name='fk_question_tournament'), nullable=False)
-    game_id = Column(Integer, ForeignKey('game.id', name='fk_question_game'))
+    game_id = Column(Integer, ForeignKey('game.id', name='fk_question_game'), index=True)
     order = Column(Integer, nullable=False)
     
     # Bonus-specific fields
@@ -47,6 +47,10 @@ class Reader(UserMixin, db.Model):
     def check_password(self, password):
         return check_password_hash(self.hashed_password, password)
     
+    def get_id(self):
+        # Admin and reader IDs overlap, so the session ID carries the role
+        return f'reader:{self.id}'
+    
     def update_last_login(self):
         self.last_login = datetime.utcnow()
         db.session.commit()
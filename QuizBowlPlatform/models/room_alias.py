@@ -1,8 +1,11 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
 from extensions import db
 
 class RoomAlias(db.Model):
     __tablename__ = 'room_alias'
+    __table_args__ = (
+        Index('ix_room_alias_tournament_room', 'tournament_id', 'room_number'),
+    )
     
     id = Column(Integer, primary_key=True)
     room_name = Column(String(100), nullable=False)
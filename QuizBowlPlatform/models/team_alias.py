@@ -1,9 +1,14 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
 from extensions import db
 
 class TeamAlias(db.Model):
     __tablename__ = 'team_alias'
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index('ix_team_alias_tournament_team', 'tournament_id', 'team_id'),
+        Index('ix_team_alias_tournament_name_stage', 'tournament_id', 'team_name', 'stage_id'),
+        Index('ix_team_alias_tournament_stage', 'tournament_id', 'stage_id'),
+        {'extend_existing': True}
+    )
     
     id = Column(Integer, primary_key=True)
     team_name = Column(String(100), nullable=False)
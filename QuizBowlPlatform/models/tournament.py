@@ -2,9 +2,13 @@ from datetime import datetime
 import random
 import string
 import json
+import logging
 
 from extensions import db
 from sqlalchemy.ext.associationproxy import association_proxy
+from utils.format_cache import get_parsed_format
+
+logger = logging.getLogger(__name__)
 
 class Tournament(db.Model):
     __tablename__ = 'tournament'
@@ -49,7 +53,13 @@ class Tournament(db.Model):
         
     @property
     def format(self):
-        return json.loads(self.format_json)
+        """The parsed format, shared across requests. Treat it as read-only."""
+        return self.parsed_format.data
+
+    @property
+    def parsed_format(self):
+        """The cached ParsedFormat, with max rooms, stage IDs and the pairing index."""
+        return get_parsed_format(self.id, self.format_json or '{}')
         
     @format.setter
     def format(self, value):
@@ -68,67 +78,19 @@ class Tournament(db.Model):
         Calculate the maximum number of rooms needed based on the tournament format.
         This is determined by the maximum number of pairings in any round.
         """
-        print(f"\n=== DEBUG: get_max_rooms() called ===")
-        print(f"Tournament ID: {self.id}, Name: {self.name}")
-        print(f"Format JSON: {self.format_json}")
-        
         if not self.format_json:
-            print("DEBUG: No format_json found, returning 0")
             return 0
             
-        max_rooms = 0
         try:
-            format_data = self.format
-            print(f"Parsed format data: {format_data}")
-            
-            # Check if we have the tournament_format object with stages
-            if 'tournament_format' not in format_data:
-                print("DEBUG: No 'tournament_format' key in format_data")
-                return 0
-                
-            tournament_format = format_data['tournament_format']
-            
-            if 'stages' not in tournament_format:
-                print("DEBUG: No 'stages' key in tournament_format")
-                return 0
-                
-            print(f"Found {len(tournament_format['stages'])} stages")
-            
-            for stage_idx, stage in enumerate(tournament_format['stages'], 1):
-                print(f"\nStage {stage_idx}:")
-                print(f"Stage data: {stage}")
-                
-                if 'rounds' not in stage:
-                    print(f"  No 'rounds' in stage {stage_idx}")
-                    continue
-                    
-                print(f"  Found {len(stage['rounds'])} rounds")
-                
-                for round_idx, round_data in enumerate(stage['rounds'], 1):
-                    print(f"  Round {round_idx}:")
-                    print(f"  Round data: {round_data}")
-                    
-                    # Look for 'pairings' instead of 'games'
-                    if 'pairings' in round_data:
-                        num_games = len(round_data['pairings'])
-                        print(f"    Found {num_games} pairings in this round")
-                        if num_games > max_rooms:
-                            max_rooms = num_games
-                            print(f"    New max_rooms: {max_rooms}")
-                    else:
-                        print("    No 'pairings' key in round data")
-                        
+            max_rooms = self.parsed_format.max_rooms
         except json.JSONDecodeError as e:
-            print(f"ERROR: Failed to parse format_json: {e}")
+            logger.warning("Failed to parse format_json for tournament %s: %s", self.id, e)
             return 0
-        except Exception as e:
-            print(f"ERROR in get_max_rooms: {str(e)}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("Error calculating max rooms for tournament %s", self.id)
             return 0
             
-        print(f"\nFinal max_rooms: {max_rooms}")
-        print("=== END DEBUG ===\n")
+        logger.debug("Tournament %s needs %s rooms", self.id, max_rooms)
         return max_rooms
     
     def get_readers_by_room(self, room_number):
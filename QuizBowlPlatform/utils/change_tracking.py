@@ -0,0 +1,205 @@
+"""
+Per-tournament change tracking for cached, derived data.
+
+SQLAlchemy session events record which tournaments had rows added, changed or
+deleted in the tracked tables. Just before the transaction commits, the
+version row for each (tournament, table) pair in the change_version table is
+bumped, in the same transaction. Every worker process (and any script using
+the app's models) therefore sees the same versions, and caches can compare a
+cheap version tuple, read with one primary-key query, instead of re-querying
+the data to find out whether it is stale.
+
+A scorecard sync for a game still in progress (result -2, only the scorecard
+changed) bumps GAME_PROGRESS instead of 'game', so caches built from finished
+games (schedules, exports, analytics) aren't rebuilt on every cycle of every
+live game; whatever shows live scores reads GAME_PROGRESS as well.
+
+Bulk inserts, ``query.update()`` and ``query.delete()`` do not expose the affected
+tournaments, so they bump a table-wide version (tournament 0) that invalidates
+every tournament for that table.
+
+Writes that bypass the ORM session entirely (raw SQL from maintenance
+scripts) can't be seen, so versions also roll over every MAX_AGE seconds
+(CHANGE_VERSION_MAX_AGE, default 300): anything cached on a version is
+rebuilt at least that often.
+"""
+import os
+import time
+from datetime import datetime
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+# Tables whose rows carry a tournament_id (or are the tournament itself); player
+# rows don't, so a player change bumps the table for every tournament
+TRACKED_TABLES = ('tournament', 'game', 'team_alias', 'room_alias', 'question', 'protest', 'player')
+
+# Tracked key for mid-game scorecard syncs
+GAME_PROGRESS = 'game_progress'
+
+# Stands in for "every tournament" in change_version
+_ALL_TOURNAMENTS = 0
+_PENDING_KEY = 'changed_tournament_tables'
+
+# Seconds after which every version rolls over, for writes the session events can't see
+MAX_AGE = 300
+
+# Last-Modified for data that hasn't changed since change tracking started
+_NEVER = datetime(2000, 1, 1)
+
+
+def _tournament_id_for(obj):
+    table = getattr(obj, '__tablename__', None)
+    if table not in TRACKED_TABLES:
+        return None, None
+    if table == 'tournament':
+        return obj.id, table
+    return getattr(obj, 'tournament_id', None), table
+
+
+def _is_progress(obj):
+    """Whether a changed game is only a scorecard sync for a game still in progress."""
+    if obj.result != -2:
+        return False
+    changed = {attr.key for attr in inspect(obj).attrs if attr.history.has_changes()}
+    return changed <= {'scorecard'}
+
+
+def _collect_changes(session, flush_context):
+    pending = session.info.setdefault(_PENDING_KEY, set())
+    changed = [(obj, False) for obj in list(session.new) + list(session.deleted)]
+    changed += [(obj, True) for obj in session.dirty if session.is_modified(obj)]
+    for obj, updated in changed:
+        tournament_id, table = _tournament_id_for(obj)
+        if table is None:
+            continue
+        if updated and table == 'game' and _is_progress(obj):
+            table = GAME_PROGRESS
+        pending.add((tournament_id if tournament_id is not None else _ALL_TOURNAMENTS, table))
+
+
+def _collect_bulk_changes(orm_execute_state):
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    table = getattr(mapper.class_, '__tablename__', None) if mapper is not None else None
+    if table in TRACKED_TABLES:
+        orm_execute_state.session.info.setdefault(_PENDING_KEY, set()).add((_ALL_TOURNAMENTS, table))
+
+
+def _write_versions(session):
+    # Flush first so the final flush's changes are collected, then bump in the same transaction
+    session.flush()
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        _bump(session, pending)
+
+
+def _discard_changes(session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+_UPSERT_DIALECTS = {
+    'sqlite': sqlite.insert,
+    'postgresql': postgresql.insert,
+}
+
+
+def _bump(session, changes):
+    from models.change_version import ChangeVersion
+
+    table = ChangeVersion.__table__
+    now = datetime.utcnow().replace(microsecond=0)
+    upsert = _UPSERT_DIALECTS.get(session.get_bind().dialect.name)
+    for tournament_id, table_name in sorted(changes):
+        if upsert is not None:
+            # One statement, so two transactions creating the same row can't both insert it
+            statement = upsert(table).values(
+                tournament_id=tournament_id, table_name=table_name, version=1, modified_at=now
+            )
+            session.execute(statement.on_conflict_do_update(
+                index_elements=[table.c.tournament_id, table.c.table_name],
+                set_={'version': table.c.version + 1, 'modified_at': now},
+            ))
+            continue
+        where = (table.c.tournament_id == tournament_id) & (table.c.table_name == table_name)
+        result = session.execute(table.update().where(where).values(version=table.c.version + 1, modified_at=now))
+        if not result.rowcount:
+            session.execute(table.insert().values(
+                tournament_id=tournament_id, table_name=table_name, version=1, modified_at=now
+            ))
+
+
+def mark_changed(changes, session=None):
+    """
+    Bump the version of each (tournament_id, table) pair and commit.
+
+    Only needed for changes the session events can't see. Pending ORM
+    changes in the session are committed along with it.
+
+    Args:
+        changes (iterable): Pairs of (tournament_id, table_name). A tournament_id
+            of None invalidates the table for every tournament.
+        session (Session): Session to use (default: db.session)
+    """
+    if session is None:
+        from extensions import db
+        session = db.session
+    session.info.setdefault(_PENDING_KEY, set()).update(
+        (tournament_id if tournament_id is not None else _ALL_TOURNAMENTS, table) for tournament_id, table in changes
+    )
+    session.commit()
+
+
+def _rows(tournament_id, tables):
+    from extensions import db
+    from models.change_version import ChangeVersion
+
+    return db.session.execute(
+        select(ChangeVersion.tournament_id, ChangeVersion.table_name, ChangeVersion.version, ChangeVersion.modified_at)
+        .where(ChangeVersion.tournament_id.in_((tournament_id, _ALL_TOURNAMENTS)))
+        .where(ChangeVersion.table_name.in_(tables))
+    ).all()
+
+
+def get_version(tournament_id, tables=TRACKED_TABLES):
+    """
+    Get a hashable version for a tournament's rows in the given tables.
+
+    The value changes whenever a committed transaction touched any of those
+    tables for this tournament (or for all tournaments, via bulk statements),
+    and at least every MAX_AGE seconds. It is the same in every process.
+
+    Returns:
+        tuple: Integers; join them to build an ETag
+    """
+    versions = {(row.tournament_id, row.table_name): row.version for row in _rows(tournament_id, tables)}
+    version = []
+    for table in tables:
+        version.append(versions.get((tournament_id, table), 0))
+        version.append(versions.get((_ALL_TOURNAMENTS, table), 0))
+    version.append(int(time.time() // MAX_AGE))
+    return tuple(version)
+
+
+def last_modified(tournament_id, tables=TRACKED_TABLES):
+    """
+    Get the time of the most recent committed change for a tournament.
+
+    Comes from the database, so every process agrees on it.
+    """
+    stamps = [row.modified_at for row in _rows(tournament_id, tables)]
+    return max(stamps) if stamps else _NEVER
+
+
+def init_change_tracking():
+    """Register the session listeners. Safe to call more than once."""
+    global MAX_AGE
+    MAX_AGE = max(1, int(os.environ.get('CHANGE_VERSION_MAX_AGE', MAX_AGE)))
+    if event.contains(Session, 'after_flush', _collect_changes):
+        return
+    event.listen(Session, 'after_flush', _collect_changes)
+    event.listen(Session, 'do_orm_execute', _collect_bulk_changes)
+    event.listen(Session, 'before_commit', _write_versions)
+    event.listen(Session, 'after_rollback', _discard_changes)
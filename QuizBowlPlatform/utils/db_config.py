@@ -0,0 +1,134 @@
+"""
+Database connection configuration.
+
+The database URI comes from the DATABASE_URL environment variable, falling
+back to the local SQLite file, so the same app can run against PostgreSQL in
+production. SQLite connections are tuned on connect for a tournament's load
+(many rooms writing scorecards while spectators read):
+
+    journal_mode=WAL       readers no longer wait behind a writer
+    synchronous=NORMAL     safe with WAL, avoids an fsync on every commit
+    busy_timeout           writers wait for the lock instead of failing
+    mmap_size              reads served from memory-mapped pages
+
+Every setting can be overridden by an environment variable of the same name.
+"""
+import os
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+DEFAULT_DATABASE_URI = 'sqlite:///quizbowl.db'
+
+DATABASE_DEFAULTS = {
+    'SQLITE_JOURNAL_MODE': 'WAL',
+    'SQLITE_SYNCHRONOUS': 'NORMAL',
+    'SQLITE_BUSY_TIMEOUT_MS': 5000,
+    'SQLITE_MMAP_SIZE': 256 * 1024 * 1024,
+    'DATABASE_POOL_SIZE': 10,
+    'DATABASE_MAX_OVERFLOW': 20,
+    'DATABASE_POOL_TIMEOUT': 30,
+    'DATABASE_POOL_RECYCLE': 1800,
+}
+
+
+def get_database_uri():
+    """Get the database URI from the environment, defaulting to local SQLite."""
+    uri = os.environ.get('DATABASE_URL', DEFAULT_DATABASE_URI)
+    # Some hosts still hand out the pre-SQLAlchemy-1.4 scheme
+    if uri.startswith('postgres://'):
+        uri = 'postgresql://' + uri[len('postgres://'):]
+    return uri
+
+
+def get_database_settings(overrides=None):
+    """
+    Get the tuning settings, applying environment overrides and then any explicit ones.
+
+    Args:
+        overrides (dict): Settings that take precedence over the environment
+
+    Returns:
+        dict: Every key in DATABASE_DEFAULTS with its effective value
+    """
+    settings = {}
+    for key, default in DATABASE_DEFAULTS.items():
+        value = os.environ.get(key)
+        settings[key] = type(default)(value) if value is not None else default
+    settings.update(overrides or {})
+    return settings
+
+
+def _is_file_sqlite(uri):
+    url = make_url(uri)
+    return url.get_backend_name() == 'sqlite' and url.database not in (None, '', ':memory:')
+
+
+def build_engine_options(uri, settings):
+    """
+    Build the create_engine() keyword arguments for a database URI.
+
+    Returns:
+        dict: Suitable for SQLALCHEMY_ENGINE_OPTIONS or sqlalchemy.create_engine
+    """
+    backend = make_url(uri).get_backend_name()
+    if backend == 'sqlite':
+        if not _is_file_sqlite(uri):
+            # In-memory databases live in a single connection; keep the default pool
+            return {'connect_args': {'check_same_thread': False}}
+        return {
+            'pool_size': settings['DATABASE_POOL_SIZE'],
+            'max_overflow': settings['DATABASE_MAX_OVERFLOW'],
+            'pool_timeout': settings['DATABASE_POOL_TIMEOUT'],
+            'connect_args': {
+                # The driver's own lock wait, in seconds, matching busy_timeout
+                'timeout': settings['SQLITE_BUSY_TIMEOUT_MS'] / 1000,
+                'check_same_thread': False,
+            },
+        }
+    return {
+        'pool_size': settings['DATABASE_POOL_SIZE'],
+        'max_overflow': settings['DATABASE_MAX_OVERFLOW'],
+        'pool_timeout': settings['DATABASE_POOL_TIMEOUT'],
+        'pool_recycle': settings['DATABASE_POOL_RECYCLE'],
+        'pool_pre_ping': True,
+    }
+
+
+def apply_sqlite_pragmas(dbapi_connection, settings):
+    """Apply the tuning pragmas to a new SQLite connection."""
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA busy_timeout = {int(settings['SQLITE_BUSY_TIMEOUT_MS'])}")
+        cursor.execute(f"PRAGMA journal_mode = {settings['SQLITE_JOURNAL_MODE']}")
+        cursor.execute(f"PRAGMA synchronous = {settings['SQLITE_SYNCHRONOUS']}")
+        cursor.execute(f"PRAGMA mmap_size = {int(settings['SQLITE_MMAP_SIZE'])}")
+    finally:
+        cursor.close()
+
+
+def register_engine_events(engine, settings):
+    """Tune every new connection on the engine. Only SQLite files need it."""
+    if not _is_file_sqlite(str(engine.url)):
+        return
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        apply_sqlite_pragmas(dbapi_connection, settings)
+
+
+def configure_database(app):
+    """
+    Set the database URI and engine options on the app config.
+
+    Values already present in app.config win over the environment and defaults.
+    """
+    app.config.setdefault('SQLALCHEMY_DATABASE_URI', get_database_uri())
+    overrides = {key: app.config[key] for key in DATABASE_DEFAULTS if key in app.config}
+    settings = get_database_settings(overrides)
+    app.config.update(settings)
+    app.config.setdefault(
+        'SQLALCHEMY_ENGINE_OPTIONS',
+        build_engine_options(app.config['SQLALCHEMY_DATABASE_URI'], settings)
+    )
+    return settings
@@ -0,0 +1,258 @@
+"""
+In-process broadcast hub for real-time tournament events.
+
+Alerts, protests, game results and live scorecard progress are captured from
+SQLAlchemy session events when they are flushed and published once the
+transaction commits, so every code path that writes them (reader, admin and
+API routes alike) notifies subscribers without needing its own call.
+Subscribers receive events on a bounded queue that the server-sent events
+endpoint in routes/events.py drains.
+
+Channels:
+    'admin'                  - every alert, protest and game result
+    'tournament:<id>'        - game results and live scores for one tournament (spectators)
+
+The broker lives in process memory, so it only reaches clients connected to
+the same worker that handled the write; routes/events.py polls the database
+for events committed by other workers. Event ids carry a token for this
+process and boot ('3f9c2a1b-42'), so a Last-Event-ID sent by a client that
+reconnects to another worker, or after a restart, is recognized as foreign
+instead of being compared with this process's sequence.
+"""
+import itertools
+import json
+import queue
+import threading
+import uuid
+from collections import deque
+from datetime import datetime
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+ADMIN_CHANNEL = 'admin'
+_PENDING_KEY = 'pending_broadcast_events'
+
+
+def tournament_channel(tournament_id):
+    """Name of the channel carrying public events for one tournament."""
+    return f'tournament:{tournament_id}'
+
+
+class Subscription:
+    """A subscriber's view of the broker: a bounded queue of events."""
+
+    def __init__(self, broker, channels, max_queue=100):
+        self.broker = broker
+        self.channels = frozenset(channels)
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.dropped = 0
+        self.complete = True  # Whether replay covered everything the client missed
+
+    def put(self, item):
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            # A stalled client should not block publishers; drop its oldest event
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                pass
+            self.dropped += 1
+            self.queue.put_nowait(item)
+
+    def get(self, timeout=None):
+        """Wait for the next event, returning None on timeout."""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class EventBroker:
+    """Fan-out of published events to every subscription on a channel."""
+
+    def __init__(self, history_size=200):
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._ids = itertools.count(1)
+        # Identifies this process and boot in event ids
+        self.boot_id = uuid.uuid4().hex[:8]
+        # Recent events, so reconnecting clients can catch up via Last-Event-ID
+        self._history = deque(maxlen=history_size)
+
+    def event_id(self, item):
+        """The id sent to clients for an event: this broker's boot token and the event's sequence number."""
+        return f"{self.boot_id}-{item['id']}"
+
+    def parse_event_id(self, value):
+        """
+        Get the sequence number from a client's Last-Event-ID.
+
+        Returns:
+            int or None: None if the id came from another process or an earlier boot
+        """
+        token, _, sequence = str(value).rpartition('-')
+        if token != self.boot_id or not sequence.isdigit():
+            return None
+        return int(sequence)
+
+    def subscribe(self, channels, last_event_id=None, max_queue=100):
+        """
+        Register a new subscriber.
+
+        Args:
+            channels (iterable): Channel names to receive events from
+            last_event_id (int): If given, replay retained events newer than this
+                sequence number (see parse_event_id)
+            max_queue (int): Events buffered for this subscriber before dropping
+
+        Returns:
+            Subscription: The new subscription; call close() when done. Its
+                `complete` is False when events after last_event_id have
+                already left the history, so the client must resync.
+        """
+        subscription = Subscription(self, channels, max_queue=max_queue)
+        with self._lock:
+            if last_event_id is not None:
+                if self._history and self._history[0]['id'] > last_event_id + 1:
+                    subscription.complete = False
+                for item in self._history:
+                    if item['id'] > last_event_id and item['channel'] in subscription.channels:
+                        subscription.put(item)
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, channels, event_type, data):
+        """
+        Send an event to every subscriber of any of the given channels.
+
+        A subscriber on several of the channels receives the event once.
+        """
+        if isinstance(channels, str):
+            channels = (channels,)
+        with self._lock:
+            event_id = next(self._ids)
+            delivered = set()
+            for channel in channels:
+                item = {'id': event_id, 'channel': channel, 'event': event_type, 'data': data}
+                self._history.append(item)
+                for subscription in self._subscribers:
+                    if channel in subscription.channels and subscription not in delivered:
+                        subscription.put(item)
+                        delivered.add(subscription)
+        return event_id
+
+    @property
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+
+broker = EventBroker()
+
+
+def format_sse(item):
+    """Encode a broker event as a server-sent events message. Items without an id don't move Last-Event-ID."""
+    event_id = f"id: {broker.event_id(item)}\n" if item.get('id') is not None else ''
+    return f"{event_id}event: {item['event']}\ndata: {json.dumps(item['data'])}\n\n"
+
+
+def _isoformat(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _alert_event(alert, created):
+    data = alert.to_dict() if alert.created_at else {'id': alert.id, 'game_id': alert.game_id}
+    return [ADMIN_CHANNEL], 'alert_created' if created else 'alert_updated', data
+
+
+def _protest_event(protest, created):
+    data = {
+        'id': protest.id,
+        'tournament_id': protest.tournament_id,
+        'game_id': protest.game_id,
+        'cycle_number': protest.cycle_number,
+        'message': protest.message,
+        'status': protest.status,
+        'created_at': _isoformat(protest.created_at),
+        'resolved_at': _isoformat(protest.resolved_at),
+        'resolution_notes': protest.resolution_notes,
+    }
+    return [ADMIN_CHANNEL], 'protest_created' if created else 'protest_updated', data
+
+
+def _game_result_event(game):
+    data = {
+        'id': game.id,
+        'tournament_id': game.tournament_id,
+        'stage_id': game.stage_id,
+        'round_number': game.round_number,
+        'team1': game.team1,
+        'team2': game.team2,
+        'result': game.result,
+    }
+    return [ADMIN_CHANNEL, tournament_channel(game.tournament_id)], 'game_result', data
+
+
+def _game_progress_event(game):
+    # Scores are not columns; scorecard sync sets them on the instance
+    data = {
+        'id': game.id,
+        'tournament_id': game.tournament_id,
+        'team1': game.team1,
+        'team2': game.team2,
+        'team1_score': getattr(game, 'team1_score', None),
+        'team2_score': getattr(game, 'team2_score', None),
+    }
+    return [tournament_channel(game.tournament_id)], 'game_progress', data
+
+
+def _collect_events(session, flush_context):
+    """Capture broadcastable changes while the flushed state is still at hand."""
+    from models.alert import Alert
+    from models.game import Game
+    from models.protest import Protest
+
+    pending = session.info.setdefault(_PENDING_KEY, [])
+    for obj in session.new:
+        if isinstance(obj, Alert):
+            pending.append(_alert_event(obj, created=True))
+        elif isinstance(obj, Protest):
+            pending.append(_protest_event(obj, created=True))
+    for obj in session.dirty:
+        if isinstance(obj, Alert) and inspect(obj).attrs.resolved.history.has_changes():
+            pending.append(_alert_event(obj, created=False))
+        elif isinstance(obj, Protest) and inspect(obj).attrs.status.history.has_changes():
+            pending.append(_protest_event(obj, created=False))
+        elif isinstance(obj, Game):
+            state = inspect(obj)
+            if state.attrs.result.history.has_changes():
+                pending.append(_game_result_event(obj))
+            elif obj.result == -2 and state.attrs.scorecard.history.has_changes():
+                pending.append(_game_progress_event(obj))
+
+
+def _publish_events(session):
+    for channels, event_type, data in session.info.pop(_PENDING_KEY, ()):
+        broker.publish(channels, event_type, data)
+
+
+def _discard_events(session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+def init_event_broker():
+    """Register the session listeners that feed the broker. Safe to call more than once."""
+    if event.contains(Session, 'after_flush', _collect_events):
+        return
+    event.listen(Session, 'after_flush', _collect_events)
+    event.listen(Session, 'after_commit', _publish_events)
+    event.listen(Session, 'after_rollback', _discard_events)
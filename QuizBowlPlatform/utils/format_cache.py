@@ -0,0 +1,109 @@
+"""
+Shared cache of parsed tournament formats.
+
+A tournament's format_json is a multi-kilobyte bracket description that many
+code paths read, often several times per request. It is parsed once per
+distinct (tournament id, format text) and shared across requests together with
+structures derived from it, so editing the format (which changes the text)
+naturally produces a new entry.
+
+The cached format is shared: treat it as read-only. Code that edits a format
+must parse its own copy with json.loads(tournament.format_json) and assign the
+result back through Tournament.format.
+"""
+import json
+import re
+import threading
+from collections import OrderedDict
+
+# Bracket references such as 'W(S2R1M1)', 'L(S2R1M1)' or 'T(S2R1M1)'
+GAME_REFERENCE_PATTERN = re.compile(r'^(W|L|T)\((S(\d+)R(\d+)M(\d+))\)$')
+
+# Distinct formats kept in memory; each tournament normally has just one
+MAX_ENTRIES = 64
+
+_lock = threading.Lock()
+_entries = OrderedDict()  # (tournament_id, hash(format_json)) -> ParsedFormat
+
+
+class ParsedFormat:
+    """A parsed tournament format and the lookups derived from it."""
+
+    def __init__(self, format_json):
+        self.source = format_json
+        self.data = json.loads(format_json)
+
+        tournament_format = self.data.get('tournament_format', {}) if isinstance(self.data, dict) else {}
+        self.stages = tournament_format.get('stages', []) if isinstance(tournament_format, dict) else []
+        self.stages_by_id = {stage.get('stage_id'): stage for stage in self.stages}
+        self.stage_ids = [stage.get('stage_id') for stage in self.stages]
+
+        # (stage_id, round_in_stage, match_number) -> pairing
+        self.pairings = {}
+        self.max_rooms = 0
+        for stage in self.stages:
+            for round_data in stage.get('rounds', []):
+                pairings = round_data.get('pairings', [])
+                self.max_rooms = max(self.max_rooms, len(pairings))
+                for pairing in pairings:
+                    key = (stage.get('stage_id'), round_data.get('round_in_stage'), pairing.get('match_number'))
+                    self.pairings[key] = pairing
+
+    def get_stage(self, stage_id):
+        """Get a stage definition by ID, or None."""
+        return self.stages_by_id.get(stage_id)
+
+    def get_pairing(self, stage_id, round_number, match_number):
+        """Get a pairing by stage, round within the stage and match number, or None."""
+        return self.pairings.get((stage_id, round_number, match_number))
+
+
+def parse_game_reference(team_ref):
+    """
+    Split a bracket reference into its parts.
+
+    Returns:
+        tuple or None: (kind, stage_id, round_number, match_number) for
+            references like 'W(S2R1M1)', or None for plain team IDs
+    """
+    match = GAME_REFERENCE_PATTERN.match(team_ref) if isinstance(team_ref, str) else None
+    if not match:
+        return None
+    kind, _, stage_id, round_number, match_number = match.groups()
+    return kind, int(stage_id), int(round_number), int(match_number)
+
+
+def get_parsed_format(tournament_id, format_json):
+    """
+    Get the parsed format for a tournament, parsing it only on first use.
+
+    Args:
+        tournament_id (int): The tournament's ID (None for unsaved tournaments)
+        format_json (str): The tournament's format text
+
+    Returns:
+        ParsedFormat: The shared parsed format
+
+    Raises:
+        json.JSONDecodeError: If format_json is not valid JSON
+    """
+    key = (tournament_id, hash(format_json))
+    with _lock:
+        entry = _entries.get(key)
+        if entry is not None and entry.source == format_json:
+            _entries.move_to_end(key)
+            return entry
+
+    entry = ParsedFormat(format_json)
+    with _lock:
+        _entries[key] = entry
+        _entries.move_to_end(key)
+        while len(_entries) > MAX_ENTRIES:
+            _entries.popitem(last=False)
+    return entry
+
+
+def clear_format_cache():
+    """Drop every cached format."""
+    with _lock:
+        _entries.clear()
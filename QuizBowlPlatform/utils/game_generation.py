@@ -0,0 +1,178 @@
+"""
+Bulk game generation from a tournament format.
+
+All games for the requested stages are built in memory from the cached parsed
+format, checked once (pairing shape, duplicates and bracket references), and
+inserted with a single executemany INSERT. Existing games are loaded once as
+plain columns instead of being queried pairing by pairing, so the whole run
+costs a constant number of queries no matter how large the bracket is.
+"""
+from sqlalchemy import case, func, insert, select
+
+from extensions import db
+from models.game import Game
+from utils.format_cache import parse_game_reference
+
+
+class GenerationError(ValueError):
+    """Raised when the format cannot produce a valid set of games."""
+
+    def __init__(self, errors):
+        super().__init__('; '.join(errors))
+        self.errors = errors
+
+
+class GenerationSummary:
+    """What a generation run did, for flashing and logging."""
+
+    def __init__(self, created, skipped_existing, skipped_invalid, games_by_stage):
+        self.created = created                    # list of (game_id, stage_id, round_number)
+        self.skipped_existing = skipped_existing  # pairings that already had a game
+        self.skipped_invalid = skipped_invalid    # pairings without exactly two teams
+        self.games_by_stage = games_by_stage      # stage_id -> total games after the run
+
+    @property
+    def created_count(self):
+        return len(self.created)
+
+    def __repr__(self):
+        return (f'<GenerationSummary created={self.created_count} existing={self.skipped_existing} '
+                f'invalid={self.skipped_invalid} by_stage={self.games_by_stage}>')
+
+
+def stage_completion(tournament_id, stage_id, require_scorecard=False):
+    """
+    Count a stage's games and how many are unfinished, in one query.
+
+    Args:
+        tournament_id (int): The tournament's ID
+        stage_id (int): The stage to check
+        require_scorecard (bool): Also count games without a scorecard as unfinished
+
+    Returns:
+        tuple: (total_games, unfinished_games)
+    """
+    unfinished = (Game.result.is_(None)) | (Game.result == -2)
+    if require_scorecard:
+        unfinished = unfinished | Game.scorecard.is_(None)
+    total, incomplete = db.session.execute(
+        select(func.count(Game.id), func.coalesce(func.sum(case((unfinished, 1), else_=0)), 0))
+        .where(Game.tournament_id == tournament_id, Game.stage_id == stage_id)
+    ).one()
+    return total, incomplete
+
+
+def _pair_key(stage_id, round_number, team1, team2):
+    # Games are the same pairing regardless of which team is listed first
+    return stage_id, round_number, frozenset((team1, team2))
+
+
+def plan_games(tournament, stage_ids, resolve_team=None):
+    """
+    Build the rows for every missing game in the given stages, without writing.
+
+    Args:
+        tournament (Tournament): The tournament whose format to expand
+        stage_ids (iterable): Stages to generate games for
+        resolve_team (callable): Maps a format team reference to the value
+            stored on the game; defaults to storing the reference unchanged
+
+    Returns:
+        tuple: (rows, skipped_existing, skipped_invalid)
+
+    Raises:
+        GenerationError: If a stage is missing or a bracket reference points
+            at a pairing that does not exist in an earlier round
+    """
+    parsed = tournament.parsed_format
+    resolve_team = resolve_team or (lambda team_ref: team_ref)
+    stage_ids = list(stage_ids)
+
+    errors = []
+    for stage_id in stage_ids:
+        if parsed.get_stage(stage_id) is None:
+            errors.append(f'Stage {stage_id} not found in the tournament format.')
+    if errors:
+        raise GenerationError(errors)
+
+    existing = {
+        _pair_key(row.stage_id, row.round_number, row.team1, row.team2)
+        for row in db.session.execute(
+            select(Game.stage_id, Game.round_number, Game.team1, Game.team2)
+            .where(Game.tournament_id == tournament.id, Game.stage_id.in_(stage_ids))
+        )
+    }
+
+    rows = []
+    skipped_existing = 0
+    skipped_invalid = 0
+    for stage_id in stage_ids:
+        for rnd in parsed.get_stage(stage_id).get('rounds', []):
+            round_num = rnd.get('round_in_stage') or 1
+            for pairing in rnd.get('pairings', []):
+                teams = pairing.get('teams', [])
+                if len(teams) != 2:
+                    skipped_invalid += 1
+                    continue
+
+                for team_ref in teams:
+                    reference = parse_game_reference(team_ref)
+                    if reference is None:
+                        continue
+                    _, ref_stage, ref_round, ref_match = reference
+                    if parsed.get_pairing(ref_stage, ref_round, ref_match) is None:
+                        errors.append(f'{team_ref} in stage {stage_id} round {round_num} refers to a match that is not in the format.')
+                    elif (ref_stage, ref_round) >= (stage_id, round_num):
+                        errors.append(f'{team_ref} in stage {stage_id} round {round_num} refers to a match that is not played earlier.')
+
+                team1, team2 = (resolve_team(team_ref) for team_ref in teams)
+                key = _pair_key(stage_id, round_num, team1, team2)
+                if key in existing:
+                    skipped_existing += 1
+                    continue
+                existing.add(key)
+                rows.append({
+                    'team1': team1,
+                    'team2': team2,
+                    'tournament_id': tournament.id,
+                    'round_number': round_num,
+                    'stage_id': stage_id,
+                    'result': -2,  # -2 indicates game not started
+                    'scorecard': None,
+                })
+
+    if errors:
+        raise GenerationError(errors)
+    return rows, skipped_existing, skipped_invalid
+
+
+def generate_games(tournament, stage_ids, resolve_team=None):
+    """
+    Create every missing game for the given stages in one INSERT.
+
+    The caller owns the transaction and must commit (or roll back) afterwards.
+
+    Returns:
+        GenerationSummary: Created game IDs and per-stage totals
+
+    Raises:
+        GenerationError: If the format is invalid; nothing is written
+    """
+    stage_ids = list(stage_ids)
+    rows, skipped_existing, skipped_invalid = plan_games(tournament, stage_ids, resolve_team)
+
+    created = []
+    if rows:
+        result = db.session.execute(
+            insert(Game).returning(Game.id, Game.stage_id, Game.round_number, sort_by_parameter_order=True),
+            rows
+        )
+        created = [tuple(row) for row in result]
+
+    games_by_stage = dict(db.session.execute(
+        select(Game.stage_id, func.count(Game.id))
+        .where(Game.tournament_id == tournament.id, Game.stage_id.in_(stage_ids))
+        .group_by(Game.stage_id)
+    ).all())
+
+    return GenerationSummary(created, skipped_existing, skipped_invalid, games_by_stage)
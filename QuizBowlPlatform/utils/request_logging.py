@@ -0,0 +1,170 @@
+"""
+Request logging for the QuizBowl app.
+
+Log records are handed to a queue and written by a background listener thread,
+so file and console I/O never blocks a request thread. Each request produces
+at most one structured summary record on the 'quizbowl.requests' logger with
+its latency and the number of SQL queries it ran. Errors and slow requests are
+always logged; other requests are sampled.
+
+Settings (app config or environment variables of the same name):
+    LOG_LEVEL                  level for application logs (default WARNING,
+                               or DEBUG when the app runs in debug mode; an
+                               unknown name logs a warning and uses the default)
+    LOG_REQUEST_SAMPLE_RATE    fraction of ordinary requests summarized (0.1)
+    LOG_SLOW_REQUEST_MS        requests at least this slow are always logged (500)
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+from extensions import db
+
+REQUEST_LOGGER_NAME = 'quizbowl.requests'
+
+LOGGING_DEFAULTS = {
+    'LOG_REQUEST_SAMPLE_RATE': 0.1,
+    'LOG_SLOW_REQUEST_MS': 500.0,
+}
+
+
+class StructuredFormatter(logging.Formatter):
+    """Render records that carry structured fields as one JSON object per line."""
+
+    def format(self, record):
+        fields = getattr(record, 'fields', None)
+        if fields is None:
+            return super().format(record)
+        payload = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        payload.update(fields)
+        return json.dumps(payload, default=str)
+
+
+def _get_setting(app, key, default):
+    if key in app.config:
+        return app.config[key]
+    value = os.environ.get(key)
+    return type(default)(value) if value is not None else default
+
+
+def _parse_level(name):
+    """Get the numeric level for a level name such as 'INFO', or None if it isn't one."""
+    name = str(name).strip().upper()
+    if name.isdigit():
+        return int(name)
+    if hasattr(logging, 'getLevelNamesMapping'):
+        return logging.getLevelNamesMapping().get(name)
+    # Before Python 3.11; unknown names come back as the string "Level <name>"
+    level = logging.getLevelName(name)
+    return level if isinstance(level, int) else None
+
+
+def _count_query_start(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context():
+        conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+
+def _count_query_end(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('query_start')
+    if not starts or not has_request_context():
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    g.query_count = g.get('query_count', 0) + 1
+    g.query_time = g.get('query_time', 0.0) + elapsed
+
+
+def init_request_logging(app):
+    """
+    Move the app's log handlers behind a queue and add per-request summaries.
+
+    Call after the app's handlers are configured and extensions are initialized.
+    """
+    default_level = 'DEBUG' if app.debug else 'WARNING'
+    level_name = _get_setting(app, 'LOG_LEVEL', default_level)
+    level = _parse_level(level_name)
+    if level is None:
+        level = _parse_level(default_level)
+    sample_rate = float(_get_setting(app, 'LOG_REQUEST_SAMPLE_RATE', LOGGING_DEFAULTS['LOG_REQUEST_SAMPLE_RATE']))
+    slow_ms = float(_get_setting(app, 'LOG_SLOW_REQUEST_MS', LOGGING_DEFAULTS['LOG_SLOW_REQUEST_MS']))
+
+    # The listener thread owns the real handlers; loggers only enqueue records
+    handlers = list(app.logger.handlers) or [logging.StreamHandler()]
+    formatter = StructuredFormatter('%(asctime)s %(levelname)s: %(message)s [in %(pathname)s:%(lineno)d]')
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    log_queue = queue.Queue(-1)
+    queue_handler = QueueHandler(log_queue)
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
+    app.logger.handlers = [queue_handler]
+    app.logger.setLevel(level)
+    app.logger.propagate = False
+
+    # Module loggers such as models.tournament share the same queue
+    root_logger = logging.getLogger()
+    root_logger.handlers = [queue_handler]
+    root_logger.setLevel(level)
+
+    request_logger = logging.getLogger(REQUEST_LOGGER_NAME)
+    request_logger.handlers = [queue_handler]
+    request_logger.setLevel(logging.INFO)
+    request_logger.propagate = False
+
+    if _parse_level(level_name) is None:
+        app.logger.warning("Unknown LOG_LEVEL %r, using %s", level_name, default_level)
+
+    with app.app_context():
+        if not event.contains(db.engine, 'before_cursor_execute', _count_query_start):
+            event.listen(db.engine, 'before_cursor_execute', _count_query_start)
+            event.listen(db.engine, 'after_cursor_execute', _count_query_end)
+
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+        g.query_count = 0
+        g.query_time = 0.0
+
+    @app.after_request
+    def log_request_summary(response):
+        started = g.get('request_started')
+        if started is None:
+            return response
+        duration_ms = (time.perf_counter() - started) * 1000
+
+        if response.status_code >= 500:
+            level = logging.ERROR
+        elif duration_ms >= slow_ms:
+            level = logging.WARNING
+        elif random.random() < sample_rate:
+            level = logging.INFO
+        else:
+            return response
+
+        request_logger.log(level, '%s %s', request.method, request.path, extra={'fields': {
+            'method': request.method,
+            'path': request.path,
+            'endpoint': request.endpoint,
+            'status': response.status_code,
+            'duration_ms': round(duration_ms, 2),
+            'queries': g.get('query_count', 0),
+            'query_ms': round(g.get('query_time', 0.0) * 1000, 2),
+            'sample_rate': sample_rate if level == logging.INFO else 1.0,
+        }})
+        return response
+
+    return listener
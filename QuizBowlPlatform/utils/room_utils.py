@@ -1,40 +1,108 @@
+"""
+Room display names.
+
+Each tournament's room aliases are loaded with one query into a per-process
+map and reused until they change: the map is keyed on the tournament's
+room_alias version from utils.change_tracking. That version lives in the
+database, so an alias committed by any worker (or script) invalidates the map
+in every worker, and it rolls over every CHANGE_VERSION_MAX_AGE seconds so
+even raw SQL edits are picked up. Rendering a schedule or a game list
+therefore costs at most one alias query no matter how many rooms it shows.
+"""
+import threading
+
 from models.room_alias import RoomAlias
+from utils import change_tracking
+
+_lock = threading.Lock()
+_alias_maps = {}  # tournament_id -> (room_alias version, {room_number: room_name})
+
+
+def _get_alias_map(tournament_id):
+    """Get the shared room_number -> room_name map for a tournament. Treat it as read-only."""
+    version = change_tracking.get_version(tournament_id, ('room_alias',))
+    with _lock:
+        entry = _alias_maps.get(tournament_id)
+    if entry is not None and entry[0] == version:
+        return entry[1]
+
+    aliases = {
+        alias.room_number: alias.room_name
+        for alias in RoomAlias.query.filter_by(tournament_id=tournament_id).all()
+    }
+    with _lock:
+        _alias_maps[tournament_id] = (version, aliases)
+    return aliases
+
+
+def invalidate_room_aliases(tournament_id=None):
+    """
+    Drop the cached room aliases for a tournament, or for every tournament.
+
+    Also bumps the shared room_alias version, so other workers reload their
+    maps too. Commits the current session.
+
+    Args:
+        tournament_id (int): The tournament whose aliases changed (None for all)
+    """
+    change_tracking.mark_changed([(tournament_id, 'room_alias')])
+    with _lock:
+        if tournament_id is None:
+            _alias_maps.clear()
+        else:
+            _alias_maps.pop(tournament_id, None)
+
 
 def get_room_display_name(tournament_id, room_number, default_prefix='Room '):
     """
     Get the display name for a room, using the alias if available.
-    
+
     Args:
         tournament_id (int): The ID of the tournament
         room_number (int): The room number to look up
         default_prefix (str): The prefix to use when no alias exists (default: 'Room ')
-        
+
     Returns:
         str: The room's display name (either the alias or the default prefix + number)
     """
     if not room_number:
         return "Unassigned"
-        
-    # Try to find a room alias
-    alias = RoomAlias.query.filter_by(
-        tournament_id=tournament_id,
-        room_number=room_number
-    ).first()
-    
-    if alias and alias.room_name:
-        return alias.room_name
-    
+
+    room_name = _get_alias_map(tournament_id).get(room_number)
+    if room_name:
+        return room_name
+
     return f"{default_prefix}{room_number}"
 
+def get_room_display_names(tournament_id, room_numbers, default_prefix='Room '):
+    """
+    Get the display names for many rooms with at most one query.
+
+    Args:
+        tournament_id (int): The ID of the tournament
+        room_numbers (iterable): The room numbers to look up
+        default_prefix (str): The prefix to use when no alias exists (default: 'Room ')
+
+    Returns:
+        dict: A dictionary mapping each room number to its display name
+    """
+    aliases = _get_alias_map(tournament_id)
+    names = {}
+    for room_number in room_numbers:
+        if not room_number:
+            names[room_number] = "Unassigned"
+        else:
+            names[room_number] = aliases.get(room_number) or f"{default_prefix}{room_number}"
+    return names
+
 def get_room_aliases(tournament_id):
     """
     Get all room aliases for a tournament as a dictionary mapping room numbers to names.
-    
+
     Args:
         tournament_id (int): The ID of the tournament
-        
+
     Returns:
         dict: A dictionary mapping room numbers to their display names
     """
-    aliases = RoomAlias.query.filter_by(tournament_id=tournament_id).all()
-    return {alias.room_number: alias.room_name for alias in aliases}
+    return dict(_get_alias_map(tournament_id))
@@ -0,0 +1,374 @@
+"""
+Precomputed schedule snapshots for the public schedule pages.
+
+Building a schedule means loading every game, team alias and room alias for a
+tournament and resolving bracket references for each pairing. The result only
+changes when one of those rows (or the tournament format) changes, so it is
+built once per tournament and reused until utils.change_tracking reports a
+newer version. Versions live in the database, so a commit on one worker
+invalidates every worker's snapshot. Each snapshot also carries an ETag and
+Last-Modified time, the same in every worker, so clients polling the schedule
+can be answered with a 304.
+"""
+import json
+import threading
+import zlib
+
+from flask import current_app, request
+
+from extensions import db
+from models.game import Game
+from models.team_alias import TeamAlias
+from models.tournament import Tournament
+from utils import change_tracking
+from utils.format_cache import GAME_REFERENCE_PATTERN
+from utils.room_utils import get_room_aliases
+
+# Tables whose rows feed into a tournament's schedule
+SCHEDULE_TABLES = ('tournament', 'game', 'team_alias', 'room_alias')
+
+_lock = threading.Lock()
+_snapshots = {}  # tournament_id -> ScheduleSnapshot
+
+
+class ScheduleSnapshot:
+    """Resolved schedule data for one tournament at one version."""
+
+    def __init__(self, tournament_id, version, last_modified, schedule, team_schedules, team_template, room_aliases):
+        self.tournament_id = tournament_id
+        self.version = version
+        self.last_modified = last_modified
+        self.schedule = schedule
+        self.team_schedules = team_schedules
+        self.team_template = team_template
+        self.room_aliases = room_aliases
+        self.etag = f"{tournament_id}-" + '.'.join(str(part) for part in version)
+
+    def get_team_schedule(self, teamname):
+        """Get the per-team schedule, falling back to an empty one for unknown teams."""
+        if teamname in self.team_schedules:
+            return self.team_schedules[teamname]
+        return {stage_name: dict(data) for stage_name, data in self.team_template.items()}
+
+    def team_etag(self, teamname):
+        """ETag for one team's view; team names are hashed so they stay header-safe."""
+        return f"{self.etag}-{zlib.crc32(teamname.encode('utf-8')):08x}"
+
+    def get_room_display_name(self, tournament_id, room_number, default_prefix='Room '):
+        """Same contract as utils.room_utils.get_room_display_name, without a query per call."""
+        if not room_number:
+            return "Unassigned"
+        return self.room_aliases.get(room_number) or f"{default_prefix}{room_number}"
+
+
+def _scorecard_scores(game):
+    """
+    Sum both teams' points from a game's scorecard.
+
+    Returns:
+        tuple: (score1, score2, is_completed, result) where result is the game
+            result implied by the scores, or None if the scorecard was unusable.
+    """
+    score1 = 0
+    score2 = 0
+    is_completed = game.result != -2  # -2 means not played
+
+    if not game.scorecard:
+        return score1, score2, is_completed, None
+
+    try:
+        scorecard_data = json.loads(game.scorecard)
+        if isinstance(scorecard_data, list):
+            for q in scorecard_data:
+                # Handle both old and new scorecard formats
+                if 'team1' in q and 'team2' in q:
+                    # New format with team1/team2 structure
+                    score1 += sum(int(p) for p in q['team1'].values() if str(p).lstrip('-').isdigit())
+                    score2 += sum(int(p) for p in q['team2'].values() if str(p).lstrip('-').isdigit())
+
+                    # Add bonus points if they exist
+                    if 'team1Bonus' in q and isinstance(q['team1Bonus'], (int, float)):
+                        score1 += int(q['team1Bonus'])
+                    if 'team2Bonus' in q and isinstance(q['team2Bonus'], (int, float)):
+                        score2 += int(q['team2Bonus'])
+                elif 'scores' in q and len(q['scores']) >= 4:
+                    # Old format with scores array
+                    team1_scores = q['scores'][0]
+                    team2_scores = q['scores'][2]
+                    if isinstance(team1_scores, list):
+                        score1 += sum(s for s in team1_scores if isinstance(s, (int, float)))
+                    if isinstance(team2_scores, list):
+                        score2 += sum(s for s in team2_scores if isinstance(s, (int, float)))
+
+        if game.result == -2:
+            # A game being synced cycle by cycle has a partial scorecard but
+            # isn't over until the reader submits it; show the running score as
+            # of this snapshot (syncs bump GAME_PROGRESS, which the schedule
+            # doesn't follow, so it isn't rebuilt on every cycle)
+            return score1, score2, False, None
+
+        if score1 > score2:
+            result = 1  # Team 1 wins
+        elif score2 > score1:
+            result = -1  # Team 2 wins
+        else:
+            result = 0  # Tie
+
+        # Consider game completed if we have non-zero scores
+        return score1, score2, score1 > 0 or score2 > 0, result
+
+    except Exception as e:
+        current_app.logger.error(f"Error parsing scorecard for game {game.id}: {str(e)}")
+        # Fall back to game.result if available
+        if game.result is not None:
+            if game.result == 1:
+                return 1, 0, True, None  # Indicate team 1 won
+            elif game.result == 2:
+                return 0, 1, True, None  # Indicate team 2 won
+            return 0, 0, True, None  # Tie
+        return score1, score2, is_completed, None
+
+
+def _build_snapshot(tournament, version, last_modified):
+    """
+    Resolve the full and per-team schedules for a tournament.
+
+    Returns:
+        tuple: (snapshot, results_changed) where results_changed is True when
+            game results were corrected from their scorecards and need committing.
+    """
+    format_data = tournament.format
+    stages = format_data['tournament_format']['stages']
+
+    aliases = TeamAlias.query.filter_by(tournament_id=tournament.id).all()
+    alias_dict = {alias.team_id: alias.team_name for alias in aliases}
+    prelim_alias_dict = {alias.team_id: alias.team_name for alias in aliases if alias.stage_id == 1}
+
+    room_aliases = get_room_aliases(tournament.id)
+
+    games = Game.query.filter_by(tournament_id=tournament.id).order_by(Game.stage_id, Game.round_number).all()
+
+    # Organize games by stage and round, and create a lookup dict for game references
+    games_by_stage_round = {}
+    game_lookup = {}  # Format: {'S{stage}R{round}M{match}': game}
+    for game in games:
+        stage_id = game.stage_id or 1
+        round_num = game.round_number or 1
+        games_by_stage_round.setdefault(stage_id, {}).setdefault(round_num, []).append(game)
+        game_lookup[f'S{stage_id}R{round_num}M{game.id}'] = game
+
+    def resolve_team_name(team_ref):
+        if not team_ref:
+            return "TBD"
+
+        # If team_ref is not a string, convert to string for consistent handling
+        if not isinstance(team_ref, str):
+            team_ref = str(team_ref)
+
+        # If it's a direct team ID, return the team name
+        if team_ref in alias_dict:
+            return alias_dict[team_ref]
+
+        # Then try converting to int and looking up (for backward compatibility)
+        if team_ref.isdigit():
+            return alias_dict.get(int(team_ref), f"Team {team_ref}")
+
+        # Check if it's a game reference like 'W(S2R1M1)'
+        match = GAME_REFERENCE_PATTERN.match(team_ref)
+        if match:
+            result_type, game_ref = match.groups()[:2]
+
+            ref_game = game_lookup.get(game_ref)
+            if not ref_game or ref_game.result not in (1, -1):
+                return f"Winner/Loser of {game_ref}"
+
+            team1_won = ref_game.result == 1
+            if result_type == 'W':
+                winning_team = str(ref_game.team1 if team1_won else ref_game.team2)
+                return alias_dict.get(winning_team, f"Team {winning_team}")
+            elif result_type == 'L':
+                losing_team = str(ref_game.team2 if team1_won else ref_game.team1)
+                return alias_dict.get(losing_team, f"Team {losing_team}")
+            return f"Tie in {game_ref}"
+
+        # If it's a string that looks like 't1', 't2', etc., look it up by number
+        if team_ref.startswith('t') and team_ref[1:].isdigit():
+            team_id = team_ref[1:]  # Keep as string to match how it's stored
+            return alias_dict.get(team_id, f"Team {team_id}")
+
+        return f"Team {team_ref}"
+
+    results_changed = False
+    schedule = {}
+    for stage in stages:
+        stage_id = stage.get('stage_id')
+        stage_name = stage.get('stage_name')
+        rounds = stage.get('rounds', [])
+
+        # For all stages, show actual games if they exist
+        if stage_id in games_by_stage_round:
+            resolved_rounds = []
+            for round_num, games_in_round in sorted(games_by_stage_round[stage_id].items()):
+                matches = []
+                # Sort games by ID to ensure consistent ordering
+                for match_number, game in enumerate(sorted(games_in_round, key=lambda g: g.id), 1):
+                    team1_name = resolve_team_name(game.team1)
+                    team2_name = resolve_team_name(game.team2) if game.team2 else "TBD"
+
+                    score1, score2, is_completed, result = _scorecard_scores(game)
+                    if result is not None and game.result != result:
+                        game.result = result
+                        results_changed = True
+
+                    matches.append({
+                        'match_number': match_number,
+                        'teams': [team1_name, team2_name],
+                        'scores': [score1, score2],
+                        'completed': is_completed,
+                        # Use match number as room number if no room is assigned
+                        'room_number': getattr(game, 'room_number', match_number)
+                    })
+
+                resolved_rounds.append({
+                    'round': round_num,
+                    'round_name': f"Round {round_num}",
+                    'matches': matches
+                })
+
+            schedule[stage_name] = {
+                'resolved': True,
+                'rounds': resolved_rounds,
+                'is_playoff': stage_id > 1
+            }
+        elif stage_id == 1:
+            # Fallback to format data if no prelim games exist yet
+            resolved_rounds = []
+            for rnd in rounds:
+                round_label = rnd.get('round_in_stage')
+                matches = []
+                for pairing in rnd.get('pairings', []):
+                    match_num = pairing.get('match_number')
+                    matches.append({
+                        'match_number': match_num,
+                        'teams': [alias_dict.get(t, t) for t in pairing.get('teams', [])],
+                        'scores': ["-", "-"],
+                        'completed': False,
+                        'room_number': pairing.get('room_number', match_num)  # Default to match number if no room specified
+                    })
+                resolved_rounds.append({
+                    'round': round_label,
+                    'round_name': f"Round {round_label}",
+                    'matches': matches
+                })
+            schedule[stage_name] = {
+                'resolved': True,
+                'rounds': resolved_rounds,
+                'is_playoff': False
+            }
+        else:
+            schedule[stage_name] = {
+                'resolved': False,
+                'round_count': len(rounds),
+                'is_playoff': True
+            }
+
+    # Per-team schedules come from the prelim pairings in the format, indexed
+    # once by resolved team name instead of re-walking the format per request
+    team_template = {}
+    team_rounds = {}
+    for stage in stages:
+        stage_name = stage.get('stage_name')
+        rounds = stage.get('rounds', [])
+        if stage.get('stage_id') != 1:
+            team_template[stage_name] = {'resolved': False, 'round_count': len(rounds)}
+            continue
+        team_template[stage_name] = {'resolved': True, 'rounds': []}
+        for rnd in rounds:
+            for pairing in rnd.get('pairings', []):
+                resolved = [prelim_alias_dict.get(t, t) for t in pairing.get('teams', [])]
+                for teamname in set(resolved):
+                    opponent = resolved[1] if resolved[0] == teamname else resolved[0]
+                    rounds_for_team = team_rounds.setdefault(teamname, {}).setdefault(stage_name, [])
+                    if not rounds_for_team or rounds_for_team[-1]['round'] != rnd.get('round_in_stage'):
+                        rounds_for_team.append({'round': rnd.get('round_in_stage'), 'matches': [], 'pdf': rnd.get('pdf', None)})
+                    rounds_for_team[-1]['matches'].append({'match_number': pairing.get('match_number'), 'opponent': opponent})
+
+    team_schedules = {}
+    for teamname, stage_rounds in team_rounds.items():
+        team_schedule = {stage_name: dict(data) for stage_name, data in team_template.items()}
+        for stage_name, rounds_for_team in stage_rounds.items():
+            team_schedule[stage_name] = {'resolved': True, 'rounds': rounds_for_team}
+        team_schedules[teamname] = team_schedule
+
+    snapshot = ScheduleSnapshot(
+        tournament.id, version, last_modified, schedule, team_schedules, team_template, room_aliases
+    )
+    return snapshot, results_changed
+
+
+def get_cached_snapshot(tournament_id):
+    """Return the cached snapshot if it is still current, checking only the version row."""
+    version = change_tracking.get_version(tournament_id, SCHEDULE_TABLES)
+    with _lock:
+        snapshot = _snapshots.get(tournament_id)
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+    return None
+
+
+def get_snapshot(tournament):
+    """
+    Get the current schedule snapshot for a tournament, rebuilding it if stale.
+
+    Args:
+        tournament (Tournament): The tournament to get the schedule for
+
+    Returns:
+        ScheduleSnapshot: The resolved schedule
+    """
+    snapshot = get_cached_snapshot(tournament.id)
+    if snapshot is not None:
+        return snapshot
+
+    version = change_tracking.get_version(tournament.id, SCHEDULE_TABLES)
+    last_modified = change_tracking.last_modified(tournament.id, SCHEDULE_TABLES)
+    snapshot, results_changed = _build_snapshot(tournament, version, last_modified)
+
+    if results_changed:
+        # Persist results corrected from scorecards. The commit bumps the game
+        # version, so this snapshot is served once and rebuilt on next request.
+        db.session.commit()
+        return snapshot
+
+    with _lock:
+        _snapshots[tournament.id] = snapshot
+    return snapshot
+
+
+def not_modified(snapshot, etag=None):
+    """
+    Check the request's conditional headers against a snapshot.
+
+    Returns:
+        Response or None: A 304 response if the client's copy is current
+    """
+    etag = etag or snapshot.etag
+    if request.if_none_match:
+        is_current = request.if_none_match.contains(etag)
+    elif request.if_modified_since:
+        is_current = request.if_modified_since.replace(tzinfo=None) >= snapshot.last_modified
+    else:
+        is_current = False
+
+    if not is_current:
+        return None
+    response = current_app.response_class(status=304)
+    return add_cache_headers(response, snapshot, etag)
+
+
+def add_cache_headers(response, snapshot, etag=None):
+    """Attach ETag/Last-Modified and require revalidation on every poll."""
+    response.set_etag(etag or snapshot.etag)
+    response.last_modified = snapshot.last_modified
+    response.cache_control.no_cache = True
+    return response
@@ -0,0 +1,216 @@
+"""
+Incremental scorecard sync for the reader's match view.
+
+Instead of posting the whole scorecard once at the end of a game, the match
+view sends every changed cycle as a delta as soon as it is recorded, keeping
+unacknowledged deltas in localStorage while the connection is down. Each delta
+carries a sequence number that is unique per match view session (client):
+
+    {'seq': 7, 'index': 3, 'cycle': {...}}     # cycle 3 recorded or edited
+    {'seq': 8, 'index': 4, 'cycle': None}      # cycle 4 thrown out
+
+Deltas are stored as they arrive in the game_cycle table, one row per
+(game, client, seq), so replaying a delta is a no-op. Each request's deltas
+are then applied as one batch: the game's scorecard is rebuilt from the
+stored deltas up to each client's highest contiguous sequence number and
+written with a single UPDATE. That number is returned as the acknowledgement,
+so after a dropped connection the client resends only what comes after it.
+
+Synced games keep result -2 until the reader submits the final scorecard; the
+leaderboard shows them as live games in the meantime.
+"""
+import json
+import re
+
+from sqlalchemy import insert, select
+
+from extensions import db
+from models.game_cycle import GameCycle
+
+# Deltas accepted per request; the client sends a longer backlog in several batches
+MAX_BATCH_SIZE = 100
+
+CLIENT_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+
+class SyncError(ValueError):
+    """Raised when a sync request is malformed."""
+
+
+class SyncResult:
+    """The outcome of applying one batch of deltas."""
+
+    def __init__(self, acked_seq, stored, duplicates, team1_score, team2_score, cycle_count):
+        self.acked_seq = acked_seq      # highest contiguous seq stored for the client
+        self.stored = stored            # new deltas written by this batch
+        self.duplicates = duplicates    # replayed deltas that were already stored
+        self.team1_score = team1_score
+        self.team2_score = team2_score
+        self.cycle_count = cycle_count  # cycles in the rebuilt scorecard
+
+    def to_dict(self):
+        return {
+            'acked_seq': self.acked_seq,
+            'stored': self.stored,
+            'duplicates': self.duplicates,
+            'team1_score': self.team1_score,
+            'team2_score': self.team2_score,
+            'cycles': self.cycle_count,
+        }
+
+
+def _as_int(value):
+    if isinstance(value, bool):
+        return 0
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str) and value.lstrip('-').isdigit():
+        return int(value)
+    return 0
+
+
+def score_cycles(cycles):
+    """
+    Total each team's points the same way submit_game does.
+
+    Args:
+        cycles (list): Scorecard cycles in the sample_scorecard.json format
+
+    Returns:
+        tuple: (team1_score, team2_score)
+    """
+    team1_score = 0
+    team2_score = 0
+    for cycle in cycles:
+        if not isinstance(cycle, dict):
+            continue
+        for key in ('team1', 'team2'):
+            if isinstance(cycle.get(key), dict):
+                points = sum(_as_int(p) for p in cycle[key].values())
+                if key == 'team1':
+                    team1_score += points
+                else:
+                    team2_score += points
+        team1_score += _as_int(cycle.get('team1Bonus'))
+        team2_score += _as_int(cycle.get('team2Bonus'))
+    return team1_score, team2_score
+
+
+def parse_sync_request(data):
+    """
+    Validate a sync request body.
+
+    Args:
+        data (dict): {'client_id': str, 'cycles': [{'seq', 'index', 'cycle'}, ...]}
+
+    Returns:
+        tuple: (client_id, deltas) with deltas as (seq, index, cycle) tuples
+
+    Raises:
+        SyncError: If the body or any delta is malformed
+    """
+    if not isinstance(data, dict):
+        raise SyncError('Invalid JSON data')
+    client_id = data.get('client_id')
+    if not isinstance(client_id, str) or not CLIENT_ID_PATTERN.match(client_id):
+        raise SyncError('client_id must be 1-64 letters, digits, dashes or underscores')
+    raw_deltas = data.get('cycles')
+    if not isinstance(raw_deltas, list):
+        raise SyncError('cycles must be a list')
+    if len(raw_deltas) > MAX_BATCH_SIZE:
+        raise SyncError(f'At most {MAX_BATCH_SIZE} cycles can be synced per request')
+
+    deltas = []
+    for delta in raw_deltas:
+        if not isinstance(delta, dict):
+            raise SyncError('Each cycle delta must be an object')
+        seq, index, cycle = delta.get('seq'), delta.get('index'), delta.get('cycle')
+        if not isinstance(seq, int) or isinstance(seq, bool) or seq < 1:
+            raise SyncError('seq must be a positive integer')
+        if not isinstance(index, int) or isinstance(index, bool) or index < 0:
+            raise SyncError('index must be a non-negative integer')
+        if cycle is not None and not isinstance(cycle, dict):
+            raise SyncError('cycle must be an object or null')
+        deltas.append((seq, index, cycle))
+    return client_id, deltas
+
+
+def _contiguous(seqs):
+    acked = 0
+    while acked + 1 in seqs:
+        acked += 1
+    return acked
+
+
+def get_acked_seq(game_id, client_id):
+    """Get the highest contiguous seq stored for a client, 0 if none."""
+    seqs = set(db.session.scalars(
+        select(GameCycle.seq).where(GameCycle.game_id == game_id, GameCycle.client_id == client_id)
+    ))
+    return _contiguous(seqs)
+
+
+def sync_cycles(game, client_id, deltas):
+    """
+    Store a batch of cycle deltas and rebuild the game's scorecard from them.
+
+    Costs one SELECT of the game's stored deltas, at most one INSERT for the
+    new ones and one UPDATE of the game. The caller commits; on an
+    IntegrityError (a concurrent retry stored the same seq first) it should
+    roll back and call again.
+
+    Args:
+        game (Game): The game being read; must not be finished
+        client_id (str): The match view session sending the deltas
+        deltas (list): (seq, index, cycle) tuples from parse_sync_request
+
+    Returns:
+        SyncResult: The acknowledgement and the scores after the batch
+    """
+    rows = db.session.execute(
+        select(GameCycle.client_id, GameCycle.seq, GameCycle.cycle_index, GameCycle.data)
+        .where(GameCycle.game_id == game.id)
+        .order_by(GameCycle.id)
+    ).all()
+    stored = [(row.client_id, row.seq, row.cycle_index, row.data) for row in rows]
+
+    known = {(row_client, seq) for row_client, seq, _, _ in stored}
+    new_rows = []
+    duplicates = 0
+    for seq, index, cycle in deltas:
+        if (client_id, seq) in known:
+            duplicates += 1
+            continue
+        known.add((client_id, seq))
+        data = json.dumps(cycle) if cycle is not None else None
+        new_rows.append({'game_id': game.id, 'client_id': client_id, 'seq': seq,
+                         'cycle_index': index, 'data': data})
+        stored.append((client_id, seq, index, data))
+
+    if new_rows:
+        db.session.execute(insert(GameCycle), new_rows)
+
+    # Only deltas up to each client's contiguous prefix are applied, so a gap
+    # left by a lost request never produces a scorecard with a hole in it
+    seqs_by_client = {}
+    for row_client, seq, _, _ in stored:
+        seqs_by_client.setdefault(row_client, set()).add(seq)
+    applied_through = {row_client: _contiguous(seqs) for row_client, seqs in seqs_by_client.items()}
+
+    cycles_by_index = {}
+    for row_client, seq, index, data in stored:
+        if seq <= applied_through[row_client]:
+            cycles_by_index[index] = data
+    cycles = [json.loads(cycles_by_index[index]) for index in sorted(cycles_by_index)
+              if cycles_by_index[index] is not None]
+
+    team1_score, team2_score = score_cycles(cycles)
+    scorecard = json.dumps(cycles)
+    if new_rows and game.scorecard != scorecard:
+        game.scorecard = scorecard
+    # Not columns; carried on the instance for the progress event
+    game.team1_score = team1_score
+    game.team2_score = team2_score
+
+    return SyncResult(applied_through.get(client_id, 0), len(new_rows), duplicates,
+                      team1_score, team2_score, len(cycles))
@@ -0,0 +1,325 @@
+"""
+Playoff seeding from preliminary results.
+
+Every finished preliminary game is read once, as plain columns, and its
+scorecard is tallied in the same pass into per-team records: wins (ties count
+half), points, games, bonus points and bonuses heard, plus a head-to-head table.
+Teams are then ordered by a configurable tiebreak chain, where each tiebreaker
+only separates teams that are still level on everything before it:
+
+    wins          more wins (a tie counts as half a win)
+    head_to_head  more wins in games among the teams still tied
+    ppg           more points per game
+    ppb           more points per bonus heard
+
+Teams level on the whole chain are ordered by name. The chain comes from the
+tournament format ("seeding_tiebreakers" in tournament_format), else the
+SEEDING_TIEBREAKERS setting (a comma-separated list), else DEFAULT_TIEBREAKERS.
+
+The seeds are written as the playoff stage's aliases (placeholders T1, T2, ...)
+with one DELETE and one executemany INSERT.
+"""
+import json
+import os
+
+from flask import current_app
+from sqlalchemy import delete, insert, select
+
+from extensions import db
+from models.game import Game
+from models.team_alias import TeamAlias
+
+PRELIM_STAGE_ID = 1
+PLAYOFF_STAGE_ID = 2
+
+TIEBREAKERS = ('wins', 'head_to_head', 'ppg', 'ppb')
+DEFAULT_TIEBREAKERS = TIEBREAKERS
+
+
+class SeedingError(ValueError):
+    """Raised when seeding cannot be computed."""
+
+
+class TeamRecord:
+    """A team's preliminary record, as used for seeding."""
+
+    def __init__(self, team_id, team_name):
+        self.team_id = team_id
+        self.team_name = team_name
+        self.seed = None
+        self.games = 0
+        self.wins = 0
+        self.losses = 0
+        self.ties = 0
+        self.tossup_points = 0
+        self.bonus_points = 0
+        self.bonuses_heard = 0
+
+    @property
+    def points(self):
+        return self.tossup_points + self.bonus_points
+
+    @property
+    def win_value(self):
+        return self.wins + 0.5 * self.ties
+
+    @property
+    def ppg(self):
+        return self.points / self.games if self.games else 0.0
+
+    @property
+    def ppb(self):
+        return self.bonus_points / self.bonuses_heard if self.bonuses_heard else 0.0
+
+    def to_dict(self):
+        return {
+            'seed': self.seed,
+            'team_id': self.team_id,
+            'team_name': self.team_name,
+            'wins': self.wins,
+            'losses': self.losses,
+            'ties': self.ties,
+            'points': self.points,
+            'ppg': round(self.ppg, 2),
+            'ppb': round(self.ppb, 2),
+        }
+
+    def __repr__(self):
+        return f'<TeamRecord {self.seed} {self.team_name} {self.wins}-{self.losses}-{self.ties} ppg={self.ppg:.1f} ppb={self.ppb:.2f}>'
+
+
+def _as_int(value):
+    if isinstance(value, bool):
+        return 0
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str) and value.lstrip('-').isdigit():
+        return int(value)
+    return 0
+
+
+def _tally_scorecard(scorecard, record1, record2):
+    """
+    Add a scorecard's tossup points, bonus points and bonuses heard to both teams.
+
+    Returns:
+        tuple: The game's (team 1, team 2) point totals
+    """
+    totals = [0, 0]
+    try:
+        cycles = json.loads(scorecard) if isinstance(scorecard, str) else scorecard
+    except (TypeError, ValueError):
+        return tuple(totals)
+    if not isinstance(cycles, list):
+        cycles = [cycles]
+
+    for cycle in cycles:
+        if not isinstance(cycle, dict):
+            continue
+        for index, (key, record) in enumerate((('team1', record1), ('team2', record2))):
+            tossup = cycle.get(key)
+            tossup_points = sum(_as_int(p) for p in tossup.values()) if isinstance(tossup, dict) else 0
+            bonus_points = _as_int(cycle.get(f'{key}Bonus'))
+            record.tossup_points += tossup_points
+            record.bonus_points += bonus_points
+            totals[index] += tossup_points + bonus_points
+            # A team hears the bonus when it answers the tossup correctly
+            if tossup_points > 0:
+                record.bonuses_heard += 1
+    return tuple(totals)
+
+
+def _winner(result, totals):
+    """
+    Work out who won a finished game: 1 for team 1, 2 for team 2, 0 for a tie.
+
+    The scorecard totals decide, because the result codes disagree: readers
+    store a team 2 win as -1, while the admin scorecard editors store a team 2
+    win as 2 and a tie as -1. The code is only used when nothing was scored
+    (a forfeit), read with the reader's encoding.
+    """
+    team1_points, team2_points = totals
+    if team1_points or team2_points:
+        if team1_points == team2_points:
+            return 0
+        return 1 if team1_points > team2_points else 2
+    if result == 1:
+        return 1
+    if result in (-1, 2):
+        return 2
+    return 0
+
+
+def resolve_tiebreakers(tournament=None, tiebreakers=None):
+    """
+    Work out the tiebreak chain to use.
+
+    Args:
+        tournament (Tournament): Checked for a "seeding_tiebreakers" list in its format
+        tiebreakers (list or str): An explicit chain, which takes precedence
+
+    Returns:
+        tuple: The tiebreaker names, in order
+
+    Raises:
+        SeedingError: If the chain names an unknown tiebreaker
+    """
+    if tiebreakers is None and tournament is not None:
+        data = tournament.parsed_format.data
+        tournament_format = data.get('tournament_format') if isinstance(data, dict) else None
+        if isinstance(tournament_format, dict):
+            tiebreakers = tournament_format.get('seeding_tiebreakers')
+    if tiebreakers is None:
+        tiebreakers = current_app.config.get('SEEDING_TIEBREAKERS', os.environ.get('SEEDING_TIEBREAKERS'))
+    if not tiebreakers:
+        return DEFAULT_TIEBREAKERS
+
+    if isinstance(tiebreakers, str):
+        tiebreakers = tiebreakers.split(',')
+    chain = tuple(name.strip().lower() for name in tiebreakers if name and name.strip())
+    unknown = [name for name in chain if name not in TIEBREAKERS]
+    if unknown:
+        raise SeedingError(f"Unknown tiebreaker(s): {', '.join(unknown)}. Use any of: {', '.join(TIEBREAKERS)}")
+    return chain or DEFAULT_TIEBREAKERS
+
+
+def collect_records(tournament_id):
+    """
+    Tally every team's preliminary record in one pass over the finished games.
+
+    Args:
+        tournament_id (int): The tournament's ID
+
+    Returns:
+        tuple: ({team_id: TeamRecord}, {(winner_id, loser_id): games won})
+    """
+    records = {
+        team_id: TeamRecord(team_id, team_name)
+        for team_id, team_name in db.session.execute(
+            select(TeamAlias.team_id, TeamAlias.team_name)
+            .where(TeamAlias.tournament_id == tournament_id, TeamAlias.stage_id == PRELIM_STAGE_ID)
+        )
+    }
+
+    head_to_head = {}
+    games = db.session.execute(
+        select(Game.team1, Game.team2, Game.result, Game.scorecard)
+        .where(
+            Game.tournament_id == tournament_id,
+            Game.stage_id == PRELIM_STAGE_ID,
+            Game.scorecard.isnot(None),
+            Game.result.isnot(None),
+            Game.result != -2,  # -2 means not played
+        )
+    )
+    for team1, team2, result, scorecard in games:
+        record1 = records.get(team1)
+        record2 = records.get(team2)
+        if record1 is None or record2 is None:
+            continue
+
+        record1.games += 1
+        record2.games += 1
+        outcome = _winner(result, _tally_scorecard(scorecard, record1, record2))
+        if outcome == 1:
+            winner, loser = record1, record2
+        elif outcome == 2:
+            winner, loser = record2, record1
+        else:
+            winner = loser = None
+            record1.ties += 1
+            record2.ties += 1
+        if winner is not None:
+            winner.wins += 1
+            loser.losses += 1
+            key = (winner.team_id, loser.team_id)
+            head_to_head[key] = head_to_head.get(key, 0) + 1
+
+    return records, head_to_head
+
+
+def _order(teams, chain, head_to_head):
+    """Order a group of teams by the tiebreak chain, splitting only the teams still level."""
+    if len(teams) <= 1 or not chain:
+        return sorted(teams, key=lambda record: (record.team_name, record.team_id))
+
+    tiebreaker, rest = chain[0], chain[1:]
+    if tiebreaker == 'head_to_head':
+        # Wins against the other teams in this group, so a three-way tie is
+        # decided by the games among those three teams only
+        group_ids = [record.team_id for record in teams]
+        values = {
+            record.team_id: sum(head_to_head.get((record.team_id, other), 0)
+                                for other in group_ids if other != record.team_id)
+            for record in teams
+        }
+    else:
+        attribute = 'win_value' if tiebreaker == 'wins' else tiebreaker
+        values = {record.team_id: getattr(record, attribute) for record in teams}
+
+    levels = {}
+    for record in teams:
+        levels.setdefault(values[record.team_id], []).append(record)
+    ordered = []
+    for value in sorted(levels, reverse=True):
+        ordered.extend(_order(levels[value], rest, head_to_head))
+    return ordered
+
+
+def compute_seeding(tournament, tiebreakers=None):
+    """
+    Rank the preliminary teams for the playoffs.
+
+    Args:
+        tournament (Tournament): The tournament to seed
+        tiebreakers (list or str): The tiebreak chain; see resolve_tiebreakers
+
+    Returns:
+        list: TeamRecords in seed order, with seed set from 1
+
+    Raises:
+        SeedingError: If there are no preliminary teams or the chain is invalid
+    """
+    chain = resolve_tiebreakers(tournament, tiebreakers)
+    records, head_to_head = collect_records(tournament.id)
+    if not records:
+        raise SeedingError("No preliminary teams found. Please assign teams to the preliminary stage first.")
+
+    ordered = _order(list(records.values()), chain, head_to_head)
+    for seed, record in enumerate(ordered, start=1):
+        record.seed = seed
+    return ordered
+
+
+def assign_playoff_seeding(tournament, tiebreakers=None):
+    """
+    Replace the playoff stage's aliases with seeds computed from the preliminaries.
+
+    Writes one DELETE and one INSERT; the caller commits.
+
+    Args:
+        tournament (Tournament): The tournament to seed
+        tiebreakers (list or str): The tiebreak chain; see resolve_tiebreakers
+
+    Returns:
+        list: TeamRecords in seed order
+
+    Raises:
+        SeedingError: If there are no preliminary teams or the chain is invalid
+    """
+    ordered = compute_seeding(tournament, tiebreakers)
+
+    db.session.execute(
+        delete(TeamAlias).where(TeamAlias.tournament_id == tournament.id, TeamAlias.stage_id == PLAYOFF_STAGE_ID)
+    )
+    db.session.execute(insert(TeamAlias), [
+        {
+            'team_name': record.team_name,
+            'team_id': record.team_id,
+            'stage_id': PLAYOFF_STAGE_ID,
+            'tournament_id': tournament.id,
+            'placeholder': f'T{record.seed}',
+        }
+        for record in ordered
+    ])
+    return ordered
@@ -0,0 +1,210 @@
+"""
+Template and static-file delivery, with a production mode.
+
+In development templates reload on every change and static files are served
+as they are. Setting PRODUCTION=1 (in the environment or app config) switches
+to settings meant for venue phones on poor connections:
+
+    templates     no auto-reload (no stat per render); every template is
+                  compiled at startup into a FileSystemBytecodeCache, so new
+                  workers load bytecode instead of re-parsing the sources
+    static files  url_for('static', ...) points at a fingerprinted name
+                  (js/gameState.3f2a9c1b04.js) served with a one-year,
+                  immutable Cache-Control; a changed file gets a new name
+    compression   gzip (and brotli, if the brotli package is installed)
+                  variants are written once at startup and served as they
+                  are to clients that accept them, instead of compressing
+                  per request
+
+Compressed variants and the bytecode cache live under the instance folder
+(STATIC_BUILD_FOLDER and JINJA_CACHE_FOLDER override the locations) and are
+keyed by content, so restarting after a deploy only builds what changed.
+
+Tailwind comes from the CDN's in-browser compiler unless a compiled
+stylesheet exists at static/css/tailwind.css (npm run build:css); production
+mode uses the compiled one when it is there.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+
+from flask import current_app, request, send_file, url_for
+from jinja2 import FileSystemBytecodeCache
+from markupsafe import Markup
+from werkzeug.exceptions import NotFound
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:  # Optional: gzip alone is still served
+    brotli = None
+
+# One year; fingerprinted names change whenever the content does
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+# Types worth compressing, and the smallest file worth the extra request header
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.json', '.map', '.svg', '.txt', '.html', '.xml')
+MIN_COMPRESS_SIZE = 512
+
+# Source directories under static/ that are built from, not served
+SOURCE_DIRS = ('src',)
+
+TAILWIND_CSS = 'css/tailwind.css'
+TAILWIND_CDN = 'https://cdn.tailwindcss.com'
+
+# Preferred first when the client accepts both
+_ENCODINGS = ('br', 'gzip')
+
+
+def is_production(app):
+    """Check the PRODUCTION setting in the app config, then the environment."""
+    value = app.config.get('PRODUCTION', os.environ.get('PRODUCTION', ''))
+    return str(value).strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+class StaticManifest:
+    """Fingerprinted names and compressed variants for the static folder."""
+
+    def __init__(self, static_folder, build_folder):
+        self.static_folder = static_folder
+        self.build_folder = build_folder
+        self.fingerprinted = {}  # original path -> fingerprinted path
+        self.originals = {}      # fingerprinted path -> original path
+        self.variants = {}       # fingerprinted path -> {encoding: file}
+
+    def build(self):
+        """Hash every static file and write missing compressed variants."""
+        if not self.static_folder or not os.path.isdir(self.static_folder):
+            return self
+        os.makedirs(self.build_folder, exist_ok=True)
+        for root, dirs, files in os.walk(self.static_folder):
+            if root == self.static_folder:
+                dirs[:] = [d for d in dirs if d not in SOURCE_DIRS]
+            for name in files:
+                if name.endswith(('.gz', '.br')):
+                    continue
+                path = os.path.join(root, name)
+                relative = os.path.relpath(path, self.static_folder).replace(os.sep, '/')
+                with open(path, 'rb') as f:
+                    content = f.read()
+                stem, ext = os.path.splitext(relative)
+                fingerprinted = f"{stem}.{hashlib.sha256(content).hexdigest()[:10]}{ext}"
+                self.fingerprinted[relative] = fingerprinted
+                self.originals[fingerprinted] = relative
+                if ext.lower() in COMPRESSIBLE_EXTENSIONS and len(content) >= MIN_COMPRESS_SIZE:
+                    self.variants[fingerprinted] = self._write_variants(fingerprinted, content)
+        return self
+
+    def _write_variants(self, fingerprinted, content):
+        variants = {}
+        compressors = [('gzip', '.gz', lambda data: gzip.compress(data, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            compressors.insert(0, ('br', '.br', lambda data: brotli.compress(data, quality=11)))
+        for encoding, suffix, compress in compressors:
+            target = os.path.join(self.build_folder, *(fingerprinted + suffix).split('/'))
+            if not os.path.exists(target):
+                compressed = compress(content)
+                if len(compressed) >= len(content):
+                    continue
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                # Write then rename, so a worker starting alongside never serves a partial file
+                partial = f"{target}.{os.getpid()}.tmp"
+                with open(partial, 'wb') as f:
+                    f.write(compressed)
+                os.replace(partial, target)
+            variants[encoding] = target
+        return variants
+
+
+def _precompile_templates(app):
+    """Compile every template once so its bytecode is cached before the first request."""
+    compiled = 0
+    for name in app.jinja_env.list_templates():
+        if not name.endswith(('.html', '.htm', '.xml', '.txt', '.j2', '.jinja')):
+            continue
+        try:
+            app.jinja_env.get_template(name)
+            compiled += 1
+        except Exception as e:
+            app.logger.warning("Could not precompile template %s: %s", name, e)
+    return compiled
+
+
+def _serve_static(filename):
+    """Serve a static file, preferring a precompressed variant for fingerprinted names."""
+    manifest = current_app.extensions['static_manifest']
+    original = manifest.originals.get(filename)
+    if original is None:
+        # A plain name (an old link, or a file added after startup) is served as usual
+        return current_app.send_static_file(filename)
+
+    source = safe_join(manifest.static_folder, original)
+    if source is None or not os.path.isfile(source):
+        raise NotFound()
+    mimetype = mimetypes.guess_type(original)[0] or 'application/octet-stream'
+
+    variants = manifest.variants.get(filename, {})
+    path, encoding = source, None
+    for candidate in _ENCODINGS:
+        if candidate in variants and request.accept_encodings[candidate]:
+            path, encoding = variants[candidate], candidate
+            break
+
+    response = send_file(path, mimetype=mimetype, max_age=IMMUTABLE_MAX_AGE, conditional=True)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    if variants:
+        response.vary.add('Accept-Encoding')
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+
+def _tailwind_stylesheet():
+    app = current_app._get_current_object()
+    manifest = app.extensions.get('static_manifest')
+    if manifest is not None and TAILWIND_CSS in manifest.fingerprinted:
+        return Markup('<link rel="stylesheet" href="%s">') % url_for('static', filename=TAILWIND_CSS)
+    return Markup('<script src="%s"></script>') % TAILWIND_CDN
+
+
+def init_static_assets(app):
+    """
+    Configure template reloading and static delivery for development or production.
+
+    Call it after the blueprints are registered, so their templates are precompiled too.
+
+    Args:
+        app (Flask): The application
+    """
+    if not is_production(app):
+        # Pick up template edits without restarting
+        app.config['TEMPLATES_AUTO_RELOAD'] = True
+        app.jinja_env.auto_reload = True
+        app.context_processor(lambda: {'tailwind_stylesheet': _tailwind_stylesheet()})
+        return
+
+    app.config['TEMPLATES_AUTO_RELOAD'] = False
+    app.jinja_env.auto_reload = False
+    cache_folder = app.config.get('JINJA_CACHE_FOLDER', os.environ.get(
+        'JINJA_CACHE_FOLDER', os.path.join(app.instance_path, 'jinja_cache')))
+    os.makedirs(cache_folder, exist_ok=True)
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(cache_folder)
+
+    build_folder = app.config.get('STATIC_BUILD_FOLDER', os.environ.get(
+        'STATIC_BUILD_FOLDER', os.path.join(app.instance_path, 'static-build')))
+    manifest = StaticManifest(app.static_folder, build_folder).build()
+    app.extensions['static_manifest'] = manifest
+
+    @app.url_defaults
+    def fingerprint_static_urls(endpoint, values):
+        if endpoint == 'static' and 'filename' in values:
+            values['filename'] = manifest.fingerprinted.get(values['filename'], values['filename'])
+
+    app.view_functions['static'] = _serve_static
+    app.context_processor(lambda: {'tailwind_stylesheet': _tailwind_stylesheet()})
+
+    compiled = _precompile_templates(app)
+    app.logger.info("Production mode: %s templates compiled, %s static files fingerprinted",
+                    compiled, len(manifest.fingerprinted))
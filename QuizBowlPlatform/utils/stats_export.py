@@ -0,0 +1,506 @@
+"""
+Tournament stats export.
+
+Streams a tournament's results, tallied from the stored scorecards, in one of
+EXPORT_FORMATS:
+
+    json  the tournament, every finished game with team and player lines, and
+          the standings
+    csv   one row per team per finished game
+    qbj   the Quiz Bowl Schema tournament format (a Tournament object followed
+          by one Match object per game), which MODAQ writes and which
+          SQBS-style stats programs such as YellowFruit import
+
+Games are read in batches and serialized as they are read, so a large
+tournament starts downloading at once and is never held twice in memory.
+The finished bytes are kept as an artifact keyed on the tournament's change
+version and last-modified time, both read from the change_version table that
+utils.change_tracking keeps in the database. Every worker therefore agrees on
+the ETag and Last-Modified, and repeat downloads and conditional requests are
+answered without re-reading the games until a game, alias, player or the
+tournament itself changes.
+"""
+import csv
+import io
+import json
+import threading
+
+from flask import current_app, stream_with_context
+from sqlalchemy import select
+
+from extensions import db
+from models.game import Game
+from models.player import Player
+from models.team_alias import TeamAlias
+from utils import change_tracking
+from utils.seeding import TeamRecord
+
+EXPORT_FORMATS = {
+    'json': ('application/json', 'json'),
+    'csv': ('text/csv', 'csv'),
+    'qbj': ('application/json', 'qbj'),
+}
+
+# Tables whose rows feed into an export
+EXPORT_TABLES = ('tournament', 'game', 'team_alias', 'player')
+
+CSV_COLUMNS = (
+    'game_id', 'stage_id', 'stage_name', 'round', 'team_id', 'team', 'opponent_id', 'opponent',
+    'result', 'points', 'opponent_points', 'tossup_points', 'bonus_points', 'bonuses_heard',
+    'powers', 'tens', 'negs', 'tossups_read',
+)
+
+QBJ_VERSION = '2.1.1'
+ANSWER_VALUES = (15, 10, -5)
+
+# Bonuses are three parts of ten points
+MAXIMUM_BONUS_SCORE = 30
+BONUS_DIVISOR = 10
+
+# Games loaded per batch while streaming
+BATCH_SIZE = 200
+
+# Larger artifacts are streamed every time instead of being kept in memory
+MAX_CACHED_BYTES = 32 * 1024 * 1024
+
+_lock = threading.Lock()
+_artifacts = {}  # (tournament_id, format) -> ExportArtifact
+
+
+class ExportArtifact:
+    """A finished export for one tournament, format and version."""
+
+    def __init__(self, tournament_id, export_format, version, last_modified, chunks=None):
+        self.tournament_id = tournament_id
+        self.export_format = export_format
+        self.version = version
+        self.last_modified = last_modified
+        self.chunks = chunks  # None until the export has been generated once
+        self.etag = (f"export-{export_format}-{tournament_id}-{last_modified:%Y%m%d%H%M%S}-"
+                     + '.'.join(str(part) for part in version))
+
+    @property
+    def mimetype(self):
+        return EXPORT_FORMATS[self.export_format][0]
+
+    @property
+    def filename(self):
+        return f"tournament-{self.tournament_id}-stats.{EXPORT_FORMATS[self.export_format][1]}"
+
+
+class TeamLine:
+    """One team's line in one game."""
+
+    def __init__(self, team_id, name):
+        self.team_id = team_id
+        self.name = name
+        self.tossup_points = 0
+        self.bonus_points = 0
+        self.bonuses_heard = 0
+        self.players = {}  # player id -> PlayerLine
+
+    @property
+    def points(self):
+        return self.tossup_points + self.bonus_points
+
+    def answer_count(self, value):
+        return sum(player.answers[value] for player in self.players.values())
+
+
+class PlayerLine:
+    """One player's line in one game."""
+
+    def __init__(self, player_id):
+        self.player_id = player_id
+        self.tossups_heard = 0
+        self.points = 0
+        self.answers = {value: 0 for value in ANSWER_VALUES}
+
+
+class GameLine:
+    """A finished game tallied from its scorecard."""
+
+    def __init__(self, game_id, stage_id, round_number, result, team1, team2):
+        self.game_id = game_id
+        self.stage_id = stage_id
+        self.round_number = round_number
+        self.result = result
+        self.teams = (team1, team2)
+        self.tossups_read = 0
+
+
+def _as_int(value):
+    if isinstance(value, bool):
+        return 0
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str) and value.lstrip('-').isdigit():
+        return int(value)
+    return 0
+
+
+def _tally_game(game_line, cycles):
+    """Add each cycle's tossup, bonus and per-player points to the game's team lines."""
+    for cycle in cycles:
+        if not isinstance(cycle, dict):
+            continue
+        game_line.tossups_read += 1
+        for key, team in zip(('team1', 'team2'), game_line.teams):
+            tossup = cycle.get(key)
+            tossup_points = 0
+            if isinstance(tossup, dict):
+                # Every player listed in the cycle was on the floor for it
+                for player_id, raw_points in tossup.items():
+                    points = _as_int(raw_points)
+                    tossup_points += points
+                    if not str(player_id).isdigit():
+                        continue
+                    player = team.players.get(int(player_id))
+                    if player is None:
+                        player = team.players[int(player_id)] = PlayerLine(int(player_id))
+                    player.tossups_heard += 1
+                    player.points += points
+                    if points in player.answers:
+                        player.answers[points] += 1
+            team.tossup_points += tossup_points
+            team.bonus_points += _as_int(cycle.get(f'{key}Bonus'))
+            if tossup_points > 0:
+                team.bonuses_heard += 1
+
+
+class _ExportContext:
+    """Names and ids the serializers need, loaded once per export."""
+
+    def __init__(self, tournament):
+        self.tournament = tournament
+        parsed_format = tournament.parsed_format
+        self.stage_names = {
+            stage_id: (parsed_format.get_stage(stage_id) or {}).get('stage_name') or f"Stage {stage_id}"
+            for stage_id in parsed_format.stage_ids
+        }
+
+        # Games store a prelim team id ('T3') or, in playoffs, the team's name
+        self.teams = {}       # team_id -> name
+        self.team_refs = {}   # team id or name -> team_id
+        for team_id, team_name, stage_id in db.session.execute(
+            select(TeamAlias.team_id, TeamAlias.team_name, TeamAlias.stage_id)
+            .where(TeamAlias.tournament_id == tournament.id)
+            .order_by(TeamAlias.stage_id, TeamAlias.id)
+        ):
+            if stage_id == 1 or team_id not in self.teams:
+                self.teams[team_id] = team_name
+            self.team_refs.setdefault(team_id, team_id)
+            self.team_refs.setdefault(team_name, team_id)
+
+        self.players = {}     # player id -> (name, team_id)
+        for player_id, name, team_id in db.session.execute(
+            select(Player.id, Player.name, Player.team_id)
+            .join(TeamAlias, Player.alias_id == TeamAlias.id)
+            .where(TeamAlias.tournament_id == tournament.id)
+            .order_by(Player.id)
+        ):
+            self.players[player_id] = (name, team_id)
+
+    def stage_name(self, stage_id):
+        return self.stage_names.get(stage_id, f"Stage {stage_id}")
+
+    def team_line(self, team_ref):
+        team_id = self.team_refs.get(team_ref, team_ref)
+        return TeamLine(team_id, self.teams.get(team_id, team_ref))
+
+    def finished_games(self):
+        """Yield a GameLine per finished game, loading the games in batches."""
+        rows = db.session.execute(
+            select(Game.id, Game.stage_id, Game.round_number, Game.team1, Game.team2, Game.result, Game.scorecard)
+            .where(
+                Game.tournament_id == self.tournament.id,
+                Game.scorecard.isnot(None),
+                Game.result.isnot(None),
+                Game.result != -2,  # -2 means not played
+            )
+            .order_by(Game.stage_id, Game.round_number, Game.id)
+            .execution_options(yield_per=BATCH_SIZE)
+        )
+        for game_id, stage_id, round_number, team1, team2, result, scorecard in rows:
+            try:
+                cycles = json.loads(scorecard)
+            except (TypeError, ValueError):
+                current_app.logger.warning("Skipping game %s in export: unreadable scorecard", game_id)
+                continue
+            if not isinstance(cycles, list):
+                cycles = [cycles]
+            game_line = GameLine(game_id, stage_id, round_number, result,
+                                 self.team_line(team1), self.team_line(team2))
+            _tally_game(game_line, cycles)
+            yield game_line
+
+
+def _result_for(game_line, index):
+    """
+    'W', 'L' or 'T' for the team at index 0 or 1.
+
+    Decided by the tallied points, since readers store a team 2 win as -1 but
+    the admin scorecard editors store a tie as -1; the result code is only
+    used when nothing was scored (a forfeit).
+    """
+    team, opponent = game_line.teams[index], game_line.teams[1 - index]
+    if team.points or opponent.points:
+        if team.points == opponent.points:
+            return 'T'
+        return 'W' if team.points > opponent.points else 'L'
+    if game_line.result == 1:
+        return 'W' if index == 0 else 'L'
+    if game_line.result in (-1, 2):
+        return 'L' if index == 0 else 'W'
+    return 'T'
+
+
+def _add_to_standings(standings, game_line):
+    for index, team in enumerate(game_line.teams):
+        record = standings.get(team.team_id)
+        if record is None:
+            record = standings[team.team_id] = TeamRecord(team.team_id, team.name)
+        record.games += 1
+        record.tossup_points += team.tossup_points
+        record.bonus_points += team.bonus_points
+        record.bonuses_heard += team.bonuses_heard
+        outcome = _result_for(game_line, index)
+        if outcome == 'W':
+            record.wins += 1
+        elif outcome == 'L':
+            record.losses += 1
+        else:
+            record.ties += 1
+
+
+def _stream_json(context):
+    tournament = context.tournament
+    header = {
+        'id': tournament.id,
+        'name': tournament.name,
+        'date': tournament.date.isoformat() if tournament.date else None,
+        'location': tournament.location,
+    }
+    yield '{"tournament": ' + json.dumps(header) + ', "games": ['
+
+    standings = {}
+    separator = ''
+    for game_line in context.finished_games():
+        _add_to_standings(standings, game_line)
+        game = {
+            'id': game_line.game_id,
+            'stage_id': game_line.stage_id,
+            'stage_name': context.stage_name(game_line.stage_id),
+            'round': game_line.round_number,
+            'tossups_read': game_line.tossups_read,
+            'teams': [
+                {
+                    'team_id': team.team_id,
+                    'name': team.name,
+                    'result': _result_for(game_line, index),
+                    'points': team.points,
+                    'tossup_points': team.tossup_points,
+                    'bonus_points': team.bonus_points,
+                    'bonuses_heard': team.bonuses_heard,
+                    'players': [
+                        {
+                            'player_id': player.player_id,
+                            'name': context.players.get(player.player_id, (None, None))[0],
+                            'tossups_heard': player.tossups_heard,
+                            'points': player.points,
+                            'powers': player.answers[15],
+                            'tens': player.answers[10],
+                            'negs': player.answers[-5],
+                        }
+                        for player in team.players.values()
+                    ],
+                }
+                for index, team in enumerate(game_line.teams)
+            ],
+        }
+        yield separator + json.dumps(game)
+        separator = ', '
+
+    ranked = sorted(standings.values(), key=lambda record: (-record.win_value, -record.ppg, record.team_name))
+    for rank, record in enumerate(ranked, start=1):
+        record.seed = rank
+    yield '], "standings": ' + json.dumps([
+        {**record.to_dict(), 'rank': record.seed, 'games': record.games} for record in ranked
+    ]) + '}'
+
+
+def _stream_csv(context):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush():
+        data = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+        return data
+
+    writer.writerow(CSV_COLUMNS)
+    yield flush()
+    for game_line in context.finished_games():
+        for index, team in enumerate(game_line.teams):
+            opponent = game_line.teams[1 - index]
+            writer.writerow((
+                game_line.game_id, game_line.stage_id, context.stage_name(game_line.stage_id),
+                game_line.round_number, team.team_id, team.name, opponent.team_id, opponent.name,
+                _result_for(game_line, index), team.points, opponent.points, team.tossup_points,
+                team.bonus_points, team.bonuses_heard, team.answer_count(15), team.answer_count(10),
+                team.answer_count(-5), game_line.tossups_read,
+            ))
+        yield flush()
+
+
+def _stream_qbj(context):
+    tournament = context.tournament
+
+    players_by_team = {}
+    for player_id, (name, team_id) in context.players.items():
+        players_by_team.setdefault(team_id, []).append({'id': f'player_{player_id}', 'name': name})
+
+    # The tournament object lists every match by reference, so the ids and
+    # rounds are loaded first; the matches themselves are streamed after it
+    rounds_by_stage = {}
+    for game_id, stage_id, round_number in db.session.execute(
+        select(Game.id, Game.stage_id, Game.round_number)
+        .where(Game.tournament_id == tournament.id, Game.scorecard.isnot(None),
+               Game.result.isnot(None), Game.result != -2)
+        .order_by(Game.stage_id, Game.round_number, Game.id)
+    ):
+        rounds_by_stage.setdefault(stage_id, {}).setdefault(round_number, []).append({'$ref': f'game_{game_id}'})
+
+    tournament_object = {
+        'type': 'Tournament',
+        'id': f'tournament_{tournament.id}',
+        'name': tournament.name,
+        'start_date': tournament.date.isoformat() if tournament.date else None,
+        'scoring_rules': {
+            'answer_types': [
+                {'id': f'answer_type_{value}', 'value': value, 'awards_bonus': value > 0}
+                for value in ANSWER_VALUES
+            ],
+            'maximum_bonus_score': MAXIMUM_BONUS_SCORE,
+            'bonus_divisor': BONUS_DIVISOR,
+        },
+        'registrations': [
+            {
+                'id': f'registration_{team_id}',
+                'name': name,
+                'teams': [{'id': f'team_{team_id}', 'name': name, 'players': players_by_team.get(team_id, [])}],
+            }
+            for team_id, name in context.teams.items()
+        ],
+        'phases': [
+            {
+                'name': context.stage_name(stage_id),
+                'rounds': [
+                    {'name': f"Round {round_number}", 'matches': matches}
+                    for round_number, matches in sorted(rounds.items())
+                ],
+            }
+            for stage_id, rounds in sorted(rounds_by_stage.items())
+        ],
+    }
+    if tournament.location:
+        tournament_object['location'] = tournament.location
+    yield '{"version": "' + QBJ_VERSION + '", "objects": [' + json.dumps(tournament_object)
+
+    for game_line in context.finished_games():
+        match = {
+            'type': 'Match',
+            'id': f'game_{game_line.game_id}',
+            'tossups_read': game_line.tossups_read,
+            'match_teams': [
+                {
+                    'team': {'$ref': f'team_{team.team_id}'},
+                    'points': team.points,
+                    'bonus_points': team.bonus_points,
+                    'match_players': [
+                        {
+                            'player': {'$ref': f'player_{player.player_id}'},
+                            'tossups_heard': player.tossups_heard,
+                            'answer_counts': [
+                                {'answer_type': {'$ref': f'answer_type_{value}'}, 'number': count}
+                                for value, count in player.answers.items()
+                            ],
+                        }
+                        for player in team.players.values()
+                    ],
+                }
+                for team in game_line.teams
+            ],
+        }
+        yield ', ' + json.dumps(match)
+    yield ']}'
+
+
+_SERIALIZERS = {
+    'json': _stream_json,
+    'csv': _stream_csv,
+    'qbj': _stream_qbj,
+}
+
+
+def get_artifact(tournament_id, export_format):
+    """
+    Get the export artifact for a tournament's current version.
+
+    The artifact always carries the ETag and Last-Modified time, so
+    conditional requests can be answered from it; its chunks are None until
+    the export has been generated at this version.
+
+    Args:
+        tournament_id (int): The tournament to export
+        export_format (str): One of EXPORT_FORMATS
+
+    Returns:
+        ExportArtifact: The cached artifact, or an empty one for the current version
+    """
+    version = change_tracking.get_version(tournament_id, EXPORT_TABLES)
+    last_modified = change_tracking.last_modified(tournament_id, EXPORT_TABLES)
+    with _lock:
+        artifact = _artifacts.get((tournament_id, export_format))
+    if artifact is not None and artifact.version == version and artifact.last_modified == last_modified:
+        return artifact
+    return ExportArtifact(tournament_id, export_format, version, last_modified)
+
+
+def stream_export(tournament, artifact):
+    """
+    Yield the export's bytes, from the cached artifact or generated as they are read.
+
+    A generated export is cached once it has been streamed in full. The
+    generator uses the database, so it is wrapped in stream_with_context.
+
+    Args:
+        tournament (Tournament): The tournament to export
+        artifact (ExportArtifact): From get_artifact
+
+    Returns:
+        generator: The response body in chunks
+    """
+    if artifact.chunks is not None:
+        return iter(artifact.chunks)
+
+    def generate():
+        chunks = []
+        size = 0
+        for text in _SERIALIZERS[artifact.export_format](_ExportContext(tournament)):
+            if not text:
+                continue
+            chunk = text.encode('utf-8')
+            size += len(chunk)
+            if chunks is not None:
+                chunks.append(chunk)
+                if size > MAX_CACHED_BYTES:
+                    chunks = None
+            yield chunk
+        if chunks is not None:
+            artifact.chunks = chunks
+            with _lock:
+                _artifacts[(artifact.tournament_id, artifact.export_format)] = artifact
+
+    return stream_with_context(generate())
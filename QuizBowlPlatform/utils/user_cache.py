@@ -0,0 +1,201 @@
+"""
+Short-lived cache of logged-in users' identity and role.
+
+Flask-Login calls the user loader on every authenticated request. Instead of
+querying the admin and reader tables each time, the loader returns a
+UserIdentity built from a per-process cache entry that lives for
+USER_CACHE_TTL seconds (default 30). The identity carries what requests
+check on every call (id, role, name, needs_password_change); any other
+attribute, such as a reader's assigned_tournaments, loads the full model on
+first use.
+
+Session ids carry the role ('admin:3', 'reader:7') because admins and readers
+have separate id sequences. Bare ids from sessions created before the prefix
+was added are treated as readers, which is how they were loaded before.
+
+Entries are dropped as soon as a password change, a forced-change flag
+update or a deletion commits, whichever code path made it. The cache is per
+process, so other workers see the change once their entry expires.
+"""
+import os
+import threading
+import time
+
+from flask_login import UserMixin
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from extensions import db
+
+ROLE_ADMIN = 'admin'
+ROLE_READER = 'reader'
+
+DEFAULT_TTL = 30.0
+
+# Columns whose change must drop a cached identity
+_WATCHED_COLUMNS = ('username', 'email', 'password_hash', 'hashed_password', 'needs_password_change')
+_PENDING_KEY = 'pending_user_invalidations'
+
+_lock = threading.Lock()
+_entries = {}  # (role, user_id) -> (expires_at, identity fields)
+_ttl = DEFAULT_TTL
+
+
+def _model_for(role):
+    if role == ROLE_ADMIN:
+        from models.admin import Admin
+        return Admin
+    from models.reader import Reader
+    return Reader
+
+
+class UserIdentity(UserMixin):
+    """The cached identity Flask-Login exposes as current_user."""
+
+    def __init__(self, role, user_id, name, needs_password_change=False):
+        self.role = role
+        self.id = user_id
+        self.name = name
+        self.needs_password_change = needs_password_change
+        if role == ROLE_ADMIN:
+            self.username = name
+        else:
+            self.email = name
+
+    def get_id(self):
+        return f'{self.role}:{self.id}'
+
+    @property
+    def is_admin(self):
+        return self.role == ROLE_ADMIN
+
+    @property
+    def is_reader(self):
+        return self.role == ROLE_READER
+
+    @property
+    def model(self):
+        """The Admin or Reader row, loaded on first use within the request."""
+        return db.session.get(_model_for(self.role), self.id)
+
+    def __getattr__(self, name):
+        # Only reached for attributes the identity doesn't carry
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.model, name)
+
+    def __repr__(self):
+        return f'<UserIdentity {self.role}:{self.id} {self.name}>'
+
+
+def _identity_fields(role, user):
+    if role == ROLE_ADMIN:
+        return user.username, bool(user.needs_password_change)
+    return user.email, False
+
+
+def get_user_identity(role, user_id):
+    """
+    Get a user's identity, querying the database only on a cache miss.
+
+    Args:
+        role (str): ROLE_ADMIN or ROLE_READER
+        user_id (int): The admin's or reader's ID
+
+    Returns:
+        UserIdentity or None: None if the user does not exist
+    """
+    key = (role, int(user_id))
+    now = time.monotonic()
+    with _lock:
+        entry = _entries.get(key)
+    if entry is not None and entry[0] > now:
+        name, needs_password_change = entry[1]
+        return UserIdentity(role, key[1], name, needs_password_change)
+
+    user = db.session.get(_model_for(role), key[1])
+    if user is None:
+        return None
+    fields = _identity_fields(role, user)
+    with _lock:
+        _entries[key] = (now + _ttl, fields)
+    return UserIdentity(role, key[1], *fields)
+
+
+def parse_user_id(user_id):
+    """
+    Split a session user id into (role, id).
+
+    Returns:
+        tuple or None: None if the id is malformed
+    """
+    role, _, raw_id = str(user_id).rpartition(':')
+    role = role or ROLE_READER  # Sessions from before ids carried a role
+    if role not in (ROLE_ADMIN, ROLE_READER) or not raw_id.isdigit():
+        return None
+    return role, int(raw_id)
+
+
+def load_user(user_id):
+    """Flask-Login user loader for admins and readers."""
+    parsed = parse_user_id(user_id)
+    if parsed is None:
+        return None
+    return get_user_identity(*parsed)
+
+
+def invalidate_user(role, user_id):
+    """Drop a user's cached identity in this process."""
+    with _lock:
+        _entries.pop((role, int(user_id)), None)
+
+
+def clear_user_cache():
+    """Drop every cached identity in this process."""
+    with _lock:
+        _entries.clear()
+
+
+def _role_of(obj):
+    from models.admin import Admin
+    from models.reader import Reader
+    if isinstance(obj, Admin):
+        return ROLE_ADMIN
+    if isinstance(obj, Reader):
+        return ROLE_READER
+    return None
+
+
+def _collect_invalidations(session, flush_context):
+    pending = session.info.setdefault(_PENDING_KEY, set())
+    for obj in session.deleted:
+        role = _role_of(obj)
+        if role is not None:
+            pending.add((role, obj.id))
+    for obj in session.dirty:
+        role = _role_of(obj)
+        if role is None:
+            continue
+        attrs = inspect(obj).attrs
+        if any(name in attrs and attrs[name].history.has_changes() for name in _WATCHED_COLUMNS):
+            pending.add((role, obj.id))
+
+
+def _apply_invalidations(session):
+    for role, user_id in session.info.pop(_PENDING_KEY, ()):
+        invalidate_user(role, user_id)
+
+
+def _discard_invalidations(session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+def init_user_cache(app):
+    """Set the TTL and register the listeners that invalidate changed users. Safe to call more than once."""
+    global _ttl
+    _ttl = float(app.config.get('USER_CACHE_TTL', os.environ.get('USER_CACHE_TTL', DEFAULT_TTL)))
+    if event.contains(Session, 'after_flush', _collect_invalidations):
+        return
+    event.listen(Session, 'after_flush', _collect_invalidations)
+    event.listen(Session, 'after_commit', _apply_invalidations)
+    event.listen(Session, 'after_rollback', _discard_invalidations)